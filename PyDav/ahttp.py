@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import ssl
+import time
+import base64
+import asyncio
+from os import fstat
+from contextlib import asynccontextmanager
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    print('Please use python3 to use PyDav asynchronous client.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav minimal HTTP/1.1 client for asyncio with keep-alive connections
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+CHUNKSIZE = 262144
+
+# errors meaning the connection is unusable, the caller gets them as is
+NETWORK_ERRORS = (
+    OSError,
+    EOFError,
+    asyncio.IncompleteReadError,
+    asyncio.TimeoutError,
+    ValueError)
+
+
+class connection():
+    '''
+     One TCP (or TLS) connection to a host
+    '''
+
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.lastuse = time.time()
+        self.requests = 0
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class response():
+    '''
+     HTTP response whose body is read on demand
+
+     :param conn: connection the response is read from
+     :type  conn: connection
+
+     :param method: request method, HEAD responses have no body
+     :type  method: string
+    '''
+
+    def __init__(self, conn, method):
+        self.__conn = conn
+        self.__method = method
+        self.__remaining = 0
+        self.__chunked = False
+        self.__untileof = False
+        self.done = False
+        self.keepalive = True
+        self.status = 0
+        self.reason = ''
+        self.headers = {}
+
+    async def start(self, timeout):
+        '''
+         Read status line and headers, skipping informational responses
+        '''
+
+        reader = self.__conn.reader
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line:
+                raise EOFError('Connection closed by server')
+            version, status, reason = '{0}  '.format(
+                line.decode('latin-1').strip()).split(' ', 2)
+            self.status = int(status)
+            self.reason = reason.strip()
+            self.headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout)
+                line = line.decode('latin-1').strip()
+                if not line:
+                    break
+                key, value = line.split(':', 1)
+                self.headers[key.strip().lower()] = value.strip()
+            if self.status >= 200:
+                break
+
+        connhdr = self.headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            self.keepalive = connhdr == 'keep-alive'
+        else:
+            self.keepalive = connhdr != 'close'
+
+        if self.__method == 'HEAD' or self.status in [204, 304]:
+            self.done = True
+        elif 'chunked' in self.headers.get('transfer-encoding', '').lower():
+            self.__chunked = True
+        elif 'content-length' in self.headers:
+            self.__remaining = int(self.headers['content-length'])
+            self.done = self.__remaining == 0
+        else:
+            self.__untileof = True
+            self.keepalive = False
+
+    async def chunks(self, size=CHUNKSIZE):
+        '''
+         Iterate over the response body
+
+         :param   size: maximum bytes returned at once
+         :type    size: int
+         :default size: 262144
+
+         :returns: body chunks
+         :rtype: async generator
+        '''
+
+        reader = self.__conn.reader
+        while not self.done:
+            if self.__chunked:
+                if self.__remaining == 0:
+                    line = await reader.readline()
+                    self.__remaining = int(line.split(b';')[0].strip(), 16)
+                    if self.__remaining == 0:
+                        # skip trailers
+                        while (await reader.readline()).strip():
+                            pass
+                        self.done = True
+                        break
+                data = await reader.read(min(size, self.__remaining))
+                if not data:
+                    raise EOFError('Connection closed by server')
+                self.__remaining -= len(data)
+                if self.__remaining == 0:
+                    await reader.readline()
+            elif self.__untileof:
+                data = await reader.read(size)
+                if not data:
+                    self.done = True
+                    break
+            else:
+                data = await reader.read(min(size, self.__remaining))
+                if not data:
+                    raise EOFError('Connection closed by server')
+                self.__remaining -= len(data)
+                self.done = self.__remaining == 0
+            yield data
+
+    async def read(self):
+        '''
+         Read the whole response body
+
+         :returns: body
+         :rtype: bytes
+        '''
+
+        data = []
+        async for chunk in self.chunks():
+            data.append(chunk)
+        return(b''.join(data))
+
+
+class session():
+    '''
+     Pool of keep-alive HTTP/1.1 connections. Each host gets its own
+     semaphore so no more than maxconn requests run against it at once,
+     whatever the number of tasks awaiting.
+
+     :param   auth: (login, password) used for Basic authentication
+     :type    auth: tuple
+     :default auth: None
+
+     :param   maxconn: maximum concurrent requests (and connections) per host
+     :type    maxconn: int
+     :default maxconn: 8
+
+     :param   idletime: seconds after which an idle connection is closed
+     :type    idletime: int
+     :default idletime: 60
+
+     :param   timeout: seconds to wait for a connection or a response
+     :type    timeout: int
+     :default timeout: 60
+
+     :returns: session object
+     :rtype: obj
+    '''
+
+    def __init__(self, auth=None, maxconn=8, idletime=60, timeout=60):
+        self.__maxconn = max(1, int(maxconn))
+        self.__idletime = idletime
+        self.__timeout = timeout
+        self.__limits = {}
+        self.__idle = {}
+        self.__ssl = None
+        self.__auth = None
+        if auth is not None:
+            self.__auth = 'Basic {0}'.format(base64.b64encode(
+                '{0}:{1}'.format(auth[0], auth[1] or '').encode('utf-8')
+            ).decode('ascii'))
+        self.__counters = {'requests': 0, 'connects': 0}
+
+    def __limit(self, key):
+        if key not in self.__limits:
+            self.__limits[key] = asyncio.Semaphore(self.__maxconn)
+        return(self.__limits[key])
+
+    async def __checkout(self, key):
+        idle = self.__idle.setdefault(key, [])
+        limit = time.time() - self.__idletime
+        while idle:
+            conn = idle.pop()
+            if conn.lastuse >= limit and not conn.reader.at_eof():
+                return(conn)
+            conn.close()
+
+        scheme, host, port = key
+        context = None
+        if scheme == 'https':
+            if self.__ssl is None:
+                self.__ssl = ssl.create_default_context()
+            context = self.__ssl
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context), self.__timeout)
+        self.__counters['connects'] += 1
+        return(connection(key, reader, writer))
+
+    def __checkin(self, conn, resp):
+        if resp is not None and resp.done and resp.keepalive:
+            conn.lastuse = time.time()
+            self.__idle.setdefault(conn.key, []).append(conn)
+        else:
+            # body left unread or server closing, the connection is lost
+            conn.close()
+
+    async def __send(self, conn, method, target, headers, body):
+        writer = conn.writer
+        head = ['{0} {1} HTTP/1.1'.format(method, target)]
+        for key, value in headers.items():
+            head.append('{0}: {1}'.format(key, value))
+        head.append('')
+        head.append('')
+        writer.write('\r\n'.join(head).encode('latin-1'))
+
+        if isinstance(body, (bytes, bytearray)):
+            writer.write(body)
+        elif body is not None:
+            loop = asyncio.get_event_loop()
+            while True:
+                data = await loop.run_in_executor(None, body.read, CHUNKSIZE)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        await writer.drain()
+
+        conn.requests += 1
+        resp = response(conn, method)
+        await resp.start(self.__timeout)
+        return(resp)
+
+    @asynccontextmanager
+    async def request(self, method, url, headers=None, body=None):
+        '''
+         Send a request and hold its connection while the response is used
+
+            async with http.request('GET', url) as resp:
+                async for chunk in resp.chunks():
+                    ...
+
+         :param method: HTTP method
+         :type  method: string
+
+         :param url: absolute URL
+         :type  url: string
+
+         :param   headers: extra request headers
+         :type    headers: dict
+         :default headers: None
+
+         :param   body: request body, bytes or a file opened in binary mode
+         :type    body: bytes or file
+         :default body: None
+
+         :returns: response, body must be consumed for the connection
+                   to be reused
+         :rtype: response
+        '''
+
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target = '{0}?{1}'.format(target, parts.query)
+
+        allheaders = {'Host': parts.netloc, 'Accept': '*/*'}
+        if self.__auth is not None:
+            allheaders['Authorization'] = self.__auth
+        allheaders.update(headers or {})
+        if isinstance(body, (bytes, bytearray)):
+            allheaders['Content-Length'] = str(len(body))
+        elif body is not None:
+            allheaders['Content-Length'] = str(
+                fstat(body.fileno()).st_size - body.tell())
+        elif method in ['PUT', 'POST', 'PROPFIND', 'PROPPATCH', 'REPORT']:
+            allheaders['Content-Length'] = '0'
+
+        async with self.__limit(key):
+            start = body.tell() if hasattr(body, 'tell') else None
+            conn = await self.__checkout(key)
+            reused = conn.requests > 0
+            try:
+                resp = await self.__send(conn, method, target, allheaders, body)
+            except NETWORK_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                # server dropped the idle connection, retry once on a new one
+                if start is not None:
+                    body.seek(start)
+                conn = await self.__checkout(key)
+                try:
+                    resp = await self.__send(
+                        conn, method, target, allheaders, body)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+            self.__counters['requests'] += 1
+            try:
+                yield resp
+            except BaseException:
+                conn.close()
+                raise
+            else:
+                self.__checkin(conn, resp)
+
+    def stats(self):
+        '''
+         Session counters
+
+         :returns: 'requests' sent, new 'connects' opened and 'idle' ones
+         :rtype: dict
+        '''
+
+        result = dict(self.__counters)
+        result['idle'] = sum(len(i) for i in self.__idle.values())
+        return(result)
+
+    async def close(self):
+        '''
+         Close every idle connection
+        '''
+
+        for idle in self.__idle.values():
+            for conn in idle:
+                conn.close()
+        self.__idle = {}
+
+
+if __name__ == "__main__":
+    pass
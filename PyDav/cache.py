@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import time
+import threading
+from os import path as fpath
+from collections import OrderedDict
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav remote metadata cache filled by PROPFIND responses
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+def normalize(path):
+    '''
+     Cache key of a Webdav path
+
+     :param path: Webdav path
+     :type  path: string
+
+     :returns: absolute normalized path
+     :rtype: string
+    '''
+
+    return(fpath.normpath('/{0}'.format(str(path).lstrip('/'))))
+
+
+class metadata():
+    '''
+     Bounded LRU cache of listing.entry keyed on the normalized remote
+     path. Entries expire after ttl seconds; an expired collection keeps
+     its members list as long as a new PROPFIND returns the same etag.
+
+     :param   maxsize: maximum number of cached paths
+     :type    maxsize: int
+     :default maxsize: 50000
+
+     :param   ttl: seconds an entry is trusted without asking the server
+     :type    ttl: int
+     :default ttl: 30
+
+     :returns: cache object
+     :rtype: obj
+    '''
+
+    def __init__(self, maxsize=50000, ttl=30):
+        self.__maxsize = max(1, int(maxsize))
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        # path -> (entry, timestamp)
+        self.__entries = OrderedDict()
+        # collection path -> (set of member paths, timestamp)
+        self.__members = OrderedDict()
+        # parent path -> child paths known in either table
+        self.__children = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __fresh(self, stamp):
+        return(time.time() - stamp < self.__ttl)
+
+    def __link(self, key):
+        while key != '/':
+            parent = fpath.dirname(key)
+            siblings = self.__children.setdefault(parent, set())
+            if key in siblings:
+                break
+            siblings.add(key)
+            key = parent
+
+    def __unlink(self, key):
+        # a path stays linked while cached or while it leads to cached paths
+        while key != '/' and key not in self.__entries and \
+                key not in self.__members and not self.__children.get(key):
+            self.__children.pop(key, None)
+            parent = fpath.dirname(key)
+            siblings = self.__children.get(parent)
+            if siblings is not None:
+                siblings.discard(key)
+            key = parent
+
+    def __bound(self, table):
+        while len(table) > self.__maxsize:
+            self.__unlink(table.popitem(last=False)[0])
+
+    def get(self, path):
+        '''
+         Lookup a path
+
+         :param path: Webdav path
+         :type  path: string
+
+         :returns: (found, entry): found is False when the cache cannot
+                   answer, entry is None when the path is known missing
+         :rtype: tuple
+        '''
+
+        key = normalize(path)
+        with self.__lock:
+            cached = self.__entries.get(key)
+            if cached is not None and self.__fresh(cached[1]):
+                self.__entries.move_to_end(key)
+                self.hits += 1
+                return((True, cached[0]))
+
+            # a fresh complete listing of the parent proves it is missing
+            parent = self.__members.get(fpath.dirname(key))
+            if key != '/' and parent is not None and self.__fresh(parent[1]):
+                if key not in parent[0]:
+                    self.hits += 1
+                    return((True, None))
+
+            self.misses += 1
+            return((False, None))
+
+    def etag(self, path):
+        '''
+         Last known etag of a path, even if expired
+
+         :returns: etag or None
+         :rtype: string
+        '''
+
+        with self.__lock:
+            cached = self.__entries.get(normalize(path))
+        return(cached[0].etag if cached is not None else None)
+
+    def members(self, path):
+        '''
+         Fresh members of a collection
+
+         :param path: Webdav collection path
+         :type  path: string
+
+         :returns: list of member entries, None if unknown or if the
+                   listing or one of its members expired
+         :rtype: list
+        '''
+
+        key = normalize(path)
+        with self.__lock:
+            cached = self.__members.get(key)
+            if cached is None or not self.__fresh(cached[1]):
+                self.misses += 1
+                return(None)
+            found = []
+            for member in cached[0]:
+                item = self.__entries.get(member)
+                if item is None or not self.__fresh(item[1]):
+                    # member evicted or expired: the collection etag does
+                    # not follow its members' changes on every server
+                    self.misses += 1
+                    return(None)
+                found.append(item[0])
+            self.__members.move_to_end(key)
+            self.hits += 1
+        return(found)
+
+    def put(self, item):
+        '''
+         Store or refresh one entry. A collection whose etag changed
+         loses its cached members.
+
+         :param item: listing.entry
+         :type  item: namedtuple
+        '''
+
+        key = normalize(item.path)
+        now = time.time()
+        with self.__lock:
+            previous = self.__entries.get(key)
+            self.__entries[key] = (item, now)
+            self.__entries.move_to_end(key)
+            self.__link(key)
+            if key in self.__members:
+                if previous is not None and item.etag and \
+                        previous[0].etag == item.etag:
+                    # etag revalidated, members are still valid
+                    self.__members[key] = (self.__members[key][0], now)
+                else:
+                    del self.__members[key]
+            self.__bound(self.__entries)
+
+    def fill(self, path, entries, depth='infinity'):
+        '''
+         Store a PROPFIND result and the members lists it proves complete
+
+         :param path: Webdav path which was listed
+         :type  path: string
+
+         :param entries: listing.entry found (path itself may be included)
+         :type  entries: list
+
+         :param   depth: depth of the listing (0, 1 or 'infinity')
+         :type    depth: int or string
+         :default depth: 'infinity'
+        '''
+
+        base = normalize(path)
+        members = {}
+        collections = set([base]) if str(depth) != '0' else set()
+        now = time.time()
+
+        with self.__lock:
+            for item in entries:
+                key = normalize(item.path)
+                self.__entries[key] = (item, now)
+                self.__entries.move_to_end(key)
+                self.__link(key)
+                if key == base:
+                    continue
+                members.setdefault(fpath.dirname(key), set()).add(key)
+                if item.is_dir and str(depth) == 'infinity':
+                    collections.add(key)
+
+            for collection in collections:
+                self.__members[collection] = (
+                    members.get(collection, set()), now)
+                self.__members.move_to_end(collection)
+                self.__link(collection)
+
+            self.__bound(self.__entries)
+            self.__bound(self.__members)
+
+    def invalidate(self, path, exists=None):
+        '''
+         Forget a path, everything below it and the parent entry. The
+         parent listing is kept when told whether path exists now.
+
+         :param path: Webdav path which changed on the server
+         :type  path: string
+
+         :param   exists: True when path may exist now (written), False
+                          when it is gone (removed), None if unknown
+         :type    exists: boolean
+         :default exists: None
+        '''
+
+        key = normalize(path)
+        parent = fpath.dirname(key)
+        with self.__lock:
+            # walk the subtree through the parent index, not the tables
+            pending = [key]
+            while pending:
+                k = pending.pop()
+                self.__entries.pop(k, None)
+                self.__members.pop(k, None)
+                pending.extend(self.__children.pop(k, ()))
+            self.__unlink(key)
+            self.__entries.pop(parent, None)
+            self.__unlink(parent)
+            listing = self.__members.get(parent)
+            if listing is None or key == parent:
+                return(None)
+            if exists is None:
+                del self.__members[parent]
+            elif exists:
+                # without its entry a member is asked again, never assumed
+                listing[0].add(key)
+            else:
+                listing[0].discard(key)
+
+    def clear(self):
+        '''
+         Forget everything
+        '''
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__members.clear()
+            self.__children.clear()
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import sqlite3
+import hashlib
+from os import path as fpath
+try:
+    from PyDav import cache
+    from PyDav import listing
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav local index of a remote tree, refreshed from changed collections
+    only, answering searches and listings without asking the server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# shortest word looked up through the trigram full text index
+TRIGRAM = 3
+
+
+def default_catalog(host, root, remotedir):
+    '''
+     Default index location of a remote tree, in the user cache directory
+
+     :param host: Webdav host:port part of URI
+     :type  host: string
+
+     :param root: Webdav root
+     :type  root: string
+
+     :param remotedir: indexed Webdav path
+     :type  remotedir: string
+
+     :returns: SQLite database file path
+     :rtype: string
+    '''
+
+    signature = '{0}|{1}|{2}'.format(host, root, cache.normalize(remotedir))
+    key = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+    cachedir = os.environ.get('XDG_CACHE_HOME') or fpath.expanduser('~/.cache')
+    return(fpath.join(cachedir, 'pydav', 'tree-{0}.db'.format(key)))
+
+
+def changed(row, item):
+    '''
+     Tell if a remote resource differs from its indexed state
+
+     :param row: indexed (is_dir, size, mtime, etag)
+     :type  row: tuple
+
+     :param item: remote resource
+     :type  item: listing.entry
+
+     :rtype: boolean
+    '''
+
+    return(tuple(row) != (int(item.is_dir), item.size, item.mtime, item.etag))
+
+
+class catalog():
+    '''
+     Local index of every resource below a remote path, kept in SQLite
+     with a trigram full text index on names, so searches and listings
+     are answered in milliseconds.
+
+     The first refresh lists the whole tree once. Servers answering
+     sync-collection REPORT requests (RFC 6578) then send only what
+     changed since the sync-token kept with the index. Other servers
+     are asked the top collection only and the collections whose etag
+     or modification time changed are listed again, relying on the
+     server to propagate changes to parent collections (Nextcloud,
+     ownCloud and most servers keeping collection etags).
+
+     :param client: connected client.core
+     :type  client: obj
+
+     :param remotedir: Webdav path to index
+     :type  remotedir: string
+
+     :param   dbpath: SQLite database file path
+     :type    dbpath: string
+     :default dbpath: default_catalog()
+
+     :param   ttl: seconds a refresh is trusted without asking the server
+     :type    ttl: int
+     :default ttl: 0
+
+     :param   host: Webdav host, names the default database
+     :type    host: string
+     :default host: ''
+
+     :param   root: Webdav root, names the default database
+     :type    root: string
+     :default root: ''
+
+     :returns: catalog object
+     :rtype: obj
+    '''
+
+    def __init__(self, client, remotedir, dbpath=None, ttl=0, host='', root=''):
+        self.__client = client
+        self.__base = cache.normalize(remotedir)
+        self.__dbpath = dbpath or default_catalog(host, root, remotedir)
+        self.__ttl = ttl
+        self.__db = None
+        self.__fts = False
+
+    def __open(self):
+        if self.__db is None:
+            directory = fpath.dirname(self.__dbpath)
+            if directory and not fpath.isdir(directory):
+                os.makedirs(directory, 0o700, exist_ok=True)
+            db = sqlite3.connect(self.__dbpath, timeout=30)
+            with db:
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS entries ('
+                    'path TEXT PRIMARY KEY, parent TEXT, name TEXT, '
+                    'is_dir INTEGER, size INTEGER, mtime REAL, etag TEXT, '
+                    'checksum TEXT)')
+                db.execute(
+                    'CREATE INDEX IF NOT EXISTS entries_parent '
+                    'ON entries (parent)')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS state ('
+                    'key TEXT PRIMARY KEY, value TEXT)')
+            try:
+                with db:
+                    # rows are deleted then inserted, never updated
+                    db.execute(
+                        'CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5('
+                        "name, content='entries', tokenize='trigram')")
+                    db.execute(
+                        'CREATE TRIGGER IF NOT EXISTS names_insert '
+                        'AFTER INSERT ON entries BEGIN '
+                        'INSERT INTO names (rowid, name) '
+                        'VALUES (new.rowid, new.name); END')
+                    db.execute(
+                        'CREATE TRIGGER IF NOT EXISTS names_delete '
+                        'AFTER DELETE ON entries BEGIN '
+                        "INSERT INTO names (names, rowid, name) "
+                        "VALUES ('delete', old.rowid, old.name); END")
+                self.__fts = True
+            except sqlite3.OperationalError:
+                # SQLite without FTS5 or trigrams: names are scanned
+                self.__fts = False
+            self.__db = db
+        return(self.__db)
+
+    def __state(self, db, key, value=None):
+        if value is not None:
+            db.execute(
+                'INSERT OR REPLACE INTO state VALUES (?, ?)', (key, str(value)))
+            return(value)
+        row = db.execute(
+            'SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        return(row[0] if row else None)
+
+    def __list(self, path, depth):
+        found = self.__client.propfind(path, depth)
+        if 'code' in found:
+            raise IOError(found['reason'])
+        return(found)
+
+    def __walk(self, path):
+        found = self.__client.walk(path)
+        if 'code' in found:
+            raise IOError(found['reason'])
+        return(found)
+
+    def __prune(self, db, path):
+        # path and everything below it
+        prefix = path.rstrip('/')
+        db.execute(
+            'DELETE FROM entries WHERE path = ? OR (path >= ? AND path < ?)',
+            (path, '{0}/'.format(prefix), '{0}0'.format(prefix)))
+
+    def __store(self, db, items):
+        db.executemany(
+            'DELETE FROM entries WHERE path = ?', [(e.path,) for e in items])
+        db.executemany(
+            'INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(e.path, fpath.dirname(e.path), fpath.basename(e.path),
+              int(e.is_dir), e.size, e.mtime, e.etag, e.checksum)
+             for e in items])
+
+    def __known(self, db, path):
+        return(db.execute(
+            'SELECT is_dir, size, mtime, etag FROM entries WHERE path = ?',
+            (path,)).fetchone())
+
+    def __children(self, db, path):
+        return(dict(
+            (r[0], r[1:]) for r in db.execute(
+                'SELECT path, is_dir, size, mtime, etag FROM entries '
+                'WHERE parent = ? AND path != ?', (path, path))))
+
+    def __top(self):
+        top = [e for e in self.__list(self.__base, 0) if e.path == self.__base]
+        if not top:
+            raise IOError('Remote path {0} not found.'.format(self.__base))
+        return(top[0])
+
+    def __follow(self, db, token):
+        '''
+         Apply the changes the server lists since token, returns a
+         report or None when the server cannot list changes
+        '''
+
+        found = self.__client.changes(self.__base, token)
+        if found['code'] == 1:
+            if found.get('supported', True):
+                raise IOError(found['reason'])
+            self.__state(db, 'sync', 0)
+            db.execute("DELETE FROM state WHERE key = 'token'")
+            return(None)
+
+        if found['initial']:
+            self.__prune(db, self.__base)
+            self.__store(db, [self.__top()] + found['changed'])
+        else:
+            for gone in found['removed']:
+                self.__prune(db, gone)
+            for e in found['changed']:
+                row = self.__known(db, e.path)
+                if row is not None and bool(row[0]) != e.is_dir:
+                    self.__prune(db, e.path)
+            self.__store(db, found['changed'])
+        self.__state(db, 'sync', 1)
+        self.__state(db, 'token', found['token'])
+        return('{0} changes of {1} received.'.format(
+            len(found['changed']) + len(found['removed']), self.__base))
+
+    def __compare(self, db, rebuild):
+        '''
+         Compare collection etags with the indexed ones, returns a report
+        '''
+
+        top = self.__top()
+        row = self.__known(db, self.__base)
+        if rebuild or row is None:
+            listed = self.__rebuild(db, top)
+        elif changed(row, top):
+            listed = self.__update(db, top)
+        else:
+            listed = 0
+        return('{0} collections of {1} listed again.'.format(
+            listed, self.__base))
+
+    def __rebuild(self, db, top):
+        entries = self.__walk(self.__base)
+        self.__prune(db, self.__base)
+        self.__store(db, [top] + entries)
+        return(1)
+
+    def __update(self, db, top):
+        '''
+         List again the changed collections below top, returns how many
+         listings were needed
+        '''
+
+        listed = 0
+        frontier = [top]
+        while frontier:
+            directory = frontier.pop()
+            members = self.__list(directory.path, 1)
+            listed += 1
+            known = self.__children(db, directory.path)
+            self.__store(db, [directory])
+            for e in members:
+                if e.path == directory.path:
+                    continue
+                row = known.pop(e.path, None)
+                if row is not None and not changed(row, e):
+                    continue
+                if e.is_dir and row is not None and row[0]:
+                    frontier.append(e)
+                    continue
+                if row is not None:
+                    self.__prune(db, e.path)
+                if e.is_dir:
+                    # a new collection, listed once recursively
+                    self.__store(db, [e] + self.__walk(e.path))
+                    listed += 1
+                else:
+                    self.__store(db, [e])
+            for gone in known:
+                self.__prune(db, gone)
+        return(listed)
+
+    def ready(self):
+        '''
+         Tell if the index was built once and can answer queries
+
+         :rtype: boolean
+        '''
+
+        return(self.__state(self.__open(), 'built') is not None)
+
+    def covers(self, path):
+        '''
+         Tell if a Webdav path is inside the indexed tree
+
+         :param path: Webdav path
+         :type  path: string
+
+         :rtype: boolean
+        '''
+
+        path = cache.normalize(path)
+        return(path == self.__base or
+               path.startswith('{0}/'.format(self.__base.rstrip('/'))))
+
+    def refresh(self, fresh=False, ttl=None):
+        '''
+         Bring the index up to date with the server
+
+         :param   fresh: forget the index and list the whole tree again
+         :type    fresh: boolean
+         :default fresh: False
+
+         :param   ttl: seconds a refresh is trusted, 0 to always ask
+         :type    ttl: int
+         :default ttl: the catalog ttl
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+
+        db = self.__open()
+        built = self.__state(db, 'built')
+        refreshed = float(self.__state(db, 'refreshed') or 0)
+        ttl = self.__ttl if ttl is None else ttl
+        if not fresh and built and ttl and \
+                time.time() - refreshed < float(ttl):
+            return({'code': 0, 'reason': 'Index of {0} is recent.'.format(
+                self.__base)})
+
+        try:
+            with db:
+                rebuild = fresh or not built or \
+                    self.__known(db, self.__base) is None
+                token = None if rebuild else self.__state(db, 'token')
+                reason = None
+                # servers refusing sync-collection are asked again on fresh
+                if token or fresh or self.__state(db, 'sync') != '0':
+                    reason = self.__follow(db, token)
+                if reason is None:
+                    reason = self.__compare(db, rebuild)
+                self.__state(db, 'built', built or time.time())
+                self.__state(db, 'refreshed', time.time())
+        except IOError as exception:
+            return({'code': 1, 'reason': str(exception)})
+
+        return({'code': 0, 'reason': reason})
+
+    def entries(self, path=None):
+        '''
+         Indexed resources below a collection
+
+         :param   path: Webdav collection path
+         :type    path: string
+         :default path: the indexed path
+
+         :returns: listing.entry list sorted on path, path itself
+                   excluded, None if path is not an indexed collection
+         :rtype: list
+        '''
+
+        db = self.__open()
+        path = cache.normalize(path or self.__base)
+        row = self.__known(db, path)
+        if row is None or not row[0]:
+            return(None)
+        prefix = path.rstrip('/')
+        return([
+            listing.entry(p, bool(d), size, mtime, etag, checksum)
+            for p, d, size, mtime, etag, checksum in db.execute(
+                'SELECT path, is_dir, size, mtime, etag, checksum '
+                'FROM entries WHERE path >= ? AND path < ? ORDER BY path',
+                ('{0}/'.format(prefix), '{0}0'.format(prefix)))])
+
+    def search(self, word, path=None):
+        '''
+         Indexed paths whose name contains word
+
+         :param word: searching word
+         :type  word: string
+
+         :param   path: Webdav path where looking for word
+         :type    path: string
+         :default path: the indexed path
+
+         :returns: absolute Webdav paths, sorted
+         :rtype: list
+        '''
+
+        db = self.__open()
+        prefix = cache.normalize(path or self.__base).rstrip('/')
+        bounds = ('{0}/'.format(prefix), '{0}0'.format(prefix))
+        word = str(word)
+        if self.__fts and len(word) >= TRIGRAM:
+            # trigrams ignore case, instr() keeps the match exact
+            rows = db.execute(
+                'SELECT e.path FROM names JOIN entries AS e '
+                'ON e.rowid = names.rowid '
+                'WHERE names MATCH ? AND instr(e.name, ?) > 0 '
+                'AND e.path >= ? AND e.path < ? ORDER BY e.path',
+                ('"{0}"'.format(word.replace('"', '""')), word) + bounds)
+        else:
+            rows = db.execute(
+                'SELECT path FROM entries WHERE instr(name, ?) > 0 '
+                'AND path >= ? AND path < ? ORDER BY path',
+                (word,) + bounds)
+        return([r[0] for r in rows])
+
+    def members(self, path=None):
+        '''
+         Names of the resources directly below an indexed collection,
+         collections with a trailing slash
+
+         :param   path: Webdav collection path
+         :type    path: string
+         :default path: the indexed path
+
+         :returns: sorted names, None if path is not an indexed collection
+         :rtype: list
+        '''
+
+        db = self.__open()
+        path = cache.normalize(path or self.__base)
+        row = self.__known(db, path)
+        if row is None or not row[0]:
+            return(None)
+        return([
+            '{0}/'.format(name) if is_dir else name
+            for name, is_dir in db.execute(
+                'SELECT name, is_dir FROM entries '
+                'WHERE parent = ? AND path != ? ORDER BY name', (path, path))])
+
+    def close(self):
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+
+if __name__ == "__main__":
+    pass
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+import io
+import os
 import sys
 import re
+import hashlib
 from os import path as fpath, remove as fremove, stat as fstat, listdir, makedirs, walk
 from fnmatch import filter as fnfilter
+from email.utils import formatdate
 import logging
-import logging.handlers
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 try:
+    import pycurl
     import webdav.client as wc
 except BaseException:
     packages = "argcomplete>=1.9.2, lxml>=3.8.0, pycurl>=7.43.0, webdavclient>=1.0.8"
@@ -16,6 +22,23 @@ except BaseException:
     exit(1)
 else:
     from webdav.client import WebDavException
+    from webdav.exceptions import NotConnection, RemoteResourceNotFound, MethodNotSupported
+    from webdav.exceptions import RemoteParentNotFound, NotEnoughSpace
+    from webdav.urn import Urn
+from PyDav import cache
+from PyDav import digest
+from PyDav import lazy
+from PyDav import negotiate
+from PyDav import listing
+from PyDav import logs
+from PyDav import metrics
+from PyDav import pool
+from PyDav import progress
+from PyDav import resume
+from PyDav import retry
+from PyDav import stream
+from PyDav import throttle
+from PyDav import transfer
 
 __author__ = "Alain Maibach"
 __status__ = "Released"
@@ -46,12 +69,96 @@ __status__ = "Released"
   https://journeyman-to-zen.blogspot.fr/2014/04/how-to-use-pycurl-to-provide-status-bar.html
 '''
 
+# AsyncCore only: asyncio and ssl weigh more than the rest of the client
+ahttp = lazy.module('PyDav.ahttp')
+asyncio = lazy.module('asyncio')
+
 python3 = sys.version_info.major == 3
 
 curScriptDir = fpath.dirname(fpath.abspath(__file__))
 curScriptName = fpath.splitext(fpath.basename(__file__))[0]
 
 
+def emitlog(message, level='INFO', dst='console', logfpath=False):
+    '''
+     Send one log message to the given destination
+
+     :param message: logging message to send
+     :type  message: string
+
+     :param level: logging facility level
+     :type  level: string
+
+     :param dst: logging destination (console|syslog|file)
+     :type  dst: string
+
+     :param logfpath: If dst is file, allow you to specify the file path
+     :type  logfpath: string
+    '''
+
+    logs.emit(message, level=level, dst=dst, logfpath=logfpath,
+              name=curScriptName)
+
+
+class pooledClient(wc.Client):
+    '''
+     webdavclient Client whose requests are performed on curl handles
+     checked out from a connection pool instead of fresh ones, and
+     recorded in the process metrics registry with their attempt number
+
+     :param options: webdavclient options
+     :type  options: dict
+
+     :param connections: pool shared by every request of this client
+     :type  connections: pool.connections
+
+     :param   connecttimeout: seconds to establish a connection, 0 for
+                              curl default
+     :type    connecttimeout: float
+     :default connecttimeout: 0
+    '''
+
+    def __init__(self, options, connections, connecttimeout=0):
+        wc.Client.__init__(self, options)
+        self.connections = connections
+        self.connecttimeout = connecttimeout
+
+    def Request(self, options=None):
+        curl = self.connections.acquire(self.webdav.hostname)
+
+        defaults = {
+            'URL': self.webdav.hostname,
+            'NOBODY': 1,
+            'SSLVERSION': pycurl.SSLVERSION_TLSv1,
+            'TCP_KEEPALIVE': 1
+        }
+        if self.connecttimeout:
+            defaults['CONNECTTIMEOUT_MS'] = int(self.connecttimeout * 1000)
+        if not self.webdav.token:
+            defaults['USERPWD'] = '{0}:{1}'.format(
+                self.webdav.login, self.webdav.password)
+        if self.webdav.recv_speed:
+            defaults['MAX_RECV_SPEED_LARGE'] = self.webdav.recv_speed
+        if self.webdav.send_speed:
+            defaults['MAX_SEND_SPEED_LARGE'] = self.webdav.send_speed
+        if self.webdav.verbose:
+            defaults['VERBOSE'] = self.webdav.verbose
+
+        # Retry-After of the answer is noted for the retry policy
+        options = dict(options or {})
+        options['HEADERFUNCTION'] = retry.tap(options.get('HEADERFUNCTION'))
+        # data goes through the process bandwidth limits
+        options = throttle.shared().shape(options)
+
+        wc.add_options(curl, defaults)
+        wc.add_options(curl, options)
+        defaults.update(options)
+
+        request = metrics.shared().wrap(curl, defaults)
+        request.retries = retry.attempt()
+        return(request)
+
+
 class core():
     '''
      Main class which will allow
@@ -81,6 +188,100 @@ class core():
      :type    verbosity: boolean
      :default verbosity: False
 
+     :param   jobs: Number of files transferred concurrently
+     :type    jobs: int
+     :default jobs: 1
+
+     :param   pool: Transfer workers pool type (thread|process)
+     :type    pool: string
+     :default pool: 'thread'
+
+     :param   maxconn: Maximum keep-alive connections per host
+     :type    maxconn: int
+     :default maxconn: 8
+
+     :param   idletime: Seconds before an idle connection is closed
+     :type    idletime: int
+     :default idletime: 60
+
+     :param   cachettl: Seconds remote metadata are trusted without asking
+     :type    cachettl: int
+     :default cachettl: 30
+
+     :param   cachesize: Maximum number of remote paths kept in cache
+     :type    cachesize: int
+     :default cachesize: 50000
+
+     :param   segments: Concurrent byte ranges used to download a large file
+     :type    segments: int
+     :default segments: 1 (disabled)
+
+     :param   segthreshold: Minimum file size in bytes for segmented download
+     :type    segthreshold: int
+     :default segthreshold: 67108864
+
+     :param   chunking: Large files upload protocol (none|range|nextcloud)
+     :type    chunking: string
+     :default chunking: 'none'
+
+     :param   chunksize: Chunk size in bytes, larger files are chunked
+     :type    chunksize: int
+     :default chunksize: 10485760
+
+     :param   checksums: Compare file contents with server checksums before
+                         skipping a transfer, send OC-Checksum on upload
+     :type    checksums: boolean
+     :default checksums: True
+
+     :param   retries: Attempts after the first one of a failed request
+     :type    retries: int
+     :default retries: 3
+
+     :param   retrywait: Base wait in seconds before a retry, doubled at
+                         each attempt
+     :type    retrywait: float
+     :default retrywait: 0.5
+
+     :param   filebudget: Retries allowed for all requests of one file
+     :type    filebudget: int
+     :default filebudget: 10
+
+     :param   maxrecv: Download rate of all transfers of the process
+                       (bytes per second or 512K, 2M...), 0 for unlimited
+     :type    maxrecv: int or string
+     :default maxrecv: 0
+
+     :param   maxsend: Upload rate of all transfers of the process
+     :type    maxsend: int or string
+     :default maxsend: 0
+
+     :param   filerecv: Download rate of each transfer
+     :type    filerecv: int or string
+     :default filerecv: 0
+
+     :param   filesend: Upload rate of each transfer
+     :type    filesend: int or string
+     :default filesend: 0
+
+     :param   schedule: Time of day rates replacing maxrecv and maxsend,
+                        like '08:00-19:00 1M 256K, 22:00-06:00 0 0'
+     :type    schedule: string
+     :default schedule: ''
+
+     :param   shares: Processes sharing maxrecv and maxsend
+     :type    shares: int
+     :default shares: 1
+
+     :param   handshake: Request checking the server on connect: a Depth 0
+                         PROPFIND, an OPTIONS or a listing of the root
+                         (propfind|options|list)
+     :type    handshake: string
+     :default handshake: 'propfind'
+
+     :param   connecttimeout: Seconds to establish a connection
+     :type    connecttimeout: float
+     :default connecttimeout: 10
+
      :returns: webdavclient library object
      :rtype: obj
     '''
@@ -93,7 +294,29 @@ class core():
         root,
         logtype='console',
         logfile=False,
-        verbosity=False
+        verbosity=False,
+        jobs=1,
+        pool='thread',
+        maxconn=8,
+        idletime=60,
+        cachettl=30,
+        cachesize=50000,
+        segments=1,
+        segthreshold=67108864,
+        chunking='none',
+        chunksize=10485760,
+        checksums=True,
+        retries=3,
+        retrywait=0.5,
+        filebudget=10,
+        maxrecv=0,
+        maxsend=0,
+        filerecv=0,
+        filesend=0,
+        schedule='',
+        shares=1,
+        handshake='propfind',
+        connecttimeout=10
     ):
         '''
          Init class
@@ -102,6 +325,8 @@ class core():
         self.__error = {'code': 0, 'reason': ''}
 
         self.__logfile = logfile
+        self.__logger = None
+        self.__loglevel = logging.DEBUG if verbosity else logging.INFO
 
         if logtype not in ['console', 'file', 'syslog']:
             self.sendlog(
@@ -120,6 +345,10 @@ class core():
                 dst='console',
                 level='warn')
 
+        # built once, sendlog only looks it up
+        self.__logger = logs.getlogger(
+            self.__logtype, self.__logfile, curScriptName)
+
         self.__verbose = verbosity
         if host != "" and host is not None:
             self.__host = host
@@ -157,15 +386,115 @@ class core():
             # 'proxy_password':  "p_password",
             # 'cert_path':       "/etc/ssl/certs/certificate.crt",
             # 'key_path':        "/etc/ssl/private/certificate.key",
-            # 'recv_speed' : 3000000,
-            # 'send_speed' : 3000000,
             'verbose': verbosity
         }
 
-        signal.signal(signal.SIGINT, self.sigint_handler)
+        try:
+            self.__jobs = max(1, int(jobs))
+        except (TypeError, ValueError):
+            self.__jobs = 1
+        self.__pool = pool
+        self.__maxconn = maxconn
+        self.__idletime = idletime
+        self.__connections = None
+        # thread workers borrow the connections of the client they serve
+        self.__ownpool = True
+        self.__cache = cache.metadata(maxsize=cachesize, ttl=cachettl)
+        try:
+            self.__segments = max(1, int(segments))
+            self.__segthreshold = max(1, int(segthreshold))
+        except (TypeError, ValueError):
+            self.__segments = 1
+            self.__segthreshold = 67108864
+        if not hasattr(os, 'pwrite'):
+            self.__segments = 1
+        self.__chunking = chunking
+        try:
+            self.__chunksize = max(1, int(chunksize))
+        except (TypeError, ValueError):
+            self.__chunksize = 10485760
+        self.__checksums = bool(checksums)
+        try:
+            self.__retry = retry.policy(
+                retries=retries, wait=retrywait, budget=filebudget)
+        except (TypeError, ValueError):
+            self.__retry = retry.policy()
+        self.__digests = None
+        self.__sidecars = {}
+        # SEARCH endpoint, probed on first search
+        self.__dasl = None
+        # sync-collection REPORT support, probed on first change listing
+        self.__synccol = None
+        if handshake not in negotiate.HANDSHAKES:
+            self.sendlog(
+                msg="Handshake {0} unknown, using propfind".format(handshake),
+                dst=self.__logtype,
+                level='warn')
+            handshake = 'propfind'
+        self.__handshake = handshake
+        try:
+            self.__connecttimeout = max(0.0, float(connecttimeout))
+        except (TypeError, ValueError):
+            self.__connecttimeout = 10.0
+        # server capabilities, completed once by an OPTIONS answer
+        self.__capabilities = negotiate.capabilities({})
+        self.__probed = False
+
+        # bandwidth limits shared with every client of this process
+        try:
+            throttle.shared().configure(
+                maxrecv=maxrecv, maxsend=maxsend, filerecv=filerecv,
+                filesend=filesend, schedule=schedule, shares=shares)
+        except (TypeError, ValueError) as exception:
+            self.sendlog(
+                msg="Bandwidth limits ignored: {0}".format(exception),
+                dst=self.__logtype,
+                level='warn')
+
+        # progress line shared with every client of this process
+        self.__meter = progress.shared()
+        self.__tracker = None
+
+        # transfer workers get their own client built from these settings
+        self.__settings = {
+            'host': host,
+            'login': login,
+            'passwd': passwd,
+            'root': root,
+            'logtype': self.__logtype,
+            'logfile': logfile,
+            'verbosity': verbosity,
+            'maxconn': maxconn,
+            'idletime': idletime,
+            'cachettl': cachettl,
+            'cachesize': cachesize,
+            'segments': segments,
+            'segthreshold': segthreshold,
+            'chunking': chunking,
+            'chunksize': chunksize,
+            'checksums': checksums,
+            'retries': retries,
+            'retrywait': retrywait,
+            'filebudget': filebudget,
+            'maxrecv': maxrecv,
+            'maxsend': maxsend,
+            'filerecv': filerecv,
+            'filesend': filesend,
+            'schedule': schedule,
+            # process workers split the process wide rates
+            'shares': self.__jobs if pool == 'process' else 1,
+            'handshake': handshake,
+            'connecttimeout': connecttimeout
+        }
+
+        # signals can only be handled from the main thread
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.sigint_handler)
 
     def __del__(self):
-        pass
+        if getattr(self, '_core__connections', None) is not None and \
+                self.__ownpool:
+            self.__connections.close()
 
     def sigint_handler(self, signum, frame):
         '''
@@ -191,27 +520,96 @@ class core():
             total_to_upload,
             total_uploaded):
         '''
-         Callback function invoked when download/upload has progress
-         with pretty print progress and percentage
+         Callback function invoked when download/upload has progress,
+         shown on the process wide progress line (see progress.meter)
+        '''
+
+        if self.__tracker is None:
+            self.__tracker = self.__meter.track()
+        self.__tracker(
+            total_to_download, total_downloaded, total_to_upload, total_uploaded)
+
+    def reset(self):
+        '''
+         Clear the last error so the instance can be used again
+
+         :returns: result 'code'
+         :rtype: dict
+        '''
+
+        self.__error = {'code': 0, 'reason': ''}
+        return(self.__error)
+
+    def get_jobs(self):
+        '''
+         :returns: number of files transferred concurrently
+         :rtype: int
+        '''
+
+        return(self.__jobs)
+
+    def set_jobs(self, jobs):
+        '''
+         Change the number of files transferred concurrently, used by
+         the next transfers
+
+         :param jobs: number of concurrent transfers
+         :type  jobs: int
+        '''
+
+        try:
+            self.__jobs = max(1, int(jobs))
+        except (TypeError, ValueError):
+            self.__jobs = 1
+        if self.__pool == 'process':
+            # process workers split the process wide rates
+            self.__settings['shares'] = self.__jobs
+
+    jobs = property(
+        get_jobs,
+        set_jobs,
+        None,
+        "Number of files transferred concurrently")
+
+    def pool_stats(self):
+        '''
+         Connection pool counters, see pool.connections.stats()
+
+         :returns: pool counters, empty before connect()
+         :rtype: dict
+        '''
+
+        if self.__connections is None:
+            return({})
+        return(self.__connections.stats())
+
+    def worker(self):
         '''
+         Client for a transfer thread of this process. It keeps its own
+         error state but uses the handle pool, metadata cache and server
+         capabilities of this connected client: it sends no handshake and
+         does not ask again what a listing already told.
 
-        if total_to_upload:
-            percent_completed = float(total_uploaded) / total_to_upload
-            rate = round(percent_completed * 100, ndigits=2)
-            completed = "#" * int(rate)
-            spaces = " " * (100 - int(rate))
-            status = '[%s%s] %s%%' % (completed, spaces, rate)
-            sys.stdout.write('\r' + str(status))
-            sys.stdout.flush()
+         :returns: connected client
+         :rtype: obj
+        '''
 
-        if total_to_download:
-            percent_completed = float(total_downloaded) / total_to_download
-            rate = round(percent_completed * 100, ndigits=2)
-            completed = "#" * int(rate)
-            spaces = " " * (100 - int(rate))
-            status = '[%s%s] %s%%' % (completed, spaces, rate)
-            sys.stdout.write('\r' + str(status))
-            sys.stdout.flush()
+        twin = core(**self.__settings)
+        if self.__connections is None:
+            # not connected yet, the worker connects on its own
+            twin.connect()
+            return(twin)
+        twin.__connections = self.__connections
+        twin.__ownpool = False
+        twin.__client = pooledClient(
+            self.__options, self.__connections, self.__connecttimeout)
+        twin.__hrefroot = self.__hrefroot
+        twin.__walker = listing.walker(twin.__propfind)
+        twin.__cache = self.__cache
+        twin.__capabilities = dict(self.__capabilities)
+        twin.__probed = self.__probed
+        twin.reset()
+        return(twin)
 
     def file_size(self, fname):
         '''
@@ -252,6 +650,10 @@ class core():
         if self.__error['code'] == 1:
             return(self.__error)
 
+        lvl = logs.levelno(level)
+        if lvl < self.__loglevel:
+            return
+
         if not dst:
             dst = self.__logtype
 
@@ -259,47 +661,22 @@ class core():
             if self.__logfile:
                 logfpath = self.__logfile
 
-        message = str(msg)
-        loglvl = str(level)
-
-        logger = logging.getLogger(__name__)
-        logger.setLevel(logging.DEBUG)
-        formatter = logging.Formatter(
-            '%(asctime)s - [{0} %(processName)s] %(levelname)s: %(message)s'.format(curScriptName))
-
-        if str(dst) == 'syslog':
-            handler = logging.handlers.SysLogHandler(address='/dev/log')
-            formatter = logging.Formatter(
-                '[{0} %(processName)s] %(levelname)s: %(message)s'.format(curScriptName))
-            handler.setFormatter(formatter)
-        elif str(dst) == 'file':
-            if not logfpath:
-                handler = logging.handlers.WatchedFileHandler(
-                    r'{0}/pyWebdav.log'.format(curScriptDir))
-            else:
-                handler = logging.handlers.WatchedFileHandler(
-                    r'{0}'.format(logfpath))
-            handler.setFormatter(formatter)
-        else:
-            handler = logging.StreamHandler()
-            handler.setFormatter(formatter)
-
-        logger.addHandler(handler)
-        if loglvl == 'DEBUG' or loglvl == 'debug':
-            logger.debug(message)
-        elif loglvl == 'INFO' or loglvl == 'info':
-            logger.info(message)
-        elif loglvl == 'WARN' or loglvl == 'warn':
-            logger.warn(message)
-        elif loglvl == 'ERROR' or loglvl == 'error':
-            logger.error(message)
+        if self.__logger is not None and dst == self.__logtype and (
+                dst != 'file' or logfpath == self.__logfile):
+            logger = self.__logger
         else:
-            logger.critical(message)
-        logger.removeHandler(handler)
+            logger = logs.getlogger(dst, logfpath, curScriptName)
+        logger.log(lvl, str(msg))
 
-    def connect(self):
+    @metrics.operation('connect')
+    def connect(self, target=None):
         '''
-         function to connect to webdav
+         function to connect to webdav, the handshake request checks the
+         credentials and that target exists
+
+         :param   target: Webdav path which must exist
+         :type    target: string
+         :default target: None (Webdav root)
 
          :returns: In case of failure only, it will returns error 'code' and 'reason'
          :rtype: dict
@@ -307,11 +684,40 @@ class core():
         if self.__error['code'] == 1:
             return(self.__error)
 
-        self.__client = wc.Client(self.__options)
+        if self.__connections is None:
+            self.__connections = pool.connections(
+                maxconn=self.__maxconn, idletime=self.__idletime)
+        self.__client = pooledClient(
+            self.__options, self.__connections, self.__connecttimeout)
+        self.__hrefroot = listing.href_root('{0}{1}'.format(
+            self.__client.webdav.hostname, self.__client.webdav.root))
+        self.__walker = listing.walker(self.__propfind)
         try:
-            self.__client.list()
-        except BaseException:
+            if self.__handshake == 'list':
+                self.__client.list()
+            else:
+                self.__greet(target or '/')
+                if target and self.__handshake == 'options' and \
+                        not self.__exists(target):
+                    # OPTIONS is answered for missing paths too
+                    raise RemoteResourceNotFound(target)
+        except RemoteResourceNotFound:
+            errmsg = "Unable to find {0}".format(target)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level='warn',
+                    msg=errmsg)
+            else:
+                self.sendlog(msg=errmsg, dst=self.__logtype, level='warn')
+            self.__error = {'code': 1, 'reason': errmsg}
+            return(self.__error)
+        except BaseException as exception:
             errmsg = "Unable to connect to server: {0}.".format(self.__host)
+            if isinstance(exception, WebDavException) and str(exception):
+                errmsg = "Unable to connect to server: {0}, {1}.".format(
+                    self.__host, exception)
             if self.__logtype == 'file':
                 self.sendlog(
                     logfpath=self.__logfile,
@@ -338,9 +744,139 @@ class core():
                 dst=self.__logtype)
 
         self.__error = {'code': 0}
+        if target and self.__handshake == 'list':
+            return(self.check(target))
 
         return(self.__error)
 
+    def __greet(self, target):
+        '''
+         Send the handshake request on target, keeping the capabilities
+         its answer announces and, for a PROPFIND, target metadata. Raises
+         RemoteResourceNotFound when target does not exist and
+         WebDavException when the server refuses the request.
+        '''
+
+        method = 'OPTIONS' if self.__handshake == 'options' else 'PROPFIND'
+        lines = []
+        parser = listing.multistatus(self.__hrefroot)
+        options = {
+            'URL': self.__url(target, directory=(method == 'OPTIONS')),
+            'CUSTOMREQUEST': method,
+            'HTTPHEADER': ['Accept: */*'],
+            'HEADERFUNCTION': lines.append
+        }
+        if method == 'PROPFIND':
+            options['HTTPHEADER'].extend([
+                'Depth: 0', 'Content-Type: application/xml; charset="utf-8"'])
+            options['POSTFIELDS'] = listing.PROPFIND_BODY
+            options['NOBODY'] = 0
+            options['WRITEFUNCTION'] = parser.feed
+
+        request = self.__client.Request(options=options)
+        try:
+            request.perform()
+            code = int(request.getinfo(pycurl.HTTP_CODE))
+            spent = negotiate.timings(request)
+        finally:
+            request.close()
+
+        msg = "Handshake {0} {1}: HTTP {2}, {3}".format(
+            method, target, code, negotiate.describe(spent))
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                level='debug',
+                msg=msg)
+        else:
+            self.sendlog(msg=msg, dst=self.__logtype, level='debug')
+
+        if code in [401, 403]:
+            raise WebDavException('credentials refused (HTTP {0})'.format(code))
+        if code == 404:
+            raise RemoteResourceNotFound(target)
+        if code >= 300 or (method == 'PROPFIND' and code != 207):
+            raise WebDavException('{0} answered HTTP {1}'.format(method, code))
+
+        self.__capabilities = negotiate.merge(
+            self.__capabilities,
+            negotiate.capabilities(negotiate.headers(lines)))
+        if method == 'OPTIONS':
+            self.__probed = True
+        else:
+            for e in parser.close():
+                self.__cache.put(e)
+
+    def __offers(self, url):
+        '''
+         Send an OPTIONS request, returns its HTTP status and answer
+         header fields
+        '''
+
+        lines = []
+
+        def perform():
+            del lines[:]
+            request = self.__client.Request(options={
+                'URL': url,
+                'CUSTOMREQUEST': 'OPTIONS',
+                'HTTPHEADER': ['Accept: */*'],
+                'HEADERFUNCTION': lines.append})
+            try:
+                request.perform()
+                return(int(request.getinfo(pycurl.HTTP_CODE)))
+            finally:
+                request.close()
+
+        code = self.__replay('OPTIONS', perform)
+        return(code, negotiate.headers(lines))
+
+    def __probe(self):
+        '''
+         Server capabilities, completed with an OPTIONS request on the
+         Webdav root the first time. Raises WebDavException when it fails.
+        '''
+
+        if not self.__probed:
+            code, fields = self.__offers(self.__url('/', directory=True))
+            self.__probed = True
+            if code < 300:
+                self.__capabilities = negotiate.merge(
+                    self.__capabilities, negotiate.capabilities(fields))
+        return(self.__capabilities)
+
+    def capabilities(self):
+        '''
+         Server capabilities announced so far: DAV compliance classes,
+         allowed methods, byte ranges, DASL search, chunking protocols and,
+         once changes() asked, sync-collection support; asked once with an
+         OPTIONS request if the handshake did not tell
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: capabilities, see negotiate.capabilities()
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        try:
+            return(dict(self.__probe()))
+        except WebDavException as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
+
+    @metrics.operation('check')
     def check(self, target):
         '''
          Check if target exists on remote Webdav server
@@ -355,7 +891,7 @@ class core():
             return(self.__error)
 
         try:
-            if not self.__client.check(target):
+            if not self.__exists(target):
                 if self.__logtype == 'file':
                     self.sendlog(
                         logfpath=self.__logfile,
@@ -388,6 +924,7 @@ class core():
 
         return(self.__error)
 
+    @metrics.operation('list')
     def list(self, target):
         '''
          List share content
@@ -405,7 +942,12 @@ class core():
             return(self.__error)
 
         try:
-            remotefiles = self.__client.list(target)
+            remotefiles = []
+            for e in self.__members(target):
+                if e.is_dir:
+                    remotefiles.append('{0}/'.format(fpath.basename(e.path)))
+                else:
+                    remotefiles.append(fpath.basename(e.path))
         except WebDavException as exception:
             if self.__logtype == 'file':
                 self.sendlog(
@@ -420,6 +962,7 @@ class core():
         else:
             return(remotefiles)
 
+    @metrics.operation('getinfo')
     def getinfo(self, target):
         '''
          Get infos about file
@@ -437,7 +980,16 @@ class core():
             return(self.__error)
 
         try:
-            fileinfos = self.__client.info(target)
+            item = self.__stat(target)
+            if item is None:
+                raise RemoteResourceNotFound(target)
+            fileinfos = {
+                'created': item.created,
+                'name': fpath.basename(item.path),
+                'size': item.size,
+                'modified': formatdate(item.mtime, usegmt=True) if item.mtime else None,
+                'etag': item.etag
+            }
         except WebDavException as exception:
             if self.__logtype == 'file':
                 self.sendlog(
@@ -452,294 +1004,1735 @@ class core():
         else:
             return(fileinfos)
 
-    def download(self, remote, local):
+    def __url(self, target, directory=False):
+        '''
+         Build the full URL of a Webdav path
         '''
-         Downloading file from webdav
-
-         :param remote: Webdav remote file path to get
-         :type  remote: string
 
-         :param local: local filesystem path where to put downloaded datas
-         :type  local: string
+        urn = Urn(target, directory=directory)
+        return('{0}{1}{2}'.format(
+            self.__client.webdav.hostname,
+            self.__client.webdav.root,
+            urn.quote()))
 
-         :returns: It will returns result 'code' and 'reason'
-         :rtype: dict
+    def __replay(self, method, perform):
+        '''
+         Run perform() through the retry policy and return the HTTP status
+         of its last attempt. Raises NotConnection if no answer came and
+         retry.unavailable while the host circuit is open.
         '''
-        if self.__error['code'] == 1:
-            return(self.__error)
 
-        local = fpath.normpath(local)
-        remote = fpath.normpath(remote)
+        try:
+            return(self.__retry.run(
+                method, self.__client.webdav.hostname, perform,
+                self.__retrylog))
+        except pycurl.error:
+            raise NotConnection(self.__client.webdav.hostname)
 
-        isdir = False
-        fileinfo = self.getinfo(remote)
-        if 'code' in fileinfo:
-            return(self.__error)
+    def __retrylog(self, msg):
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                level="warn",
+                msg=msg)
+        else:
+            self.sendlog(dst=self.__logtype, level="warn", msg=msg)
 
-        rfilesize = fileinfo['size']
+    def __propfind(self, target, depth=1, url=None):
+        '''
+         Send a PROPFIND request and parse the multistatus body while it
+         is received. Raises WebDavException on failure and
+         NotImplementedError if the server refuses an infinite depth.
+         An explicit url outside the Webdav root is not cached.
+        '''
 
-        if rfilesize is None:
-            rdircontent = self.__client.list(remote)
-            if 'code' in rdircontent:
-                return(self.__error)
-            if len(rdircontent) > 0:
-                isdir = True
-            else:
-                errstr = 'Directory {0} is empty, or the file is corrupted, skip downloading'.format(
-                    remote)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level="warn",
-                        msg=errstr)
-                else:
-                    self.sendlog(dst=self.__logtype, level="warn", msg=errstr)
-                self.__error = {'code': 0, 'reason': errstr}
-                return(self.__error)
+        hrefroot = self.__hrefroot if url is None else listing.href_root(url)
+        options = {
+            'URL': url or self.__url(target),
+            'CUSTOMREQUEST': 'PROPFIND',
+            'HTTPHEADER': [
+                'Accept: */*',
+                'Depth: {0}'.format(depth),
+                'Content-Type: application/xml; charset="utf-8"'],
+            'POSTFIELDS': listing.PROPFIND_BODY,
+            'NOBODY': 0
+        }
+        parser = [None]
 
-        if fpath.exists(local):
-            if not isdir:
-                lfilesize = self.file_size(local)
-                if int(lfilesize) == int(rfilesize):
-                    errmsg = "File {0} already exists on local filesystem, skipping download.".format(
-                        local)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            msg=errmsg)
-                    else:
-                        self.sendlog(dst=self.__logtype, msg=errmsg)
-                    self.__error = {'code': 0, 'reason': errmsg}
-                    return(self.__error)
-                else:
-                    errmsg = "File {0} exists on local filesystem, but seems to be different, trying to download again.".format(
-                        local)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level="warn",
-                            msg=errmsg)
-                    else:
-                        self.sendlog(
-                            dst=self.__logtype, level="warn", msg=errmsg)
+        def perform():
+            # a failed attempt may have fed part of its answer
+            parser[0] = listing.multistatus(hrefroot)
+            options['WRITEFUNCTION'] = parser[0].feed
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                return(int(request.getinfo(pycurl.HTTP_CODE)))
+            finally:
+                request.close()
+
+        code = self.__replay('PROPFIND', perform)
+
+        if code == 404:
+            raise RemoteResourceNotFound(target)
+        if depth == 'infinity' and code in [400, 403, 501]:
+            raise NotImplementedError(
+                'Depth infinity refused by {0}'.format(self.__host))
+        if code != 207:
+            raise MethodNotSupported(
+                name='propfind', server=self.__client.webdav.hostname)
+
+        entries = parser[0].close()
+        if url is not None:
+            return(entries)
+        if str(depth) == '0':
+            for e in entries:
+                self.__cache.put(e)
+        else:
+            self.__cache.fill(target, entries, depth)
 
-        if not self.__client.check(remote):
-            errmsg = "Remote file {0} not found.".format(remote)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    level="warn",
-                    msg=errmsg)
-            else:
-                self.sendlog(dst=self.__logtype, level="warn", msg=errmsg)
-            self.__error = {'code': 1, 'reason': errmsg}
-            return(self.__error)
+        return(entries)
 
-        if isdir:
-            infostr = 'Downloading directory {0}'.format(remote)
-            self.make_local_dirs(local)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    msg=infostr)
-            else:
-                self.sendlog(dst=self.__logtype, msg=infostr)
+    def __stat(self, target):
+        '''
+         Metadata of a remote path, from cache or from a Depth: 0 PROPFIND.
+         Returns None if the path does not exist.
+        '''
 
-            for f in rdircontent:
-                if f[-1] == "/":
-                    f = f[:-1]
+        found, item = self.__cache.get(target)
+        if found:
+            return(item)
 
-                remotefrecurse = "{0}/{1}".format(remote, f)
-                localefrecurse = "{0}/{1}".format(local, f)
+        try:
+            entries = self.__propfind(target, 0)
+        except RemoteResourceNotFound:
+            return(None)
 
-                self.download(remotefrecurse, localefrecurse)
-                if self.__error['code'] == 1:
-                    return(self.__error)
+        key = cache.normalize(target)
+        for e in entries:
+            if e.path == key:
+                return(e)
+        return(entries[0] if entries else None)
 
-        else:
-            infostr = 'Downloading file {0}'.format(remote)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    msg=infostr)
-            else:
-                self.sendlog(dst=self.__logtype, msg=infostr)
+    def __exists(self, target):
+        return(self.__stat(target) is not None)
 
-            localdirdest = fpath.dirname(fpath.abspath(local))
-            localdirdest = fpath.normpath(localdirdest)
-            if not fpath.exists(localdirdest):
-                self.make_local_dirs(localdirdest)
+    def __members(self, target):
+        '''
+         Entries directly below a remote collection, from a fresh cached
+         listing or from a Depth: 1 PROPFIND
+        '''
+
+        members = self.__cache.members(target)
+        if members is None:
+            key = cache.normalize(target)
+            members = [e for e in self.__propfind(target, 1) if e.path != key]
+        return(members)
 
+    def __hashes(self):
+        if self.__digests is None:
+            self.__digests = digest.index(jobs=self.__jobs)
+        return(self.__digests)
+
+    def __sidecar(self, directory):
+        '''
+         sha1 digests of the .pydav-hashes file of a remote directory,
+         with the file modification time, fetched once per instance
+        '''
+
+        key = cache.normalize(directory)
+        if key in self.__sidecars:
+            return(self.__sidecars[key])
+
+        found = (None, {})
+        sidecar = fpath.join(key, digest.SIDECAR)
+        try:
+            item = self.__stat(sidecar)
+        except WebDavException:
+            item = None
+        if item is not None and not item.is_dir:
+            data = []
+            options = {
+                'URL': self.__url(sidecar),
+                'HTTPHEADER': ['Accept: */*'],
+                'WRITEFUNCTION': data.append,
+                'NOBODY': 0
+            }
+            request = self.__client.Request(options=options)
             try:
-                self.__client.download(
-                    remote_path=remote,
-                    local_path=local,
-                    progress=self.progress)
-                # print console carriage return after progress bar
-                # self.sendlog(dst='console', msg='')
-                print('')
-            except WebDavException as exception:
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level="error",
-                        msg=exception)
-                else:
-                    self.sendlog(
-                        dst=self.__logtype,
-                        level="error",
-                        msg=exception)
+                request.perform()
+                code = int(request.getinfo(pycurl.HTTP_CODE))
+            except pycurl.error:
+                code = 0
+            finally:
+                request.close()
+            if code == 200:
+                found = (item.mtime, digest.parse_sidecar(b''.join(data)))
+
+        self.__sidecars[key] = found
+        return(found)
 
-                self.__error = {'code': 1, 'reason': exception}
-                return(self.__error)
+    def __same(self, local, item):
+        '''
+         Compare a local file content with a remote file from the server
+         checksum, an MD5 etag or the directory .pydav-hashes file.
+         Returns True or False when known, None when there is no way to
+         tell but downloading it.
+        '''
 
-            lfilesize = self.file_size(local)
+        try:
+            size = fstat(local).st_size
+        except OSError:
+            return(False)
+        if item.size is not None and size != item.size:
+            return(False)
+        if not self.__checksums:
+            return(None)
+
+        sums = digest.parse_checksums(item.checksum)
+        for algorithm in digest.ALGORITHMS:
+            if algorithm in sums:
+                return(self.__hashes().digest(local, algorithm) == sums[algorithm])
+
+        md5 = digest.etag_md5(item.etag)
+        if md5 is not None and self.__hashes().digest(local, 'md5') == md5:
+            return(True)
+
+        mtime, known = self.__sidecar(fpath.dirname(item.path))
+        sha1 = known.get(fpath.basename(item.path))
+        # written after the file last change, so it describes this content
+        if sha1 and (item.mtime is None or (mtime or 0) >= item.mtime):
+            return(self.__hashes().digest(local, 'sha1') == sha1)
+        return(None)
+
+    def __uptodate(self, local, item):
+        '''
+         Tell if a transfer between local and remote item can be skipped,
+         by content when checksums allow it, by size otherwise
+        '''
 
-            if int(lfilesize) == int(rfilesize):
+        same = self.__same(local, item)
+        if same is None:
+            return(item.size is not None and fstat(local).st_size == item.size)
+        return(same)
+
+    def __checksum(self, local):
+        if not self.__checksums:
+            return([])
+        return(['OC-Checksum: SHA1:{0}'.format(
+            self.__hashes().digest(local, 'sha1'))])
+
+    def __get(self, remote, local):
+        '''
+         GET a remote file into local, its progress being tracked and its
+         retries taken from one file budget
+        '''
+
+        tracker = self.__meter.track()
+        try:
+            with self.__retry.file():
+                self.__getfile(remote, local, tracker)
+        except BaseException:
+            tracker.done(False)
+            raise
+        tracker.done()
+
+    def __getfile(self, remote, local, tracker):
+        '''
+         GET a remote file into local through a .part file. An interrupted
+         download is resumed with a Range request guarded by If-Range and
+         the .part file is renamed onto local once complete.
+        '''
+
+        item = self.__stat(remote)
+        if item is None:
+            raise RemoteResourceNotFound(remote)
+
+        state = resume.checkpoint(local)
+        validator = resume.validator(item.etag, item.mtime)
+        if self.__segments > 1 and validator and item.size and \
+                item.size >= self.__segthreshold:
+            try:
+                return(self.__getsegments(remote, item, state, validator, tracker))
+            except NotImplementedError:
+                # no range support, fall back to a single stream
+                state.discard()
+
+        writer = [None]
+
+        def perform():
+            # each attempt resumes from what the previous ones saved
+            offset = state.load(validator, item.size)
+
+            headers = ['Accept: */*']
+            if offset:
+                headers.append('Range: bytes={0}-'.format(offset))
+                headers.append('If-Range: {0}'.format(validator))
+                msg = "Resuming download of {0} from byte {1}".format(
+                    remote, offset)
                 if self.__logtype == 'file':
                     self.sendlog(
                         logfpath=self.__logfile,
                         dst=self.__logtype,
-                        msg='File {0} downloaded correctly'.format(remote))
+                        msg=msg)
                 else:
-                    self.sendlog(
-                        dst=self.__logtype,
-                        msg='File {0} downloaded correctly'.format(remote))
+                    self.sendlog(dst=self.__logtype, msg=msg)
+
+            with open(state.part, 'ab' if offset else 'wb') as lfile:
+                output = resume.writer(
+                    lfile, state, validator, item.size, offset)
+                writer[0] = output
+                options = {
+                    'URL': self.__url(remote),
+                    'HTTPHEADER': headers,
+                    'HEADERFUNCTION': output.header,
+                    'WRITEFUNCTION': output.write,
+                    'NOPROGRESS': 0,
+                    'PROGRESSFUNCTION': tracker,
+                    'NOBODY': 0
+                }
+                request = self.__client.Request(options=options)
+                try:
+                    request.perform()
+                    return(int(request.getinfo(pycurl.HTTP_CODE)))
+                finally:
+                    request.close()
+                    output.save()
+
+        code = self.__replay('GET', perform)
+        output = writer[0]
+
+        if code == 404:
+            state.discard()
+            raise RemoteResourceNotFound(remote)
+        if code == 416:
+            state.discard()
+        if code >= 400:
+            raise WebDavException(
+                'Unable to download {0}: HTTP error {1}'.format(remote, code))
+        if item.size is not None and output.offset != item.size:
+            raise WebDavException(
+                'Download of {0} stopped at byte {1}, it will resume from there.'.format(
+                    remote, output.offset))
+
+        state.finish()
+
+    def __getsegments(self, remote, item, state, validator, tracker):
+        '''
+         GET a large remote file as concurrent byte ranges, each written
+         at its offset into the preallocated .part file. Progress of every
+         range is checkpointed so an interrupted download resumes them.
+         Raises NotImplementedError if the server does not answer ranges.
+        '''
 
-                self.__error = {'code': 0}
-            else:
+        ranges = state.ranges(validator, item.size, self.__segments)
+        msg = "Downloading {0} in {1} segments".format(remote, len(ranges))
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                msg=msg)
+        else:
+            self.sendlog(dst=self.__logtype, msg=msg)
+
+        lock = threading.Lock()
+        unsaved = [0]
+
+        def save(written):
+            tracker.advance(written, item.size)
+            with lock:
+                unsaved[0] += written
+                if written == 0 or unsaved[0] >= resume.SAVE_EVERY:
+                    state.save(validator, item.size, 0, ranges)
+                    unsaved[0] = 0
+
+        fd = os.open(state.part, os.O_WRONLY)
+        try:
+            todo = [r for r in ranges if r[0] <= r[1]]
+            with ThreadPoolExecutor(max_workers=max(1, len(todo))) as executor:
+                for f in [executor.submit(self.__segment, remote, fd, r, validator, save)
+                          for r in todo]:
+                    f.result()
+        finally:
+            os.close(fd)
+            save(0)
+
+        state.finish()
+
+    def __segment(self, remote, fd, byterange, validator, save):
+        '''
+         GET one [position, end] byte range into fd, moving position
+         forward as data is written
+        '''
+
+        status = [0]
+
+        def header(line):
+            if line.startswith(b'HTTP/'):
+                status[0] = int(line.split()[1])
+
+        def write(data):
+            if status[0] != 206:
+                # aborts the transfer
+                return(0)
+            os.pwrite(fd, data, byterange[0])
+            byterange[0] += len(data)
+            save(len(data))
+            return(None)
+
+        def perform():
+            # each attempt asks for what is left of the range
+            status[0] = 0
+            options = {
+                'URL': self.__url(remote),
+                'HTTPHEADER': [
+                    'Accept: */*',
+                    'Range: bytes={0}-{1}'.format(byterange[0], byterange[1]),
+                    'If-Range: {0}'.format(validator)],
+                'HEADERFUNCTION': header,
+                'WRITEFUNCTION': write,
+                'NOBODY': 0
+            }
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+            finally:
+                request.close()
+            return(status[0])
+
+        try:
+            self.__replay('GET', perform)
+        except NotConnection:
+            if status[0] in [0, 206]:
+                raise
+
+        if status[0] == 200:
+            raise NotImplementedError(
+                'Range requests refused by {0}'.format(self.__host))
+        if status[0] == 404:
+            raise RemoteResourceNotFound(remote)
+        if status[0] >= 400:
+            raise WebDavException(
+                'Unable to download {0}: HTTP error {1}'.format(
+                    remote, status[0]))
+        if byterange[0] <= byterange[1]:
+            raise WebDavException(
+                'Download of {0} stopped at byte {1}, it will resume from there.'.format(
+                    remote, byterange[0]))
+
+    def __send(self, method, url, headers=None, lfile=None, offset=0, length=0):
+        '''
+         Send a request whose body is length bytes of lfile from offset,
+         replayed by the retry policy, and return the HTTP status
+        '''
+
+        options = {
+            'URL': url,
+            'CUSTOMREQUEST': method,
+            'HTTPHEADER': ['Accept: */*', 'Expect:'] + (headers or [])
+        }
+        left = [length]
+        if lfile is not None:
+            def read(size):
+                data = lfile.read(min(size, left[0]))
+                left[0] -= len(data)
+                return(data)
+
+            options['UPLOAD'] = 1
+            options['READFUNCTION'] = read
+            options['INFILESIZE_LARGE'] = length
+
+        def perform():
+            if lfile is not None:
+                # a replayed request sends its body again
+                lfile.seek(offset)
+                left[0] = length
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                code = int(request.getinfo(pycurl.HTTP_CODE))
+            finally:
+                request.close()
+            if method == 'DELETE' and code == 404 and retry.attempt():
+                # deleted by an attempt whose answer was lost
+                code = 204
+            return(code)
+
+        return(self.__replay(method, perform))
+
+    def __put(self, local, remote):
+        '''
+         PUT a local file onto a remote path, its progress being tracked
+         and its retries taken from one file budget
+        '''
+
+        tracker = self.__meter.track()
+        try:
+            with self.__retry.file():
+                self.__putfile(local, remote, tracker)
+        except RemoteParentNotFound:
+            # callers create the missing parent and send the file again
+            tracker.done(None)
+            raise
+        except BaseException:
+            tracker.done(False)
+            raise
+        tracker.done()
+
+    def __putfile(self, local, remote, tracker):
+        '''
+         PUT a local file onto a remote path, in chunks if it is bigger
+         than chunksize and chunked uploads are enabled
+        '''
+
+        self.__cache.invalidate(remote, exists=True)
+        size = fstat(local).st_size
+        if self.__chunking in ['range', 'nextcloud'] and size > self.__chunksize:
+            try:
+                if self.__chunking == 'range':
+                    return(self.__putranges(local, remote, size, tracker))
+                return(self.__putnextcloud(local, remote, size, tracker))
+            except NotImplementedError as exception:
+                msg = "{0}, uploading {1} in one request".format(
+                    exception, local)
                 if self.__logtype == 'file':
                     self.sendlog(
                         logfpath=self.__logfile,
                         dst=self.__logtype,
                         level="warn",
-                        msg='Download failed: partially retrieved.')
+                        msg=msg)
                 else:
-                    self.sendlog(
-                        dst=self.__logtype,
-                        level="warn",
-                        msg='Download failed: partially retrieved.')
+                    self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+
+        with open(local, 'rb') as lfile:
+            options = {
+                'URL': self.__url(remote),
+                'HTTPHEADER': ['Accept: */*', 'Expect:'] + self.__checksum(local),
+                'UPLOAD': 1,
+                'READFUNCTION': lfile.read,
+                'INFILESIZE_LARGE': fstat(lfile.fileno()).st_size,
+                'NOPROGRESS': 0,
+                'PROGRESSFUNCTION': tracker
+            }
+
+            def perform():
+                lfile.seek(0)
+                request = self.__client.Request(options=options)
+                try:
+                    request.perform()
+                    return(int(request.getinfo(pycurl.HTTP_CODE)))
+                finally:
+                    request.close()
 
-                fremove(local)
-                self.__error = {
-                    'code': 1, 'reason': "Download failed: partially retrieved."}
+            code = self.__replay('PUT', perform)
 
-            return(self.__error)
+        self.__putstatus(code, remote)
 
-        return(self.__error)
+    def __putstatus(self, code, remote):
+        '''
+         Raise the WebDavException matching a PUT/MOVE HTTP status
+        '''
 
-    def upload(self, local, remote, recurse=False):
+        if code == 409:
+            raise RemoteParentNotFound(remote)
+        if code == 507:
+            raise NotEnoughSpace()
+        if code >= 400:
+            raise WebDavException(
+                'Unable to upload {0}: HTTP error {1}'.format(remote, code))
+
+    def __uploadid(self, local, remote, size):
+        '''
+         Identifier of an upload, the same as long as the local file and
+         the destination are unchanged, so an interrupted upload is resumed
         '''
-         Uploading file to Webdav
 
-         :param local: local resource's filesystem path to upload
-         :type  local: string
+        signature = '{0}:{1}:{2}:{3}'.format(
+            fpath.abspath(local), remote, size, fstat(local).st_mtime_ns)
+        return(hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16])
 
-         :param remote: Webdav remote file path where to put the file
+    def __resumelog(self, local, offset):
+        if offset:
+            msg = "Resuming upload of {0} from byte {1}".format(local, offset)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=msg)
+            else:
+                self.sendlog(dst=self.__logtype, msg=msg)
+
+    def __putranges(self, local, remote, size, tracker):
+        '''
+         Upload with partial PUT requests (Content-Range) into a hidden
+         temporary file next to remote, moved onto remote once complete.
+         An interrupted upload resumes from the temporary file size.
+         Raises NotImplementedError if the server refuses partial PUT.
+        '''
+
+        temp = '{0}/.{1}.{2}.part'.format(
+            fpath.dirname(remote),
+            fpath.basename(remote),
+            self.__uploadid(local, remote, size))
+
+        self.__cache.invalidate(temp)
+        item = self.__stat(temp)
+        offset = 0
+        if item is not None and not item.is_dir and item.size:
+            offset = min(item.size, size)
+        self.__resumelog(local, offset)
+
+        self.__cache.invalidate(temp)
+        with open(local, 'rb') as lfile:
+            while offset < size:
+                length = min(self.__chunksize, size - offset)
+                code = self.__send('PUT', self.__url(temp), [
+                    'Content-Range: bytes {0}-{1}/{2}'.format(
+                        offset, offset + length - 1, size)],
+                    lfile, offset, length)
+                if code in [400, 405, 501]:
+                    raise NotImplementedError(
+                        'Partial PUT refused by {0}'.format(self.__host))
+                self.__putstatus(code, remote)
+                offset += length
+                tracker.advance(length, size)
+
+        item = self.__stat(temp)
+        if item is None or item.size != size:
+            # server ignored Content-Range and kept the last chunk only
+            self.__send('DELETE', self.__url(temp))
+            self.__cache.invalidate(temp)
+            raise NotImplementedError(
+                'Partial PUT not supported by {0}'.format(self.__host))
+
+        self.__cache.invalidate(temp)
+        code = self.__send('MOVE', self.__url(temp), [
+            'Destination: {0}'.format(self.__url(remote)),
+            'Overwrite: T'])
+        self.__putstatus(code, remote)
+
+    def __putnextcloud(self, local, remote, size, tracker):
+        '''
+         Upload with the Nextcloud/ownCloud chunking v2 protocol: chunks
+         are PUT in an upload collection which is assembled onto remote by
+         a final MOVE. An interrupted upload only sends missing chunks.
+         Raises NotImplementedError if the server has no upload endpoint.
+        '''
+
+        root = self.__client.webdav.root
+        prefix, sep, tail = root.partition('/remote.php/')
+        login = Urn(self.__login).quote().strip('/')
+        if sep and tail.startswith('dav/files/'):
+            files = '{0}{1}'.format(self.__client.webdav.hostname, root)
+        else:
+            files = '{0}{1}/remote.php/dav/files/{2}'.format(
+                self.__client.webdav.hostname, prefix, login)
+        uploads = '{0}{1}/remote.php/dav/uploads/{2}/{3}'.format(
+            self.__client.webdav.hostname, prefix, login,
+            self.__uploadid(local, remote, size))
+        destination = [
+            'Destination: {0}{1}'.format(files, Urn(remote).quote()),
+            'OC-Total-Length: {0}'.format(size)]
+
+        code = self.__send('MKCOL', '{0}/'.format(uploads), destination)
+        done = {}
+        if code == 405:
+            # upload collection exists: resume it
+            try:
+                for e in self.__propfind(None, 1, url='{0}/'.format(uploads)):
+                    done[fpath.basename(e.path)] = e.size
+            except WebDavException:
+                done = {}
+        elif code >= 300:
+            raise NotImplementedError(
+                'Chunked upload refused by {0}'.format(self.__host))
+        self.__resumelog(local, sum(v or 0 for v in done.values()))
+
+        with open(local, 'rb') as lfile:
+            for number, offset in enumerate(range(0, size, self.__chunksize)):
+                name = '{0:05d}'.format(number + 1)
+                length = min(self.__chunksize, size - offset)
+                if done.get(name) == length:
+                    continue
+                code = self.__send(
+                    'PUT', '{0}/{1}'.format(uploads, name), destination,
+                    lfile, offset, length)
+                self.__putstatus(code, remote)
+                tracker.advance(length, size)
+
+        code = self.__send(
+            'MOVE', '{0}/.file'.format(uploads),
+            destination + ['Overwrite: T'] + self.__checksum(local))
+        self.__putstatus(code, remote)
+
+    def open_read(self, remote, chunksize=stream.CHUNKSIZE, compress=False):
+        '''
+         Stream a remote file without writing it to disk
+
+            stream = client.open_read('Music/file.flac')
+            for chunk in stream:
+                consume(chunk)
+            stream.close()
+
+         :param remote: Webdav remote file path to read
          :type  remote: string
 
-         :param recurse: Internal use only
-         :type  recurse: boolean
+         :param   chunksize: size of the chunks read at once, memory use
+                             is bounded to a few chunks
+         :type    chunksize: int
+         :default chunksize: 262144
 
-         :returns: It will returns result 'code' and 'reason'
+         :param   compress: ask the server for a compressed transfer
+                            (Accept-Encoding), data read is uncompressed
+         :type    compress: boolean
+         :default compress: False
+
+         :returns: It will returns result 'code' and 'reason' if it fails
          :rtype: dict
-        '''
 
+         :returns: readable file-like object, iterable over bytes chunks.
+                   Transfer errors are raised by read()
+         :rtype: stream.reader
+        '''
         if self.__error['code'] == 1:
             return(self.__error)
 
-        if not fpath.exists(local):
-            errstr = 'Unable to find locale file {lfile}. Aborting upload..'.format(
-                lfile=local)
+        try:
+            item = self.__stat(remote)
+            if item is None:
+                raise RemoteResourceNotFound(remote)
+            if item.is_dir:
+                raise WebDavException(
+                    'Unable to read {0}: it is a directory'.format(remote))
+        except WebDavException as exception:
             if self.__logtype == 'file':
                 self.sendlog(
                     logfpath=self.__logfile,
                     dst=self.__logtype,
-                    level="error",
-                    msg=errstr)
+                    level="warn",
+                    msg=exception)
             else:
-                self.sendlog(dst=self.__logtype, level="error", msg=errstr)
-            self.__error = {'code': 1, 'reason': errstr}
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
             return(self.__error)
 
-        local_isdir = fpath.isdir(local)
+        def perform(write):
+            options = {
+                'URL': self.__url(remote),
+                'HTTPHEADER': ['Accept: */*'],
+                'WRITEFUNCTION': write,
+                'NOBODY': 0
+            }
+            if compress:
+                # let libcurl negotiate and decode every encoding it knows
+                options['ENCODING'] = ''
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                code = int(request.getinfo(pycurl.HTTP_CODE))
+            except pycurl.error:
+                raise NotConnection(self.__client.webdav.hostname)
+            finally:
+                # a reader closed early gives its handle back too
+                request.close()
+            if code == 404:
+                raise RemoteResourceNotFound(remote)
+            if code >= 400:
+                raise WebDavException(
+                    'Unable to download {0}: HTTP error {1}'.format(remote, code))
+
+        return(stream.reader(perform, chunksize))
+
+    def open_write(self, remote, chunksize=stream.CHUNKSIZE, compress=False):
+        '''
+         Stream data to a remote file without a local file. The request
+         body is sent with chunked transfer encoding while it is written.
 
-        rfilename = fpath.basename(fpath.normpath(local))
-        if local_isdir:
-            rfiledst = "{}/{}".format(remote, rfilename)
-        else:
-            if not recurse:
-                rfiledst = "{}/{}".format(remote, rfilename)
-            else:
-                rfiledst = str(remote)
+            with client.open_write('Backup/db.sql') as stream:
+                for block in dump():
+                    stream.write(block)
 
-        rfiledst = fpath.normpath(rfiledst)
+         :param remote: Webdav remote file path to write
+         :type  remote: string
 
-        infostr = 'Uploading {} to {}'.format(local, rfiledst)
-        if self.__logtype == 'file':
-            self.sendlog(
-                logfpath=self.__logfile,
-                dst=self.__logtype,
-                msg=infostr)
+         :param   chunksize: size of the chunks sent at once, memory use
+                             is bounded to a few chunks
+         :type    chunksize: int
+         :default chunksize: 262144
+
+         :param   compress: gzip the body with Content-Encoding: gzip,
+                            the server must decode it before storing it
+         :type    compress: boolean
+         :default compress: False
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: writable file-like object, close() raises the transfer
+                   error if the upload failed, abort() or an exception in
+                   its with block cancels the upload
+         :rtype: stream.writer
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        # streamed data cannot be sent twice, create the parent first
+        parentdir = fpath.dirname(fpath.normpath(remote))
+        try:
+            missing = not self.__exists(parentdir)
+        except WebDavException:
+            missing = True
+        if missing and self.createdir(parentdir)['code'] == 1:
+            return(self.__error)
+
+        def perform(read):
+            self.__cache.invalidate(remote, exists=True)
+            headers = ['Accept: */*', 'Expect:', 'Transfer-Encoding: chunked']
+            if compress:
+                headers.append('Content-Encoding: gzip')
+            options = {
+                'URL': self.__url(remote),
+                'HTTPHEADER': headers,
+                'UPLOAD': 1,
+                'READFUNCTION': read
+            }
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                code = int(request.getinfo(pycurl.HTTP_CODE))
+            except pycurl.error:
+                raise NotConnection(self.__client.webdav.hostname)
+            finally:
+                # an aborted upload gives its handle back too
+                request.close()
+            self.__putstatus(code, remote)
+
+        return(stream.writer(perform, chunksize, compress))
+
+    @metrics.operation('propfind')
+    def propfind(self, target, depth=1):
+        '''
+         Get size, modification time, etag and type of a resource
+         and of its members
+
+         :param target: Webdav target path
+         :type  target: string
+
+         :param   depth: PROPFIND depth (0, 1 or 'infinity')
+         :type    depth: int or string
+         :default depth: 1
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: list of listing.entry
+         :rtype: list
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        try:
+            entries = self.__propfind(target, depth)
+        except (WebDavException, NotImplementedError) as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
         else:
-            self.sendlog(dst=self.__logtype, msg=infostr)
+            return(entries)
 
-        if not self.__client.check(rfiledst):
-            if local_isdir:
-                mkdires = self.createdir(rfiledst)
-                if mkdires['code'] == 1:
-                    errmsg = 'Unable to create remote directory {}'.format(
-                        rfiledst)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level="warn",
-                            msg=errmsg)
-                    else:
-                        self.sendlog(
-                            dst=self.__logtype, level="warn", msg=errmsg)
+    @metrics.operation('walk')
+    def walk(self, path):
+        '''
+         List a Webdav path recursively with as few PROPFIND as possible
 
-                    self.__error = {'code': 1, 'reason': errmsg}
-                    return(self.__error)
+         :param path: Webdav path to list
+         :type  path: string
 
-                remote = str(rfiledst)
-                for file_ in listdir(local):
-                    recursed_local = "{}/{}".format(local, file_)
-                    recursed_local = fpath.normpath(recursed_local)
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
 
-                    if fpath.isdir(recursed_local):
-                        recursed_remote = rfiledst
-                    else:
-                        recursed_remote = "{}/{}".format(rfiledst, file_)
-                    recursed_remote = fpath.normpath(recursed_remote)
+         :returns: list of listing.entry found below path,
+                   entry paths are prefixed with path as given
+         :rtype: list
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
 
-                    self.upload(
-                        local=recursed_local,
-                        remote=recursed_remote,
-                        recurse=True)
+        base = fpath.normpath('/{0}'.format(str(path).lstrip('/')))
+        try:
+            entries = self.__walker.walk(base)
+        except WebDavException as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
             else:
-                try:
-                    self.__client.upload(
-                        remote_path=rfiledst,
-                        local_path=local,
-                        progress=self.progress)
-                    # print console carriage return after progress bar
-                    # self.sendlog(dst='console', msg='')
-                    print('')
-                except WebDavException as exception:
-                    if re.match(
-                        'Remote parent for.* not found',
-                            str(exception)):
-                        parentdir = fpath.dirname(rfiledst)
-                        res = self.createdir(parentdir)
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
+
+        return([e._replace(path=listing.rebase(path, base, e.path))
+                for e in entries])
+
+    def __reports(self, target):
+        '''
+         REPORT methods target answers, from its supported-report-set
+         property. Returns None when the server does not tell.
+        '''
+
+        body = []
+        options = {
+            'URL': self.__url(target, directory=True),
+            'CUSTOMREQUEST': 'PROPFIND',
+            'HTTPHEADER': [
+                'Accept: */*',
+                'Depth: 0',
+                'Content-Type: application/xml; charset="utf-8"'],
+            'POSTFIELDS': listing.REPORTS_BODY,
+            'NOBODY': 0,
+            'WRITEFUNCTION': body.append
+        }
+
+        def perform():
+            del body[:]
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                return(int(request.getinfo(pycurl.HTTP_CODE)))
+            finally:
+                request.close()
+
+        code = self.__replay('PROPFIND', perform)
+        if code == 404:
+            raise RemoteResourceNotFound(target)
+        if code != 207:
+            return(None)
+        return(listing.reports(b''.join(body)))
+
+    def __syncable(self, target):
+        '''
+         Tell if sync-collection REPORT requests may be sent, asked once
+         to target. Servers which do not list their reports are tried.
+        '''
+
+        if self.__synccol is None:
+            found = self.__reports(target)
+            self.__synccol = found is None or listing.SYNC_REPORT in found
+            if not self.__synccol:
+                self.__capabilities['sync'] = False
+        return(self.__synccol)
+
+    def __sync(self, target, token):
+        '''
+         Send one sync-collection REPORT request on target, returns its
+         HTTP status and the multistatus parser fed with its answer
+        '''
+
+        options = {
+            'URL': self.__url(target, directory=True),
+            'CUSTOMREQUEST': 'REPORT',
+            'HTTPHEADER': [
+                'Accept: */*',
+                'Depth: 0',
+                'Content-Type: application/xml; charset="utf-8"'],
+            'POSTFIELDS': listing.sync_body(token),
+            'NOBODY': 0
+        }
+        parser = [None]
+
+        def perform():
+            parser[0] = listing.multistatus(self.__hrefroot)
+            options['WRITEFUNCTION'] = parser[0].feed
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                return(int(request.getinfo(pycurl.HTTP_CODE)))
+            finally:
+                request.close()
+
+        code = self.__replay('REPORT', perform)
+        parser[0].close()
+        return(code, parser[0])
+
+    def __changes(self, target, token):
+        '''
+         Follow sync-collection answers until they are complete. Raises
+         NotImplementedError when the server cannot answer them.
+        '''
+
+        initial = not token
+        changed = {}
+        removed = set()
+        while True:
+            code, parser = self.__sync(target, token)
+            if code != 207 and token and code in [400, 403, 409, 412]:
+                # the token expired (valid-sync-token), start over
+                msg = "Sync token of {0} refused (HTTP {1}), listing it again".format(
+                    target, code)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level="warn",
+                        msg=msg)
+                else:
+                    self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+                token = None
+                initial = True
+                changed.clear()
+                removed.clear()
+                continue
+            if code == 404:
+                raise RemoteResourceNotFound(target)
+            if code in [400, 403, 405, 415, 501]:
+                raise NotImplementedError(
+                    'sync-collection refused by {0}'.format(self.__host))
+            if code != 207 or not parser.token:
+                raise MethodNotSupported(
+                    name='report', server=self.__client.webdav.hostname)
+
+            for path in parser.removed:
+                changed.pop(path, None)
+                removed.add(path)
+            for e in parser.entries:
+                if e.path == target:
+                    continue
+                removed.discard(e.path)
+                changed[e.path] = e
+
+            # a truncated answer goes on from its own token
+            if not parser.truncated or parser.token == token:
+                return(parser.token, initial, list(changed.values()),
+                       sorted(removed))
+            token = parser.token
+
+    @metrics.operation('changes')
+    def changes(self, path, token=None):
+        '''
+         Resources changed or removed below a Webdav collection since a
+         sync-token, asked with sync-collection REPORT requests (RFC 6578).
+         Without token, or when the server forgot it, every resource below
+         path is listed and the answer is 'initial'.
+
+         :param path: Webdav collection path
+         :type  path: string
+
+         :param   token: sync-token of a previous answer
+         :type    token: string
+         :default token: None
+
+         :returns: It will returns result 'code' and 'reason' if it fails,
+                   and 'supported' False when the server cannot answer
+         :rtype: dict
+
+         :returns: 'code' 0, new sync 'token', 'initial' boolean, 'changed'
+                   listing.entry list and 'removed' paths, all absolute
+                   from Webdav root
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        base = fpath.normpath('/{0}'.format(str(path).lstrip('/')))
+        try:
+            if not token and not self.__syncable(base):
+                raise NotImplementedError(
+                    'sync-collection not supported by {0}'.format(self.__host))
+            token, initial, changed, removed = self.__changes(base, token)
+        except NotImplementedError as exception:
+            # not an error: callers list the collection their own way
+            self.__synccol = False
+            self.__capabilities['sync'] = False
+            return({'code': 1, 'reason': str(exception), 'supported': False})
+        except WebDavException as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
+
+        self.__synccol = True
+        self.__capabilities['sync'] = True
+        for e in changed:
+            self.__cache.put(e)
+        for gone in removed:
+            self.__cache.invalidate(gone)
+        return({'code': 0, 'token': token, 'initial': initial,
+                'changed': changed, 'removed': removed})
+
+    @metrics.operation('put')
+    def put(self, local, remote):
+        '''
+         Upload one local file onto a remote file path whatever the
+         remote state, creating the remote parent directory if needed
+
+         :param local: local filesystem file path
+         :type  local: string
+
+         :param remote: Webdav remote file path
+         :type  remote: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        remote = fpath.normpath(remote)
+        try:
+            try:
+                self.__put(local, remote)
+            except RemoteParentNotFound:
+                if self.createdir(fpath.dirname(remote))['code'] == 1:
+                    return(self.__error)
+                self.__put(local, remote)
+        except (WebDavException, OSError) as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
+
+        return({'code': 0, 'reason': 'File {0} uploaded.'.format(remote)})
+
+    @metrics.operation('get')
+    def get(self, remote, local):
+        '''
+         Download one remote file onto a local file path whatever the
+         local state, creating the local parent directory if needed
+
+         :param remote: Webdav remote file path
+         :type  remote: string
+
+         :param local: local filesystem file path
+         :type  local: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        local = fpath.normpath(local)
+        localdirdest = fpath.dirname(fpath.abspath(local))
+        if not fpath.exists(localdirdest):
+            self.make_local_dirs(localdirdest)
+            if self.__error['code'] == 1:
+                return(self.__error)
+
+        try:
+            self.__get(remote, local)
+        except (WebDavException, OSError) as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
+
+        return({'code': 0, 'reason': 'File {0} downloaded.'.format(local)})
+
+    def compare(self, local, item):
+        '''
+         Compare a local file content with a remote file
+
+         :param local: local filesystem file path
+         :type  local: string
+
+         :param item: remote file (see propfind() and walk())
+         :type  item: listing.entry
+
+         :returns: True or False when known from sizes or checksums,
+                   None when the server gives no way to tell
+         :rtype: boolean
+        '''
+
+        try:
+            return(self.__same(local, item))
+        except WebDavException:
+            return(None)
+
+    def digests(self, paths, algorithm='sha1'):
+        '''
+         Content digests of local files, from the local digest index
+         when the files did not change since they were last read
+
+         :param paths: local filesystem file paths
+         :type  paths: list
+
+         :param   algorithm: hashlib algorithm name
+         :type    algorithm: string
+         :default algorithm: 'sha1'
+
+         :returns: hex digest keyed on path, None for unreadable files
+         :rtype: dict
+        '''
+
+        return(self.__hashes().digests(paths, algorithm))
+
+    @metrics.operation('update_sidecar')
+    def update_sidecar(self, directory, changes):
+        '''
+         Update the .pydav-hashes file of a remote directory, used to
+         compare contents with servers giving no checksum
+
+         :param directory: Webdav directory path
+         :type  directory: string
+
+         :param changes: sha1 hex digest keyed on file name, None drops it
+         :type  changes: dict
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        key = cache.normalize(directory)
+        mtime, known = self.__sidecar(key)
+        known = dict(known)
+        for name, sha1 in changes.items():
+            if sha1 is None:
+                known.pop(name, None)
+            else:
+                known[name] = sha1
+
+        sidecar = fpath.join(key, digest.SIDECAR)
+        self.__cache.invalidate(sidecar)
+        self.__sidecars.pop(key, None)
+        data = digest.format_sidecar(known)
+        try:
+            if known:
+                code = self.__send(
+                    'PUT', self.__url(sidecar), [], io.BytesIO(data), 0, len(data))
+            else:
+                code = self.__send('DELETE', self.__url(sidecar))
+                code = 204 if code == 404 else code
+            self.__putstatus(code, sidecar)
+        except WebDavException as exception:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=exception)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=exception)
+            self.__error = {'code': 1, 'reason': exception}
+            return(self.__error)
+
+        return({'code': 0, 'reason': 'Digests of {0} updated.'.format(key)})
+
+    @metrics.operation('transfer')
+    def transfer(self, tasks):
+        '''
+         Run transfer.task items, concurrently when jobs is above 1.
+         Failed transfers are reported in the results and do not
+         leave the instance in error.
+
+         :param tasks: list of transfer.task ('put', 'get', 'upload' or
+                       'download' actions)
+         :type  tasks: list
+
+         :returns: 'code', 'reason' and per file 'results' (transfer.result)
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        tasks = list(tasks)
+        self.__meter.begin()
+        try:
+            self.__expect(tasks)
+            if self.__jobs > 1 and len(tasks) > 1:
+                sched = transfer.scheduler(
+                    factory=core,
+                    options=self.__settings,
+                    jobs=self.__jobs,
+                    pool=self.__pool,
+                    shared=self.worker)
+                return(sched.run(tasks))
+
+            results = [transfer.execute(self, t) for t in tasks]
+        finally:
+            self.__summary()
+
+        failed = [r for r in results if r.code == 1]
+        if failed:
+            reason = '{0} of {1} transfers failed.'.format(
+                len(failed), len(results))
+            return({'code': 1, 'reason': reason, 'results': results})
+        reason = '{0} transfers done.'.format(len(results))
+        return({'code': 0, 'reason': reason, 'results': results})
+
+    def __expect(self, tasks):
+        '''
+         Announce the files and bytes tasks will transfer to the progress
+         line, remote sizes come from the metadata cache
+        '''
+
+        size = 0
+        for t in tasks:
+            if t.action in ['put', 'upload']:
+                try:
+                    size += fstat(t.source).st_size
+                except OSError:
+                    pass
+            else:
+                found, item = self.__cache.get(t.source)
+                if not found or item is None or item.size is None:
+                    self.__meter.expect(len(tasks))
+                    return
+                size += item.size
+        self.__meter.expect(len(tasks), size)
+
+    def __summary(self):
+        '''
+         End a directory operation on the progress line and log its totals
+        '''
+
+        summary = self.__meter.end()
+        if summary is not None:
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=summary)
+            else:
+                self.sendlog(dst=self.__logtype, msg=summary)
+
+    def __dispatch(self, tasks):
+        '''
+         Run file transfers concurrently through the transfer scheduler
+         and aggregate their results into the class error state
+        '''
+
+        self.__expect(tasks)
+        sched = transfer.scheduler(
+            factory=core,
+            options=self.__settings,
+            jobs=self.__jobs,
+            pool=self.__pool,
+            shared=self.worker)
+        res = sched.run(tasks)
+
+        for r in res['results']:
+            if r.code == 1:
+                msg = "Transfer of {0} to {1} failed: {2}".format(
+                    r.source, r.destination, r.reason)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level="warn",
+                        msg=msg)
+                else:
+                    self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+
+        self.__error = {'code': res['code'], 'reason': res['reason']}
+        return(self.__error)
+
+    def __skip(self, failed, path):
+        '''
+         Note a file which failed in a directory loop and clear the error
+         state so the loop goes on. Returns False when the host circuit is
+         open, the whole operation has to stop then.
+        '''
+
+        if retry.circuit(self.__client.webdav.hostname).state() == 'open':
+            return(False)
+        failed.append(path)
+        self.__error = {'code': 0, 'reason': ''}
+        return(True)
+
+    def __failures(self, failed, directory):
+        '''
+         Set the error state of a directory loop in which some files failed
+        '''
+
+        msg = '{0} transfers of {1} failed: {2}'.format(
+            len(failed), directory, ', '.join(failed))
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                level="warn",
+                msg=msg)
+        else:
+            self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+        self.__error = {'code': 1, 'reason': msg}
+        return(self.__error)
+
+    @metrics.operation('download')
+    def download(self, remote, local):
+        '''
+         Downloading file from webdav
+
+         :param remote: Webdav remote file path to get
+         :type  remote: string
+
+         :param local: local filesystem path where to put downloaded datas
+         :type  local: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+
+        self.__meter.begin()
+        try:
+            return(self.__download(remote, local))
+        finally:
+            self.__summary()
+
+    def __download(self, remote, local):
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        local = fpath.normpath(local)
+        remote = fpath.normpath(remote)
+
+        isdir = False
+        fileinfo = self.getinfo(remote)
+        if 'code' in fileinfo:
+            return(self.__error)
+
+        rfilesize = fileinfo['size']
+
+        if rfilesize is None:
+            rdircontent = self.list(remote)
+            if 'code' in rdircontent:
+                return(self.__error)
+            if len(rdircontent) > 0:
+                isdir = True
+            else:
+                errstr = 'Directory {0} is empty, or the file is corrupted, skip downloading'.format(
+                    remote)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level="warn",
+                        msg=errstr)
+                else:
+                    self.sendlog(dst=self.__logtype, level="warn", msg=errstr)
+                self.__error = {'code': 0, 'reason': errstr}
+                return(self.__error)
+
+        if fpath.exists(local):
+            if not isdir:
+                item = self.__stat(remote)
+                if item is not None and self.__uptodate(local, item):
+                    errmsg = "File {0} already exists on local filesystem, skipping download.".format(
+                        local)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            msg=errmsg)
+                    else:
+                        self.sendlog(dst=self.__logtype, msg=errmsg)
+                    self.__error = {'code': 0, 'reason': errmsg}
+                    return(self.__error)
+                else:
+                    errmsg = "File {0} exists on local filesystem, but seems to be different, trying to download again.".format(
+                        local)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="warn",
+                            msg=errmsg)
+                    else:
+                        self.sendlog(
+                            dst=self.__logtype, level="warn", msg=errmsg)
+
+        if not self.__exists(remote):
+            errmsg = "Remote file {0} not found.".format(remote)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=errmsg)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=errmsg)
+            self.__error = {'code': 1, 'reason': errmsg}
+            return(self.__error)
+
+        if isdir:
+            infostr = 'Downloading directory {0}'.format(remote)
+            self.make_local_dirs(local)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=infostr)
+            else:
+                self.sendlog(dst=self.__logtype, msg=infostr)
+
+            if self.__jobs > 1:
+                rentries = self.walk(remote)
+                if 'code' in rentries:
+                    return(self.__error)
+
+                tasks = []
+                for e in rentries:
+                    if fpath.basename(e.path) == digest.SIDECAR:
+                        continue
+                    lpath = fpath.normpath("{0}/{1}".format(
+                        local, fpath.relpath(e.path, remote)))
+                    if e.is_dir:
+                        self.make_local_dirs(lpath)
+                        if self.__error['code'] == 1:
+                            return(self.__error)
+                    else:
+                        tasks.append(transfer.task('download', e.path, lpath))
+
+                return(self.__dispatch(tasks))
+
+            # a file out of retries does not abort its directory
+            failed = []
+            for f in rdircontent:
+                if f[-1] == "/":
+                    f = f[:-1]
+                if f == digest.SIDECAR:
+                    continue
+
+                remotefrecurse = "{0}/{1}".format(remote, f)
+                localefrecurse = "{0}/{1}".format(local, f)
+
+                self.download(remotefrecurse, localefrecurse)
+                if self.__error['code'] == 1:
+                    if not self.__skip(failed, remotefrecurse):
+                        return(self.__error)
+            if failed:
+                return(self.__failures(failed, remote))
+
+        else:
+            infostr = 'Downloading file {0}'.format(remote)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=infostr)
+            else:
+                self.sendlog(dst=self.__logtype, msg=infostr)
+
+            localdirdest = fpath.dirname(fpath.abspath(local))
+            localdirdest = fpath.normpath(localdirdest)
+            if not fpath.exists(localdirdest):
+                self.make_local_dirs(localdirdest)
+
+            try:
+                self.__get(remote, local)
+            except WebDavException as exception:
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level="error",
+                        msg=exception)
+                else:
+                    self.sendlog(
+                        dst=self.__logtype,
+                        level="error",
+                        msg=exception)
+
+                self.__error = {'code': 1, 'reason': exception}
+                return(self.__error)
+
+            lfilesize = self.file_size(local)
+
+            if int(lfilesize) == int(rfilesize):
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        msg='File {0} downloaded correctly'.format(remote))
+                else:
+                    self.sendlog(
+                        dst=self.__logtype,
+                        msg='File {0} downloaded correctly'.format(remote))
+
+                self.__error = {'code': 0}
+            else:
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level="warn",
+                        msg='Download failed: partially retrieved.')
+                else:
+                    self.sendlog(
+                        dst=self.__logtype,
+                        level="warn",
+                        msg='Download failed: partially retrieved.')
+
+                fremove(local)
+                self.__error = {
+                    'code': 1, 'reason': "Download failed: partially retrieved."}
+
+            return(self.__error)
+
+        return(self.__error)
+
+    @metrics.operation('upload')
+    def upload(self, local, remote, recurse=False):
+        '''
+         Uploading file to Webdav
+
+         :param local: local resource's filesystem path to upload
+         :type  local: string
+
+         :param remote: Webdav remote file path where to put the file
+         :type  remote: string
+
+         :param recurse: Internal use only
+         :type  recurse: boolean
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+
+        self.__meter.begin()
+        try:
+            return(self.__upload(local, remote, recurse))
+        finally:
+            self.__summary()
+
+    def __upload(self, local, remote, recurse=False):
+
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        if not fpath.exists(local):
+            errstr = 'Unable to find locale file {lfile}. Aborting upload..'.format(
+                lfile=local)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="error",
+                    msg=errstr)
+            else:
+                self.sendlog(dst=self.__logtype, level="error", msg=errstr)
+            self.__error = {'code': 1, 'reason': errstr}
+            return(self.__error)
+
+        local_isdir = fpath.isdir(local)
+
+        rfilename = fpath.basename(fpath.normpath(local))
+        if local_isdir:
+            rfiledst = "{}/{}".format(remote, rfilename)
+        else:
+            if not recurse:
+                rfiledst = "{}/{}".format(remote, rfilename)
+            else:
+                rfiledst = str(remote)
+
+        rfiledst = fpath.normpath(rfiledst)
+
+        infostr = 'Uploading {} to {}'.format(local, rfiledst)
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                msg=infostr)
+        else:
+            self.sendlog(dst=self.__logtype, msg=infostr)
+
+        # a file out of retries does not abort its directory
+        failed = []
+        if not self.__exists(rfiledst):
+            if local_isdir:
+                mkdires = self.createdir(rfiledst)
+                if mkdires['code'] == 1:
+                    errmsg = 'Unable to create remote directory {}'.format(
+                        rfiledst)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="warn",
+                            msg=errmsg)
+                    else:
+                        self.sendlog(
+                            dst=self.__logtype, level="warn", msg=errmsg)
+
+                    self.__error = {'code': 1, 'reason': errmsg}
+                    return(self.__error)
+
+                remote = str(rfiledst)
+                if self.__jobs > 1:
+                    tasks = []
+                    for dirpath, dirnames, filenames in walk(local):
+                        dirnames.sort()
+                        rdir = "{}/{}".format(
+                            rfiledst, fpath.relpath(dirpath, local))
+                        rdir = fpath.normpath(rdir)
+                        if rdir != rfiledst:
+                            if self.createdir(rdir)['code'] == 1:
+                                return(self.__error)
+                        # created empty, workers do not ask for its files
+                        self.__cache.fill(rdir, [], 1)
+                        for file_ in sorted(filenames):
+                            tasks.append(transfer.task(
+                                'upload',
+                                fpath.join(dirpath, file_),
+                                "{}/{}".format(rdir, file_)))
+                    # failed transfers are not left to the checks below
+                    if self.__dispatch(tasks)['code'] == 1:
+                        return(self.__error)
+                else:
+                    for file_ in listdir(local):
+                        recursed_local = "{}/{}".format(local, file_)
+                        recursed_local = fpath.normpath(recursed_local)
+
+                        if fpath.isdir(recursed_local):
+                            recursed_remote = rfiledst
+                        else:
+                            recursed_remote = "{}/{}".format(rfiledst, file_)
+                        recursed_remote = fpath.normpath(recursed_remote)
+
+                        self.upload(
+                            local=recursed_local,
+                            remote=recursed_remote,
+                            recurse=True)
+                        if self.__error['code'] == 1:
+                            if not self.__skip(failed, recursed_local):
+                                return(self.__error)
+            else:
+                try:
+                    self.__put(local, rfiledst)
+                except WebDavException as exception:
+                    if re.match(
+                        'Remote parent for.* not found',
+                            str(exception)):
+                        parentdir = fpath.dirname(rfiledst)
+                        res = self.createdir(parentdir)
                         if res['code'] == 1:
                             errmsg = "Unable to create remote parent directory {}.".format(
                                 parentdir)
@@ -747,713 +2740,1625 @@ class core():
                                 self.sendlog(
                                     logfpath=self.__logfile,
                                     dst=self.__logtype,
-                                    level='error',
-                                    msg=errmsg)
+                                    level='error',
+                                    msg=errmsg)
+                            else:
+                                self.sendlog(
+                                    msg=errmsg, dst=self.__logtype, level='error')
+                            self.__error = {'code': 1, 'reason': errmsg}
+                            return(self.__error)
+                        else:
+                            try:
+                                self.__put(local, rfiledst)
+                            except WebDavException as exception:
+                                if self.__logtype == 'file':
+                                    self.sendlog(
+                                        logfpath=self.__logfile,
+                                        dst=self.__logtype,
+                                        level="error",
+                                        msg=exception)
+                                else:
+                                    self.sendlog(
+                                        dst=self.__logtype, level="error", msg=exception)
+                                self.__error = {'code': 1, 'reason': exception}
+                                return(self.__error)
+                    else:
+                        if self.__logtype == 'file':
+                            self.sendlog(
+                                logfpath=self.__logfile,
+                                dst=self.__logtype,
+                                level="error",
+                                msg=exception)
+                        else:
+                            self.sendlog(
+                                dst=self.__logtype, level="error", msg=exception)
+                        self.__error = {'code': 1, 'reason': exception}
+                        return(self.__error)
+
+                remoteinfo = self.getinfo(rfiledst)
+                if 'code' in remoteinfo:
+                    errstr = remoteinfo['reason']
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="error",
+                            msg=errstr)
+                    else:
+                        self.sendlog(
+                            dst=self.__logtype, level="warn", msg=errstr)
+
+                    self.__error = {'code': 1, 'reason': errstr}
+                    return(self.__error)
+
+                lfsize = self.file_size(local)
+                if lfsize == int(remoteinfo['size']):
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            msg='File {0} uploaded correctly'.format(rfiledst))
+                    else:
+                        self.sendlog(
+                            dst=self.__logtype,
+                            msg='File {0} uploaded correctly'.format(rfiledst))
+
+                    self.__error = {'code': 0}
+                else:
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="warn",
+                            msg='Upload failed: partially sent.')
+                    else:
+                        self.sendlog(
+                            dst=self.__logtype,
+                            level="warn",
+                            msg='Upload failed: partially sent.')
+
+                    self.delete(rfiledst)
+                    self.__error = {
+                        'code': 1, 'reason': "Upload failed: partially sent."}
+
+                return(self.__error)
+
+            if local_isdir:
+                info = "Checking directory {} overall upload state...".format(
+                    rfiledst)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        msg=info)
+                else:
+                    self.sendlog(dst=self.__logtype, msg=info)
+
+                remoteflist = self.walk(rfiledst)
+                if 'code' in remoteflist:
+                    return(self.__error)
+
+                for finfo in remoteflist:
+                    if finfo.is_dir:
+                        continue
+
+                    f = finfo.path
+                    lfile = "{}/{}".format(
+                        local, fpath.relpath(f, rfiledst))
+                    lfile = fpath.normpath(lfile)
+
+                    if fpath.isfile(lfile):
+                        lfsize = self.file_size(lfile)
+                        if lfsize != int(finfo.size or 0):
+                            msg = 'Upload failed: file {} partially sent.'.format(
+                                f)
+                            if self.__logtype == 'file':
+                                self.sendlog(
+                                    logfpath=self.__logfile,
+                                    dst=self.__logtype,
+                                    level="warn",
+                                    msg=msg)
                             else:
                                 self.sendlog(
-                                    msg=errmsg, dst=self.__logtype, level='error')
-                            self.__error = {'code': 1, 'reason': errmsg}
-                            return(self.__error)
+                                    dst=self.__logtype, level="warn", msg=msg)
+                            self.delete(f)
+                            self.__error = {'code': 1, 'reason': msg}
+
+                if failed:
+                    self.__failures(failed, local)
+                elif self.__error['code'] == 0:
+                    msg = 'Uploading {} Success.'.format(local)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            msg=msg)
+                    else:
+                        self.sendlog(dst=self.__logtype, msg=msg)
+                    self.__error = {'code': 0, 'reason': msg}
+                else:
+                    msg = 'Upload failed: directory {} partially sent.'.format(
+                        local)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="warn",
+                            msg=msg)
+                    else:
+                        self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+
+                    self.__error = {'code': 1, 'reason': msg}
+        else:
+            if self.__stat(rfiledst).is_dir:
+                remoteflist = self.walk(rfiledst)
+                if 'code' in remoteflist:
+                    return(self.__error)
+                remoteflist = dict((e.path, e) for e in remoteflist)
+
+                tasks = []
+                lclfiles = self.list_files_ldir(local)
+                for file_ in lclfiles:
+                    basepath = fpath.dirname(fpath.abspath(file_))
+                    torem = fpath.dirname(fpath.abspath(local))
+                    basepath = basepath.replace(torem, '')
+                    filename = fpath.basename(file_)
+                    rpath = '{}/{}/{}'.format(remote, basepath, filename)
+                    rpath = fpath.normpath(rpath)
+
+                    if rpath not in remoteflist:
+                        if self.__jobs > 1:
+                            tasks.append(transfer.task('upload', file_, rpath))
                         else:
-                            try:
-                                self.__client.upload(
-                                    remote_path=rfiledst, local_path=local, progress=self.progress)
-                                # print console carriage return after progress bar
-                                # self.sendlog(dst='console', msg='')
-                                print('')
-                            except WebDavException as exception:
+                            self.upload(local=file_, remote=rpath, recurse=True)
+                            if self.__error['code'] == 1:
+                                if not self.__skip(failed, file_):
+                                    return(self.__error)
+                    else:
+                        finfo = remoteflist[rpath]
+
+                        if not self.__uptodate(file_, finfo):
+                            msg = 'Remote file {} mismatch local file {} trying to update.'.format(
+                                rpath, file_)
+                            if self.__logtype == 'file':
+                                self.sendlog(
+                                    logfpath=self.__logfile,
+                                    dst=self.__logtype,
+                                    level="warn",
+                                    msg=msg)
+                            else:
+                                self.sendlog(
+                                    dst=self.__logtype, level="warn", msg=msg)
+                            if self.__jobs > 1:
+                                tasks.append(
+                                    transfer.task('upload', file_, rpath))
+                                continue
+                            upres = self.upload(
+                                local=file_, remote=rpath, recurse=True)
+                            if upres['code'] == 1:
+                                msg = 'Upload failed for {}, partially sent.'.format(
+                                    file_)
+                                if self.__logtype == 'file':
+                                    self.sendlog(
+                                        logfpath=self.__logfile, dst=self.__logtype, level="warn", msg=msg)
+                                else:
+                                    self.sendlog(
+                                        dst=self.__logtype, level="warn", msg=msg)
+                                if not self.__skip(failed, file_):
+                                    return(self.__error)
+                        else:
+                            errmsg = "File {0} already exists on remote, skipping upload.".format(
+                                file_)
+                            if self.__logtype == 'file':
+                                self.sendlog(
+                                    logfpath=self.__logfile, dst=self.__logtype, msg=errmsg)
+                            else:
+                                self.sendlog(dst=self.__logtype, msg=errmsg)
+                            self.__error = {'code': 0, 'reason': errmsg}
+
+                if tasks:
+                    # create missing parents first, workers would race on them
+                    parents = set(fpath.dirname(t.destination) for t in tasks)
+                    for parent in sorted(parents):
+                        if parent not in remoteflist and parent != rfiledst:
+                            if self.createdir(parent)['code'] == 1:
+                                return(self.__error)
+                    if self.__dispatch(tasks)['code'] == 1:
+                        return(self.__error)
+                if failed:
+                    return(self.__failures(failed, local))
+            else:
+                finfo = self.getinfo(rfiledst)
+                if 'code' in finfo:
+                    return(self.__error)
+
+                if not self.__uptodate(local, self.__stat(rfiledst)):
+                    msg = 'Remote file {} mismatch local file {} trying to update.'.format(
+                        rfiledst, local)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="warn",
+                            msg=msg)
+                    else:
+                        self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+                    try:
+                        self.__put(local, rfiledst)
+                    except WebDavException as exception:
+                        if re.match(
+                            'Remote parent for.* not found',
+                                str(exception)):
+                            parentdir = fpath.dirname(fpath.abspath(rfiledst))
+                            res = self.createdir(parentdir)
+                            if res['code'] == 1:
+                                errmsg = "Unable to create remote parent directory {}.".format(
+                                    parentdir)
                                 if self.__logtype == 'file':
                                     self.sendlog(
                                         logfpath=self.__logfile,
                                         dst=self.__logtype,
-                                        level="error",
-                                        msg=exception)
+                                        level='error',
+                                        msg=errmsg)
                                 else:
                                     self.sendlog(
-                                        dst=self.__logtype, level="error", msg=exception)
-                                self.__error = {'code': 1, 'reason': exception}
+                                        msg=errmsg, dst=self.__logtype, level='error')
+                                self.__error = {'code': 1, 'reason': errmsg}
                                 return(self.__error)
-                    else:
+                            else:
+                                try:
+                                    self.__put(local, rfiledst)
+                                except WebDavException as exception:
+                                    if self.__logtype == 'file':
+                                        self.sendlog(
+                                            logfpath=self.__logfile, dst=self.__logtype, level="error", msg=exception)
+                                    else:
+                                        self.sendlog(
+                                            dst=self.__logtype, level="error", msg=exception)
+                                    self.__error = {
+                                        'code': 1, 'reason': exception}
+                                    return(self.__error)
+                        else:
+                            if self.__logtype == 'file':
+                                self.sendlog(
+                                    logfpath=self.__logfile,
+                                    dst=self.__logtype,
+                                    level="error",
+                                    msg=exception)
+                            else:
+                                self.sendlog(
+                                    dst=self.__logtype, level="error", msg=exception)
+                            self.__error = {'code': 1, 'reason': exception}
+                            return(self.__error)
+
+                    remoteinfo = self.getinfo(rfiledst)
+                    if 'code' in remoteinfo:
+                        errstr = remoteinfo['reason']
                         if self.__logtype == 'file':
                             self.sendlog(
                                 logfpath=self.__logfile,
                                 dst=self.__logtype,
                                 level="error",
-                                msg=exception)
+                                msg=errstr)
                         else:
                             self.sendlog(
-                                dst=self.__logtype, level="error", msg=exception)
-                        self.__error = {'code': 1, 'reason': exception}
+                                dst=self.__logtype, level="warn", msg=errstr)
+
+                        self.__error = {'code': 1, 'reason': errstr}
                         return(self.__error)
 
-                remoteinfo = self.getinfo(rfiledst)
-                if 'code' in remoteinfo:
-                    errstr = remoteinfo['reason']
+                    lfsize = self.file_size(local)
+                    if lfsize == int(remoteinfo['size']):
+                        if self.__logtype == 'file':
+                            self.sendlog(
+                                logfpath=self.__logfile,
+                                dst=self.__logtype,
+                                msg='File {0} uploaded correctly'.format(rfiledst))
+                        else:
+                            self.sendlog(
+                                dst=self.__logtype,
+                                msg='File {0} uploaded correctly'.format(rfiledst))
+
+                        self.__error = {'code': 0}
+                    else:
+                        if self.__logtype == 'file':
+                            self.sendlog(
+                                logfpath=self.__logfile,
+                                dst=self.__logtype,
+                                level="warn",
+                                msg='Upload failed: partially sent.')
+                        else:
+                            self.sendlog(
+                                dst=self.__logtype,
+                                level="warn",
+                                msg='Upload failed: partially sent.')
+
+                        self.delete(rfiledst)
+                        self.__error = {
+                            'code': 1, 'reason': "Upload failed: partially sent."}
+                else:
+                    errmsg = "File {0} already exists on remote, skipping upload.".format(
+                        local)
                     if self.__logtype == 'file':
                         self.sendlog(
                             logfpath=self.__logfile,
                             dst=self.__logtype,
-                            level="error",
-                            msg=errstr)
+                            msg=errmsg)
                     else:
-                        self.sendlog(
-                            dst=self.__logtype, level="warn", msg=errstr)
+                        self.sendlog(dst=self.__logtype, msg=errmsg)
+                    self.__error = {'code': 0, 'reason': errmsg}
 
-                    self.__error = {'code': 1, 'reason': errstr}
-                    return(self.__error)
+        return(self.__error)
 
-                lfsize = self.file_size(local)
-                if lfsize == int(remoteinfo['size']):
+    @metrics.operation('createdir')
+    def createdir(self, target):
+        '''
+         Create directory on Webdav
+
+         :param target: Webdav target path
+         :type  target: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        self.__cache.invalidate(target, exists=True)
+        try:
+            self.__client.mkdir(target)
+        except WebDavException as exception:
+            if re.match('Remote parent for.* not found', str(exception)):
+                parentdir = fpath.dirname(fpath.abspath(target))
+                res = self.createdir(parentdir)
+                if res['code'] == 1:
+                    errmsg = "Unable to create remote parent directory {}.".format(
+                        parentdir)
                     if self.__logtype == 'file':
                         self.sendlog(
                             logfpath=self.__logfile,
                             dst=self.__logtype,
-                            msg='File {0} uploaded correctly'.format(rfiledst))
+                            level='error',
+                            msg=errmsg)
                     else:
                         self.sendlog(
-                            dst=self.__logtype,
-                            msg='File {0} uploaded correctly'.format(rfiledst))
+                            msg=errmsg, dst=self.__logtype, level='error')
+                    self.__error = {'code': 1, 'reason': errmsg}
+                else:
+                    res = self.createdir(target)
+                    if res['code'] == 1:
+                        errmsg = "Unable to create remote directory {}.".format(
+                            target)
+                        if self.__logtype == 'file':
+                            self.sendlog(
+                                logfpath=self.__logfile,
+                                dst=self.__logtype,
+                                level='error',
+                                msg=errmsg)
+                        else:
+                            self.sendlog(
+                                msg=errmsg, dst=self.__logtype, level='error')
+                        self.__error = {'code': 1, 'reason': errmsg}
+            else:
+                errmsg = "Unable to create remote directory {}.".format(target)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level='error',
+                        msg=errmsg)
+                else:
+                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
+                self.__error = {'code': 1, 'reason': errmsg}
+        else:
+            msg = "Directory {} created.".format(target)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=msg)
+            else:
+                self.sendlog(msg=msg, dst=self.__logtype)
 
-                    self.__error = {'code': 0}
+            try:
+                self.__client.publish(target)
+            except BaseException:
+                errmsg = "Unable to publish resource {}.".format(target)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level='error',
+                        msg=errmsg)
                 else:
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level="warn",
-                            msg='Upload failed: partially sent.')
-                    else:
-                        self.sendlog(
-                            dst=self.__logtype,
-                            level="warn",
-                            msg='Upload failed: partially sent.')
+                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
+                self.__error = {'code': 1, 'reason': errmsg}
+            else:
+                self.__error = {'code': 0, 'reason': msg}
 
-                    self.delete(rfiledst)
-                    self.__error = {
-                        'code': 1, 'reason': "Upload failed: partially sent."}
+        return(self.__error)
 
-                return(self.__error)
+    @metrics.operation('delete')
+    def delete(self, target):
+        '''
+         Delete resource on Webdav
 
-            if local_isdir:
-                info = "Checking directory {} overall upload state...".format(
-                    rfiledst)
+         :param target: Webdav target path
+         :type  target: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        target = fpath.normpath(target)
+
+        msg = "Removing {}.".format(target)
+        if self.__logtype == 'file':
+            self.sendlog(logfpath=self.__logfile, dst=self.__logtype, msg=msg)
+        else:
+            self.sendlog(dst=self.__logtype, msg=msg)
+
+        if not self.__exists(target):
+            errmsg = "Remote resource {0} not found.".format(target)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=errmsg)
+            else:
+                self.sendlog(dst=self.__logtype, msg=errmsg, level="warn")
+            self.__error = {'code': 1, 'reason': errmsg}
+        else:
+            self.__cache.invalidate(target)
+            try:
+                code = self.__send('DELETE', self.__url(target))
+                if code >= 400:
+                    raise WebDavException(
+                        'Unable to remove {0}: HTTP error {1}'.format(target, code))
+            except BaseException:
+                errmsg = "Unable to remove remote resource {}.".format(target)
                 if self.__logtype == 'file':
                     self.sendlog(
                         logfpath=self.__logfile,
                         dst=self.__logtype,
-                        msg=info)
+                        level='error',
+                        msg=errmsg)
                 else:
-                    self.sendlog(dst=self.__logtype, msg=info)
+                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
+                self.__error = {'code': 1, 'reason': errmsg}
+            else:
+                self.__cache.invalidate(target, exists=False)
+                msg = "Remote resource {} has been removed.".format(target)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        msg=msg)
+                else:
+                    self.sendlog(msg=msg, dst=self.__logtype)
+                self.__error = {'code': 0, 'reason': msg}
 
-                remoteflist = self.list_recurse(rfiledst)
-                for f in remoteflist:
-                    finfo = self.getinfo(f)
-                    if 'code' in finfo:
-                        return(self.__error)
+        return(self.__error)
 
-                    lfilename = fpath.basename(f)
-                    lbasepath = fpath.dirname(
-                        fpath.abspath(f)).replace(
-                        remote, '')
-                    lbasepath = "{}/{}".format(local, lbasepath)
-                    lbasepath = fpath.normpath(lbasepath)
-                    lfile = "{}/{}".format(lbasepath, lfilename)
-                    lfile = fpath.normpath(lfile)
-                    lfsize = self.file_size(lfile)
+    @metrics.operation('duplicate')
+    def duplicate(self, target, twin):
+        '''
+         Duplicate a resource on Webdav
 
-                    if not fpath.isdir(lfile):
-                        if lfsize != int(finfo['size']):
-                            msg = 'Upload failed: file {} partially sent.'.format(
-                                f)
-                            if self.__logtype == 'file':
-                                self.sendlog(
-                                    logfpath=self.__logfile,
-                                    dst=self.__logtype,
-                                    level="warn",
-                                    msg=msg)
-                            else:
-                                self.sendlog(
-                                    dst=self.__logtype, level="warn", msg=msg)
-                            self.delete(f)
-                            self.__error = {'code': 1, 'reason': msg}
+         :param target: Webdav source target path
+         :type  target: string
 
-                if self.__error['code'] == 0:
-                    msg = 'Uploading {} Success.'.format(local)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            msg=msg)
-                    else:
-                        self.sendlog(dst=self.__logtype, msg=msg)
-                    self.__error = {'code': 0, 'reason': msg}
-                else:
-                    msg = 'Upload failed: directory {} partially sent.'.format(
-                        local)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level="warn",
-                            msg=msg)
-                    else:
-                        self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+         :param twin: Webdav destination target path
+         :type  twin: string
 
-                    self.__error = {'code': 1, 'reason': msg}
-        else:
-            if self.__client.is_dir(rfiledst):
-                remoteflist = self.list_recurse(rfiledst)
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
 
-                lclfiles = self.list_files_ldir(local)
-                for file_ in lclfiles:
-                    basepath = fpath.dirname(fpath.abspath(file_))
-                    torem = fpath.dirname(fpath.abspath(local))
-                    basepath = basepath.replace(torem, '')
-                    filename = fpath.basename(file_)
-                    rpath = '{}/{}/{}'.format(remote, basepath, filename)
-                    rpath = fpath.normpath(rpath)
+        if self.__error['code'] == 1:
+            return(self.__error)
 
-                    if rpath not in remoteflist:
-                        self.upload(local=file_, remote=rpath, recurse=True)
-                    else:
-                        lfsize = self.file_size(file_)
-                        finfo = self.getinfo(rpath)
-                        if 'code' in finfo:
-                            return(self.__error)
+        target = fpath.normpath(target)
 
-                        if lfsize != int(finfo['size']):
-                            msg = 'Remote file {} mismatch local file {} trying to update.'.format(
-                                rpath, file_)
-                            if self.__logtype == 'file':
-                                self.sendlog(
-                                    logfpath=self.__logfile,
-                                    dst=self.__logtype,
-                                    level="warn",
-                                    msg=msg)
-                            else:
-                                self.sendlog(
-                                    dst=self.__logtype, level="warn", msg=msg)
-                            upres = self.upload(
-                                local=file_, remote=rpath, recurse=True)
-                            if upres['code'] == 1:
-                                msg = 'Upload failed for {}, partially sent.'.format(
-                                    file_)
-                                if self.__logtype == 'file':
-                                    self.sendlog(
-                                        logfpath=self.__logfile, dst=self.__logtype, level="warn", msg=msg)
-                                else:
-                                    self.sendlog(
-                                        dst=self.__logtype, level="warn", msg=msg)
-                        else:
-                            errmsg = "File {0} already exists on remote, skipping upload.".format(
-                                file_)
-                            if self.__logtype == 'file':
-                                self.sendlog(
-                                    logfpath=self.__logfile, dst=self.__logtype, msg=errmsg)
-                            else:
-                                self.sendlog(dst=self.__logtype, msg=errmsg)
-                            self.__error = {'code': 0, 'reason': errmsg}
+        if not self.__exists(target):
+            errmsg = "Remote resource {0} not found.".format(target)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=errmsg)
             else:
-                lfsize = self.file_size(local)
-                finfo = self.getinfo(rfiledst)
-                if 'code' in finfo:
-                    return(self.__error)
+                self.sendlog(dst=self.__logtype, level="warn", msg=errmsg)
+            self.__error = {'code': 1, 'reason': errmsg}
+            return(self.__error)
 
-                if lfsize != int(finfo['size']):
-                    msg = 'Remote file {} mismatch local file {} trying to update.'.format(
-                        rfiledst, local)
+        msg = "Copying {} to {}.".format(target, twin)
+        if self.__logtype == 'file':
+            self.sendlog(logfpath=self.__logfile, dst=self.__logtype, msg=msg)
+        else:
+            self.sendlog(dst=self.__logtype, msg=msg)
+
+        self.__cache.invalidate(twin)
+        try:
+            self.__client.copy(remote_path_from=target, remote_path_to=twin)
+        except WebDavException as exception:
+            if re.match('Remote parent for.* not found', str(exception)):
+                parentdir = fpath.dirname(fpath.abspath(twin))
+                res = self.createdir(parentdir)
+                if res['code'] == 1:
+                    errmsg = "Unable to create remote parent directory {}.".format(
+                        parentdir)
                     if self.__logtype == 'file':
                         self.sendlog(
                             logfpath=self.__logfile,
                             dst=self.__logtype,
-                            level="warn",
-                            msg=msg)
+                            level='error',
+                            msg=errmsg)
                     else:
-                        self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+                        self.sendlog(
+                            msg=errmsg, dst=self.__logtype, level='error')
+                    self.__error = {'code': 1, 'reason': errmsg}
+                    return(self.__error)
+                else:
                     try:
-                        self.__client.upload(
-                            remote_path=rfiledst,
-                            local_path=local,
-                            progress=self.progress)
-                        # print console carriage return after progress bar
-                        # self.sendlog(dst='console', msg='')
-                        print('')
+                        self.__client.copy(
+                            remote_path_from=target, remote_path_to=twin)
                     except WebDavException as exception:
-                        if re.match(
-                            'Remote parent for.* not found',
-                                str(exception)):
-                            parentdir = fpath.dirname(fpath.abspath(rfiledst))
-                            res = self.createdir(parentdir)
-                            if res['code'] == 1:
-                                errmsg = "Unable to create remote parent directory {}.".format(
-                                    parentdir)
-                                if self.__logtype == 'file':
-                                    self.sendlog(
-                                        logfpath=self.__logfile,
-                                        dst=self.__logtype,
-                                        level='error',
-                                        msg=errmsg)
-                                else:
-                                    self.sendlog(
-                                        msg=errmsg, dst=self.__logtype, level='error')
-                                self.__error = {'code': 1, 'reason': errmsg}
-                                return(self.__error)
-                            else:
-                                try:
-                                    self.__client.upload(
-                                        remote_path=rfiledst, local_path=local, progress=self.progress)
-                                    # print console carriage return after progress bar
-                                    # self.sendlog(dst='console', msg='')
-                                    print('')
-                                except WebDavException as exception:
-                                    if self.__logtype == 'file':
-                                        self.sendlog(
-                                            logfpath=self.__logfile, dst=self.__logtype, level="error", msg=exception)
-                                    else:
-                                        self.sendlog(
-                                            dst=self.__logtype, level="error", msg=exception)
-                                    self.__error = {
-                                        'code': 1, 'reason': exception}
-                                    return(self.__error)
-                        else:
-                            if self.__logtype == 'file':
-                                self.sendlog(
-                                    logfpath=self.__logfile,
-                                    dst=self.__logtype,
-                                    level="error",
-                                    msg=exception)
-                            else:
-                                self.sendlog(
-                                    dst=self.__logtype, level="error", msg=exception)
-                            self.__error = {'code': 1, 'reason': exception}
-                            return(self.__error)
-
-                    remoteinfo = self.getinfo(rfiledst)
-                    if 'code' in remoteinfo:
-                        errstr = remoteinfo['reason']
+                        errmsg = "Unable to duplicate remote resource {} to {}.".format(
+                            target, twin)
                         if self.__logtype == 'file':
                             self.sendlog(
                                 logfpath=self.__logfile,
                                 dst=self.__logtype,
-                                level="error",
-                                msg=errstr)
+                                level='error',
+                                msg=errmsg)
                         else:
                             self.sendlog(
-                                dst=self.__logtype, level="warn", msg=errstr)
+                                msg=errmsg, dst=self.__logtype, level='error')
+                        self.__error = {'code': 1, 'reason': errmsg}
+                    else:
+                        msg = "Remote resource {} has been copied to remote location {}.".format(
+                            target, twin)
+                        if self.__logtype == 'file':
+                            self.sendlog(
+                                logfpath=self.__logfile, dst=self.__logtype, msg=msg)
+                        else:
+                            self.sendlog(msg=msg, dst=self.__logtype)
+                        self.__error = {'code': 0, 'reason': msg}
+            else:
+                errmsg = "Unable to duplicate remote resource {} to {}.".format(
+                    target, twin)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level='error',
+                        msg=errmsg)
+                else:
+                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
+                self.__error = {'code': 1, 'reason': errmsg}
+        else:
+            msg = "Remote resource {} has been copied to remote location {}.".format(
+                target, twin)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=msg)
+            else:
+                self.sendlog(msg=msg, dst=self.__logtype)
+            self.__error = {'code': 0, 'reason': msg}
 
-                        self.__error = {'code': 1, 'reason': errstr}
-                        return(self.__error)
+        return(self.__error)
 
-                    lfsize = self.file_size(local)
-                    if lfsize == int(remoteinfo['size']):
+    @metrics.operation('move')
+    def move(self, target, new):
+        '''
+         Move a resource on Webdav
+
+         :param target: Webdav source target path
+         :type  target: string
+
+         :param new: Webdav destination target path
+         :type  new: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        target = fpath.normpath(target)
+
+        if not self.__exists(target):
+            errmsg = "Remote resource {0} not found.".format(target)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=errmsg)
+            else:
+                self.sendlog(dst=self.__logtype, level="warn", msg=errmsg)
+            self.__error = {'code': 1, 'reason': errmsg}
+            return(self.__error)
+
+        msg = "Moving {} to {}.".format(target, new)
+        if self.__logtype == 'file':
+            self.sendlog(logfpath=self.__logfile, dst=self.__logtype, msg=msg)
+        else:
+            self.sendlog(dst=self.__logtype, msg=msg)
+
+        self.__cache.invalidate(target)
+        self.__cache.invalidate(new)
+        try:
+            self.__client.move(remote_path_from=target, remote_path_to=new)
+        except WebDavException as exception:
+            if re.match('Remote parent for.* not found', str(exception)):
+                parentdir = fpath.dirname(fpath.abspath(new))
+                res = self.createdir(parentdir)
+                if res['code'] == 1:
+                    errmsg = "Unable to create remote parent directory {}.".format(
+                        parentdir)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level='error',
+                            msg=errmsg)
+                    else:
+                        self.sendlog(
+                            msg=errmsg, dst=self.__logtype, level='error')
+                    self.__error = {'code': 1, 'reason': errmsg}
+                    return(self.__error)
+                else:
+                    try:
+                        self.__client.move(
+                            remote_path_from=target, remote_path_to=new)
+                    except WebDavException as exception:
+                        errmsg = "Unable to move remote resource {} to {}.".format(
+                            target, new)
                         if self.__logtype == 'file':
                             self.sendlog(
                                 logfpath=self.__logfile,
                                 dst=self.__logtype,
-                                msg='File {0} uploaded correctly'.format(rfiledst))
+                                level='error',
+                                msg=errmsg)
                         else:
                             self.sendlog(
-                                dst=self.__logtype,
-                                msg='File {0} uploaded correctly'.format(rfiledst))
-
-                        self.__error = {'code': 0}
+                                msg=errmsg, dst=self.__logtype, level='error')
+                        self.__error = {'code': 1, 'reason': errmsg}
                     else:
+                        msg = "Remote resource {} has been moved to remote location {}.".format(
+                            target, new)
                         if self.__logtype == 'file':
                             self.sendlog(
-                                logfpath=self.__logfile,
-                                dst=self.__logtype,
-                                level="warn",
-                                msg='Upload failed: partially sent.')
+                                logfpath=self.__logfile, dst=self.__logtype, msg=msg)
                         else:
-                            self.sendlog(
-                                dst=self.__logtype,
-                                level="warn",
-                                msg='Upload failed: partially sent.')
-
-                        self.delete(rfiledst)
-                        self.__error = {
-                            'code': 1, 'reason': "Upload failed: partially sent."}
+                            self.sendlog(msg=msg, dst=self.__logtype)
+                        self.__error = {'code': 0, 'reason': msg}
+            else:
+                errmsg = "Unable to move remote resource {} to {}.".format(
+                    target, new)
+                if self.__logtype == 'file':
+                    self.sendlog(
+                        logfpath=self.__logfile,
+                        dst=self.__logtype,
+                        level='error',
+                        msg=errmsg)
                 else:
-                    errmsg = "File {0} already exists on remote, skipping upload.".format(
-                        local)
+                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
+                self.__error = {'code': 1, 'reason': errmsg}
+        else:
+            msg = "Remote resource {} has been moved to remote location {}.".format(
+                target, new)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    msg=msg)
+            else:
+                self.sendlog(msg=msg, dst=self.__logtype)
+            self.__error = {'code': 0, 'reason': msg}
+
+        return(self.__error)
+
+    @metrics.operation('expand')
+    def expand(self, patterns):
+        '''
+         Resolve glob patterns ('*', '?', '[]' within a path segment and
+         '**' for any depth) against the remote tree. Paths without
+         wildcards are returned as is, without checking they exist.
+         Members of a matched directory are left out.
+
+         :param patterns: Webdav paths or glob patterns
+         :type  patterns: list
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: list of Webdav paths
+         :rtype: list
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
+
+        found = []
+        listings = {}
+        for pattern in patterns:
+            pattern = cache.normalize(pattern)
+            if not listing.has_magic(pattern):
+                found.append(pattern)
+                continue
+
+            parts = pattern.strip('/').split('/')
+            static = []
+            for part in parts:
+                if listing.has_magic(part):
+                    break
+                static.append(part)
+            base = cache.normalize('/'.join(static))
+            rest = parts[len(static):]
+
+            # one level is listed with Depth: 1, deeper ones with a walk
+            deep = len(rest) > 1 or '**' in rest
+            if (base, deep) not in listings:
+                try:
+                    if deep:
+                        entries = self.__walker.walk(base)
+                    else:
+                        entries = self.__members(base)
+                except WebDavException as exception:
                     if self.__logtype == 'file':
                         self.sendlog(
                             logfpath=self.__logfile,
                             dst=self.__logtype,
-                            msg=errmsg)
+                            level="warn",
+                            msg=exception)
                     else:
-                        self.sendlog(dst=self.__logtype, msg=errmsg)
-                    self.__error = {'code': 0, 'reason': errmsg}
+                        self.sendlog(
+                            dst=self.__logtype, level="warn", msg=exception)
+                    self.__error = {'code': 1, 'reason': exception}
+                    return(self.__error)
+                listings[(base, deep)] = sorted(e.path for e in entries)
+
+            for path in listings[(base, deep)]:
+                if listing.glob_match(
+                        fpath.relpath(path, base).split('/'), rest):
+                    found.append(path)
+
+        matched = set(found)
+        result = []
+        for path in dict.fromkeys(found):
+            parent = fpath.dirname(path)
+            while parent not in ['/', ''] and parent not in matched:
+                parent = fpath.dirname(parent)
+            if parent not in matched:
+                result.append(path)
+        return(result)
+
+    def __mkcols(self, target):
+        '''
+         MKCOL target and its missing parents, safe to run concurrently
+        '''
 
-        return(self.__error)
+        code = self.__send('MKCOL', self.__url(target, directory=True))
+        if code == 409 and fpath.dirname(target) != target:
+            self.__mkcols(fpath.dirname(target))
+            code = self.__send('MKCOL', self.__url(target, directory=True))
+        if code >= 400 and code != 405:
+            raise WebDavException(
+                'Unable to create remote directory {0}: HTTP error {1}'.format(
+                    target, code))
+        self.__cache.invalidate(target)
+
+    def __bulkone(self, method, source, destination):
+        '''
+         Send one DELETE, MOVE or COPY request and return its HTTP status,
+         creating the missing destination parent once
+        '''
 
-    def createdir(self, target):
+        self.__cache.invalidate(source)
+        headers = []
+        if destination is not None:
+            self.__cache.invalidate(destination)
+            headers = [
+                'Destination: {0}'.format(self.__url(destination)),
+                'Overwrite: T']
+        code = self.__send(method, self.__url(source), headers)
+        if code == 409 and destination is not None:
+            self.__mkcols(fpath.dirname(destination))
+            code = self.__send(method, self.__url(source), headers)
+        return(code)
+
+    @metrics.operation('bulk')
+    def bulk(self, action, items, concurrency=None):
         '''
-         Create directory on Webdav
+         Delete, move or duplicate many remote resources. Requests are not
+         preceded by existence checks and run concurrently over the pooled
+         keep-alive connections.
+
+         :param action: delete|move|duplicate
+         :type  action: string
+
+         :param items: Webdav paths to delete, or (source, destination)
+                       pairs to move or duplicate
+         :type  items: list
 
-         :param target: Webdav target path
-         :type  target: string
+         :param   concurrency: requests in flight at once
+         :type    concurrency: int
+         :default concurrency: maxconn
 
-         :returns: It will returns result 'code' and 'reason'
+         :returns: 'code', 'reason' and per path 'results' (transfer.result)
          :rtype: dict
         '''
         if self.__error['code'] == 1:
             return(self.__error)
 
+        methods = {'delete': 'DELETE', 'move': 'MOVE', 'duplicate': 'COPY'}
+        if action not in methods:
+            self.__error = {
+                'code': 1, 'reason': 'Unknown bulk action {0}'.format(action)}
+            return(self.__error)
+
+        jobs = []
+        for item in items:
+            if action == 'delete':
+                jobs.append((fpath.normpath(item), None))
+            else:
+                jobs.append((fpath.normpath(item[0]), fpath.normpath(item[1])))
+        if not jobs:
+            return({'code': 0, 'reason': 'Nothing to do.', 'results': []})
+
+        def run(job):
+            source, destination = job
+            try:
+                code = self.__bulkone(methods[action], source, destination)
+            except WebDavException as exception:
+                return(transfer.result(
+                    action, source, destination, 1, str(exception)))
+            if code < 300:
+                return(transfer.result(action, source, destination, 0, 'Done'))
+            if code == 404:
+                reason = 'Not found'
+            elif code == 412:
+                reason = 'Destination exists'
+            else:
+                reason = 'HTTP error {0}'.format(code)
+            return(transfer.result(action, source, destination, 1, reason))
+
         try:
-            self.__client.mkdir(target)
-        except WebDavException as exception:
-            if re.match('Remote parent for.* not found', str(exception)):
-                parentdir = fpath.dirname(fpath.abspath(target))
-                res = self.createdir(parentdir)
-                if res['code'] == 1:
-                    errmsg = "Unable to create remote parent directory {}.".format(
-                        parentdir)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level='error',
-                            msg=errmsg)
-                    else:
-                        self.sendlog(
-                            msg=errmsg, dst=self.__logtype, level='error')
-                    self.__error = {'code': 1, 'reason': errmsg}
-                else:
-                    res = self.createdir(target)
-                    if res['code'] == 1:
-                        errmsg = "Unable to create remote directory {}.".format(
-                            target)
-                        if self.__logtype == 'file':
-                            self.sendlog(
-                                logfpath=self.__logfile,
-                                dst=self.__logtype,
-                                level='error',
-                                msg=errmsg)
-                        else:
-                            self.sendlog(
-                                msg=errmsg, dst=self.__logtype, level='error')
-                        self.__error = {'code': 1, 'reason': errmsg}
+            concurrency = max(1, int(concurrency or self.__maxconn))
+        except (TypeError, ValueError):
+            concurrency = 8
+        with ThreadPoolExecutor(
+                max_workers=min(concurrency, len(jobs))) as executor:
+            results = list(executor.map(run, jobs))
+
+        failed = [r for r in results if r.code == 1]
+        for r in failed:
+            msg = "{0} of {1} failed: {2}".format(
+                action.capitalize(), r.source, r.reason)
+            if self.__logtype == 'file':
+                self.sendlog(
+                    logfpath=self.__logfile,
+                    dst=self.__logtype,
+                    level="warn",
+                    msg=msg)
             else:
-                errmsg = "Unable to create remote directory {}.".format(target)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level='error',
-                        msg=errmsg)
-                else:
-                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
-                self.__error = {'code': 1, 'reason': errmsg}
+                self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+
+        if failed:
+            reason = '{0} of {1} operations failed.'.format(
+                len(failed), len(results))
+            return({'code': 1, 'reason': reason, 'results': results})
+        reason = '{0} operations done.'.format(len(results))
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                msg=reason)
         else:
-            msg = "Directory {} created.".format(target)
+            self.sendlog(dst=self.__logtype, msg=reason)
+        return({'code': 0, 'reason': reason, 'results': results})
+
+    def __searchable(self):
+        '''
+         Where SEARCH requests are answered, probed once with OPTIONS on
+         the Webdav root then on the Nextcloud/ownCloud DAV root. Returns
+         (url, scope href prefix, href root of results) or None.
+        '''
+
+        if self.__dasl is not None:
+            return(self.__dasl or None)
+        self.__dasl = False
+
+        hostname = self.__client.webdav.hostname
+        root = self.__client.webdav.root
+        candidates = [(
+            self.__url('/', directory=True),
+            Urn(root).quote().rstrip('/'),
+            self.__hrefroot)]
+        prefix, sep, tail = root.partition('/remote.php/')
+        if sep:
+            # the DAV root arbitrates searches, scopes are relative to it
+            login = Urn(self.__login).quote().strip('/')
+            candidates.append((
+                '{0}{1}/remote.php/dav/'.format(hostname, prefix),
+                '/files/{0}'.format(login),
+                listing.href_root('{0}{1}/remote.php/dav/files/{2}'.format(
+                    hostname, prefix, login))))
+
+        for url, scope, hrefroot in candidates:
+            try:
+                if url == candidates[0][0]:
+                    # the root capabilities are kept for other features
+                    found = self.__probe()
+                else:
+                    code, fields = self.__offers(url)
+                    found = negotiate.capabilities(fields if code < 300 else {})
+            except WebDavException:
+                return(None)
+            if found['search']:
+                self.__dasl = (url, scope, hrefroot)
+                return(self.__dasl)
+        return(None)
+
+    def __serversearch(self, target, path, found, callback=None):
+        '''
+         Search resources whose name contains target with one SEARCH
+         request (RFC 5323), matches being added to found and handed to
+         callback while the answer is received. Returns None when the
+         server cannot search.
+        '''
+
+        endpoint = self.__searchable()
+        if endpoint is None:
+            return(None)
+        url, scope, hrefroot = endpoint
+
+        base = fpath.normpath('/{0}'.format(str(path).lstrip('/')))
+        below = '{0}/'.format(base.rstrip('/'))
+        seen = set(found)
+
+        def match(e):
+            # the server answer is a superset: names are like target
+            if not e.path.startswith(below) or \
+                    target not in fpath.basename(e.path):
+                return
+            name = listing.rebase(path, base, e.path)
+            # a replayed request sends matches again
+            if name not in seen:
+                seen.add(name)
+                found.append(name)
+                if callback is not None:
+                    callback(name)
+
+        options = {
+            'URL': url,
+            'CUSTOMREQUEST': 'SEARCH',
+            'HTTPHEADER': [
+                'Accept: */*',
+                'Content-Type: text/xml; charset="utf-8"'],
+            'POSTFIELDS': listing.search_body(
+                '{0}{1}'.format(scope, Urn(base, directory=True).quote()),
+                target),
+            'NOBODY': 0
+        }
+        parser = [None]
+
+        def perform():
+            parser[0] = listing.multistatus(hrefroot, match)
+            options['WRITEFUNCTION'] = parser[0].feed
+            request = self.__client.Request(options=options)
+            try:
+                request.perform()
+                return(int(request.getinfo(pycurl.HTTP_CODE)))
+            finally:
+                request.close()
+
+        try:
+            code = self.__replay('SEARCH', perform)
+        except WebDavException as exception:
+            code = exception
+        if code != 207:
+            msg = "Server search refused ({0}), listing {1} instead".format(
+                code, path)
             if self.__logtype == 'file':
                 self.sendlog(
                     logfpath=self.__logfile,
                     dst=self.__logtype,
+                    level="warn",
                     msg=msg)
             else:
-                self.sendlog(msg=msg, dst=self.__logtype)
+                self.sendlog(dst=self.__logtype, level="warn", msg=msg)
+            if isinstance(code, int):
+                self.__dasl = False
+            return(None)
+        parser[0].close()
+
+        return(found)
+
+    @metrics.operation('search')
+    def search(self, target, path=False, callback=None):
+        '''
+         Search for file or directory recursively on Webdav. Servers
+         announcing DASL basicsearch are asked with one SEARCH request,
+         others are listed recursively.
+
+         :param target: Searching word
+         :type  target: string
+
+         :param   path: Webdav path where looking for target
+         :type    path: string
+         :default path: False
+
+         :param   callback: called with each path found, as soon as known
+         :type    callback: function
+         :default callback: None
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: list of file paths which contains target
+         :rtype: list
+        '''
+
+        if path:
+            currdir = str(path)
+        else:
+            currdir = "/"
+
+        target = str(target)
+        # paths already handed to callback by an interrupted search
+        sent = []
+        if self.__error['code'] == 0 and '\\' not in target:
+            if self.__serversearch(target, currdir, sent, callback) is not None:
+                return(sent)
+
+        info = "Listing directory {}".format(currdir)
+        if self.__logtype == 'file':
+            self.sendlog(
+                logfpath=self.__logfile,
+                dst=self.__logtype,
+                msg=info)
+        else:
+            self.sendlog(dst=self.__logtype, msg=info)
+
+        remotefiles = self.walk(currdir)
+        if 'code' in remotefiles:
+            return(self.__error)
+
+        found = []
+        sent = set(sent)
+        for e in remotefiles:
+            if target in fpath.basename(e.path):
+                found.append(e.path)
+                if callback is not None and e.path not in sent:
+                    callback(e.path)
+
+        return(found)
+
+    def list_recurse(self, path):
+        '''
+         List Webdav path recursively
+
+         :param path: Webdav path to list files
+         :type  path: string
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: list of file paths which contains target
+         :rtype: list
+        '''
+
+        remotefiles = self.walk(str(path))
+        if 'code' in remotefiles:
+            return(self.__error)
+
+        return([e.path for e in remotefiles])
+
+    def list_files_ldir(self, directory_path, pattern="*"):
+        '''
+         Pattern can be used to look for specific files like .mp3 etc.
+
+         :param directory_path: local filesystem directory path
+         :type  directory_path: string
+
+         :param pattern: pattern filter to use for the search
+         :type  pattern: string
+
+         :returns: list of absolute file paths found
+         :rtype: list
+        '''
+
+        files = []
+        for dirpath, dirnames, filenames in walk(directory_path):
+            for file_name in fnfilter(filenames, pattern):
+                filepath = yield fpath.join(dirpath, file_name)
+                files.append(filepath)
+        return(files)
+
+    def make_local_dirs(self, directory):
+        '''
+         Creates local filsystem directories recursively
+
+         :param directory: local filesystem directory path
+         :type  directory: string
 
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if not fpath.exists(directory):
             try:
-                self.__client.publish(target)
-            except BaseException:
-                errmsg = "Unable to publish resource {}.".format(target)
+                makedirs(directory, 0o750)
+            except PermissionError as e:
+                errmsg = "Unable to create local directory {0}: {1}".format(
+                    directory, e.strerror)
                 if self.__logtype == 'file':
                     self.sendlog(
                         logfpath=self.__logfile,
                         dst=self.__logtype,
-                        level='error',
+                        level="error",
                         msg=errmsg)
                 else:
-                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
+                    self.sendlog(dst=self.__logtype, level="error", msg=errmsg)
                 self.__error = {'code': 1, 'reason': errmsg}
-            else:
-                self.__error = {'code': 0, 'reason': msg}
+                return(self.__error)
+            except OSError as exception:
+                if exception.errno != exception.errno.EEXIST:
+                    errmsg = "Unable to create local directory {0}: {1}".format(
+                        directory, exception)
+                    if self.__logtype == 'file':
+                        self.sendlog(
+                            logfpath=self.__logfile,
+                            dst=self.__logtype,
+                            level="error",
+                            msg=errmsg)
+                    else:
+                        self.sendlog(
+                            dst=self.__logtype, level="error", msg=errmsg)
+                    self.__error = {'code': 1, 'reason': errmsg}
+                    return(self.__error)
+
+
+class AsyncCore():
+    '''
+     Asynchronous counterpart of core for asyncio applications. Every
+     operation is a coroutine and all of them share one ahttp.session,
+     so no more than maxconn requests run against the host at once
+     whatever the number of concurrent tasks. No signal handler is set.
+
+     Unlike core, a failed operation does not block the following ones:
+     only a wrong setting or a failed connect() does.
+
+        async with client.AsyncCore(host, login, passwd, root) as dav:
+            await asyncio.gather(*[dav.download(r, l) for r, l in files])
+
+     :param host: Webdav host:port part of URI
+     :type  host: string
+
+     :param login: Webdav user login
+     :type  login: string
+
+     :param passwd: Webdav user password
+     :type  passwd: string
+
+     :param root: Webdav root
+     :type  root: string
+
+     :param   logtype: Logging destination (console|syslog|file)
+     :type    logtype: string
+     :default logtype: 'console'
+
+     :param   logfile: Logging file path if logtype is file
+     :type    logfile: string
+     :default logfile: False
+
+     :param   verbosity: General debug mode (not really used)
+     :type    verbosity: boolean
+     :default verbosity: False
+
+     :param   maxconn: Maximum concurrent requests to the host
+     :type    maxconn: int
+     :default maxconn: 16
+
+     :param   idletime: Seconds before an idle connection is closed
+     :type    idletime: int
+     :default idletime: 60
+
+     :param   timeout: Seconds to wait for a connection or a response
+     :type    timeout: int
+     :default timeout: 60
+
+     :param   cachettl: Seconds remote metadata are trusted without asking
+     :type    cachettl: int
+     :default cachettl: 30
+
+     :param   cachesize: Maximum number of remote paths kept in cache
+     :type    cachesize: int
+     :default cachesize: 50000
+
+     :returns: asynchronous client object
+     :rtype: obj
+    '''
+
+    def __init__(
+        self,
+        host,
+        login,
+        passwd,
+        root,
+        logtype='console',
+        logfile=False,
+        verbosity=False,
+        maxconn=16,
+        idletime=60,
+        timeout=60,
+        cachettl=30,
+        cachesize=50000
+    ):
+        '''
+         Init class
+        '''
+
+        self.__error = {'code': 0, 'reason': ''}
+        self.__logfile = logfile
+
+        if logtype not in ['console', 'file', 'syslog']:
+            emitlog(
+                "Log destination {} incorrect, logging to console".format(
+                    logtype),
+                level='warn')
+            logtype = 'console'
+        if logtype == 'file' and not logfile:
+            emitlog("Log destination file not set, logging to console",
+                    level='warn')
+            logtype = 'console'
+        self.__logtype = logtype
+        self.__logger = logs.getlogger(logtype, logfile, curScriptName)
+        self.__loglevel = logging.DEBUG if verbosity else logging.INFO
 
-        return(self.__error)
+        self.__verbose = verbosity
+        self.__host = host
+        self.__login = login
+        self.__passwd = passwd
+        if host == "" or host is None:
+            self.sendlog("Host cannot be empty.", level='warn')
+            self.__error = {'code': 1, 'reason': 'Host cannot be empty.'}
+        if login == "" or login is None:
+            self.sendlog("Login cannot be empty.", level='warn')
+            self.__error = {'code': 1, 'reason': 'Login cannot be empty.'}
+        if passwd == "" or passwd is None:
+            self.sendlog("Empty password set.", level='warn')
 
-    def delete(self, target):
+        root = Urn(root).quote().rstrip('/') if root else ''
+        self.__base = '{0}{1}'.format(str(host or '').rstrip('/'), root)
+        self.__hrefroot = listing.href_root(self.__base)
+        self.__infinity = True
+
+        self.__maxconn = maxconn
+        self.__idletime = idletime
+        self.__timeout = timeout
+        self.__http = None
+        self.__cache = cache.metadata(maxsize=cachesize, ttl=cachettl)
+
+    async def __aenter__(self):
+        await self.connect()
+        return(self)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def sendlog(self, msg, level='INFO'):
         '''
-         Delete resource on Webdav
+         Send log to the destination chosen at init
 
-         :param target: Webdav target path
-         :type  target: string
+         :param msg: logging message to send
+         :type  msg: string
 
-         :returns: It will returns result 'code' and 'reason'
-         :rtype: dict
+         :param level: logging facility level
+         :type  level: string
+        '''
+
+        lvl = logs.levelno(level)
+        if lvl >= self.__loglevel:
+            self.__logger.log(lvl, str(msg))
+
+    def __failure(self, reason, level='warn'):
+        self.sendlog(reason, level=level)
+        return({'code': 1, 'reason': reason})
+
+    def __success(self, reason):
+        self.sendlog(reason)
+        return({'code': 0, 'reason': reason})
+
+    async def connect(self):
         '''
+         Open the session and check the share answers
 
+         :returns: It will returns result 'code' (and 'reason' if it fails)
+         :rtype: dict
+        '''
         if self.__error['code'] == 1:
             return(self.__error)
 
-        target = fpath.normpath(target)
+        if self.__http is None:
+            self.__http = ahttp.session(
+                auth=(self.__login, self.__passwd),
+                maxconn=self.__maxconn,
+                idletime=self.__idletime,
+                timeout=self.__timeout)
+        try:
+            await self.__propfind('/', 0)
+        except (WebDavException, NotImplementedError):
+            errmsg = "Unable to connect to server: {0}.".format(self.__host)
+            self.__error = self.__failure(errmsg, level='error')
+            return(self.__error)
 
-        msg = "Removing {}.".format(target)
-        if self.__logtype == 'file':
-            self.sendlog(logfpath=self.__logfile, dst=self.__logtype, msg=msg)
-        else:
-            self.sendlog(dst=self.__logtype, msg=msg)
+        self.sendlog("Connected to {0} as {1}".format(
+            self.__host, self.__login))
+        return({'code': 0})
 
-        if not self.__client.check(target):
-            errmsg = "Remote resource {0} not found.".format(target)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    level="warn",
-                    msg=errmsg)
-            else:
-                self.sendlog(dst=self.__logtype, msg=errmsg, level="warn")
-            self.__error = {'code': 1, 'reason': errmsg}
+    async def close(self):
+        '''
+         Close every keep-alive connection
+        '''
+
+        if self.__http is not None:
+            await self.__http.close()
+            self.__http = None
+
+    def pool_stats(self):
+        '''
+         Session counters, see ahttp.session.stats()
+
+         :returns: session counters, empty before connect()
+         :rtype: dict
+        '''
+
+        if self.__http is None:
+            return({})
+        return(self.__http.stats())
+
+    def __url(self, target, directory=False):
+        '''
+         Build the full URL of a Webdav path
+        '''
+
+        urn = Urn(target, directory=directory)
+        return('{0}{1}'.format(self.__base, urn.quote()))
+
+    async def __request(self, method, target, headers=None, directory=False):
+        '''
+         Send a bodyless request and return its HTTP status
+        '''
+
+        try:
+            async with self.__http.request(
+                    method,
+                    self.__url(target, directory),
+                    headers=headers) as resp:
+                await resp.read()
+                return(resp.status)
+        except ahttp.NETWORK_ERRORS:
+            raise NotConnection(self.__host)
+
+    async def __propfind(self, target, depth=1):
+        '''
+         Send a PROPFIND request and parse the multistatus body while it
+         is received. Raises WebDavException on failure and
+         NotImplementedError if the server refuses an infinite depth.
+        '''
+
+        parser = listing.multistatus(self.__hrefroot)
+        headers = {
+            'Depth': str(depth),
+            'Content-Type': 'application/xml; charset="utf-8"'}
+        try:
+            async with self.__http.request(
+                    'PROPFIND',
+                    self.__url(target),
+                    headers=headers,
+                    body=listing.PROPFIND_BODY) as resp:
+                async for chunk in resp.chunks():
+                    parser.feed(chunk)
+                code = resp.status
+        except ahttp.NETWORK_ERRORS:
+            raise NotConnection(self.__host)
+
+        if code == 404:
+            raise RemoteResourceNotFound(target)
+        if depth == 'infinity' and code in [400, 403, 501]:
+            raise NotImplementedError(
+                'Depth infinity refused by {0}'.format(self.__host))
+        if code != 207:
+            raise MethodNotSupported(name='propfind', server=self.__host)
+
+        entries = parser.close()
+        if str(depth) == '0':
+            for e in entries:
+                self.__cache.put(e)
         else:
-            try:
-                self.__client.clean(target)
-            except BaseException:
-                errmsg = "Unable to remove remote resource {}.".format(target)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level='error',
-                        msg=errmsg)
-                else:
-                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
-                self.__error = {'code': 1, 'reason': errmsg}
-            else:
-                msg = "Remote resource {} has been removed.".format(target)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        msg=msg)
-                else:
-                    self.sendlog(msg=msg, dst=self.__logtype)
-                self.__error = {'code': 0, 'reason': msg}
+            self.__cache.fill(target, entries, depth)
 
-        return(self.__error)
+        return(entries)
 
-    def duplicate(self, target, twin):
+    async def __stat(self, target):
+        '''
+         Metadata of a remote path, from cache or from a Depth: 0 PROPFIND.
+         Returns None if the path does not exist.
         '''
-         Duplicate a resource on Webdav
 
-         :param target: Webdav source target path
-         :type  target: string
+        found, item = self.__cache.get(target)
+        if found:
+            return(item)
 
-         :param twin: Webdav destination target path
-         :type  twin: string
+        try:
+            entries = await self.__propfind(target, 0)
+        except RemoteResourceNotFound:
+            return(None)
 
-         :returns: It will returns result 'code' and 'reason'
-         :rtype: dict
+        key = cache.normalize(target)
+        for e in entries:
+            if e.path == key:
+                return(e)
+        return(entries[0] if entries else None)
+
+    async def __members(self, target):
+        '''
+         Entries directly below a remote collection
         '''
 
-        if self.__error['code'] == 1:
-            return(self.__error)
+        members = self.__cache.members(target)
+        if members is None:
+            key = cache.normalize(target)
+            entries = await self.__propfind(target, 1)
+            members = [e for e in entries if e.path != key]
+        return(members)
 
-        target = fpath.normpath(target)
+    async def __walk(self, base):
+        '''
+         Every entry below base, with one Depth: infinity PROPFIND or
+         concurrent Depth: 1 PROPFIND per tree level
+        '''
 
-        if not self.__client.check(target):
-            errmsg = "Remote resource {0} not found.".format(target)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    level="warn",
-                    msg=errmsg)
+        if self.__infinity:
+            try:
+                found = await self.__propfind(base, 'infinity')
+            except NotImplementedError:
+                self.__infinity = False
             else:
-                self.sendlog(dst=self.__logtype, level="warn", msg=errmsg)
-            self.__error = {'code': 1, 'reason': errmsg}
-            return(self.__error)
+                return([e for e in found if e.path != base])
+
+        found = []
+        frontier = [base]
+        while frontier:
+            batch = await asyncio.gather(
+                *[self.__propfind(p, 1) for p in frontier])
+            parents = set(frontier)
+            frontier = []
+            for entries in batch:
+                for e in entries:
+                    if e.path in parents:
+                        continue
+                    found.append(e)
+                    if e.is_dir:
+                        frontier.append(e.path)
+        return(found)
 
-        msg = "Copying {} to {}.".format(target, twin)
-        if self.__logtype == 'file':
-            self.sendlog(logfpath=self.__logfile, dst=self.__logtype, msg=msg)
-        else:
-            self.sendlog(dst=self.__logtype, msg=msg)
+    async def __gather(self, jobs):
+        '''
+         Run coroutines concurrently and aggregate their results
+        '''
+
+        results = await asyncio.gather(*jobs)
+        failed = [r for r in results if r['code'] == 1]
+        if failed:
+            return({
+                'code': 1,
+                'reason': '{0} of {1} transfers failed.'.format(
+                    len(failed), len(results)),
+                'results': results})
+        return({
+            'code': 0,
+            'reason': '{0} transfers done.'.format(len(results)),
+            'results': results})
+
+    async def walk(self, path):
+        '''
+         List a Webdav path recursively with as few PROPFIND as possible
+
+         :param path: Webdav path to list
+         :type  path: string
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: list of listing.entry found below path,
+                   entry paths are prefixed with path as given
+         :rtype: list
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
 
+        base = fpath.normpath('/{0}'.format(str(path).lstrip('/')))
         try:
-            self.__client.copy(remote_path_from=target, remote_path_to=twin)
+            entries = await self.__walk(base)
         except WebDavException as exception:
-            if re.match('Remote parent for.* not found', str(exception)):
-                parentdir = fpath.dirname(fpath.abspath(twin))
-                res = self.createdir(parentdir)
-                if res['code'] == 1:
-                    errmsg = "Unable to create remote parent directory {}.".format(
-                        parentdir)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level='error',
-                            msg=errmsg)
-                    else:
-                        self.sendlog(
-                            msg=errmsg, dst=self.__logtype, level='error')
-                    self.__error = {'code': 1, 'reason': errmsg}
-                    return(self.__error)
-                else:
-                    try:
-                        self.__client.copy(
-                            remote_path_from=target, remote_path_to=twin)
-                    except WebDavException as exception:
-                        errmsg = "Unable to duplicate remote resource {} to {}.".format(
-                            target, twin)
-                        if self.__logtype == 'file':
-                            self.sendlog(
-                                logfpath=self.__logfile,
-                                dst=self.__logtype,
-                                level='error',
-                                msg=errmsg)
-                        else:
-                            self.sendlog(
-                                msg=errmsg, dst=self.__logtype, level='error')
-                        self.__error = {'code': 1, 'reason': errmsg}
-                    else:
-                        msg = "Remote resource {} has been copied to remote location {}.".format(
-                            target, twin)
-                        if self.__logtype == 'file':
-                            self.sendlog(
-                                logfpath=self.__logfile, dst=self.__logtype, msg=msg)
-                        else:
-                            self.sendlog(msg=msg, dst=self.__logtype)
-                        self.__error = {'code': 0, 'reason': msg}
-            else:
-                errmsg = "Unable to duplicate remote resource {} to {}.".format(
-                    target, twin)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level='error',
-                        msg=errmsg)
-                else:
-                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
-                self.__error = {'code': 1, 'reason': errmsg}
-        else:
-            msg = "Remote resource {} has been copied to remote location {}.".format(
-                target, twin)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    msg=msg)
-            else:
-                self.sendlog(msg=msg, dst=self.__logtype)
-            self.__error = {'code': 0, 'reason': msg}
+            return(self.__failure(exception))
 
-        return(self.__error)
+        return([e._replace(path=listing.rebase(path, base, e.path))
+                for e in entries])
 
-    def move(self, target, new):
+    async def list(self, target):
         '''
-         Move a resource on Webdav
+         List share content
 
-         :param target: Webdav source target path
+         :param target: Webdav target path
          :type  target: string
 
-         :param new: Webdav destination target path
-         :type  new: string
-
-         :returns: It will returns result 'code' and 'reason'
+         :returns: It will returns result 'code' and 'reason' if it fails
          :rtype: dict
-        '''
 
+         :returns: It will returns list of files found
+         :rtype: list
+        '''
         if self.__error['code'] == 1:
             return(self.__error)
 
-        target = fpath.normpath(target)
+        try:
+            members = await self.__members(target)
+        except WebDavException as exception:
+            return(self.__failure(exception))
 
-        if not self.__client.check(target):
-            errmsg = "Remote resource {0} not found.".format(target)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    level="warn",
-                    msg=errmsg)
+        remotefiles = []
+        for e in members:
+            if e.is_dir:
+                remotefiles.append('{0}/'.format(fpath.basename(e.path)))
             else:
-                self.sendlog(dst=self.__logtype, level="warn", msg=errmsg)
-            self.__error = {'code': 1, 'reason': errmsg}
-            return(self.__error)
+                remotefiles.append(fpath.basename(e.path))
+        return(remotefiles)
 
-        msg = "Moving {} to {}.".format(target, new)
-        if self.__logtype == 'file':
-            self.sendlog(logfpath=self.__logfile, dst=self.__logtype, msg=msg)
-        else:
-            self.sendlog(dst=self.__logtype, msg=msg)
+    async def getinfo(self, target):
+        '''
+         Get infos about file
+
+         :param target: Webdav target path
+         :type  target: string
+
+         :returns: It will returns result 'code' and 'reason' if it fails
+         :rtype: dict
+
+         :returns: dict of remote file informations
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
 
         try:
-            self.__client.move(remote_path_from=target, remote_path_to=new)
+            item = await self.__stat(target)
+            if item is None:
+                raise RemoteResourceNotFound(target)
         except WebDavException as exception:
-            if re.match('Remote parent for.* not found', str(exception)):
-                parentdir = fpath.dirname(fpath.abspath(new))
-                res = self.createdir(parentdir)
-                if res['code'] == 1:
-                    errmsg = "Unable to create remote parent directory {}.".format(
-                        parentdir)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level='error',
-                            msg=errmsg)
-                    else:
-                        self.sendlog(
-                            msg=errmsg, dst=self.__logtype, level='error')
-                    self.__error = {'code': 1, 'reason': errmsg}
-                    return(self.__error)
-                else:
-                    try:
-                        self.__client.move(
-                            remote_path_from=target, remote_path_to=new)
-                    except WebDavException as exception:
-                        errmsg = "Unable to move remote resource {} to {}.".format(
-                            target, new)
-                        if self.__logtype == 'file':
-                            self.sendlog(
-                                logfpath=self.__logfile,
-                                dst=self.__logtype,
-                                level='error',
-                                msg=errmsg)
-                        else:
-                            self.sendlog(
-                                msg=errmsg, dst=self.__logtype, level='error')
-                        self.__error = {'code': 1, 'reason': errmsg}
-                    else:
-                        msg = "Remote resource {} has been moved to remote location {}.".format(
-                            target, new)
-                        if self.__logtype == 'file':
-                            self.sendlog(
-                                logfpath=self.__logfile, dst=self.__logtype, msg=msg)
-                        else:
-                            self.sendlog(msg=msg, dst=self.__logtype)
-                        self.__error = {'code': 0, 'reason': msg}
-            else:
-                errmsg = "Unable to move remote resource {} to {}.".format(
-                    target, new)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level='error',
-                        msg=errmsg)
-                else:
-                    self.sendlog(msg=errmsg, dst=self.__logtype, level='error')
-                self.__error = {'code': 1, 'reason': errmsg}
-        else:
-            msg = "Remote resource {} has been moved to remote location {}.".format(
-                target, new)
-            if self.__logtype == 'file':
-                self.sendlog(
-                    logfpath=self.__logfile,
-                    dst=self.__logtype,
-                    msg=msg)
-            else:
-                self.sendlog(msg=msg, dst=self.__logtype)
-            self.__error = {'code': 0, 'reason': msg}
+            return(self.__failure(exception))
 
-        return(self.__error)
+        return({
+            'created': item.created,
+            'name': fpath.basename(item.path),
+            'size': item.size,
+            'modified': formatdate(item.mtime, usegmt=True) if item.mtime else None,
+            'etag': item.etag
+        })
 
-    def search(self, target, path=False, found=False):
+    async def search(self, target, path=False):
         '''
          Search for file or directory recursively on Webdav
 
@@ -1464,9 +4369,6 @@ class core():
          :type    path: string
          :default path: False
 
-         :param found: internal use only
-         :type  found: boolean
-
          :returns: It will returns result 'code' and 'reason' if it fails
          :rtype: dict
 
@@ -1474,163 +4376,389 @@ class core():
          :rtype: list
         '''
 
-        if not found:
-            found = []
+        remotefiles = await self.walk(str(path) if path else '/')
+        if 'code' in remotefiles:
+            return(remotefiles)
 
-        if path:
-            currdir = str(path)
-        else:
-            currdir = "/"
+        return([e.path for e in remotefiles
+                if target in fpath.basename(e.path)])
 
-        info = "Listing directory {}".format(currdir)
-        if self.__logtype == 'file':
-            self.sendlog(
-                logfpath=self.__logfile,
-                dst=self.__logtype,
-                msg=info)
-        else:
-            self.sendlog(dst=self.__logtype, msg=info)
+    async def download(self, remote, local):
+        '''
+         Downloading file or directory from webdav. Directory members are
+         downloaded concurrently. A cancelled download leaves no partial
+         file behind.
 
-        remotefiles = self.list(currdir)
-        if 'code' in remotefiles:
+         :param remote: Webdav remote file path to get
+         :type  remote: string
+
+         :param local: local filesystem path where to put downloaded datas
+         :type  local: string
+
+         :returns: It will returns result 'code' and 'reason'
+                   (and per file 'results' for a directory)
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
             return(self.__error)
 
-        if len(remotefiles) > 0:
-            for f in remotefiles:
-                if f[-1] == "/":
-                    f = f[:-1]
+        local = fpath.normpath(local)
+        remote = fpath.normpath(remote)
+
+        try:
+            item = await self.__stat(remote)
+        except WebDavException as exception:
+            return(self.__failure(exception))
+        if item is None:
+            return(self.__failure(
+                "Remote file {0} not found.".format(remote)))
+
+        if not item.is_dir:
+            return(await self.__download(remote, local, item))
 
-                if currdir != '/':
-                    currfile = "{0}/{1}".format(currdir, f)
+        self.sendlog('Downloading directory {0}'.format(remote))
+        try:
+            entries = await self.__walk(remote)
+        except WebDavException as exception:
+            return(self.__failure(exception))
+
+        jobs = []
+        try:
+            makedirs(local, 0o750, exist_ok=True)
+            for e in entries:
+                lpath = fpath.normpath("{0}/{1}".format(
+                    local, fpath.relpath(e.path, remote)))
+                if e.is_dir:
+                    makedirs(lpath, 0o750, exist_ok=True)
                 else:
-                    currfile = "/{0}".format(f)
+                    jobs.append(self.__download(e.path, lpath, e))
+        except OSError as exception:
+            for job in jobs:
+                job.close()
+            return(self.__failure(
+                "Unable to create local directory: {0}".format(exception),
+                level='error'))
 
-                if target in f or target == f:
-                    found.append("{0}/{1}".format(currdir, f))
-                if self.__client.is_dir(currfile):
-                    found = self.search(target, currfile, found)
+        return(await self.__gather(jobs))
 
-            uniqueList = []
-            for i in found:
-                if i not in uniqueList:
-                    i = fpath.normpath(i)
-                    uniqueList.append(i)
-            found = uniqueList
+    async def __download(self, remote, local, item):
+        '''
+         GET one remote file through a resumable .part file, see core.__get.
+         A cancelled download removes its partial data.
+        '''
 
-        return(found)
+        if item.size is not None and fpath.isfile(local) and \
+                fstat(local).st_size == item.size:
+            return(self.__success(
+                "File {0} already exists on local filesystem, skipping download.".format(
+                    local)))
+
+        self.sendlog('Downloading file {0}'.format(remote))
+        state = resume.checkpoint(local)
+        validator = resume.validator(item.etag, item.mtime)
+        loop = asyncio.get_event_loop()
+        try:
+            makedirs(fpath.dirname(fpath.abspath(local)), 0o750, exist_ok=True)
+            offset = state.load(validator, item.size)
+            headers = {}
+            if offset:
+                headers['Range'] = 'bytes={0}-'.format(offset)
+                headers['If-Range'] = validator
+                self.sendlog("Resuming download of {0} from byte {1}".format(
+                    remote, offset))
+
+            with open(state.part, 'ab' if offset else 'wb') as lfile:
+                output = resume.writer(
+                    lfile, state, validator, item.size, offset)
+                try:
+                    async with self.__http.request(
+                            'GET', self.__url(remote), headers=headers) as resp:
+                        code = output.status = resp.status
+                        async for chunk in resp.chunks():
+                            await loop.run_in_executor(
+                                None, output.write, chunk)
+                except ahttp.NETWORK_ERRORS:
+                    output.save()
+                    raise NotConnection(self.__host)
+                output.save()
+
+            if code == 404:
+                state.discard()
+                raise RemoteResourceNotFound(remote)
+            if code == 416:
+                state.discard()
+            if code >= 300:
+                raise WebDavException(
+                    'Unable to download {0}: HTTP error {1}'.format(remote, code))
+            if item.size is not None and output.offset != item.size:
+                raise WebDavException(
+                    'Download of {0} stopped at byte {1}, it will resume from there.'.format(
+                        remote, output.offset))
+            state.finish()
+        except (WebDavException, OSError) as exception:
+            return(self.__failure(exception, level='error'))
+        except BaseException:
+            # cancelled: do not leave a partial file behind
+            state.discard()
+            raise
+
+        return(self.__success(
+            'File {0} downloaded correctly'.format(remote)))
 
-    def list_recurse(self, path, found=False):
+    async def upload(self, local, remote):
         '''
-         List Webdav path recursively
+         Uploading file or directory to Webdav. Directory files are
+         uploaded concurrently once the remote tree is created.
 
-         :param path: Webdav path to list files
-         :type  path: string
+         :param local: local resource's filesystem path to upload
+         :type  local: string
 
-         :param found: internal use only
-         :type  found: boolean
+         :param remote: Webdav remote directory where to put the resource
+         :type  remote: string
 
-         :returns: It will returns result 'code' and 'reason' if it fails
+         :returns: It will returns result 'code' and 'reason'
+                   (and per file 'results' for a directory)
          :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
 
-         :returns: list of file paths which contains target
-         :rtype: list
+        if not fpath.exists(local):
+            return(self.__failure(
+                'Unable to find locale file {lfile}. Aborting upload..'.format(
+                    lfile=local),
+                level='error'))
+
+        rfiledst = cache.normalize("{}/{}".format(
+            remote, fpath.basename(fpath.normpath(local))))
+
+        if not fpath.isdir(local):
+            try:
+                item = await self.__stat(rfiledst)
+            except WebDavException as exception:
+                return(self.__failure(exception))
+            return(await self.__upload(local, rfiledst, item))
+
+        self.sendlog('Uploading {} to {}'.format(local, rfiledst))
+        files = []
+        for dirpath, dirnames, filenames in walk(local):
+            dirnames.sort()
+            rdir = fpath.normpath("{}/{}".format(
+                rfiledst, fpath.relpath(dirpath, local)))
+            res = await self.createdir(rdir)
+            if res['code'] == 1:
+                return(res)
+            for file_ in sorted(filenames):
+                files.append((
+                    fpath.join(dirpath, file_), "{}/{}".format(rdir, file_)))
+
+        try:
+            # one listing fills the cache, and every file is checked against
+            # it before the first PUT invalidates it
+            await self.__walk(rfiledst)
+            items = [await self.__stat(r) for l, r in files]
+        except WebDavException as exception:
+            return(self.__failure(exception))
+
+        return(await self.__gather([
+            self.__upload(l, r, i) for (l, r), i in zip(files, items)]))
+
+    async def __put(self, local, remote):
+        '''
+         PUT a local file onto a remote path and return the HTTP status
+        '''
+
+        self.__cache.invalidate(remote)
+        with open(local, 'rb') as lfile:
+            try:
+                async with self.__http.request(
+                        'PUT', self.__url(remote), body=lfile) as resp:
+                    await resp.read()
+                    return(resp.status)
+            except ahttp.NETWORK_ERRORS:
+                raise NotConnection(self.__host)
+
+    async def __upload(self, local, remote, item):
+        '''
+         PUT one local file, creating missing remote parents. item is the
+         remote entry found at remote, or None.
         '''
 
-        if not found:
-            found = []
+        try:
+            if item is not None and not item.is_dir and \
+                    item.size == fstat(local).st_size:
+                return(self.__success(
+                    "File {0} already exists on remote, skipping upload.".format(
+                        remote)))
+
+            self.sendlog('Uploading {} to {}'.format(local, remote))
+            code = await self.__put(local, remote)
+            if code == 409:
+                res = await self.createdir(fpath.dirname(remote))
+                if res['code'] == 1:
+                    return(res)
+                code = await self.__put(local, remote)
+            if code == 409:
+                raise RemoteParentNotFound(remote)
+            if code == 507:
+                raise NotEnoughSpace()
+            if code >= 300:
+                raise WebDavException(
+                    'Unable to upload {0}: HTTP error {1}'.format(remote, code))
+        except (WebDavException, OSError) as exception:
+            return(self.__failure(exception, level='error'))
+
+        return(self.__success(
+            'File {0} uploaded correctly to {1}'.format(local, remote)))
+
+    async def createdir(self, target):
+        '''
+         Create directory on Webdav, and its missing parents
 
-        currdir = str(path)
+         :param target: Webdav target path
+         :type  target: string
 
-        remotefiles = self.list(currdir)
-        if 'code' in remotefiles:
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
             return(self.__error)
 
-        if len(remotefiles) > 0:
-            for f in remotefiles:
-                if f[-1] == "/":
-                    f = f[:-1]
+        target = fpath.normpath(target)
+        try:
+            item = await self.__stat(target)
+            if item is not None and item.is_dir:
+                return({'code': 0, 'reason': "Directory {} exists.".format(
+                    target)})
+
+            self.__cache.invalidate(target)
+            code = await self.__request('MKCOL', target, directory=True)
+            if code == 409 and target != fpath.dirname(target):
+                res = await self.createdir(fpath.dirname(target))
+                if res['code'] == 1:
+                    return(res)
+                code = await self.__request('MKCOL', target, directory=True)
+        except WebDavException as exception:
+            return(self.__failure(exception, level='error'))
 
-                if currdir != '/':
-                    currfile = "{0}/{1}".format(currdir, f)
-                else:
-                    currfile = "/{0}".format(f)
+        # 405: created meanwhile by a concurrent task
+        if code >= 300 and code != 405:
+            return(self.__failure(
+                "Unable to create remote directory {}.".format(target),
+                level='error'))
 
-                if self.__client.is_dir(currfile):
-                    found = self.list_recurse(currfile, found)
+        return(self.__success("Directory {} created.".format(target)))
 
-                found.append("{0}/{1}".format(currdir, f))
+    async def delete(self, target):
+        '''
+         Delete resource on Webdav
 
-            uniqueList = []
-            for i in found:
-                if i not in uniqueList:
-                    i = fpath.normpath(i)
-                    uniqueList.append(i)
-            found = uniqueList
+         :param target: Webdav target path
+         :type  target: string
 
-        return(found)
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+        if self.__error['code'] == 1:
+            return(self.__error)
 
-    def list_files_ldir(self, directory_path, pattern="*"):
+        target = fpath.normpath(target)
+        self.sendlog("Removing {}.".format(target))
+        try:
+            item = await self.__stat(target)
+            if item is None:
+                return(self.__failure(
+                    "Remote resource {0} not found.".format(target)))
+            self.__cache.invalidate(target)
+            code = await self.__request(
+                'DELETE', target, directory=item.is_dir)
+        except WebDavException as exception:
+            return(self.__failure(exception, level='error'))
+
+        if code >= 300 and code != 404:
+            return(self.__failure(
+                "Unable to remove remote resource {}.".format(target),
+                level='error'))
+
+        return(self.__success(
+            "Remote resource {} has been removed.".format(target)))
+
+    async def __relocate(self, method, target, dest):
+        '''
+         COPY or MOVE a resource, creating missing destination parents
         '''
-         Pattern can be used to look for specific files like .mp3 etc.
 
-         :param directory_path: local filesystem directory path
-         :type  directory_path: string
+        if self.__error['code'] == 1:
+            return(self.__error)
 
-         :param pattern: pattern filter to use for the search
-         :type  pattern: string
+        target = fpath.normpath(target)
+        verb = 'move' if method == 'MOVE' else 'duplicate'
+        try:
+            item = await self.__stat(target)
+            if item is None:
+                return(self.__failure(
+                    "Remote resource {0} not found.".format(target)))
+
+            if method == 'MOVE':
+                self.sendlog("Moving {} to {}.".format(target, dest))
+                self.__cache.invalidate(target)
+            else:
+                self.sendlog("Copying {} to {}.".format(target, dest))
+            self.__cache.invalidate(dest)
+
+            headers = {'Destination': self.__url(dest, item.is_dir)}
+            code = await self.__request(
+                method, target, headers=headers, directory=item.is_dir)
+            if code == 409:
+                res = await self.createdir(fpath.dirname(fpath.normpath(dest)))
+                if res['code'] == 1:
+                    return(res)
+                code = await self.__request(
+                    method, target, headers=headers, directory=item.is_dir)
+        except WebDavException as exception:
+            return(self.__failure(exception, level='error'))
 
-         :returns: list of absolute file paths found
-         :rtype: list
+        if code >= 300:
+            return(self.__failure(
+                "Unable to {} remote resource {} to {}.".format(
+                    verb, target, dest),
+                level='error'))
+
+        return(self.__success(
+            "Remote resource {} has been {} to remote location {}.".format(
+                target, 'moved' if method == 'MOVE' else 'copied', dest)))
+
+    async def duplicate(self, target, twin):
         '''
+         Duplicate a resource on Webdav
 
-        files = []
-        for dirpath, dirnames, filenames in walk(directory_path):
-            for file_name in fnfilter(filenames, pattern):
-                filepath = yield fpath.join(dirpath, file_name)
-                files.append(filepath)
-        return(files)
+         :param target: Webdav source target path
+         :type  target: string
 
-    def make_local_dirs(self, directory):
+         :param twin: Webdav destination target path
+         :type  twin: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
         '''
-         Creates local filsystem directories recursively
 
-         :param directory: local filesystem directory path
-         :type  directory: string
+        return(await self.__relocate('COPY', target, twin))
+
+    async def move(self, target, new):
+        '''
+         Move a resource on Webdav
+
+         :param target: Webdav source target path
+         :type  target: string
+
+         :param new: Webdav destination target path
+         :type  new: string
 
          :returns: It will returns result 'code' and 'reason'
          :rtype: dict
         '''
-        if not fpath.exists(directory):
-            try:
-                makedirs(directory, 0o750)
-            except PermissionError as e:
-                errmsg = "Unable to create local directory {0}: {1}".format(
-                    directory, e.strerror)
-                if self.__logtype == 'file':
-                    self.sendlog(
-                        logfpath=self.__logfile,
-                        dst=self.__logtype,
-                        level="error",
-                        msg=errmsg)
-                else:
-                    self.sendlog(dst=self.__logtype, level="error", msg=errmsg)
-                self.__error = {'code': 1, 'reason': errmsg}
-                return(self.__error)
-            except OSError as exception:
-                if exception.errno != exception.errno.EEXIST:
-                    errmsg = "Unable to create local directory {0}: {1}".format(
-                        directory, exception)
-                    if self.__logtype == 'file':
-                        self.sendlog(
-                            logfpath=self.__logfile,
-                            dst=self.__logtype,
-                            level="error",
-                            msg=errmsg)
-                    else:
-                        self.sendlog(
-                            dst=self.__logtype, level="error", msg=errmsg)
-                    self.__error = {'code': 1, 'reason': errmsg}
-                    return(self.__error)
+
+        return(await self.__relocate('MOVE', target, new))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import json
+import socket
+import signal
+import hashlib
+import traceback
+from os import path as fpath
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav session daemon: a long lived process holding a connected client
+    behind a Unix domain socket, running the commands forwarded to it with
+    the standard streams of the caller
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# largest request or answer line
+MAXLINE = 1048576
+
+
+class stopped(BaseException):
+    '''
+     Raised by SIGINT and SIGTERM in a daemon, past the commands handling
+     of SystemExit
+    '''
+
+
+def _stop(signum, frame):
+    raise stopped(signum)
+
+
+def socket_path(configpath):
+    '''
+     Socket of the daemon serving a config file, in the user runtime
+     directory (or a private directory of /tmp)
+
+     :param configpath: config.ini file path
+     :type  configpath: string
+
+     :returns: Unix domain socket path
+     :rtype: string
+    '''
+
+    configpath = fpath.abspath(fpath.realpath(fpath.expanduser(configpath)))
+    key = hashlib.sha1(configpath.encode('utf-8')).hexdigest()[:16]
+    rundir = os.environ.get('XDG_RUNTIME_DIR')
+    if not rundir or not fpath.isdir(rundir):
+        rundir = fpath.join('/tmp', 'pydav-{0}'.format(os.getuid()))
+    return(fpath.join(rundir, 'pydav-{0}.sock'.format(key)))
+
+
+def _private(directory):
+    '''
+     Create directory readable by its owner only, refuse someone else one
+    '''
+
+    os.makedirs(directory, 0o700, exist_ok=True)
+    if os.stat(directory).st_uid != os.getuid():
+        raise OSError('{0} belongs to another user'.format(directory))
+
+
+def _send(conn, message, fds=None):
+    data = json.dumps(message).encode('utf-8') + b'\n'
+    if fds:
+        socket.send_fds(conn, [data], fds)
+    else:
+        conn.sendall(data)
+
+
+def _receive(conn, maxfds=0):
+    '''
+     One JSON line and the descriptors sent along with its first bytes
+    '''
+
+    data = b''
+    fds = []
+    while not data.endswith(b'\n'):
+        if maxfds and not fds:
+            chunk, fds, flags, addr = socket.recv_fds(conn, MAXLINE, maxfds)
+        else:
+            chunk = conn.recv(MAXLINE)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAXLINE:
+            raise ValueError('Request too long')
+    if not data:
+        for fd in fds:
+            os.close(fd)
+        return(None, [])
+    return(json.loads(data.decode('utf-8')), fds)
+
+
+def forward(configpath, arguments, timeout=1.0):
+    '''
+     Run a command on the daemon serving configpath, if any. The daemon
+     gets the standard streams and working directory of this process.
+
+     :param configpath: config.ini file path
+     :type  configpath: string
+
+     :param arguments: command line arguments, without the program name
+     :type  arguments: list
+
+     :param   timeout: seconds to wait for the daemon to accept
+     :type    timeout: float
+     :default timeout: 1.0
+
+     :returns: command exit code, None when no daemon could run it
+     :rtype: int
+    '''
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(timeout)
+        conn.connect(socket_path(configpath))
+        conn.settimeout(None)
+        for stream in [sys.stdout, sys.stderr]:
+            stream.flush()
+        _send(conn, {'argv': list(arguments), 'cwd': os.getcwd()},
+              [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()])
+        answer, fds = _receive(conn)
+    except (OSError, ValueError):
+        return(None)
+    finally:
+        conn.close()
+
+    if answer is None or 'code' not in answer:
+        return(None)
+    return(int(answer['code']))
+
+
+def stop(configpath):
+    '''
+     Ask the daemon serving configpath to exit
+
+     :param configpath: config.ini file path
+     :type  configpath: string
+
+     :returns: It will returns result 'code' and 'reason'
+     :rtype: dict
+    '''
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.settimeout(5.0)
+        conn.connect(socket_path(configpath))
+        _send(conn, {'stop': True})
+        _receive(conn)
+    except (OSError, ValueError) as exception:
+        return({'code': 1, 'reason': 'No PyDav daemon for {0}: {1}'.format(
+            configpath, exception)})
+    finally:
+        conn.close()
+    return({'code': 0, 'reason': 'PyDav daemon for {0} stopped.'.format(
+        configpath)})
+
+
+class attached():
+    '''
+     Context running with the standard streams and working directory of
+     a caller: its descriptors replace 0, 1 and 2 until exit, so logs and
+     progress lines reach its terminal too.
+
+     :param fds: caller stdin, stdout and stderr descriptors
+     :type  fds: list
+
+     :param cwd: caller working directory
+     :type  cwd: string
+    '''
+
+    def __init__(self, fds, cwd):
+        self.__fds = fds
+        self.__cwd = cwd
+        self.__saved = []
+        self.__where = None
+
+    def __enter__(self):
+        self.__flush()
+        self.__where = os.getcwd()
+        self.__saved = [os.dup(fd) for fd in range(3)]
+        for fd, caller in enumerate(self.__fds[:3]):
+            os.dup2(caller, fd)
+        # a fresh stdin object, the previous one may hold buffered data
+        sys.stdin = open(0, 'r', closefd=False)
+        if self.__cwd:
+            os.chdir(self.__cwd)
+        return(self)
+
+    def __exit__(self, exc_type, exc, tb):
+        self.__flush()
+        os.chdir(self.__where)
+        for fd, saved in enumerate(self.__saved):
+            os.dup2(saved, fd)
+            os.close(saved)
+        sys.stdin = open(0, 'r', closefd=False)
+        return(False)
+
+    def __flush(self):
+        for stream in [sys.stdout, sys.stderr]:
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+
+
+def serve(configpath, execute, notify=None):
+    '''
+     Run forwarded commands one at a time until stopped, killed or the
+     config file changes. A command is run as execute(arguments) with
+     the caller standard streams and working directory.
+
+     :param configpath: config.ini file path
+     :type  configpath: string
+
+     :param execute: runs a command and returns its exit code
+     :type  execute: callable
+
+     :param   notify: called with a message when serving starts and ends
+     :type    notify: callable
+     :default notify: None
+
+     :returns: It will returns result 'code' and 'reason'
+     :rtype: dict
+    '''
+
+    path = socket_path(configpath)
+    try:
+        _private(fpath.dirname(path))
+    except OSError as exception:
+        return({'code': 1, 'reason': str(exception)})
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        # nobody answers, a socket left by a killed daemon is removed
+        if fpath.exists(path):
+            os.remove(path)
+    else:
+        return({'code': 1, 'reason': 'A PyDav daemon already serves {0}'.format(
+            configpath)})
+    finally:
+        probe.close()
+
+    try:
+        configured = os.stat(configpath).st_mtime
+    except OSError as exception:
+        return({'code': 1, 'reason': str(exception)})
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen(16)
+    for signum in [signal.SIGINT, signal.SIGTERM]:
+        signal.signal(signum, _stop)
+    if notify is not None:
+        notify('PyDav daemon listening on {0}'.format(path))
+
+    reason = 'PyDav daemon stopped.'
+    try:
+        while True:
+            conn, addr = listener.accept()
+            fds = []
+            try:
+                request, fds = _receive(conn, maxfds=3)
+                if request is None:
+                    continue
+                if request.get('stop'):
+                    _send(conn, {'stopped': True})
+                    break
+                try:
+                    changed = os.stat(configpath).st_mtime != configured
+                except OSError:
+                    changed = True
+                if changed:
+                    # the caller runs the command itself with the new file
+                    _send(conn, {'stale': True})
+                    reason = 'Config file {0} changed, PyDav daemon stopped.'.format(
+                        configpath)
+                    break
+                if len(fds) != 3:
+                    _send(conn, {'error': 'standard streams missing'})
+                    continue
+                failure = None
+                with attached(fds, request.get('cwd')):
+                    try:
+                        code = execute(list(request.get('argv', [])))
+                    except SystemExit as exception:
+                        code = exception.code
+                    except Exception as exception:
+                        # a failing command must not take the daemon down,
+                        # its caller gets the traceback
+                        traceback.print_exc()
+                        failure = exception
+                        code = 1
+                if failure is not None and notify is not None:
+                    notify('Command {0} failed: {1!r}'.format(
+                        request.get('argv', []), failure))
+                if not isinstance(code, int):
+                    code = 0 if code is None else 1
+                _send(conn, {'code': code})
+            except (OSError, ValueError):
+                # the caller went away
+                pass
+            except Exception as exception:
+                if notify is not None:
+                    notify('Request failed: {0!r}'.format(exception))
+                try:
+                    _send(conn, {'code': 1})
+                except (OSError, ValueError):
+                    pass
+            finally:
+                for fd in fds:
+                    os.close(fd)
+                conn.close()
+    except stopped:
+        pass
+    finally:
+        listener.close()
+        if fpath.exists(path):
+            os.remove(path)
+        if notify is not None:
+            notify(reason)
+
+    return({'code': 0, 'reason': reason})
+
+
+if __name__ == "__main__":
+    pass
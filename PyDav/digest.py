@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import mmap
+import hashlib
+import threading
+from os import path as fpath
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from PyDav import lazy
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav file digests, cached in a local index, and server checksums
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# the index is opened by the first digest asked
+sqlite3 = lazy.module('sqlite3')
+
+# checksums understood, best first
+ALGORITHMS = ['sha1', 'md5']
+
+# per directory file of 'digest  name' lines (sha1sum format)
+SIDECAR = '.pydav-hashes'
+
+# bytes hashed per mmap slice
+BLOCKSIZE = 16777216
+
+
+def default_index():
+    '''
+     Default digest index location, in the user cache directory
+
+     :returns: SQLite database file path
+     :rtype: string
+    '''
+
+    cachedir = os.environ.get('XDG_CACHE_HOME') or fpath.expanduser('~/.cache')
+    return(fpath.join(cachedir, 'pydav', 'hashes.db'))
+
+
+def filedigest(local, algorithm='sha1'):
+    '''
+     Hex digest of a local file content, read through mmap
+
+     :param local: local filesystem file path
+     :type  local: string
+
+     :param   algorithm: hashlib algorithm name
+     :type    algorithm: string
+     :default algorithm: 'sha1'
+
+     :returns: hex digest
+     :rtype: string
+    '''
+
+    h = hashlib.new(algorithm)
+    with open(local, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return(h.hexdigest())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            view = memoryview(m)
+            try:
+                for start in range(0, size, BLOCKSIZE):
+                    h.update(view[start:start + BLOCKSIZE])
+            finally:
+                view.release()
+    return(h.hexdigest())
+
+
+def parse_checksums(value):
+    '''
+     Read an OC-Checksum header or oc:checksums property value
+
+     :param value: space separated ALGO:hexdigest items
+     :type  value: string
+
+     :returns: hex digests keyed on lowercase algorithm name
+     :rtype: dict
+    '''
+
+    found = {}
+    for item in (value or '').split():
+        algorithm, sep, hexdigest = item.partition(':')
+        if sep and hexdigest:
+            found[algorithm.lower()] = hexdigest.lower()
+    return(found)
+
+
+def etag_md5(etag):
+    '''
+     Etag value if it looks like the MD5 of the content, as some servers
+     and object stores use
+
+     :param etag: getetag value
+     :type  etag: string
+
+     :returns: 32 hex digits or None
+     :rtype: string
+    '''
+
+    value = (etag or '').strip()
+    if value.startswith('W/'):
+        return(None)
+    value = value.strip('"').lower()
+    if len(value) == 32 and all(c in '0123456789abcdef' for c in value):
+        return(value)
+    return(None)
+
+
+def parse_sidecar(data):
+    '''
+     Read a .pydav-hashes file
+
+     :param data: file content
+     :type  data: bytes
+
+     :returns: sha1 hex digests keyed on file name
+     :rtype: dict
+    '''
+
+    found = {}
+    for line in data.decode('utf-8', 'replace').splitlines():
+        hexdigest, sep, name = line.partition('  ')
+        if sep and name:
+            found[name] = hexdigest.lower()
+    return(found)
+
+
+def format_sidecar(digests):
+    '''
+     Build a .pydav-hashes file
+
+     :param digests: sha1 hex digests keyed on file name
+     :type  digests: dict
+
+     :returns: file content
+     :rtype: bytes
+    '''
+
+    return(''.join('{0}  {1}\n'.format(digests[n], n)
+                   for n in sorted(digests)).encode('utf-8'))
+
+
+class index():
+    '''
+     Local file digests cache. A digest is reused as long as the file
+     device, inode, size and modification time are unchanged, so only new
+     or modified files are read. Missing digests are computed concurrently.
+
+     :param   dbpath: SQLite database file path
+     :type    dbpath: string
+     :default dbpath: default_index()
+
+     :param   jobs: files hashed concurrently
+     :type    jobs: int
+     :default jobs: 4
+
+     :returns: index object
+     :rtype: obj
+    '''
+
+    def __init__(self, dbpath=None, jobs=4):
+        self.__dbpath = dbpath or default_index()
+        self.__jobs = max(1, int(jobs))
+        self.__lock = threading.Lock()
+        self.__db = None
+
+    def __open(self):
+        if self.__db is None:
+            directory = fpath.dirname(self.__dbpath)
+            if directory and not fpath.isdir(directory):
+                os.makedirs(directory, 0o700, exist_ok=True)
+            self.__db = sqlite3.connect(
+                self.__dbpath, timeout=30, check_same_thread=False)
+            self.__db.execute(
+                'CREATE TABLE IF NOT EXISTS digests ('
+                'dev INTEGER, inode INTEGER, size INTEGER, mtime INTEGER, '
+                'algorithm TEXT, digest TEXT, '
+                'PRIMARY KEY (dev, inode, algorithm))')
+        return(self.__db)
+
+    def __key(self, st, algorithm):
+        return((st.st_dev, st.st_ino, algorithm))
+
+    def __lookup(self, st, algorithm):
+        with self.__lock:
+            row = self.__open().execute(
+                'SELECT size, mtime, digest FROM digests '
+                'WHERE dev = ? AND inode = ? AND algorithm = ?',
+                self.__key(st, algorithm)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return(row[2])
+        return(None)
+
+    def __store(self, items):
+        with self.__lock:
+            db = self.__open()
+            with db:
+                db.executemany(
+                    'INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)',
+                    [(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns,
+                      algorithm, digest) for st, algorithm, digest in items])
+
+    def digest(self, local, algorithm='sha1'):
+        '''
+         Digest of one local file
+
+         :param local: local filesystem file path
+         :type  local: string
+
+         :param   algorithm: hashlib algorithm name
+         :type    algorithm: string
+         :default algorithm: 'sha1'
+
+         :returns: hex digest
+         :rtype: string
+        '''
+
+        return(self.digests([local], algorithm)[local])
+
+    def digests(self, paths, algorithm='sha1'):
+        '''
+         Digests of many local files, unknown ones hashed in a thread pool
+
+         :param paths: local filesystem file paths
+         :type  paths: list
+
+         :param   algorithm: hashlib algorithm name
+         :type    algorithm: string
+         :default algorithm: 'sha1'
+
+         :returns: hex digest keyed on path, None for unreadable files
+         :rtype: dict
+        '''
+
+        found = {}
+        missing = []
+        for local in paths:
+            try:
+                st = os.stat(local)
+            except OSError:
+                found[local] = None
+                continue
+            digest = self.__lookup(st, algorithm)
+            if digest is None:
+                missing.append((local, st))
+            else:
+                found[local] = digest
+
+        def compute(item):
+            try:
+                return(filedigest(item[0], algorithm))
+            except (OSError, ValueError):
+                return(None)
+
+        if missing:
+            if len(missing) == 1:
+                digests = [compute(missing[0])]
+            else:
+                with ThreadPoolExecutor(
+                        max_workers=min(self.__jobs, len(missing))) as executor:
+                    digests = list(executor.map(compute, missing))
+            store = []
+            for (local, st), digest in zip(missing, digests):
+                found[local] = digest
+                if digest is not None:
+                    store.append((st, algorithm, digest))
+            self.__store(store)
+
+        return(found)
+
+    def close(self):
+        with self.__lock:
+            if self.__db is not None:
+                self.__db.close()
+                self.__db = None
+
+
+if __name__ == "__main__":
+    pass
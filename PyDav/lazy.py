@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import sys
+import importlib
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav lazy imports: modules loaded on their first use, so commands
+    which never reach the network do not pay for pycurl, webdavclient,
+    lxml, asyncio or sqlite3
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class module():
+    '''
+     Stand-in of a module, imported on the first lookup of one of its
+     attributes. Already imported modules are used as is.
+
+     :param name: absolute module name, such as 'PyDav.client'
+     :type  name: string
+
+     :returns: module proxy object
+     :rtype: obj
+    '''
+
+    def __init__(self, name):
+        self.__name = name
+        self.__module = sys.modules.get(name)
+
+    def __load(self):
+        if self.__module is None:
+            # the import system locks, concurrent first uses get one module
+            self.__module = importlib.import_module(self.__name)
+        return(self.__module)
+
+    def __getattr__(self, attribute):
+        found = self.__module
+        if found is None:
+            found = self.__load()
+        return(getattr(found, attribute))
+
+    def __dir__(self):
+        return(dir(self.__load()))
+
+    def __repr__(self):
+        state = 'loaded' if self.__module is not None else 'not loaded'
+        return("<lazy module '{0}' ({1})>".format(self.__name, state))
+
+
+if __name__ == "__main__":
+    pass
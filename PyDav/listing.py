@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+from os import path as fpath
+from fnmatch import fnmatchcase
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import XMLPullParser, ParseError, fromstring
+from xml.sax.saxutils import escape
+try:
+    from urllib.parse import unquote, urlsplit
+except ImportError:
+    from urllib import unquote
+    from urlparse import urlsplit
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav listing engine which parses WebDAV multistatus responses
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# One remote resource as described by a PROPFIND response.
+# path is absolute from the Webdav root, size/mtime/etag may be None,
+# checksum is the ownCloud/Nextcloud 'ALGO:hexdigest ...' value if any,
+# created is the creationdate string as sent by the server.
+entry = namedtuple(
+    'entry', ['path', 'is_dir', 'size', 'mtime', 'etag', 'checksum',
+              'created'],
+    defaults=(None, None))
+
+PROPFIND_BODY = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<d:propfind xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns"><d:prop>'
+    b'<d:resourcetype/><d:getcontentlength/>'
+    b'<d:getlastmodified/><d:getetag/><d:creationdate/><oc:checksums/>'
+    b'</d:prop></d:propfind>')
+
+# RFC 5323 basicsearch, resources below {scope} whose name is like {name}
+SEARCH_BODY = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<d:searchrequest xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+    '<d:basicsearch><d:select><d:prop>'
+    '<d:resourcetype/><d:getcontentlength/>'
+    '<d:getlastmodified/><d:getetag/><d:creationdate/>'
+    '<oc:checksums/>'
+    '</d:prop></d:select>'
+    '<d:from><d:scope><d:href>{scope}</d:href>'
+    '<d:depth>infinity</d:depth></d:scope></d:from>'
+    '<d:where><d:like><d:prop><d:displayname/></d:prop>'
+    '<d:literal>%{name}%</d:literal></d:like></d:where>'
+    '</d:basicsearch></d:searchrequest>')
+
+# RFC 6578 changes below a collection since {token}, empty at first
+SYNC_BODY = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<d:sync-collection xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+    '<d:sync-token>{token}</d:sync-token>'
+    '<d:sync-level>infinite</d:sync-level><d:prop>'
+    '<d:resourcetype/><d:getcontentlength/>'
+    '<d:getlastmodified/><d:getetag/><d:creationdate/>'
+    '<oc:checksums/>'
+    '</d:prop></d:sync-collection>')
+
+# REPORT methods a resource answers (RFC 3253)
+REPORTS_BODY = (
+    b'<?xml version="1.0" encoding="utf-8"?>'
+    b'<d:propfind xmlns:d="DAV:"><d:prop>'
+    b'<d:supported-report-set/>'
+    b'</d:prop></d:propfind>')
+
+SYNC_REPORT = '{DAV:}sync-collection'
+
+_DAV = '{DAV:}'
+_OC = '{http://owncloud.org/ns}'
+
+
+def href_root(url):
+    '''
+     Compute the path prefix that servers put in front of every href
+
+     :param url: Webdav hostname followed by the Webdav root
+     :type  url: string
+
+     :returns: unquoted path prefix without trailing slash
+     :rtype: string
+    '''
+
+    return(unquote(urlsplit(url).path).rstrip('/'))
+
+
+def rebase(path, base, target):
+    '''
+     Path of a resource found below base, prefixed with path as given
+
+     :param path: path the caller asked for, relative or absolute
+     :type  path: string
+
+     :param base: absolute normalized form of path
+     :type  base: string
+
+     :param target: absolute path of the resource, below base
+     :type  target: string
+
+     :returns: normalized path, without the leading '//' POSIX keeps
+     :rtype: string
+    '''
+
+    joined = fpath.normpath('{0}/{1}'.format(
+        path, fpath.relpath(target, base)))
+    if joined.startswith('//'):
+        joined = '/{0}'.format(joined.lstrip('/'))
+    return(joined)
+
+
+def parse_date(value):
+    '''
+     Convert a getlastmodified value to a POSIX timestamp
+
+     :param value: RFC 1123 date string
+     :type  value: string
+
+     :returns: timestamp or None if the date cannot be parsed
+     :rtype: float
+    '''
+
+    if not value:
+        return(None)
+    try:
+        return(parsedate_to_datetime(value).timestamp())
+    except (TypeError, ValueError, IndexError):
+        return(None)
+
+
+def search_body(scope, word):
+    '''
+     Body of a SEARCH request for resources whose name contains word.
+     '%' and '_' are left as wildcards: they match themselves too, so
+     the answer is a superset to filter like a listing.
+
+     :param scope: quoted href of the collection to search
+     :type  scope: string
+
+     :param word: word to look for, without backslash
+     :type  word: string
+
+     :returns: XML body
+     :rtype: bytes
+    '''
+
+    return(SEARCH_BODY.format(
+        scope=escape(scope), name=escape(word)).encode('utf-8'))
+
+
+def sync_body(token=None):
+    '''
+     Body of a sync-collection REPORT request
+
+     :param   token: sync-token of a previous answer
+     :type    token: string
+     :default token: None (every resource below the collection)
+
+     :returns: XML body
+     :rtype: bytes
+    '''
+
+    return(SYNC_BODY.format(token=escape(token or '')).encode('utf-8'))
+
+
+def reports(data):
+    '''
+     REPORT methods listed by a multistatus answer to REPORTS_BODY
+
+     :param data: response body
+     :type  data: bytes
+
+     :returns: '{namespace}name' of every report, None if the answer
+               does not tell
+     :rtype: set
+    '''
+
+    try:
+        root = fromstring(data)
+    except ParseError:
+        return(None)
+
+    found = None
+    for propstat in root.iter(_DAV + 'propstat'):
+        status = propstat.findtext(_DAV + 'status') or ''
+        if status and ' 200 ' not in '{0} '.format(status):
+            continue
+        for supported in propstat.iter(_DAV + 'supported-report-set'):
+            found = found or set()
+            for report in supported.iter(_DAV + 'report'):
+                found.update(child.tag for child in report)
+    return(found)
+
+
+def has_magic(pattern):
+    '''
+     Tell if a path contains glob wildcards
+
+     :param pattern: path or glob pattern
+     :type  pattern: string
+
+     :rtype: boolean
+    '''
+
+    return(any(c in pattern for c in '*?['))
+
+
+def glob_match(parts, patterns):
+    '''
+     Match path segments against glob segments, '**' matching any
+     number of segments and other wildcards staying within one segment
+
+     :param parts: path segments
+     :type  parts: list
+
+     :param patterns: glob segments
+     :type  patterns: list
+
+     :rtype: boolean
+    '''
+
+    if not patterns:
+        return(not parts)
+    if patterns[0] == '**':
+        return(any(glob_match(parts[i:], patterns[1:])
+                   for i in range(len(parts) + 1)))
+    if not parts or not fnmatchcase(parts[0], patterns[0]):
+        return(False)
+    return(glob_match(parts[1:], patterns[1:]))
+
+
+class multistatus():
+    '''
+     Incremental multistatus parser, fed with raw body chunks while they
+     are received so the whole response never has to be buffered.
+
+     Sync-collection answers also give the new sync 'token', the
+     'removed' paths and whether they are 'truncated' (RFC 6578). The
+     preconditions of an error body are kept in 'errors'.
+
+     :param hrefroot: path prefix to strip from every href (see href_root)
+     :type  hrefroot: string
+
+     :param   callback: called with each entry as soon as it is parsed
+     :type    callback: function
+     :default callback: None
+
+     :returns: parser object
+     :rtype: obj
+    '''
+
+    def __init__(self, hrefroot='', callback=None):
+        self.__hrefroot = hrefroot
+        self.__callback = callback
+        self.__parser = XMLPullParser(events=('end',))
+        self.__broken = False
+        self.entries = []
+        self.removed = []
+        self.token = None
+        self.truncated = False
+        self.errors = set()
+
+    def feed(self, data):
+        '''
+         Feed received bytes to the parser, usable as pycurl WRITEFUNCTION
+
+         :param data: chunk of the response body
+         :type  data: bytes
+        '''
+
+        if self.__broken:
+            return(None)
+        known = len(self.entries)
+        try:
+            self.__parser.feed(data)
+            self.__collect()
+        except Exception:
+            # error pages are not XML, the caller relies on the HTTP status
+            self.__broken = True
+        self.__notify(known)
+        return(None)
+
+    def close(self):
+        '''
+         Flush the parser
+
+         :returns: list of parsed entries
+         :rtype: list
+        '''
+
+        known = len(self.entries)
+        if not self.__broken:
+            try:
+                self.__parser.close()
+                self.__collect()
+            except Exception:
+                self.__broken = True
+        self.__notify(known)
+        return(self.entries)
+
+    def __notify(self, known):
+        # out of the parsing try block, callback errors are the caller ones
+        if self.__callback is not None:
+            for item in self.entries[known:]:
+                self.__callback(item)
+
+    def __collect(self):
+        for event, elem in self.__parser.read_events():
+            if elem.tag == _DAV + 'sync-token':
+                self.token = (elem.text or '').strip() or None
+            elif elem.tag == _DAV + 'error':
+                self.errors.update(child.tag for child in elem)
+            elif elem.tag == _DAV + 'response':
+                item = self.__entry(elem)
+                if item is not None:
+                    self.entries.append(item)
+                elem.clear()
+
+    def __entry(self, elem):
+        href = elem.findtext(_DAV + 'href')
+        if not href:
+            return(None)
+
+        path = unquote(urlsplit(href.strip()).path)
+        if self.__hrefroot and path.startswith(self.__hrefroot):
+            path = path[len(self.__hrefroot):]
+        path = fpath.normpath('/{0}'.format(path.lstrip('/')))
+
+        # a status without propstat: member removed, or answer truncated
+        status = elem.findtext(_DAV + 'status')
+        if status and elem.find(_DAV + 'propstat') is None:
+            if ' 404 ' in '{0} '.format(status):
+                self.removed.append(path)
+            elif ' 507 ' in '{0} '.format(status):
+                self.truncated = True
+            return(None)
+
+        props = {}
+        for propstat in elem.iter(_DAV + 'propstat'):
+            status = propstat.findtext(_DAV + 'status') or ''
+            if status and ' 200 ' not in '{0} '.format(status):
+                continue
+            prop = propstat.find(_DAV + 'prop')
+            if prop is not None:
+                for child in prop:
+                    props[child.tag] = child
+
+        is_dir = False
+        rtype = props.get(_DAV + 'resourcetype')
+        if rtype is not None and rtype.find(_DAV + 'collection') is not None:
+            is_dir = True
+
+        size = None
+        length = props.get(_DAV + 'getcontentlength')
+        if length is not None and length.text:
+            try:
+                size = int(length.text)
+            except ValueError:
+                size = None
+
+        modified = props.get(_DAV + 'getlastmodified')
+        mtime = parse_date(modified.text if modified is not None else None)
+
+        etag = props.get(_DAV + 'getetag')
+        etag = etag.text if etag is not None and etag.text else None
+
+        created = props.get(_DAV + 'creationdate')
+        created = created.text.strip() if created is not None and \
+            created.text else None
+
+        checksum = None
+        checksums = props.get(_OC + 'checksums')
+        if checksums is not None:
+            checksum = ' '.join(
+                c.text.strip() for c in checksums.iter(_OC + 'checksum')
+                if c.text) or None
+
+        return(entry(path, is_dir, size, mtime, etag, checksum, created))
+
+
+class walker():
+    '''
+     Recursive listing engine. It asks the whole subtree with a single
+     Depth: infinity PROPFIND and falls back to breadth-first Depth: 1
+     batches when the server refuses infinite depth.
+
+     :param propfind: callable(path, depth) returning a list of entries,
+                      raising NotImplementedError when depth is refused
+     :type  propfind: function
+
+     :param   jobs: number of Depth: 1 requests sent concurrently
+     :type    jobs: int
+     :default jobs: 4
+
+     :returns: walker object
+     :rtype: obj
+    '''
+
+    def __init__(self, propfind, jobs=4):
+        self.__propfind = propfind
+        self.__jobs = max(1, int(jobs))
+        self.infinity = True
+
+    def walk(self, path):
+        '''
+         List every resource below path
+
+         :param path: Webdav path to walk, absolute from Webdav root
+         :type  path: string
+
+         :returns: entries found below path (path itself excluded)
+         :rtype: list
+        '''
+
+        base = fpath.normpath('/{0}'.format(path.lstrip('/')))
+
+        if self.infinity:
+            try:
+                found = self.__propfind(base, 'infinity')
+            except NotImplementedError:
+                self.infinity = False
+            else:
+                return([e for e in found if e.path != base])
+
+        found = []
+        frontier = [base]
+        with ThreadPoolExecutor(max_workers=self.__jobs) as executor:
+            while frontier:
+                batch = list(executor.map(
+                    lambda p: self.__propfind(p, 1), frontier))
+                parents = set(frontier)
+                frontier = []
+                for entries in batch:
+                    for e in entries:
+                        if e.path in parents:
+                            continue
+                        found.append(e)
+                        if e.is_dir:
+                            frontier.append(e.path)
+        return(found)
+
+
+if __name__ == "__main__":
+    pass
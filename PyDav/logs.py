@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+import multiprocessing.util
+from os import path as fpath
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav log pipelines, built once per destination, whose file and syslog
+    writes are done by a background thread
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+curScriptDir = fpath.dirname(fpath.abspath(__file__))
+
+LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warn': logging.WARNING,
+    'warning': logging.WARNING,
+    'error': logging.ERROR
+}
+
+# loggers and queue listeners keyed on (pid, destination, file path)
+__loggers = {}
+__listeners = {}
+__lock = threading.Lock()
+
+
+def levelno(level):
+    '''
+     Numeric logging level of a PyDav level name, unknown names are critical
+
+     :param level: logging facility level (debug|info|warn|error|critical)
+     :type  level: string
+
+     :returns: logging module level
+     :rtype: int
+    '''
+
+    return(LEVELS.get(str(level).lower(), logging.CRITICAL))
+
+
+def __handler(dst, logfpath, name):
+    if dst == 'syslog':
+        handler = logging.handlers.SysLogHandler(address='/dev/log')
+        handler.setFormatter(logging.Formatter(
+            '[{0} %(processName)s] %(levelname)s: %(message)s'.format(name)))
+        return(handler)
+
+    if dst == 'file':
+        if not logfpath:
+            logfpath = '{0}/pyWebdav.log'.format(curScriptDir)
+        handler = logging.handlers.WatchedFileHandler(r'{0}'.format(logfpath))
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s - [{0} %(processName)s] %(levelname)s: %(message)s'.format(name)))
+    return(handler)
+
+
+def getlogger(dst='console', logfpath=False, name='client'):
+    '''
+     Logger writing to the given destination. It is built on first use
+     only: file and syslog records are put on a queue and written by a
+     listener thread, so callers never wait for disk or socket I/O.
+     Console records are written directly to keep their order with the
+     program output.
+
+     :param   dst: logging destination (console|syslog|file)
+     :type    dst: string
+     :default dst: 'console'
+
+     :param   logfpath: If dst is file, allow you to specify the file path
+     :type    logfpath: string
+     :default logfpath: False
+
+     :param   name: name shown in front of each message
+     :type    name: string
+     :default name: 'client'
+
+     :returns: configured logger
+     :rtype: logging.Logger
+    '''
+
+    dst = str(dst)
+    if dst != 'file':
+        logfpath = False
+    # forked workers cannot reuse their parent listener thread
+    key = (os.getpid(), dst, logfpath or '', name)
+    logger = __loggers.get(key)
+    if logger is not None:
+        return(logger)
+
+    with __lock:
+        logger = __loggers.get(key)
+        if logger is not None:
+            return(logger)
+
+        logger = logging.getLogger(
+            '{0}.{1}'.format(__name__, len(__loggers)))
+        logger.setLevel(logging.DEBUG)
+        handler = __handler(dst, logfpath, name)
+        if dst == 'console':
+            logger.addHandler(handler)
+        else:
+            records = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(records, handler)
+            listener.start()
+            __listeners[key] = listener
+            # worker processes exit without running atexit handlers
+            multiprocessing.util.Finalize(None, shutdown, exitpriority=10)
+            logger.addHandler(logging.handlers.QueueHandler(records))
+        __loggers[key] = logger
+    return(logger)
+
+
+def emit(message, level='INFO', dst='console', logfpath=False, name='client'):
+    '''
+     Send one log message to the given destination
+
+     :param message: logging message to send
+     :type  message: string
+
+     :param level: logging facility level
+     :type  level: string
+
+     :param dst: logging destination (console|syslog|file)
+     :type  dst: string
+
+     :param logfpath: If dst is file, allow you to specify the file path
+     :type  logfpath: string
+    '''
+
+    getlogger(dst, logfpath, name).log(levelno(level), str(message))
+
+
+def shutdown():
+    '''
+     Write the records still queued and stop the listener threads
+     of this process
+    '''
+
+    pid = os.getpid()
+    with __lock:
+        keys = [k for k in __listeners if k[0] == pid]
+        listeners = [__listeners.pop(k) for k in keys]
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown)
+
+
+if __name__ == "__main__":
+    pass
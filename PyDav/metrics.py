@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import functools
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit, unquote
+try:
+    import pycurl
+except BaseException:
+    packages = "pycurl>=7.43.0"
+    print('Please install python libraries: {0}'.format(packages))
+    exit(1)
+from PyDav import progress
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav request metrics: every WebDAV request is recorded in a process
+    wide registry, summarized per operation, exported as OpenMetrics text
+    and forwarded to hooks
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# request duration histogram upper bounds, in seconds
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+# byte counters, the *_T ones of libcurl 7.55 and later replace the
+# deprecated double ones
+SIZE_UPLOAD = getattr(pycurl, 'SIZE_UPLOAD_T', pycurl.SIZE_UPLOAD)
+SIZE_DOWNLOAD = getattr(pycurl, 'SIZE_DOWNLOAD_T', pycurl.SIZE_DOWNLOAD)
+
+# one finished request, given to hooks. status is 0 when no HTTP
+# answer was received
+sample = namedtuple('sample', [
+    'operation', 'method', 'path', 'status', 'sent', 'received',
+    'seconds', 'retries'])
+
+
+def method_of(options):
+    '''
+     HTTP method a set of curl options will send
+
+     :param options: pycurl options keyed on their name without prefix
+     :type  options: dict
+
+     :returns: HTTP method
+     :rtype: string
+    '''
+
+    if options.get('CUSTOMREQUEST'):
+        return(str(options['CUSTOMREQUEST']).upper())
+    if options.get('UPLOAD'):
+        return('PUT')
+    if options.get('NOBODY', 1):
+        return('HEAD')
+    if 'POSTFIELDS' in options:
+        return('POST')
+    return('GET')
+
+
+class request():
+    '''
+     Curl handle whose perform() calls are recorded. Every other
+     attribute is the wrapped handle one.
+
+     :param curl: curl handle (pool.handle or pycurl.Curl)
+     :type  curl: obj
+
+     :param owner: registry receiving the samples
+     :type  owner: metrics.registry
+
+     :param method: HTTP method
+     :type  method: string
+
+     :param url: request URL
+     :type  url: string
+    '''
+
+    def __init__(self, curl, owner, method, url):
+        self.__curl = curl
+        self.__owner = owner
+        self.__method = method
+        self.__path = unquote(urlsplit(url).path) or '/'
+        # set by callers retrying the request
+        self.retries = 0
+
+    def __getattr__(self, name):
+        return(getattr(self.__curl, name))
+
+    def perform(self):
+        started = time.monotonic()
+        status = 0
+        try:
+            self.__curl.perform()
+            status = int(self.__curl.getinfo(pycurl.HTTP_CODE))
+        finally:
+            elapsed = time.monotonic() - started
+            try:
+                sent = int(self.__curl.getinfo(SIZE_UPLOAD))
+                received = int(self.__curl.getinfo(SIZE_DOWNLOAD))
+            except pycurl.error:
+                sent = received = 0
+            self.__owner.record(
+                self.__method, self.__path, status, sent, received, elapsed,
+                self.retries)
+
+
+class registry():
+    '''
+     Thread safe request metrics, aggregated per operation, method and
+     status. Operations are the client.core methods called by the
+     application, requests sent while one runs on the same thread are
+     counted for it.
+
+     :returns: registry object
+     :rtype: obj
+    '''
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__hooks = []
+        self.reset()
+
+    def reset(self):
+        '''
+         Forget every recorded request
+        '''
+
+        with self.__lock:
+            self.__stats = {}
+
+    def add_hook(self, callback):
+        '''
+         Call callback(metrics.sample) after each request, from the thread
+         which sent it. Exceptions raised by callbacks are ignored.
+
+         :param callback: function receiving a metrics.sample
+         :type  callback: function
+        '''
+
+        with self.__lock:
+            self.__hooks = self.__hooks + [callback]
+
+    def remove_hook(self, callback):
+        '''
+         Stop calling a callback given to add_hook()
+        '''
+
+        with self.__lock:
+            self.__hooks = [h for h in self.__hooks if h != callback]
+
+    def current(self):
+        '''
+         Operation running on this thread
+
+         :returns: operation name, '' outside of any operation
+         :rtype: string
+        '''
+
+        stack = getattr(self.__local, 'stack', None)
+        return(stack[0] if stack else '')
+
+    def operation(self, name):
+        '''
+         Context manager counting the requests sent by the enclosed code
+         for name, unless an outer operation already runs on this thread
+
+         :param name: operation name
+         :type  name: string
+        '''
+
+        return(_scope(self.__local, name))
+
+    def wrap(self, curl, options):
+        '''
+         Record the requests performed with a curl handle
+
+         :param curl: curl handle about to be performed
+         :type  curl: obj
+
+         :param options: pycurl options set on it, keyed on their name
+         :type  options: dict
+
+         :returns: recording handle
+         :rtype: metrics.request
+        '''
+
+        return(request(curl, self, method_of(options), options.get('URL', '')))
+
+    def record(self, method, path, status, sent, received, seconds, retries=0):
+        '''
+         Count one finished request
+
+         :param method: HTTP method
+         :type  method: string
+
+         :param path: URL path
+         :type  path: string
+
+         :param status: HTTP status, 0 without answer
+         :type  status: int
+
+         :param sent: request body bytes
+         :type  sent: int
+
+         :param received: response body bytes
+         :type  received: int
+
+         :param seconds: duration
+         :type  seconds: float
+
+         :param   retries: attempts made before this one
+         :type    retries: int
+         :default retries: 0
+        '''
+
+        item = sample(
+            self.current(), method, path, status, sent, received, seconds,
+            retries)
+        key = (item.operation, item.method)
+        with self.__lock:
+            stats = self.__stats.get(key)
+            if stats is None:
+                stats = self.__stats[key] = {
+                    'count': 0, 'errors': 0, 'sent': 0, 'received': 0,
+                    'seconds': 0.0, 'max': 0.0, 'retries': 0, 'statuses': {},
+                    'buckets': [0] * len(BUCKETS)}
+            stats['count'] += 1
+            if status == 0 or status >= 500:
+                stats['errors'] += 1
+            stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+            stats['sent'] += sent
+            stats['received'] += received
+            stats['seconds'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            stats['retries'] += retries
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats['buckets'][i] += 1
+                    break
+            hooks = self.__hooks
+
+        for callback in hooks:
+            try:
+                callback(item)
+            except Exception:
+                # monitoring must never break a transfer
+                pass
+
+    def snapshot(self):
+        '''
+         Copy of the counters
+
+         :returns: statistics keyed on (operation, method): count, errors,
+                   sent, received, seconds, max, retries, statuses and
+                   per BUCKETS bound (not cumulative) counts
+         :rtype: dict
+        '''
+
+        with self.__lock:
+            return(dict(
+                (k, dict(v, statuses=dict(v['statuses']), buckets=list(v['buckets'])))
+                for k, v in self.__stats.items()))
+
+    def summary(self):
+        '''
+         Per operation and method table of the recorded requests
+
+         :returns: printable table, one line per operation and method
+                   then one total line per operation
+         :rtype: string
+        '''
+
+        stats = self.snapshot()
+        if not stats:
+            return('No request sent.')
+
+        header = '{0:<14} {1:<10} {2:>7} {3:>6} {4:>11} {5:>11} {6:>9} {7:>9} {8:>9}'
+        lines = [header.format(
+            'operation', 'method', 'requests', 'errors', 'sent', 'received',
+            'seconds', 'mean ms', 'max ms')]
+
+        def line(operation, method, s):
+            mean = s['seconds'] / s['count'] * 1000 if s['count'] else 0
+            return(header.format(
+                operation or '-', method, s['count'], s['errors'],
+                progress.human(s['sent']), progress.human(s['received']),
+                '{0:.3f}'.format(s['seconds']), '{0:.1f}'.format(mean),
+                '{0:.1f}'.format(s['max'] * 1000)))
+
+        for operation in sorted(set(k[0] for k in stats)):
+            keys = sorted(k for k in stats if k[0] == operation)
+            total = {'count': 0, 'errors': 0, 'sent': 0, 'received': 0,
+                     'seconds': 0.0, 'max': 0.0}
+            for k in keys:
+                lines.append(line(operation, k[1], stats[k]))
+                for field in ['count', 'errors', 'sent', 'received', 'seconds']:
+                    total[field] += stats[k][field]
+                total['max'] = max(total['max'], stats[k]['max'])
+            if len(keys) > 1:
+                lines.append(line(operation, 'all', total))
+        return('\n'.join(lines))
+
+    def openmetrics(self):
+        '''
+         Counters in the OpenMetrics text format
+
+         :returns: exposition text, ending with # EOF
+         :rtype: string
+        '''
+
+        stats = self.snapshot()
+
+        def labels(key, **extra):
+            pairs = [('operation', key[0] or 'none'), ('method', key[1])]
+            pairs += sorted(extra.items())
+            return(','.join('{0}="{1}"'.format(
+                name, str(value).replace('\\', '\\\\').replace(
+                    '"', '\\"').replace('\n', '\\n'))
+                for name, value in pairs))
+
+        lines = [
+            '# TYPE pydav_requests counter',
+            '# HELP pydav_requests WebDAV requests sent.']
+        for k in sorted(stats):
+            for status in sorted(stats[k]['statuses']):
+                lines.append('pydav_requests_total{{{0}}} {1}'.format(
+                    labels(k, status=status), stats[k]['statuses'][status]))
+
+        lines += [
+            '# TYPE pydav_request_errors counter',
+            '# HELP pydav_request_errors Requests without answer or answered with a 5xx status.']
+        for k in sorted(stats):
+            lines.append('pydav_request_errors_total{{{0}}} {1}'.format(
+                labels(k), stats[k]['errors']))
+
+        lines += [
+            '# TYPE pydav_request_retries counter',
+            '# HELP pydav_request_retries Attempts made again after a failure.']
+        for k in sorted(stats):
+            lines.append('pydav_request_retries_total{{{0}}} {1}'.format(
+                labels(k), stats[k]['retries']))
+
+        lines += [
+            '# TYPE pydav_request_bytes counter',
+            '# UNIT pydav_request_bytes bytes',
+            '# HELP pydav_request_bytes Request and response body bytes.']
+        for k in sorted(stats):
+            for direction in ['sent', 'received']:
+                lines.append('pydav_request_bytes_total{{{0}}} {1}'.format(
+                    labels(k, direction=direction), stats[k][direction]))
+
+        lines += [
+            '# TYPE pydav_request_duration_seconds histogram',
+            '# UNIT pydav_request_duration_seconds seconds',
+            '# HELP pydav_request_duration_seconds Request durations.']
+        for k in sorted(stats):
+            cumulated = 0
+            for bound, count in zip(BUCKETS, stats[k]['buckets']):
+                cumulated += count
+                lines.append('pydav_request_duration_seconds_bucket{{{0}}} {1}'.format(
+                    labels(k, le=bound), cumulated))
+            lines.append('pydav_request_duration_seconds_bucket{{{0}}} {1}'.format(
+                labels(k, le='+Inf'), stats[k]['count']))
+            lines.append('pydav_request_duration_seconds_count{{{0}}} {1}'.format(
+                labels(k), stats[k]['count']))
+            lines.append('pydav_request_duration_seconds_sum{{{0}}} {1}'.format(
+                labels(k), stats[k]['seconds']))
+
+        lines.append('# EOF')
+        return('\n'.join(lines) + '\n')
+
+    def export(self, filepath):
+        '''
+         Write the OpenMetrics text to a file, replaced atomically so a
+         collector never reads it half written
+
+         :param filepath: destination file path
+         :type  filepath: string
+
+         :returns: It will returns result 'code' and 'reason'
+         :rtype: dict
+        '''
+
+        temp = '{0}.{1}.tmp'.format(filepath, os.getpid())
+        try:
+            with open(temp, 'w') as f:
+                f.write(self.openmetrics())
+            os.replace(temp, filepath)
+        except OSError as exception:
+            return({'code': 1, 'reason': exception})
+        return({'code': 0, 'reason': 'Metrics written to {0}'.format(filepath)})
+
+
+class _scope():
+    '''
+     operation() context manager, the outermost operation of a thread wins
+    '''
+
+    def __init__(self, local, name):
+        self.__local = local
+        self.__name = name
+
+    def __enter__(self):
+        stack = getattr(self.__local, 'stack', None)
+        if stack is None:
+            stack = self.__local.stack = []
+        stack.append(self.__name)
+        return(self)
+
+    def __exit__(self, exc_type, exc, tb):
+        self.__local.stack.pop()
+        return(False)
+
+
+# registry shared by every client of this process
+__registry = registry()
+
+
+def shared():
+    '''
+     Process wide registry, process pool workers have their own
+
+     :returns: registry object
+     :rtype: metrics.registry
+    '''
+
+    return(__registry)
+
+
+def operation(name):
+    '''
+     Decorator counting the requests sent by a method for operation name
+
+     :param name: operation name
+     :type  name: string
+    '''
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with __registry.operation(name):
+                return(function(*args, **kwargs))
+        return(wrapper)
+    return(decorate)
+
+
+if __name__ == "__main__":
+    pass
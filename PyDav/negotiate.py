@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+try:
+    import pycurl
+except BaseException:
+    packages = "pycurl>=7.43.0"
+    print('Please install python libraries: {0}'.format(packages))
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav server negotiation helpers: capabilities announced in answer
+    headers and timing breakdown of the connection handshake
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# handshake requests: Depth 0 PROPFIND, OPTIONS, or the former root listing
+HANDSHAKES = ['propfind', 'options', 'list']
+
+# curl timers, in seconds from the request start
+_TIMERS = [
+    ('dns', pycurl.NAMELOOKUP_TIME),
+    ('connect', pycurl.CONNECT_TIME),
+    ('tls', pycurl.APPCONNECT_TIME),
+    ('sent', pycurl.PRETRANSFER_TIME),
+    ('first byte', pycurl.STARTTRANSFER_TIME),
+    ('total', pycurl.TOTAL_TIME)
+]
+
+
+def headers(lines):
+    '''
+     Header fields of raw answer header lines, the values of a repeated
+     field joined by commas. Only the last answer counts when several
+     came (100 Continue, redirections).
+
+     :param lines: raw header lines as given to HEADERFUNCTION
+     :type  lines: list
+
+     :returns: lower case field names and their values
+     :rtype: dict
+    '''
+
+    found = {}
+    for line in lines:
+        line = line.decode('latin-1').strip()
+        if line.upper().startswith('HTTP/'):
+            found = {}
+            continue
+        name, sep, value = line.partition(':')
+        if not sep:
+            continue
+        name = name.strip().lower()
+        if name in found:
+            found[name] = '{0}, {1}'.format(found[name], value.strip())
+        else:
+            found[name] = value.strip()
+    return(found)
+
+
+def capabilities(fields):
+    '''
+     Server capabilities announced by answer header fields
+
+     :param fields: header fields, see headers()
+     :type  fields: dict
+
+     :returns: 'dav' compliance classes, allowed 'methods', byte 'ranges'
+               support, DASL 'search' support, 'chunking' protocols and
+               sync-collection 'sync' support (never told by headers),
+               a value being None when the answer did not tell
+     :rtype: dict
+    '''
+
+    def tokens(name):
+        if name not in fields:
+            return(None)
+        return([t.strip() for t in fields[name].split(',') if t.strip()])
+
+    dav = tokens('dav')
+    methods = tokens('allow')
+    found = {
+        'dav': dav,
+        'methods': [m.upper() for m in methods] if methods is not None else None,
+        'ranges': None,
+        'search': None,
+        'chunking': None,
+        'sync': None
+    }
+    if 'accept-ranges' in fields:
+        found['ranges'] = 'bytes' in fields['accept-ranges'].lower()
+    if 'dasl' in fields:
+        found['search'] = 'DAV:basicsearch' in fields['dasl']
+    elif methods is not None:
+        found['search'] = False if 'SEARCH' not in found['methods'] else None
+    if dav is not None:
+        chunking = []
+        if 'sabredav-partialupdate' in dav:
+            chunking.append('range')
+        if 'nextcloud-checksum-update' in dav:
+            chunking.append('nextcloud')
+        found['chunking'] = chunking
+    return(found)
+
+
+def merge(known, found):
+    '''
+     Capabilities known completed with newly found ones, values told by
+     found replacing known ones
+    '''
+
+    merged = dict(known)
+    for key, value in found.items():
+        if value is not None or key not in merged:
+            merged[key] = value
+    return(merged)
+
+
+def timings(request):
+    '''
+     Timing breakdown of a performed curl request
+
+     :param request: performed curl handle
+     :type  request: pycurl.Curl
+
+     :returns: seconds spent resolving, connecting, in TLS, sending,
+               waiting for the first byte and receiving
+     :rtype: dict
+    '''
+
+    marks = dict((name, request.getinfo(timer)) for name, timer in _TIMERS)
+    # a reused connection has no dns, connect nor tls time
+    tls = marks['tls'] or marks['connect']
+    return({
+        'dns': marks['dns'],
+        'connect': max(0.0, marks['connect'] - marks['dns']),
+        'tls': max(0.0, tls - marks['connect']),
+        'send': max(0.0, marks['sent'] - tls),
+        'wait': max(0.0, marks['first byte'] - marks['sent']),
+        'receive': max(0.0, marks['total'] - marks['first byte']),
+        'total': marks['total']
+    })
+
+
+def describe(spent):
+    '''
+     One line of a timing breakdown, see timings()
+
+     :rtype: string
+    '''
+
+    return(', '.join('{0} {1:.1f} ms'.format(name, spent[name] * 1000) for name in [
+        'dns', 'connect', 'tls', 'send', 'wait', 'receive', 'total']))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import time
+import threading
+try:
+    import pycurl
+except BaseException:
+    packages = "pycurl>=7.43.0"
+    print('Please install python libraries: {0}'.format(packages))
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav connection pool which keeps curl handles (and their keep-alive
+    connections) alive across requests
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class handle():
+    '''
+     Checked out curl handle. It behaves like pycurl.Curl except that
+     close() gives it back to its pool instead of destroying it.
+    '''
+
+    def __init__(self, pool, host, curl):
+        self.pool = pool
+        self.host = host
+        self.curl = curl
+        self.released = False
+
+    def __getattr__(self, name):
+        return(getattr(self.curl, name))
+
+    def __del__(self):
+        # webdavclient does not close its requests when perform() raises
+        self.close()
+
+    def close(self):
+        if not self.released:
+            self.released = True
+            self.pool.release(self)
+
+
+class connections():
+    '''
+     Bounded, thread safe pool of reusable curl handles. libcurl keeps
+     the connection cache inside each handle, so reusing a handle reuses
+     its TCP/TLS connection when the server allows keep-alive.
+
+     :param   maxconn: maximum handles per host, checked out or idle
+     :type    maxconn: int
+     :default maxconn: 8
+
+     :param   idletime: seconds after which an idle handle is closed
+     :type    idletime: int
+     :default idletime: 60
+
+     :returns: pool object
+     :rtype: obj
+    '''
+
+    def __init__(self, maxconn=8, idletime=60):
+        self.__maxconn = max(1, int(maxconn))
+        self.__idletime = idletime
+        self.__cond = threading.Condition()
+        self.__idle = {}
+        self.__busy = {}
+        self.__counters = {
+            'created': 0,
+            'reused': 0,
+            'evicted': 0,
+            'requests': 0,
+            'connects': 0}
+
+    def acquire(self, host):
+        '''
+         Check out a handle for host, waiting if maxconn are in use
+
+         :param host: Webdav host part of URI
+         :type  host: string
+
+         :returns: pooled curl handle
+         :rtype: handle
+        '''
+
+        with self.__cond:
+            self.__evict()
+            while True:
+                idle = self.__idle.setdefault(host, [])
+                busy = self.__busy.get(host, 0)
+                if idle:
+                    curl, lastuse = idle.pop()
+                    self.__counters['reused'] += 1
+                    break
+                if busy < self.__maxconn:
+                    curl = pycurl.Curl()
+                    self.__counters['created'] += 1
+                    break
+                self.__cond.wait()
+            self.__busy[host] = busy + 1
+
+        return(handle(self, host, curl))
+
+    def release(self, item):
+        '''
+         Give a handle back to the pool
+
+         :param item: handle previously returned by acquire()
+         :type  item: handle
+        '''
+
+        curl = item.curl
+        connects = 0
+        try:
+            connects = curl.getinfo(pycurl.NUM_CONNECTS)
+            # drop callbacks and buffers but keep live connections
+            curl.reset()
+        except pycurl.error:
+            curl.close()
+            curl = None
+
+        with self.__cond:
+            self.__counters['requests'] += 1
+            self.__counters['connects'] += connects
+            self.__busy[item.host] -= 1
+            if curl is not None:
+                self.__idle.setdefault(item.host, []).append(
+                    (curl, time.time()))
+            self.__cond.notify()
+
+    def __evict(self):
+        '''
+         Close handles idle for more than idletime, lock must be held
+        '''
+
+        if not self.__idletime:
+            return(None)
+        limit = time.time() - self.__idletime
+        for host, idle in self.__idle.items():
+            keep = []
+            for curl, lastuse in idle:
+                if lastuse < limit:
+                    curl.close()
+                    self.__counters['evicted'] += 1
+                else:
+                    keep.append((curl, lastuse))
+            self.__idle[host] = keep
+
+    def stats(self):
+        '''
+         Pool counters
+
+         :returns: 'created' and 'reused' handles, 'evicted' idle handles,
+                   'requests' performed and new TCP 'connects' they needed
+         :rtype: dict
+        '''
+
+        with self.__cond:
+            result = dict(self.__counters)
+            result['idle'] = sum(len(i) for i in self.__idle.values())
+            result['busy'] = sum(self.__busy.values())
+        return(result)
+
+    def close(self):
+        '''
+         Close every idle handle
+        '''
+
+        with self.__cond:
+            for idle in self.__idle.values():
+                for curl, lastuse in idle:
+                    curl.close()
+            self.__idle = {}
+
+
+if __name__ == "__main__":
+    pass
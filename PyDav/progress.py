@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import time
+import threading
+try:
+    from PyDav import lazy
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav transfer progress, aggregated over concurrent transfers and
+    redrawn at a bounded rate
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# drawing only
+shutil = lazy.module('shutil')
+
+# redraws per second
+RATE = 10
+
+# progress bar width in characters
+BARWIDTH = 30
+
+# weight of the last measure in the displayed throughput
+SMOOTHING = 0.3
+
+UNITS = ['B', 'KiB', 'MiB', 'GiB', 'TiB']
+
+
+def human(size):
+    '''
+     Human readable byte count
+
+     :param size: bytes
+     :type  size: int
+
+     :returns: size with a binary unit, e.g. '12.3 MiB'
+     :rtype: string
+    '''
+
+    size = float(size)
+    for unit in UNITS[:-1]:
+        if abs(size) < 1024:
+            break
+        size /= 1024
+    else:
+        unit = UNITS[-1]
+    if unit == 'B':
+        return('{0} B'.format(int(size)))
+    return('{0:.1f} {1}'.format(size, unit))
+
+
+def duration(seconds):
+    '''
+     Human readable duration
+
+     :param seconds: duration
+     :type  seconds: float
+
+     :returns: [h:]mm:ss
+     :rtype: string
+    '''
+
+    seconds = int(max(0, seconds))
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return('{0}:{1:02d}:{2:02d}'.format(hours, minutes, seconds))
+    return('{0:02d}:{1:02d}'.format(minutes, seconds))
+
+
+class tracker():
+    '''
+     Progress of one file transfer. It is callable as a pycurl
+     PROGRESSFUNCTION and only stores numbers, drawing is left to
+     the meter.
+
+     :param owner: meter aggregating this transfer
+     :type  owner: progress.meter
+    '''
+
+    def __init__(self, owner):
+        self.__owner = owner
+        self.total = 0
+        self.now = 0
+
+    def __call__(self, dltotal, dlnow, ultotal, ulnow):
+        if ultotal:
+            self.total, self.now = int(ultotal), int(ulnow)
+        elif dltotal:
+            self.total, self.now = int(dltotal), int(dlnow)
+        self.__owner.tick()
+        return(None)
+
+    def advance(self, nbytes, total=None):
+        '''
+         Count bytes of a transfer made of several requests
+         (segments or chunks)
+
+         :param nbytes: bytes transferred since the last call
+         :type  nbytes: int
+
+         :param   total: size of the whole file
+         :type    total: int
+         :default total: None
+        '''
+
+        if total is not None:
+            self.total = int(total)
+        self.now += int(nbytes)
+        self.__owner.tick()
+
+    def done(self, ok=True):
+        '''
+         End of the transfer
+
+         :param   ok: transfer succeeded, counts the file as done,
+                      None when it is sent again and counts for nothing
+         :type    ok: boolean
+         :default ok: True
+        '''
+
+        self.__owner.release(self, ok)
+
+
+class meter():
+    '''
+     Aggregated progress of every transfer of a process. Trackers are
+     updated from any thread at no cost, the line showing the overall
+     percentage, byte count, throughput and ETA is redrawn at most rate
+     times per second, and only when the output is a terminal.
+
+     Operations are wrapped in begin()/end() calls which may be nested,
+     totals announced with expect() and end() returns a summary once
+     several files were transferred.
+
+     :param   output: stream to draw on
+     :type    output: file
+     :default output: sys.stdout
+
+     :param   rate: redraws per second
+     :type    rate: int
+     :default rate: 10
+
+     :param   enabled: draw progress, None draws on terminals only
+     :type    enabled: boolean
+     :default enabled: None
+
+     :returns: meter object
+     :rtype: obj
+    '''
+
+    def __init__(self, output=None, rate=RATE, enabled=None):
+        self.__output = output or sys.stdout
+        if enabled is None:
+            try:
+                enabled = self.__output.isatty()
+            except (AttributeError, ValueError):
+                enabled = False
+        self.enabled = bool(enabled)
+        self.__interval = 1.0 / max(1, int(rate))
+        self.__lock = threading.Lock()
+        self.__active = []
+        self.__depth = 0
+        self.__reset()
+
+    def __reset(self):
+        self.__started = time.monotonic()
+        self.__next = 0.0
+        self.__files = 0
+        self.__failed = 0
+        self.__finished = 0
+        self.__expected = 0
+        self.__planned = 0
+        self.__known = True
+        self.__speed = None
+        self.__last = (self.__started, 0)
+        self.__width = 0
+
+    def begin(self):
+        '''
+         Start a directory operation, nested calls share the same totals
+        '''
+
+        with self.__lock:
+            if self.__depth == 0 and not self.__active:
+                self.__reset()
+            self.__depth += 1
+
+    def expect(self, files, size=None):
+        '''
+         Announce transfers to come, so a percentage and ETA can be shown
+
+         :param files: number of files
+         :type  files: int
+
+         :param   size: their total size, None when unknown
+         :type    size: int
+         :default size: None
+        '''
+
+        with self.__lock:
+            self.__expected += int(files)
+            if size is None:
+                self.__known = False
+            else:
+                self.__planned += int(size)
+
+    def end(self):
+        '''
+         End a directory operation
+
+         :returns: totals summary when the outermost operation ends,
+                   None otherwise
+         :rtype: string
+        '''
+
+        with self.__lock:
+            if self.__depth > 1 or self.__active:
+                self.__depth = max(0, self.__depth - 1)
+                return(None)
+            self.__clear()
+            self.__depth = 0
+            if self.__files + self.__failed < 2:
+                return(None)
+            return(self.__summary())
+
+    def track(self):
+        '''
+         Start tracking one file transfer
+
+         :returns: tracker to update while data moves
+         :rtype: progress.tracker
+        '''
+
+        item = tracker(self)
+        with self.__lock:
+            if self.__depth == 0 and not self.__active:
+                self.__reset()
+            self.__active.append(item)
+        return(item)
+
+    def release(self, item, ok=True):
+        '''
+         Stop tracking a file transfer, see tracker.done()
+        '''
+
+        with self.__lock:
+            if item in self.__active:
+                self.__active.remove(item)
+            if ok:
+                self.__files += 1
+                self.__finished += item.now
+            elif ok is not None:
+                self.__failed += 1
+            if self.__depth == 0 and not self.__active:
+                self.__clear()
+            else:
+                self.__draw(time.monotonic())
+
+    def complete(self, size, ok=True):
+        '''
+         Count a file transferred out of this process (process pool worker)
+
+         :param size: bytes transferred
+         :type  size: int
+
+         :param   ok: transfer succeeded
+         :type    ok: boolean
+         :default ok: True
+        '''
+
+        item = tracker(self)
+        item.now = int(size or 0)
+        with self.__lock:
+            self.__active.append(item)
+        self.release(item, ok)
+
+    def tick(self):
+        '''
+         Redraw if the last redraw is old enough, called on every update
+        '''
+
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now < self.__next:
+            return
+        if not self.__lock.acquire(False):
+            return
+        try:
+            self.__draw(now)
+        finally:
+            self.__lock.release()
+
+    def __done(self):
+        return(self.__finished + sum(t.now for t in self.__active))
+
+    def __throughput(self, now, done):
+        then, before = self.__last
+        if now - then >= self.__interval:
+            current = (done - before) / (now - then)
+            if self.__speed is None:
+                self.__speed = current
+            else:
+                self.__speed += SMOOTHING * (current - self.__speed)
+            self.__last = (now, done)
+        if self.__speed is None:
+            return(done / max(now - self.__started, 1e-6))
+        return(self.__speed)
+
+    def __draw(self, now):
+        if not self.enabled:
+            return
+        self.__next = now + self.__interval
+        done = self.__done()
+        speed = self.__throughput(now, done)
+
+        total = 0
+        if self.__known and self.__expected:
+            total = self.__planned
+        elif not self.__expected and self.__files + len(self.__active) == 1:
+            # a single file, whole size known once its transfer started
+            total = self.__active[0].total if self.__active else done
+
+        parts = []
+        if total:
+            ratio = min(1.0, float(done) / total)
+            filled = int(ratio * BARWIDTH)
+            parts.append('[{0}{1}] {2:5.1f}%'.format(
+                '#' * filled, ' ' * (BARWIDTH - filled), ratio * 100))
+            parts.append('{0}/{1}'.format(human(done), human(total)))
+        else:
+            parts.append(human(done))
+        if self.__expected or self.__files > 1:
+            if self.__expected:
+                parts.append('{0}/{1} files'.format(
+                    self.__files, self.__expected))
+            else:
+                parts.append('{0} files'.format(self.__files))
+        parts.append('{0}/s'.format(human(speed)))
+        if total and speed > 0 and done < total:
+            parts.append('ETA {0}'.format(duration((total - done) / speed)))
+
+        line = ' '.join(parts)
+        columns = shutil.get_terminal_size().columns - 1
+        line = line[:columns]
+        padding = ' ' * max(0, self.__width - len(line))
+        self.__width = len(line)
+        try:
+            self.__output.write('\r{0}{1}'.format(line, padding))
+            self.__output.flush()
+        except (OSError, ValueError):
+            self.enabled = False
+
+    def __clear(self):
+        # last state then a line feed, the next output starts on its own line
+        if self.enabled and self.__width:
+            self.__draw(time.monotonic())
+            try:
+                self.__output.write('\n')
+                self.__output.flush()
+            except (OSError, ValueError):
+                self.enabled = False
+        self.__width = 0
+
+    def __summary(self):
+        elapsed = max(time.monotonic() - self.__started, 1e-6)
+        summary = '{0} files, {1} transferred in {2} ({3}/s)'.format(
+            self.__files, human(self.__finished), duration(elapsed),
+            human(self.__finished / elapsed))
+        if self.__failed:
+            summary = '{0}, {1} failed'.format(summary, self.__failed)
+        return(summary)
+
+
+# meter shared by every client, per process
+__meters = {}
+__lock = threading.Lock()
+
+
+def shared():
+    '''
+     Process wide meter. Process pool workers get a meter which never
+     draws, their parent counts their transfers as they complete.
+
+     :returns: meter object
+     :rtype: progress.meter
+    '''
+
+    pid = os.getpid()
+    found = __meters.get(pid)
+    if found is None:
+        with __lock:
+            found = __meters.get(pid)
+            if found is None:
+                # a pool worker runs with multiprocessing imported
+                spawner = sys.modules.get('multiprocessing')
+                child = spawner is not None and \
+                    spawner.parent_process() is not None
+                found = meter(enabled=False if child else None)
+                __meters[pid] = found
+    return(found)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import json
+from os import path as fpath, remove as fremove, replace as freplace, stat as fstat
+from email.utils import formatdate
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav partial download checkpoints used to resume interrupted downloads
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# bytes written between two checkpoint saves
+SAVE_EVERY = 8388608
+
+
+def validator(etag, mtime):
+    '''
+     Value usable in an If-Range header for a remote file
+
+     :param etag: remote etag
+     :type  etag: string
+
+     :param mtime: remote modification time
+     :type  mtime: float
+
+     :returns: strong etag, else HTTP date, else None (no resume possible)
+     :rtype: string
+    '''
+
+    # If-Range needs a strong comparison, weak etags cannot be used
+    if etag and not etag.startswith('W/'):
+        return(etag)
+    if mtime:
+        return(formatdate(mtime, usegmt=True))
+    return(None)
+
+
+class checkpoint():
+    '''
+     Partial download state of one local file. Data is written to
+     <local>.part, <local>.part.json records the remote file validator and
+     size with the offset known to be on disk. The .part file is renamed
+     onto local once complete.
+
+     :param local: local filesystem path of the downloaded file
+     :type  local: string
+
+     :returns: checkpoint object
+     :rtype: obj
+    '''
+
+    def __init__(self, local):
+        self.local = local
+        self.part = '{0}.part'.format(local)
+        self.path = '{0}.part.json'.format(local)
+
+    def __read(self, validator, size):
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return(None)
+
+        if not validator or not isinstance(state, dict) or \
+                state.get('validator') != validator or \
+                state.get('size') != size or not fpath.isfile(self.part):
+            return(None)
+        return(state)
+
+    def load(self, validator, size):
+        '''
+         Offset to resume from. A checkpoint for another remote version
+         is discarded, the .part file is cut back to the saved offset.
+
+         :param validator: current remote validator (see validator())
+         :type  validator: string
+
+         :param size: current remote size
+         :type  size: int
+
+         :returns: bytes already downloaded, 0 to start over
+         :rtype: int
+        '''
+
+        state = self.__read(validator, size)
+        if state is None or 'segments' in state:
+            self.discard()
+            return(0)
+
+        try:
+            offset = min(int(state.get('offset', 0)), fstat(self.part).st_size)
+            with open(self.part, 'r+b') as f:
+                f.truncate(offset)
+        except (OSError, TypeError, ValueError):
+            self.discard()
+            return(0)
+        return(offset)
+
+    def ranges(self, validator, size, count):
+        '''
+         Byte ranges left to fetch for a segmented download, from the
+         checkpoint or from a fresh split of a preallocated .part file
+
+         :param validator: current remote validator (see validator())
+         :type  validator: string
+
+         :param size: current remote size
+         :type  size: int
+
+         :param count: number of segments of a fresh split
+         :type  count: int
+
+         :returns: [position, end] pairs (end included), updated in place
+                   by the caller while data is written
+         :rtype: list
+        '''
+
+        state = self.__read(validator, size)
+        if state is not None and fstat(self.part).st_size == size:
+            try:
+                return([[int(p), int(e)] for p, e in state['segments']])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        self.discard()
+        with open(self.part, 'wb') as f:
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, size)
+                except OSError:
+                    f.truncate(size)
+            else:
+                f.truncate(size)
+
+        step = -(-size // max(1, count))
+        return([[start, min(size, start + step) - 1]
+                for start in range(0, size, step)])
+
+    def save(self, validator, size, offset, segments=None):
+        '''
+         Record that offset bytes of the remote version are on disk
+
+         :param validator: remote validator (see validator())
+         :type  validator: string
+
+         :param size: remote size
+         :type  size: int
+
+         :param offset: bytes flushed to the .part file
+         :type  offset: int
+
+         :param   segments: ranges left of a segmented download (see ranges())
+         :type    segments: list
+         :default segments: None
+        '''
+
+        if not validator:
+            return(None)
+        state = {'validator': validator, 'size': size, 'offset': offset}
+        if segments is not None:
+            state['segments'] = [list(s) for s in segments]
+        tmp = '{0}.tmp'.format(self.path)
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        freplace(tmp, self.path)
+
+    def finish(self):
+        '''
+         Atomically move the complete .part file onto local
+        '''
+
+        freplace(self.part, self.local)
+        if fpath.exists(self.path):
+            fremove(self.path)
+
+    def discard(self):
+        '''
+         Forget any partial download
+        '''
+
+        for f in [self.part, self.path]:
+            if fpath.exists(f):
+                fremove(f)
+
+
+class writer():
+    '''
+     pycurl HEADERFUNCTION/WRITEFUNCTION pair writing a (possibly ranged)
+     response body into an open .part file and saving checkpoints
+
+     :param lfile: .part file opened for writing
+     :type  lfile: file
+
+     :param state: checkpoint of the download
+     :type  state: checkpoint
+
+     :param validator: remote validator (see validator())
+     :type  validator: string
+
+     :param size: remote size
+     :type  size: int
+
+     :param offset: bytes already in lfile, asked with a Range request
+     :type  offset: int
+
+     :returns: writer object
+     :rtype: obj
+    '''
+
+    def __init__(self, lfile, state, validator, size, offset):
+        self.__lfile = lfile
+        self.__state = state
+        self.__validator = validator
+        self.__size = size
+        self.__saved = offset
+        self.__started = False
+        self.offset = offset
+        self.status = 0
+
+    def header(self, line):
+        if line.startswith(b'HTTP/'):
+            self.status = int(line.split()[1])
+
+    def write(self, data):
+        if self.status >= 300:
+            # error page, not file content
+            return(None)
+        if not self.__started:
+            self.__started = True
+            if self.status != 206 and self.offset:
+                # range ignored or file changed: full body follows
+                self.__lfile.seek(0)
+                self.__lfile.truncate()
+                self.offset = self.__saved = 0
+        self.__lfile.write(data)
+        self.offset += len(data)
+        if self.offset - self.__saved >= SAVE_EVERY:
+            self.save()
+        return(None)
+
+    def save(self):
+        self.__lfile.flush()
+        self.__state.save(self.__validator, self.__size, self.offset)
+        self.__saved = self.offset
+
+
+if __name__ == "__main__":
+    pass
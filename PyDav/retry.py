@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+try:
+    import pycurl
+    from webdav.client import WebDavException
+except BaseException:
+    packages = "pycurl>=7.43.0, webdavclient>=1.0.8"
+    print('Please install python libraries: {0}'.format(packages))
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav request retries: exponential backoff with jitter, Retry-After,
+    per host circuit breakers and per file retry budgets
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# methods whose replay leaves the server in the same state
+IDEMPOTENT = [
+    'GET', 'HEAD', 'OPTIONS', 'PROPFIND', 'SEARCH', 'REPORT', 'PUT', 'DELETE']
+
+# statuses worth asking again
+RETRYABLE = [408, 429, 500, 502, 503, 504]
+
+# statuses telling the request was refused before being processed
+REFUSED = [429, 503]
+
+# curl errors of an unreachable host or a dropped connection
+UNREACHABLE = [
+    pycurl.E_COULDNT_CONNECT,
+    pycurl.E_OPERATION_TIMEDOUT,
+    pycurl.E_GOT_NOTHING,
+    pycurl.E_SEND_ERROR,
+    pycurl.E_RECV_ERROR
+]
+TRANSIENT = UNREACHABLE + [pycurl.E_PARTIAL_FILE]
+
+# consecutive failures opening a host circuit, and seconds it stays open
+THRESHOLD = 10
+COOLDOWN = 30.0
+
+
+class unavailable(WebDavException):
+    '''
+     Raised instead of sending a request to a host whose circuit is open
+    '''
+
+    def __init__(self, host, seconds):
+        self.host = host
+        self.seconds = seconds
+
+    def __str__(self):
+        return("Host {0} unavailable after repeated failures, next try in {1:.0f}s".format(
+            self.host, self.seconds))
+
+
+def retry_after(value):
+    '''
+     Seconds to wait from a Retry-After header value
+
+     :param value: delay in seconds or HTTP date
+     :type  value: string
+
+     :returns: seconds, None if the value cannot be parsed
+     :rtype: float
+    '''
+
+    value = str(value).strip()
+    if value.isdigit():
+        return(float(value))
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return(None)
+    if when is None:
+        return(None)
+    return(max(0.0, when.timestamp() - time.time()))
+
+
+# attempt number and Retry-After of the request running on each thread
+_state = threading.local()
+
+
+def attempt():
+    '''
+     Attempts made before the request the current thread is sending
+
+     :rtype: int
+    '''
+
+    return(getattr(_state, 'attempt', 0))
+
+
+def tap(function=None):
+    '''
+     Wrap a pycurl HEADERFUNCTION so the Retry-After header of the
+     answer is noted for the current thread
+
+     :param   function: callback receiving header lines too
+     :type    function: callable
+     :default function: None
+
+     :returns: HEADERFUNCTION
+     :rtype: callable
+    '''
+
+    def header(line):
+        if line[:12].lower() == b'retry-after:':
+            _state.retryafter = retry_after(
+                line[12:].decode('latin-1'))
+        if function is not None:
+            return(function(line))
+        return(None)
+    return(header)
+
+
+class breaker():
+    '''
+     Circuit breaker of one host. After threshold consecutive failures
+     requests are refused for cooldown seconds, then a single request
+     is let through: its success closes the circuit, its failure opens
+     it again.
+
+     :param host: host name
+     :type  host: string
+
+     :param   threshold: consecutive failures opening the circuit
+     :type    threshold: int
+     :default threshold: 10
+
+     :param   cooldown: seconds the circuit stays open
+     :type    cooldown: float
+     :default cooldown: 30.0
+    '''
+
+    def __init__(self, host, threshold=THRESHOLD, cooldown=COOLDOWN):
+        self.host = host
+        self.__threshold = max(1, int(threshold))
+        self.__cooldown = float(cooldown)
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__opened = None
+        self.__probing = False
+
+    def admit(self):
+        '''
+         Check a request may be sent, raises retry.unavailable otherwise
+
+         :returns: True when the request is the one probing the host,
+                   release() must follow it
+         :rtype: boolean
+        '''
+
+        with self.__lock:
+            if self.__opened is None:
+                return(False)
+            left = self.__opened + self.__cooldown - time.monotonic()
+            if left > 0 or self.__probing:
+                raise unavailable(self.host, max(0.0, left))
+            self.__probing = True
+            return(True)
+
+    def release(self):
+        '''
+         End a probe which neither succeeded nor failed, the next request
+         probes the host again
+        '''
+
+        with self.__lock:
+            self.__probing = False
+
+    def success(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__opened = None
+            self.__probing = False
+
+    def failure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__probing or self.__failures >= self.__threshold:
+                self.__opened = time.monotonic()
+            self.__probing = False
+
+    def state(self):
+        '''
+         :returns: closed, open or half-open
+         :rtype: string
+        '''
+
+        with self.__lock:
+            if self.__opened is None:
+                return('closed')
+            if self.__probing or \
+                    time.monotonic() >= self.__opened + self.__cooldown:
+                return('half-open')
+            return('open')
+
+
+# breakers shared by every client, per process and host
+__breakers = {}
+__lock = threading.Lock()
+
+
+def circuit(host):
+    '''
+     Process wide circuit breaker of a host
+
+     :param host: host name
+     :type  host: string
+
+     :rtype: retry.breaker
+    '''
+
+    key = (os.getpid(), host)
+    found = __breakers.get(key)
+    if found is None:
+        with __lock:
+            found = __breakers.setdefault(key, breaker(host))
+    return(found)
+
+
+class policy():
+    '''
+     When and how long to wait before sending a failed request again.
+     Idempotent methods are replayed on transient statuses and dropped
+     connections, other methods only when the server surely did not
+     process them (connection refused, 429 or 503). Waits grow
+     exponentially with full jitter, a Retry-After header is honored.
+
+     :param   retries: attempts after the first one
+     :type    retries: int
+     :default retries: 3
+
+     :param   wait: base wait in seconds, doubled at each attempt
+     :type    wait: float
+     :default wait: 0.5
+
+     :param   maxwait: longest wait in seconds, a longer Retry-After
+                       gives up
+     :type    maxwait: float
+     :default maxwait: 60.0
+
+     :param   budget: retries allowed for all requests of one file
+     :type    budget: int
+     :default budget: 10
+
+     :returns: policy object
+     :rtype: obj
+    '''
+
+    def __init__(self, retries=3, wait=0.5, maxwait=60.0, budget=10):
+        self.retries = max(0, int(retries))
+        self.wait = max(0.0, float(wait))
+        self.maxwait = max(self.wait, float(maxwait))
+        self.budget = max(0, int(budget))
+
+    def delay(self, attempt, retryafter=None):
+        '''
+         Seconds to wait before an attempt
+
+         :param attempt: attempts already failed, from 0
+         :type  attempt: int
+
+         :param   retryafter: delay asked by the server
+         :type    retryafter: float
+         :default retryafter: None
+
+         :returns: seconds, None when the server asks more than maxwait
+         :rtype: float
+        '''
+
+        if retryafter is not None:
+            if retryafter > self.maxwait:
+                return(None)
+            return(retryafter)
+        return(random.uniform(0, min(self.maxwait, self.wait * 2 ** attempt)))
+
+    def replayable(self, method, status=None, error=None):
+        '''
+         Tell if a failed request may be sent again
+
+         :param method: HTTP method
+         :type  method: string
+
+         :param   status: HTTP status of the answer
+         :type    status: int
+         :default status: None
+
+         :param   error: curl error code when there was no answer
+         :type    error: int
+         :default error: None
+
+         :rtype: boolean
+        '''
+
+        if error is not None:
+            if error not in TRANSIENT:
+                return(False)
+            return(method in IDEMPOTENT or error == pycurl.E_COULDNT_CONNECT)
+        if status not in RETRYABLE:
+            return(False)
+        return(method in IDEMPOTENT or status in REFUSED)
+
+    def file(self):
+        '''
+         Share one retry budget between the requests sent by the current
+         thread until the returned context exits. Nested contexts use the
+         outermost budget.
+
+         :returns: context manager
+        '''
+
+        return(_budget(self.budget))
+
+    def run(self, method, host, perform, notify=None):
+        '''
+         Send a request until it succeeds, fails for good or runs out of
+         retries. Raises retry.unavailable when the host circuit is open.
+
+         :param method: HTTP method
+         :type  method: string
+
+         :param host: host name, circuit breakers are kept per host
+         :type  host: string
+
+         :param perform: send one attempt and return its HTTP status,
+                         raises pycurl.error without answer. Called again
+                         for each attempt, it must reset what a previous
+                         attempt received or sent.
+         :type  perform: callable
+
+         :param   notify: called with a message before each new attempt
+         :type    notify: callable
+         :default notify: None
+
+         :returns: HTTP status of the last attempt
+         :rtype: int
+        '''
+
+        gate = circuit(host)
+        attempts = 0
+        while True:
+            probe = gate.admit()
+            _state.attempt = attempts
+            _state.retryafter = None
+            try:
+                status = perform()
+            except pycurl.error as exception:
+                error, reason = exception.args[0], exception.args[-1]
+                if error in UNREACHABLE:
+                    gate.failure()
+                else:
+                    # truncated or aborted by a callback, the host answered
+                    gate.success()
+                if not self.__again(attempts, method, error=error):
+                    raise
+                wait = self.delay(attempts)
+            else:
+                if status not in RETRYABLE:
+                    gate.success()
+                    return(status)
+                if status != 429:
+                    # rate limiting tells the host is up
+                    gate.failure()
+                reason = 'HTTP error {0}'.format(status)
+                if not self.__again(attempts, method, status=status):
+                    return(status)
+                wait = self.delay(attempts, _state.retryafter)
+                if wait is None:
+                    return(status)
+            finally:
+                _state.attempt = 0
+                if probe:
+                    # perform raised something else or was rate limited
+                    gate.release()
+
+            attempts += 1
+            if notify is not None:
+                notify('{0} failed ({1}), attempt {2}/{3} in {4:.1f}s'.format(
+                    method, reason, attempts + 1, self.retries + 1, wait))
+            time.sleep(wait)
+
+    def __again(self, attempts, method, status=None, error=None):
+        if attempts >= self.retries:
+            return(False)
+        if not self.replayable(method, status, error):
+            return(False)
+        left = getattr(_state, 'budget', None)
+        if left is not None:
+            if left <= 0:
+                return(False)
+            _state.budget = left - 1
+        return(True)
+
+
+class _budget():
+    '''
+     Retry budget of the requests of one file, see policy.file()
+    '''
+
+    def __init__(self, size):
+        self.__size = size
+        self.__outer = False
+
+    def __enter__(self):
+        self.__outer = getattr(_state, 'budget', None) is None
+        if self.__outer:
+            _state.budget = self.__size
+        return(self)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.__outer:
+            _state.budget = None
+        return(False)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import io
+import zlib
+import queue
+import threading
+try:
+    from PyDav import lazy
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+# only an aborted upload needs it
+pycurl = lazy.module('pycurl')
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav file-like objects streaming Webdav resources without temp files
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+CHUNKSIZE = 262144
+
+# queued chunks between the transfer thread and the caller
+QUEUED = 4
+
+_EOF = None
+
+# queued by writer.abort(), the upload stops without its end
+_ABORT = object()
+
+
+class reader(io.RawIOBase):
+    '''
+     Readable file-like object fed by a download running in a thread.
+     At most QUEUED chunks of chunksize bytes are held in memory, the
+     transfer waits while the caller does not read. Iterating it yields
+     the received chunks as bytes.
+
+     :param perform: callable(write) running the request, write(data)
+                     being called with every received block
+     :type  perform: function
+
+     :param   chunksize: size of the chunks handed to the caller
+     :type    chunksize: int
+     :default chunksize: 262144
+
+     :returns: file-like object
+     :rtype: obj
+    '''
+
+    def __init__(self, perform, chunksize=CHUNKSIZE):
+        io.RawIOBase.__init__(self)
+        self.__perform = perform
+        self.__chunksize = max(1, int(chunksize))
+        self.__queue = queue.Queue(maxsize=QUEUED)
+        self.__pending = bytearray()
+        self.__buffer = memoryview(b'')
+        self.__cancelled = False
+        self.__error = None
+        self.__eof = False
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __put(self, item):
+        # give up waiting as soon as the reader is closed
+        while not self.__cancelled:
+            try:
+                self.__queue.put(item, timeout=0.5)
+                return(True)
+            except queue.Full:
+                continue
+        return(False)
+
+    def __write(self, data):
+        self.__pending += data
+        if len(self.__pending) >= self.__chunksize:
+            chunk = bytes(self.__pending)
+            self.__pending = bytearray()
+            if not self.__put(chunk):
+                # aborts the transfer
+                return(0)
+        return(None)
+
+    def __run(self):
+        try:
+            self.__perform(self.__write)
+            if self.__pending:
+                self.__put(bytes(self.__pending))
+        except BaseException as exception:
+            if not self.__cancelled:
+                self.__error = exception
+        self.__put(_EOF)
+
+    def __next_chunk(self):
+        if self.__eof:
+            return(None)
+        chunk = self.__queue.get()
+        if chunk is _EOF:
+            self.__eof = True
+            if self.__error is not None:
+                raise self.__error
+            return(None)
+        return(chunk)
+
+    def readable(self):
+        return(True)
+
+    def readinto(self, buf):
+        if not len(self.__buffer):
+            chunk = self.__next_chunk()
+            if chunk is None:
+                return(0)
+            self.__buffer = memoryview(chunk)
+        size = min(len(buf), len(self.__buffer))
+        buf[:size] = self.__buffer[:size]
+        self.__buffer = self.__buffer[size:]
+        return(size)
+
+    def __iter__(self):
+        return(self)
+
+    def __next__(self):
+        if len(self.__buffer):
+            chunk = bytes(self.__buffer)
+            self.__buffer = memoryview(b'')
+            return(chunk)
+        chunk = self.__next_chunk()
+        if chunk is None:
+            raise StopIteration
+        return(chunk)
+
+    def close(self):
+        if not self.closed:
+            self.__cancelled = True
+            # unblock the transfer thread if it waits for room
+            while True:
+                try:
+                    self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.__thread.join()
+        io.RawIOBase.close(self)
+
+
+class writer(io.RawIOBase):
+    '''
+     Writable file-like object feeding an upload running in a thread.
+     write() blocks while QUEUED chunks are waiting to be sent, so memory
+     stays bounded whatever the amount of data. close() ends the upload,
+     waits for it and raises its error if it failed. abort(), also called
+     when the with block raises, stops it without sending the end of the
+     data so the server does not store the truncated file.
+
+     :param perform: callable(read) running the request, read(size)
+                     returning the next body bytes, b'' at the end
+     :type  perform: function
+
+     :param   chunksize: size of the chunks queued for the transfer
+     :type    chunksize: int
+     :default chunksize: 262144
+
+     :param   compress: gzip the body on the fly
+     :type    compress: boolean
+     :default compress: False
+
+     :returns: file-like object
+     :rtype: obj
+    '''
+
+    def __init__(self, perform, chunksize=CHUNKSIZE, compress=False):
+        io.RawIOBase.__init__(self)
+        self.__perform = perform
+        self.__chunksize = max(1, int(chunksize))
+        self.__queue = queue.Queue(maxsize=QUEUED)
+        self.__pending = bytearray()
+        self.__buffer = memoryview(b'')
+        self.__done = False
+        self.__aborted = False
+        self.__error = None
+        self.__compressor = None
+        if compress:
+            self.__compressor = zlib.compressobj(wbits=31)
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __read(self, size):
+        if self.__aborted:
+            return(pycurl.READFUNC_ABORT)
+        if not len(self.__buffer):
+            if self.__done:
+                return(b'')
+            chunk = self.__queue.get()
+            if chunk is _ABORT:
+                return(pycurl.READFUNC_ABORT)
+            if chunk is _EOF:
+                self.__done = True
+                return(b'')
+            self.__buffer = memoryview(chunk)
+        data = bytes(self.__buffer[:size])
+        self.__buffer = self.__buffer[size:]
+        return(data)
+
+    def __run(self):
+        try:
+            self.__perform(self.__read)
+        except BaseException as exception:
+            self.__error = exception
+        # the transfer stopped, let blocked writers go
+        self.__done = True
+        while True:
+            try:
+                self.__queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __put(self, chunk):
+        while self.__thread.is_alive():
+            try:
+                self.__queue.put(chunk, timeout=0.5)
+                return(None)
+            except queue.Full:
+                continue
+        if self.__error is not None:
+            raise self.__error
+        raise IOError('Upload stopped before the end of the data')
+
+    def writable(self):
+        return(True)
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError('write to closed file')
+        size = len(data)
+        if self.__compressor is not None:
+            data = self.__compressor.compress(data)
+        self.__pending += data
+        while len(self.__pending) >= self.__chunksize:
+            self.__put(bytes(self.__pending[:self.__chunksize]))
+            del self.__pending[:self.__chunksize]
+        return(size)
+
+    def close(self):
+        if self.closed:
+            return(None)
+        try:
+            if self.__compressor is not None:
+                self.__pending += self.__compressor.flush()
+            if self.__pending and self.__thread.is_alive():
+                self.__put(bytes(self.__pending))
+            self.__pending = bytearray()
+            if self.__thread.is_alive():
+                self.__put(_EOF)
+            self.__thread.join()
+        finally:
+            io.RawIOBase.close(self)
+        if self.__error is not None:
+            raise self.__error
+
+    def abort(self):
+        '''
+         Stop the upload without ending it, the data written so far is
+         not committed on the server
+        '''
+
+        if self.closed:
+            return(None)
+        self.__aborted = True
+        try:
+            # only the caller queues chunks: emptied, there is room left
+            while True:
+                try:
+                    self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+            if self.__thread.is_alive():
+                self.__queue.put_nowait(_ABORT)
+            self.__thread.join()
+        finally:
+            self.__pending = bytearray()
+            io.RawIOBase.close(self)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+    def __del__(self):
+        # never committed unless closed
+        self.abort()
+
+
+if __name__ == "__main__":
+    pass
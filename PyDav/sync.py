@@ -0,0 +1,748 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import shutil
+import sqlite3
+from os import path as fpath
+from fnmatch import fnmatch
+from collections import namedtuple
+try:
+    from PyDav import cache
+    from PyDav import digest
+    from PyDav import metrics
+    from PyDav import transfer
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav incremental synchronization of a local directory with a Webdav path
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+MODES = ['push', 'pull', 'both']
+
+# manifest file, kept at the top of the synchronized local directory
+MANIFEST = '.pydav-sync.db'
+
+# never synchronized: the manifest, digests and partial transfer files
+IGNORED = [
+    '{0}*'.format(MANIFEST),
+    digest.SIDECAR,
+    '*.part',
+    '*.part.json',
+    '*.part.json.tmp']
+
+# State of one path when it was last synchronized. size/mtime describe
+# the local file (mtime in ns), etag/rsize/rmtime the remote one, hash is
+# the sha1 of the content.
+state = namedtuple(
+    'state',
+    ['path', 'is_dir', 'size', 'mtime', 'etag', 'rsize', 'rmtime', 'hash'])
+
+# Local file or directory found by the scan, mtime in ns
+local = namedtuple('local', ['path', 'is_dir', 'size', 'mtime'])
+
+# op is one of mkcol/mkdir (create remote/local directory), put/get,
+# delete/remove (remote/local), move/copy (remote, from source),
+# rename/clone (local, from source), record (already identical), forget
+# (gone on both sides) and conflict. Paths are relative to the sync roots.
+action = namedtuple('action', ['op', 'path', 'source'], defaults=(None,))
+
+
+def ignored(name):
+    '''
+     Tell if a file name is excluded from synchronization
+
+     :param name: file base name
+     :type  name: string
+
+     :rtype: boolean
+    '''
+
+    for pattern in IGNORED:
+        if fnmatch(name, pattern):
+            return(True)
+    return(False)
+
+
+class manifest():
+    '''
+     SQLite record of every path as it was after the last synchronization
+     of a local directory with a remote path. Synchronizing with another
+     remote path starts from an empty manifest.
+
+     :param dbpath: SQLite database file path
+     :type  dbpath: string
+
+     :param remote: remote path synchronized with
+     :type  remote: string
+
+     :returns: manifest object
+     :rtype: obj
+    '''
+
+    def __init__(self, dbpath, remote):
+        self.__db = sqlite3.connect(dbpath)
+        self.__db.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, is_dir INTEGER NOT NULL, '
+            'size INTEGER, mtime INTEGER, etag TEXT, rsize INTEGER, '
+            'rmtime REAL, hash TEXT)')
+        self.__db.execute(
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = self.__db.execute(
+            "SELECT value FROM meta WHERE key = 'remote'").fetchone()
+        if row is None or row[0] != remote:
+            with self.__db:
+                self.__db.execute('DELETE FROM files')
+                self.__db.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('remote', ?)",
+                    (remote,))
+
+    def load(self):
+        '''
+         Every recorded path
+
+         :returns: state keyed on relative path
+         :rtype: dict
+        '''
+
+        rows = self.__db.execute(
+            'SELECT path, is_dir, size, mtime, etag, rsize, rmtime, hash '
+            'FROM files')
+        return(dict((r[0], state(r[0], bool(r[1]), *r[2:])) for r in rows))
+
+    def update(self, states, forget):
+        '''
+         Record synchronized paths and drop forgotten ones in one
+         transaction
+
+         :param states: list of state to record
+         :type  states: list
+
+         :param forget: relative paths to drop
+         :type  forget: list
+        '''
+
+        with self.__db:
+            self.__db.executemany(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(s.path, int(s.is_dir), s.size, s.mtime, s.etag, s.rsize,
+                  s.rmtime, s.hash) for s in states])
+            self.__db.executemany(
+                'DELETE FROM files WHERE path = ?', [(p,) for p in forget])
+
+    def close(self):
+        self.__db.close()
+
+
+class engine():
+    '''
+     Three way synchronization of a local directory with a remote path.
+     Both trees are listed once (one recursive PROPFIND on the remote,
+     or only its changes through a catalog) and compared to the manifest of the last run, so only what changed
+     since then is transferred or deleted.
+
+     Modes:
+       push: local changes are applied to the remote, local wins
+       pull: remote changes are applied locally, remote wins
+       both: changes go both ways, a path changed on both sides is a
+             conflict left untouched, a modification wins over a deletion
+
+     :param client: connected client.core
+     :type  client: obj
+
+     :param localdir: local directory to synchronize
+     :type  localdir: string
+
+     :param remotedir: Webdav path to synchronize
+     :type  remotedir: string
+
+     :param   mode: push|pull|both
+     :type    mode: string
+     :default mode: 'both'
+
+     :param   dbpath: manifest file path
+     :type    dbpath: string
+     :default dbpath: localdir/.pydav-sync.db
+
+     :param   sidecar: keep .pydav-hashes files up to date in remote
+                       directories when the server gives no checksum
+     :type    sidecar: boolean
+     :default sidecar: True
+
+     :param   catalog: local index covering remotedir, refreshed instead
+                       of listing the remote tree so that only changes
+                       are asked (see catalog.catalog)
+     :type    catalog: obj
+     :default catalog: None
+
+     :returns: engine object
+     :rtype: obj
+    '''
+
+    def __init__(self, client, localdir, remotedir, mode='both', dbpath=None,
+                 sidecar=True, catalog=None):
+        if mode not in MODES:
+            raise ValueError('Unknown sync mode {0}'.format(mode))
+        self.__client = client
+        self.__local = fpath.abspath(localdir)
+        self.__remote = cache.normalize(remotedir)
+        self.__mode = mode
+        self.__dbpath = dbpath or fpath.join(self.__local, MANIFEST)
+        self.__sidecar = sidecar
+        self.__catalog = catalog
+
+    def __lpath(self, rel):
+        return(fpath.join(self.__local, rel))
+
+    def __rpath(self, rel):
+        return(fpath.normpath('{0}/{1}'.format(self.__remote, rel)))
+
+    def scan_local(self):
+        '''
+         List the local directory recursively
+
+         :returns: local keyed on relative path
+         :rtype: dict
+        '''
+
+        found = {}
+        stack = [self.__local]
+        while stack:
+            directory = stack.pop()
+            with os.scandir(directory) as it:
+                for e in it:
+                    if ignored(e.name):
+                        continue
+                    rel = fpath.relpath(e.path, self.__local)
+                    if e.is_dir(follow_symlinks=False):
+                        found[rel] = local(rel, True, None, None)
+                        stack.append(e.path)
+                    elif e.is_file():
+                        st = e.stat()
+                        found[rel] = local(
+                            rel, False, st.st_size, st.st_mtime_ns)
+        return(found)
+
+    def scan_remote(self):
+        '''
+         List the remote path recursively
+
+         :returns: listing.entry keyed on relative path
+         :rtype: dict
+        '''
+
+        if self.__catalog is not None:
+            # never trusted without asking: only the changes are sent
+            refreshed = self.__catalog.refresh(ttl=0)
+            if refreshed['code'] == 1:
+                raise IOError(refreshed['reason'])
+            entries = self.__catalog.entries(self.__remote)
+            if entries is None:
+                raise IOError('Unable to find {0}'.format(self.__remote))
+        else:
+            entries = self.__client.walk(self.__remote)
+            if isinstance(entries, dict):
+                raise IOError(entries['reason'])
+
+        found = {}
+        for e in entries:
+            if ignored(fpath.basename(e.path)):
+                continue
+            found[fpath.relpath(e.path, self.__remote)] = e
+        return(found)
+
+    def __scan_root(self, dryrun):
+        '''
+         Remote scan, a missing remote path is created (as an upload does)
+         when local changes are sent, and seen empty by a dry run
+        '''
+
+        try:
+            return(self.scan_remote())
+        except IOError:
+            if self.__mode == 'pull':
+                raise
+            self.__client.reset()
+            if self.__client.check(self.__remote)['code'] == 0:
+                # it exists, listing it failed
+                raise
+        if not dryrun:
+            self.__client.reset()
+            created = self.__client.createdir(self.__remote)
+            if created['code'] == 1:
+                raise IOError(created['reason'])
+            self.__log('Remote directory {0} created.'.format(self.__remote))
+        return({})
+
+    def __lchanged(self, rel, lstate, base):
+        if base is None or base.is_dir != lstate.is_dir:
+            return(True)
+        if lstate.is_dir:
+            return(False)
+        return(lstate.size != base.size or lstate.mtime != base.mtime)
+
+    def __rchanged(self, rel, rstate, base):
+        if base is None or base.is_dir != rstate.is_dir:
+            return(True)
+        if rstate.is_dir:
+            return(False)
+        if rstate.etag and base.etag:
+            return(rstate.etag != base.etag)
+        return(rstate.size != base.rsize or rstate.mtime != base.rmtime)
+
+    def plan(self, ltree, rtree, base):
+        '''
+         Operations needed to synchronize both trees
+
+         :param ltree: local scan (see scan_local())
+         :type  ltree: dict
+
+         :param rtree: remote scan (see scan_remote())
+         :type  rtree: dict
+
+         :param base: manifest content (see manifest.load())
+         :type  base: dict
+
+         :returns: list of action, parents before children
+         :rtype: list
+        '''
+
+        push = self.__mode in ['push', 'both']
+        pull = self.__mode in ['pull', 'both']
+        actions = []
+
+        for rel in sorted(set(ltree) | set(rtree) | set(base)):
+            lstate = ltree.get(rel)
+            rstate = rtree.get(rel)
+            known = base.get(rel)
+
+            if lstate is None and rstate is None:
+                actions.append(action('forget', rel))
+                continue
+
+            if lstate is not None and rstate is not None:
+                if lstate.is_dir and rstate.is_dir:
+                    if known is None:
+                        actions.append(action('record', rel))
+                    continue
+                if lstate.is_dir != rstate.is_dir:
+                    actions.append(action('conflict', rel))
+                    continue
+                lchanged = self.__lchanged(rel, lstate, known)
+                rchanged = self.__rchanged(rel, rstate, known)
+                if not lchanged and not rchanged:
+                    continue
+                same = None
+                if lchanged and rchanged:
+                    same = self.__client.compare(self.__lpath(rel), rstate)
+                if same or (same is None and known is None):
+                    # same content on both sides from checksums, or from
+                    # sizes before the first sync
+                    actions.append(action('record', rel))
+                elif lchanged and rchanged:
+                    if self.__mode == 'push':
+                        actions.append(action('put', rel))
+                    elif self.__mode == 'pull':
+                        actions.append(action('get', rel))
+                    else:
+                        actions.append(action('conflict', rel))
+                elif lchanged and push:
+                    actions.append(action('put', rel))
+                elif rchanged and pull:
+                    actions.append(action('get', rel))
+                continue
+
+            if lstate is not None:
+                lchanged = self.__lchanged(rel, lstate, known)
+                if known is not None and pull and \
+                        (self.__mode == 'pull' or not lchanged):
+                    # deleted on the remote
+                    actions.append(action('remove', rel))
+                elif push and (known is None or lchanged):
+                    actions.append(action(
+                        'mkcol' if lstate.is_dir else 'put', rel))
+                continue
+
+            rchanged = self.__rchanged(rel, rstate, known)
+            if known is not None and push and \
+                    (self.__mode == 'push' or not rchanged):
+                # deleted locally
+                actions.append(action('delete', rel))
+            elif pull and (known is None or rchanged):
+                actions.append(action(
+                    'mkdir' if rstate.is_dir else 'get', rel))
+
+        actions = self.__renames(actions, ltree, rtree, base)
+        return(self.__prune(actions, ltree, rtree))
+
+    def __renames(self, actions, ltree, rtree, base):
+        '''
+         Turn the upload of a file already on the remote into a MOVE (its
+         old path is deleted) or a COPY, and the download of a file already
+         here into a local rename or copy. Contents are matched with the
+         manifest digests, server checksums and etags.
+        '''
+
+        puts = [a.path for a in actions if a.op == 'put' and a.path not in base]
+        gets = [a.path for a in actions if a.op == 'get' and a.path not in base]
+        if not puts and not gets:
+            return(actions)
+
+        ops = dict((a.path, a.op) for a in actions)
+        byhash = {}
+        byetag = {}
+        for known in base.values():
+            if known.is_dir:
+                continue
+            if known.hash:
+                byhash.setdefault(known.hash, known.path)
+            if known.etag:
+                byetag.setdefault((known.etag, known.rsize), known.path)
+        remotesums = {}
+        for rel, rstate in rtree.items():
+            sha1 = digest.parse_checksums(rstate.checksum).get('sha1')
+            if sha1 and rel not in ops:
+                remotesums.setdefault(sha1, rel)
+
+        def unchanged(rel):
+            # content of rel is the same on both sides as recorded
+            return(rel in base and rel in ltree and rel in rtree and
+                   not self.__lchanged(rel, ltree[rel], base[rel]) and
+                   not self.__rchanged(rel, rtree[rel], base[rel]))
+
+        replaced = {}
+        used = set()
+        hashes = self.__client.digests([self.__lpath(p) for p in puts])
+        for rel in puts:
+            sha1 = hashes.get(self.__lpath(rel))
+            source = byhash.get(sha1) if sha1 else None
+            if source is not None and ops.get(source) == 'delete' and \
+                    source not in used and source in rtree and \
+                    not self.__rchanged(source, rtree[source], base[source]):
+                replaced[rel] = action('move', rel, source)
+                replaced[source] = None
+                used.add(source)
+            elif source is not None and unchanged(source):
+                replaced[rel] = action('copy', rel, source)
+            elif sha1 in remotesums:
+                replaced[rel] = action('copy', rel, remotesums[sha1])
+
+        for rel in gets:
+            rstate = rtree[rel]
+            sha1 = digest.parse_checksums(rstate.checksum).get('sha1')
+            source = byhash.get(sha1) if sha1 else None
+            if source is None and rstate.etag:
+                source = byetag.get((rstate.etag, rstate.size))
+            if source is None:
+                continue
+            if ops.get(source) == 'remove' and source not in used and \
+                    source in ltree and \
+                    not self.__lchanged(source, ltree[source], base[source]):
+                replaced[rel] = action('rename', rel, source)
+                replaced[source] = None
+                used.add(source)
+            elif unchanged(source):
+                replaced[rel] = action('clone', rel, source)
+
+        result = []
+        for a in actions:
+            if a.path in replaced:
+                if replaced[a.path] is not None:
+                    result.append(replaced[a.path])
+            else:
+                result.append(a)
+        return(result)
+
+    def __prune(self, actions, ltree, rtree):
+        '''
+         Keep directory deletions only when nothing below is kept, a
+         remote directory deletion replacing those of its members
+        '''
+
+        deleted = {
+            'delete': set(a.path for a in actions if a.op == 'delete') |
+            set(a.source for a in actions if a.op == 'move'),
+            'remove': set(a.path for a in actions if a.op == 'remove') |
+            set(a.source for a in actions if a.op == 'rename')}
+        kept = {
+            'delete': [p for p in rtree if p not in deleted['delete']],
+            'remove': [p for p in ltree if p not in deleted['remove']]}
+        tree = {'delete': rtree, 'remove': ltree}
+
+        result = []
+        dropped = set()
+        for a in actions:
+            if a.op in deleted and tree[a.op][a.path].is_dir:
+                prefix = '{0}/'.format(a.path)
+                if any(p.startswith(prefix) for p in kept[a.op]):
+                    dropped.add(a.path)
+                    continue
+            result.append(a)
+
+        # a removed remote collection takes its members with it
+        tops = set(a.path for a in result if a.op == 'delete' and
+                   rtree[a.path].is_dir)
+        final = []
+        for a in result:
+            if a.op == 'delete' and any(a.path.startswith('{0}/'.format(t)) for t in tops):
+                continue
+            final.append(a)
+        return(final)
+
+    def __log(self, msg, level='INFO'):
+        self.__client.reset()
+        self.__client.sendlog(msg=msg, level=level)
+
+    @metrics.operation('sync')
+    def run(self, dryrun=False):
+        '''
+         Synchronize both trees
+
+         :param   dryrun: only compute and report the operations
+         :type    dryrun: boolean
+         :default dryrun: False
+
+         :returns: 'code' (0, 1 when operations failed, 2 when only
+                   conflicts are left), 'reason', operation 'counts',
+                   'conflicts' and 'failed' relative paths
+         :rtype: dict
+        '''
+
+        if not fpath.isdir(self.__local):
+            os.makedirs(self.__local, 0o750)
+
+        record = manifest(self.__dbpath, self.__remote)
+        try:
+            return(self.__run(record, dryrun))
+        finally:
+            record.close()
+
+    def __run(self, record, dryrun):
+        base = record.load()
+        ltree = self.scan_local()
+        rtree = self.__scan_root(dryrun)
+        actions = self.plan(ltree, rtree, base)
+
+        counts = {}
+        for a in actions:
+            counts[a.op] = counts.get(a.op, 0) + 1
+        conflicts = [a.path for a in actions if a.op == 'conflict']
+        for rel in conflicts:
+            self.__log('Sync conflict on {0}, changed on both sides.'.format(
+                rel), level='warn')
+
+        if dryrun:
+            for a in actions:
+                if a.op not in ['record', 'forget', 'conflict']:
+                    self.__log('Sync would {0} {1}'.format(a.op, a.path))
+            return({'code': 2 if conflicts else 0, 'reason': 'Dry run.',
+                    'counts': counts, 'conflicts': conflicts, 'failed': [],
+                    'actions': actions})
+
+        done = set()
+        failed = []
+
+        for a in actions:
+            if a.op == 'mkcol':
+                self.__client.reset()
+                if self.__client.createdir(self.__rpath(a.path))['code'] == 1:
+                    failed.append(a.path)
+                else:
+                    done.add(a.path)
+            elif a.op == 'mkdir':
+                try:
+                    os.makedirs(self.__lpath(a.path), 0o750, exist_ok=True)
+                except OSError:
+                    failed.append(a.path)
+                else:
+                    done.add(a.path)
+
+        tasks = []
+        for a in actions:
+            if a.op in ['move', 'copy']:
+                self.__client.reset()
+                if a.op == 'move':
+                    res = self.__client.move(
+                        self.__rpath(a.source), self.__rpath(a.path))
+                else:
+                    res = self.__client.duplicate(
+                        self.__rpath(a.source), self.__rpath(a.path))
+                if res['code'] == 1:
+                    # send it after all
+                    tasks.append(transfer.task(
+                        'put', self.__lpath(a.path), self.__rpath(a.path)))
+                else:
+                    done.add(a.path)
+            elif a.op in ['rename', 'clone']:
+                try:
+                    os.makedirs(fpath.dirname(self.__lpath(a.path)), 0o750,
+                                exist_ok=True)
+                    if a.op == 'rename':
+                        os.rename(self.__lpath(a.source), self.__lpath(a.path))
+                    else:
+                        shutil.copy2(
+                            self.__lpath(a.source), self.__lpath(a.path))
+                except OSError:
+                    tasks.append(transfer.task(
+                        'get', self.__rpath(a.path), self.__lpath(a.path)))
+                else:
+                    done.add(a.path)
+
+        for a in actions:
+            if a.op == 'put':
+                tasks.append(transfer.task(
+                    'put', self.__lpath(a.path), self.__rpath(a.path)))
+            elif a.op == 'get':
+                tasks.append(transfer.task(
+                    'get', self.__rpath(a.path), self.__lpath(a.path)))
+        if tasks:
+            self.__client.reset()
+            res = self.__client.transfer(tasks)
+            for t, r in zip(tasks, res.get('results', [])):
+                rel = fpath.relpath(
+                    t.source if t.action == 'put' else t.destination,
+                    self.__local)
+                if r.code == 0:
+                    done.add(rel)
+                else:
+                    failed.append(rel)
+
+        for a in actions:
+            if a.op == 'delete':
+                self.__client.reset()
+                if self.__client.delete(self.__rpath(a.path))['code'] == 1:
+                    failed.append(a.path)
+                else:
+                    done.add(a.path)
+
+        # deepest first so directories are empty when removed
+        for a in sorted([a for a in actions if a.op == 'remove'],
+                        key=lambda a: a.path, reverse=True):
+            try:
+                if ltree[a.path].is_dir:
+                    os.rmdir(self.__lpath(a.path))
+                else:
+                    os.remove(self.__lpath(a.path))
+            except OSError:
+                failed.append(a.path)
+            else:
+                done.add(a.path)
+        self.__client.reset()
+
+        self.__save(record, actions, done, base, ltree, rtree)
+
+        if failed:
+            reason = 'Sync of {0} with {1}: {2} operations failed.'.format(
+                self.__local, self.__remote, len(failed))
+            code = 1
+        else:
+            reason = 'Sync of {0} with {1} done: {2}.'.format(
+                self.__local, self.__remote,
+                ', '.join('{0} {1}'.format(v, k)
+                          for k, v in sorted(counts.items())) or 'up to date')
+            # everything else went through, conflicts wait for the user
+            code = 2 if conflicts else 0
+        self.__log(reason, level='warn' if code else 'INFO')
+        return({'code': code, 'reason': reason, 'counts': counts,
+                'conflicts': conflicts, 'failed': failed, 'actions': actions})
+
+    def __save(self, record, actions, done, base, ltree, rtree):
+        '''
+         Record the state of every path now identical on both sides, with
+         its content digest
+        '''
+
+        ops = dict((a.path, a) for a in actions)
+        sent = ['put', 'mkcol', 'move', 'copy']
+        if any(ops[p].op in sent for p in done):
+            # etags of uploaded files, from one more recursive PROPFIND or
+            # from the index changes
+            try:
+                rtree = self.scan_remote()
+            except IOError:
+                rtree = dict((p, e) for p, e in rtree.items()
+                             if p not in ops or ops[p].op not in sent)
+
+        forget = []
+        for rel, a in ops.items():
+            if a.op == 'forget' or (a.op in ['delete', 'remove'] and rel in done):
+                forget.append(rel)
+            if a.op in ['move', 'rename'] and rel in done:
+                forget.append(a.source)
+        # members of deleted directories
+        prefixes = tuple('{0}/'.format(rel) for rel in forget)
+        if prefixes:
+            forget.extend(p for p in base if p.startswith(prefixes))
+
+        synced = []
+        for rel, a in ops.items():
+            if a.op in ['conflict', 'forget', 'delete', 'remove']:
+                continue
+            if a.op != 'record' and rel not in done:
+                continue
+            synced.append(rel)
+        # unchanged files recorded before digests were kept
+        for rel, known in base.items():
+            if known.hash is None and not known.is_dir and rel not in ops and \
+                    rel in ltree and rel in rtree and \
+                    not self.__lchanged(rel, ltree[rel], known):
+                synced.append(rel)
+
+        files = [self.__lpath(rel) for rel in synced
+                 if rel in rtree and not rtree[rel].is_dir]
+        hashes = self.__client.digests(files) if files else {}
+
+        states = []
+        sidecars = {}
+        for rel in synced:
+            rstate = rtree.get(rel)
+            try:
+                st = os.stat(self.__lpath(rel))
+            except OSError:
+                continue
+            if rstate is None:
+                continue
+            if rstate.is_dir:
+                states.append(state(rel, True, None, None, None, None, None, None))
+                continue
+            sha1 = hashes.get(self.__lpath(rel))
+            states.append(state(
+                rel, False, st.st_size, st.st_mtime_ns,
+                rstate.etag, rstate.size, rstate.mtime, sha1))
+            if sha1 and rel in ops and ops[rel].op in sent and \
+                    not rstate.checksum:
+                sidecars.setdefault(fpath.dirname(rel), {})[
+                    fpath.basename(rel)] = sha1
+        record.update(states, forget)
+
+        if self.__sidecar:
+            for rel in forget:
+                names = sidecars.get(fpath.dirname(rel))
+                if names is not None and fpath.basename(rel) not in names:
+                    names[fpath.basename(rel)] = None
+            for rel, names in sidecars.items():
+                self.__client.reset()
+                self.__client.update_sidecar(self.__rpath(rel), names)
+            self.__client.reset()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import re
+import time
+import threading
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav bandwidth shaping: token buckets shared by every transfer of a
+    process, per transfer caps and time of day schedules
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# seconds between two looks at the schedule
+RECHECK = 1.0
+
+UNITS = {'': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+_RATE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([kmg]?)(?:i?b)?(?:/s)?\s*$', re.I)
+_PERIOD = re.compile(
+    r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s+(\S+)\s+(\S+)\s*$')
+
+
+def rate(value):
+    '''
+     Bytes per second from a rate such as 512K, 2M or 1048576,
+     0 or an empty value meaning unlimited
+
+     :param value: rate with an optional K, M or G (powers of 1024) suffix
+     :type  value: string
+
+     :rtype: int
+    '''
+
+    if value is None or str(value).strip() == '':
+        return(0)
+    found = _RATE.match(str(value))
+    if found is None:
+        raise ValueError('Invalid rate {0}'.format(value))
+    return(int(float(found.group(1)) * UNITS[found.group(2).lower()]))
+
+
+def timetable(text):
+    '''
+     Time of day periods from a schedule such as
+     '08:00-19:00 1M 256K, 22:00-06:00 0 0', each period giving the
+     download then upload rates applying from its start to its end
+     (local time, a period may run over midnight)
+
+     :param text: comma separated periods
+     :type  text: string
+
+     :returns: (start minute, end minute, recv, send) tuples
+     :rtype: list
+    '''
+
+    periods = []
+    for part in str(text or '').split(','):
+        if not part.strip():
+            continue
+        found = _PERIOD.match(part)
+        if found is None:
+            raise ValueError('Invalid schedule period {0}'.format(part.strip()))
+        sh, sm, eh, em = [int(g) for g in found.groups()[:4]]
+        if sh > 24 or eh > 24 or sm > 59 or em > 59:
+            raise ValueError('Invalid schedule period {0}'.format(part.strip()))
+        periods.append((
+            sh * 60 + sm, eh * 60 + em,
+            rate(found.group(5)), rate(found.group(6))))
+    return(periods)
+
+
+class bucket():
+    '''
+     Token bucket refilled at rate bytes per second and holding at most
+     one second of tokens. Takers reserve their bytes in turn and wait
+     for the bucket to refill, so concurrent takers share the rate.
+
+     :param   rate: bytes per second, 0 for unlimited
+     :type    rate: int
+     :default rate: 0
+    '''
+
+    def __init__(self, rate=0):
+        self.__lock = threading.Lock()
+        self.__rate = 0
+        self.__tokens = 0.0
+        self.__last = time.monotonic()
+        self.set(rate)
+
+    def set(self, rate):
+        with self.__lock:
+            self.__refill()
+            self.__rate = max(0, int(rate))
+            self.__tokens = min(self.__tokens, float(self.__rate))
+
+    def __refill(self):
+        now = time.monotonic()
+        if self.__rate:
+            self.__tokens = min(
+                float(self.__rate),
+                self.__tokens + (now - self.__last) * self.__rate)
+        self.__last = now
+
+    def delay(self, size):
+        '''
+         Reserve size bytes
+
+         :returns: seconds to wait before using them
+         :rtype: float
+        '''
+
+        with self.__lock:
+            if not self.__rate:
+                return(0.0)
+            self.__refill()
+            self.__tokens -= size
+            if self.__tokens >= 0:
+                return(0.0)
+            return(-self.__tokens / self.__rate)
+
+    def take(self, size):
+        '''
+         Reserve size bytes and wait until they may be used
+        '''
+
+        wait = self.delay(size)
+        if wait > 0:
+            time.sleep(wait)
+
+
+class shaper():
+    '''
+     Bandwidth limits of the transfers of a process. maxrecv and maxsend
+     cap all downloads and uploads together, replaced by the schedule
+     period running if any, filerecv and filesend cap each request.
+
+     :param   maxrecv: download bytes per second of all transfers
+     :type    maxrecv: int or string
+     :default maxrecv: 0
+
+     :param   maxsend: upload bytes per second of all transfers
+     :type    maxsend: int or string
+     :default maxsend: 0
+
+     :param   filerecv: download bytes per second of one transfer
+     :type    filerecv: int or string
+     :default filerecv: 0
+
+     :param   filesend: upload bytes per second of one transfer
+     :type    filesend: int or string
+     :default filesend: 0
+
+     :param   schedule: time of day periods, see throttle.timetable()
+     :type    schedule: string
+     :default schedule: ''
+
+     :param   shares: processes sharing the limits (process pool workers)
+     :type    shares: int
+     :default shares: 1
+
+     :returns: shaper object
+     :rtype: obj
+    '''
+
+    def __init__(self, **limits):
+        self.__lock = threading.Lock()
+        self.__recv = bucket()
+        self.__send = bucket()
+        self.__limits = (0, 0, 0, 0, [], 1)
+        self.__next = 0.0
+        self.configure(**limits)
+
+    def configure(self, maxrecv=0, maxsend=0, filerecv=0, filesend=0,
+                  schedule='', shares=1):
+        '''
+         Change the limits, raises ValueError on a wrong rate or schedule
+        '''
+
+        limits = (
+            rate(maxrecv), rate(maxsend), rate(filerecv), rate(filesend),
+            timetable(schedule), max(1, int(shares)))
+        with self.__lock:
+            self.__limits = limits
+            self.__next = 0.0
+
+    def limited(self):
+        '''
+         Tell if any limit is set
+
+         :rtype: boolean
+        '''
+
+        maxrecv, maxsend, filerecv, filesend, periods, shares = self.__limits
+        return(bool(maxrecv or maxsend or filerecv or filesend or periods))
+
+    def limits(self, now=None):
+        '''
+         Download and upload rates of all transfers at a given time
+
+         :param   now: epoch time
+         :type    now: float
+         :default now: current time
+
+         :returns: (recv, send) bytes per second, 0 for unlimited
+         :rtype: tuple
+        '''
+
+        maxrecv, maxsend, filerecv, filesend, periods, shares = self.__limits
+        local = time.localtime(time.time() if now is None else now)
+        minute = local.tm_hour * 60 + local.tm_min
+        for start, end, recv, send in periods:
+            if start <= end:
+                running = start <= minute < end
+            else:
+                running = minute >= start or minute < end
+            if running:
+                maxrecv, maxsend = recv, send
+                break
+        return(tuple(
+            r and max(1, r // shares) for r in (maxrecv, maxsend)))
+
+    def __tick(self):
+        now = time.monotonic()
+        if now < self.__next:
+            return
+        with self.__lock:
+            if now < self.__next:
+                return
+            recv, send = self.limits()
+            self.__recv.set(recv)
+            self.__send.set(send)
+            self.__next = now + RECHECK
+
+    def received(self, size):
+        '''
+         Wait until size downloaded bytes fit in the download rate
+        '''
+
+        self.__tick()
+        self.__recv.take(size)
+
+    def sent(self, size):
+        '''
+         Wait until size uploaded bytes fit in the upload rate
+        '''
+
+        self.__tick()
+        self.__send.take(size)
+
+    def shape(self, options):
+        '''
+         Curl options of one request with its data callbacks going
+         through the process buckets and its own rate caps
+
+         :param options: pycurl options by name
+         :type  options: dict
+
+         :rtype: dict
+        '''
+
+        if not self.limited():
+            return(options)
+
+        maxrecv, maxsend, filerecv, filesend, periods, shares = self.__limits
+        options = dict(options)
+        if filerecv:
+            options.setdefault('MAX_RECV_SPEED_LARGE', filerecv)
+        if filesend:
+            options.setdefault('MAX_SEND_SPEED_LARGE', filesend)
+
+        write = options.get('WRITEFUNCTION')
+        if write is not None:
+            def shapedwrite(data):
+                self.received(len(data))
+                return(write(data))
+            options['WRITEFUNCTION'] = shapedwrite
+
+        read = options.get('READFUNCTION')
+        if read is not None:
+            def shapedread(size):
+                data = read(size)
+                # READFUNC_ABORT and READFUNC_PAUSE are numbers
+                if data and not isinstance(data, int):
+                    self.sent(len(data))
+                return(data)
+            options['READFUNCTION'] = shapedread
+        return(options)
+
+
+# shaper shared by every client, per process
+__shapers = {}
+__lock = threading.Lock()
+
+
+def shared():
+    '''
+     Process wide shaper, process pool workers have their own
+
+     :returns: shaper object
+     :rtype: throttle.shaper
+    '''
+
+    pid = os.getpid()
+    found = __shapers.get(pid)
+    if found is None:
+        with __lock:
+            found = __shapers.setdefault(pid, shaper())
+    return(found)
+
+
+if __name__ == "__main__":
+    pass
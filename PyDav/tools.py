@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: UTF-8 -*-
 
+import sys
 from os import path as fpath
 import signal
 try:
-    from PyDav import client
+    from PyDav import lazy
+    from PyDav import progress
 except BaseException:
     print('Please Install PyDav library.')
     exit(1)
@@ -37,6 +39,14 @@ __status__ = "Released"
     Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
 '''
 
+# loaded by the first command needing them
+catalog = lazy.module('PyDav.catalog')
+client = lazy.module('PyDav.client')
+metrics = lazy.module('PyDav.metrics')
+stream = lazy.module('PyDav.stream')
+pysync = lazy.module('PyDav.sync')
+pywatch = lazy.module('PyDav.watch')
+
 
 class core():
     '''
@@ -58,6 +68,8 @@ class core():
 
         self.__error = {'code': 0, 'reason': ''}
         self.__config = fpath.normpath(configpath)
+        self.__jobs = None
+        self.__webdavClient = None
 
         if not fpath.exists(self.__config):
             createRes = self.createConf()
@@ -115,6 +127,8 @@ class core():
             config.set('webdav', 'rpass', 'None')
             config.set('webdav', 'webdav_root', '/')
             config.set('webdav', 'share', '/synced')
+            config.set('webdav', 'handshake', 'propfind')
+            config.set('webdav', 'connecttimeout', '10')
 
         try:
             config.add_section('logging')
@@ -125,6 +139,60 @@ class core():
             config.set('logging', 'logdst', 'console')
             config.set('logging', 'logfilepath', '/var/log/')
 
+        try:
+            config.add_section('transfer')
+        except configparser.DuplicateSectionError:
+            print("INFO: Section 'transfer' already exist, nothing to do.")
+        else:
+            action = True
+            config.set('transfer', 'jobs', '1')
+            config.set('transfer', 'pool', 'thread')
+            config.set('transfer', 'maxconn', '8')
+            config.set('transfer', 'idletime', '60')
+            config.set('transfer', 'segments', '1')
+            config.set('transfer', 'segthreshold', '67108864')
+            config.set('transfer', 'chunking', 'none')
+            config.set('transfer', 'chunksize', '10485760')
+            config.set('transfer', 'checksums', 'True')
+            config.set('transfer', 'retries', '3')
+            config.set('transfer', 'retrywait', '0.5')
+            config.set('transfer', 'filebudget', '10')
+            config.set('transfer', 'maxrecv', '0')
+            config.set('transfer', 'maxsend', '0')
+            config.set('transfer', 'filerecv', '0')
+            config.set('transfer', 'filesend', '0')
+            config.set('transfer', 'schedule', '')
+
+        try:
+            config.add_section('cache')
+        except configparser.DuplicateSectionError:
+            print("INFO: Section 'cache' already exist, nothing to do.")
+        else:
+            action = True
+            config.set('cache', 'ttl', '30')
+            config.set('cache', 'size', '50000')
+
+        try:
+            config.add_section('index')
+        except configparser.DuplicateSectionError:
+            print("INFO: Section 'index' already exist, nothing to do.")
+        else:
+            action = True
+            config.set('index', 'enabled', 'False')
+            config.set('index', 'path', '')
+            config.set('index', 'ttl', '0')
+
+        try:
+            config.add_section('watch')
+        except configparser.DuplicateSectionError:
+            print("INFO: Section 'watch' already exist, nothing to do.")
+        else:
+            action = True
+            config.set('watch', 'backend', 'auto')
+            config.set('watch', 'delay', '0.5')
+            config.set('watch', 'batch', '500')
+            config.set('watch', 'interval', '2')
+
         if not action:
             part1 = "INFO: Nothing to do for {}.".format(str(self.__config))
             part2 = "If sections are empty, remove your config file"
@@ -237,6 +305,15 @@ class core():
                 "WARN: No WebDav remote sharing location defined, defaulting to {}.".format(
                     self.__webdavShare))
 
+        self.__handshake = configinfos.get(
+            'webdav', 'handshake', fallback='propfind')
+        try:
+            self.__connectTimeout = configinfos.getfloat(
+                'webdav', 'connecttimeout', fallback=10)
+        except BaseException:
+            self.__connectTimeout = 10
+            print('WARN: Unable to read connect timeout. Defaulting to 10.')
+
         self.__logDst = False
         if 'logging' not in configinfos:
             self.__logDst = '/var/log'
@@ -260,6 +337,115 @@ class core():
                         result = {'code': 1, 'content': msg}
                         return(result)
 
+        self.__transferPool = 'thread'
+        self.__maxConn = 8
+        self.__idleTime = 60
+        self.__segments = 1
+        self.__segThreshold = 67108864
+        self.__chunking = 'none'
+        self.__chunkSize = 10485760
+        self.__checksums = True
+        self.__retries = 3
+        self.__retryWait = 0.5
+        self.__fileBudget = 10
+        self.__rates = {}
+        if 'transfer' in configinfos:
+            if self.__jobs is None:
+                try:
+                    self.__jobs = configinfos.getint('transfer', 'jobs')
+                except BaseException:
+                    print('WARN: Unable to read transfer jobs. Defaulting to 1.')
+            try:
+                self.__transferPool = configinfos['transfer']['pool']
+            except BaseException:
+                self.__transferPool = 'thread'
+            try:
+                self.__maxConn = configinfos.getint(
+                    'transfer', 'maxconn', fallback=8)
+                self.__idleTime = configinfos.getint(
+                    'transfer', 'idletime', fallback=60)
+            except BaseException:
+                print('WARN: Unable to read connection pool settings. Using defaults.')
+            try:
+                self.__segments = configinfos.getint(
+                    'transfer', 'segments', fallback=1)
+                self.__segThreshold = configinfos.getint(
+                    'transfer', 'segthreshold', fallback=67108864)
+            except BaseException:
+                print('WARN: Unable to read segmented download settings. Using defaults.')
+            try:
+                self.__chunking = configinfos.get(
+                    'transfer', 'chunking', fallback='none')
+                self.__chunkSize = configinfos.getint(
+                    'transfer', 'chunksize', fallback=10485760)
+            except BaseException:
+                print('WARN: Unable to read chunked upload settings. Using defaults.')
+            try:
+                self.__checksums = configinfos.getboolean(
+                    'transfer', 'checksums', fallback=True)
+            except BaseException:
+                print('WARN: Unable to read checksums setting. Defaulting to True.')
+            try:
+                self.__retries = configinfos.getint(
+                    'transfer', 'retries', fallback=3)
+                self.__retryWait = configinfos.getfloat(
+                    'transfer', 'retrywait', fallback=0.5)
+                self.__fileBudget = configinfos.getint(
+                    'transfer', 'filebudget', fallback=10)
+            except BaseException:
+                print('WARN: Unable to read retry settings. Using defaults.')
+            # rates are checked by the client, 512K or 2M are valid too
+            for rate in ['maxrecv', 'maxsend', 'filerecv', 'filesend', 'schedule']:
+                if configinfos.get('transfer', rate, fallback=''):
+                    self.__rates[rate] = configinfos.get('transfer', rate)
+            if self.__chunking not in ['none', 'range', 'nextcloud']:
+                print('WARN: Unknown chunking {0}, chunked uploads disabled.'.format(
+                    self.__chunking))
+                self.__chunking = 'none'
+        if self.__jobs is None:
+            self.__jobs = 1
+
+        self.__cacheTtl = 30
+        self.__cacheSize = 50000
+        if 'cache' in configinfos:
+            try:
+                self.__cacheTtl = configinfos.getint('cache', 'ttl', fallback=30)
+                self.__cacheSize = configinfos.getint(
+                    'cache', 'size', fallback=50000)
+            except BaseException:
+                print('WARN: Unable to read cache settings. Using defaults.')
+
+        self.__indexed = False
+        self.__indexPath = None
+        self.__indexTtl = 0
+        if 'index' in configinfos:
+            try:
+                self.__indexed = configinfos.getboolean(
+                    'index', 'enabled', fallback=False)
+                self.__indexPath = configinfos.get(
+                    'index', 'path', fallback='') or None
+                self.__indexTtl = configinfos.getint('index', 'ttl', fallback=0)
+            except BaseException:
+                print('WARN: Unable to read index settings. Index disabled.')
+                self.__indexed = False
+
+        self.__watchBackend = 'auto'
+        self.__watchDelay = 0.5
+        self.__watchBatch = 500
+        self.__watchInterval = 2.0
+        if 'watch' in configinfos:
+            try:
+                self.__watchBackend = configinfos.get(
+                    'watch', 'backend', fallback='auto')
+                self.__watchDelay = configinfos.getfloat(
+                    'watch', 'delay', fallback=0.5)
+                self.__watchBatch = configinfos.getint(
+                    'watch', 'batch', fallback=500)
+                self.__watchInterval = configinfos.getfloat(
+                    'watch', 'interval', fallback=2.0)
+            except BaseException:
+                print('WARN: Unable to read watch settings. Using defaults.')
+
         self.__webdavClient = client.core(
             host=self.__webdavHost,
             login=self.__wedavLogin,
@@ -267,9 +453,27 @@ class core():
             root=self.__webdavRoot,
             logtype=self.__logType,
             logfile=self.__logDst,
-            verbosity=self.__mainVerbosity)
-
-        connected = self.__webdavClient.connect()
+            verbosity=self.__mainVerbosity,
+            jobs=self.__jobs,
+            pool=self.__transferPool,
+            maxconn=self.__maxConn,
+            idletime=self.__idleTime,
+            cachettl=self.__cacheTtl,
+            cachesize=self.__cacheSize,
+            segments=self.__segments,
+            segthreshold=self.__segThreshold,
+            chunking=self.__chunking,
+            chunksize=self.__chunkSize,
+            checksums=self.__checksums,
+            retries=self.__retries,
+            retrywait=self.__retryWait,
+            filebudget=self.__fileBudget,
+            handshake=self.__handshake,
+            connecttimeout=self.__connectTimeout,
+            **self.__rates)
+
+        # the handshake checks the share too
+        connected = self.__webdavClient.connect(self.__webdavShare)
         if connected['code'] == 1:
             self.__webdavClient.sendlog(msg=connected['reason'], level='warn')
             del(self.__webdavClient)
@@ -278,23 +482,79 @@ class core():
                 'content': connected['reason']}
             return(result)
 
-        res = self.__webdavClient.check(self.__webdavShare)
-        if res['code'] == 1:
-            self.__webdavClient.sendlog(msg=res['reason'], level='warn')
-            del(self.__webdavClient)
-            result = {'code': res['code'], 'content': res['reason']}
-            return(result)
+        self.__catalog = None
+        if self.__indexed:
+            if self.__indexPath:
+                self.__indexPath = fpath.expanduser(self.__indexPath)
+            self.__catalog = catalog.catalog(
+                self.__webdavClient, self.__webdavShare,
+                dbpath=self.__indexPath, ttl=self.__indexTtl, host=self.__webdavHost, root=self.__webdavRoot)
 
         result = {'code': 0}
         return(result)
 
-    def remote_list(self):
+    def capabilities(self):
+        '''
+         Capabilities of the Webdav server, see client.core.capabilities()
+
+         :returns: it will returns result 'code' and 'content'
+         :rtype: dict
+        '''
+
+        found = self.__webdavClient.capabilities()
+        if 'code' in found:
+            return({'code': found['code'], 'content': found['reason']})
+        return({'code': 0, 'content': found})
+
+    def reset(self):
+        '''
+         Start a new command on a connected client: forget the last error
+         and the requests counted so far, draw progress if the current
+         standard error is a terminal
+
+         :returns: it will returns result 'code'
+         :rtype: dict
+        '''
+
+        self.__webdavClient.reset()
+        metrics.shared().reset()
+        progress.shared().enabled = sys.stderr.isatty()
+        return({'code': 0})
+
+    def __catalogued(self, path, fresh):
+        '''
+         Tell if the local index answers for path, refreshing it first
+        '''
+
+        if self.__catalog is None or fresh or not self.__catalog.covers(path):
+            return(False)
+        refreshed = self.__catalog.refresh()
+        if refreshed['code'] == 1:
+            if not self.__catalog.ready():
+                self.__webdavClient.sendlog(
+                    msg=refreshed['reason'], level='warn')
+                return(False)
+            self.__webdavClient.sendlog(
+                msg='{0}, answering from the local index.'.format(
+                    refreshed['reason']), level='warn')
+        return(True)
+
+    def remote_list(self, fresh=False):
         '''
          List all files of the configuration file defined Webdav share
 
+         :param   fresh: ask the server even if the local index is enabled
+         :type    fresh: boolean
+         :default fresh: False
+
          :returns: it will returns result 'code' and 'content'
          :rtype: dict
         '''
+        if self.__catalogued(self.__webdavShare, fresh):
+            remotefiles = self.__catalog.members(self.__webdavShare)
+            if remotefiles is not None:
+                return({'code': 0, 'content': remotefiles})
+
         remotefiles = self.__webdavClient.list(self.__webdavShare)
         if 'code' in remotefiles:
             self.__webdavClient.sendlog(
@@ -307,13 +567,21 @@ class core():
 
         return(result)
 
-    def remote_search(self, matchword, path=False):
+    def remote_search(self, matchword, path=False, callback=None, fresh=False):
         '''
          Search for files recursively on configuration file defined Webdav share path
 
          :param matchword: Searching word
          :type  matchword: string
 
+         :param   callback: called with each file path found, as soon as known
+         :type    callback: function
+         :default callback: None
+
+         :param   fresh: ask the server even if the local index is enabled
+         :type    fresh: boolean
+         :default fresh: False
+
          :returns: It will returns result 'code' and 'content' if it fails
          :rtype: dict
 
@@ -321,14 +589,22 @@ class core():
          :rtype: list
         '''
 
+        if self.__catalogued(path or self.__webdavShare, fresh):
+            res_found = self.__catalog.search(matchword, path)
+            if callback is not None:
+                for found in res_found:
+                    callback(found)
+            return({'code': 0, 'content': res_found})
+
         if path:
           self.__webdavClient.sendlog(
           msg="Looking for {} under path '{}' in progress. Please wait...".format(matchword, path))
-          res_found = self.__webdavClient.search(target=matchword, path=path)
+          res_found = self.__webdavClient.search(
+              target=matchword, path=path, callback=callback)
         else:
           self.__webdavClient.sendlog(
               msg="Looking for {} under path '{}' in progress. Please wait...".format(matchword, self.__webdavShare))
-          res_found = self.__webdavClient.search(matchword)
+          res_found = self.__webdavClient.search(matchword, callback=callback)
 
         if 'code' in res_found:
             self.__webdavClient.sendlog(msg=res_found['reason'], level='warn')
@@ -379,6 +655,169 @@ class core():
             result = {'code': 0, 'content': ''}
         return(result)
 
+    def remote_read(self, remote, output, compress=False):
+        '''
+         Stream a Webdav file into a writable binary file object
+         (sys.stdout.buffer for example) without a temporary file
+
+         :param remote: Webdav remote file path to read
+         :type  remote: string
+
+         :param output: binary file object receiving the data
+         :type  output: file
+
+         :param   compress: ask the server for a compressed transfer
+         :type    compress: boolean
+         :default compress: False
+
+         :returns: It will returns result 'code' and 'content'
+         :rtype: dict
+        '''
+
+        rstream = self.__webdavClient.open_read(remote, compress=compress)
+        if isinstance(rstream, dict):
+            return({'code': rstream['code'], 'content': rstream['reason']})
+
+        try:
+            for chunk in rstream:
+                output.write(chunk)
+            output.flush()
+        except Exception as exception:
+            self.__webdavClient.sendlog(msg=exception, level='warn')
+            result = {'code': 1, 'content': exception}
+        else:
+            result = {'code': 0, 'content': ''}
+        finally:
+            rstream.close()
+        return(result)
+
+    def remote_write(self, source, remote, compress=False):
+        '''
+         Stream a readable binary file object (sys.stdin.buffer for
+         example) into a Webdav file without a temporary file
+
+         :param source: binary file object providing the data
+         :type  source: file
+
+         :param remote: Webdav remote file path to write
+         :type  remote: string
+
+         :param   compress: gzip the request body, the server must support it
+         :type    compress: boolean
+         :default compress: False
+
+         :returns: It will returns result 'code' and 'content'
+         :rtype: dict
+        '''
+
+        wstream = self.__webdavClient.open_write(remote, compress=compress)
+        if isinstance(wstream, dict):
+            return({'code': wstream['code'], 'content': wstream['reason']})
+
+        try:
+            # a failed read aborts the upload instead of committing it
+            with wstream:
+                while True:
+                    data = source.read(stream.CHUNKSIZE)
+                    if not data:
+                        break
+                    wstream.write(data)
+        except Exception as exception:
+            self.__webdavClient.sendlog(msg=exception, level='warn')
+            result = {'code': 1, 'content': exception}
+        else:
+            result = {'code': 0, 'content': ''}
+        return(result)
+
+    def sync(self, mode='both', local=False, remote=False, dryrun=False):
+        '''
+         Synchronize a local directory with a Webdav path, only sending,
+         fetching or deleting what changed since the last run
+
+         :param   mode: push (local to Webdav), pull (Webdav to local) or both
+         :type    mode: string
+         :default mode: 'both'
+
+         :param   local: local directory, config file localpath if not set
+         :type    local: string
+         :default local: False
+
+         :param   remote: Webdav path, config file share if not set
+         :type    remote: string
+         :default remote: False
+
+         :param   dryrun: only report what would be done
+         :type    dryrun: boolean
+         :default dryrun: False
+
+         :returns: It will returns result 'code' (2 when conflicts are
+                   left untouched) and 'content'
+         :rtype: dict
+        '''
+
+        if mode not in pysync.MODES:
+            msg = 'Unknown sync mode {0}, use one of {1}.'.format(
+                mode, ', '.join(pysync.MODES))
+            return({'code': 1, 'content': msg})
+
+        remote = remote or self.__webdavShare
+        indexed = None
+        if self.__catalog is not None and self.__catalog.covers(remote):
+            # the index asks the server for changes only
+            indexed = self.__catalog
+        engine = pysync.engine(
+            self.__webdavClient,
+            local or self.__localPath,
+            remote,
+            mode=mode,
+            sidecar=self.__checksums,
+            catalog=indexed)
+        try:
+            res = engine.run(dryrun=dryrun)
+        except (OSError, IOError) as exception:
+            self.__webdavClient.sendlog(msg=exception, level='warn')
+            return({'code': 1, 'content': exception})
+
+        return({'code': res['code'], 'content': res})
+
+    def watch(self, local=False, remote=False, until=None):
+        '''
+         Send the changes of a local directory to a Webdav path as they
+         happen, until interrupted. Removals are not sent.
+
+         :param   local: local directory, config file localpath if not set
+         :type    local: string
+         :default local: False
+
+         :param   remote: Webdav path, config file share if not set
+         :type    remote: string
+         :default remote: False
+
+         :param   until: called between events, stops watching when True
+         :type    until: callable
+         :default until: None
+
+         :returns: It will returns result 'code' and 'content'
+         :rtype: dict
+        '''
+
+        try:
+            watcher = pywatch.watcher(
+                self.__webdavClient,
+                local or self.__localPath,
+                remote or self.__webdavShare,
+                delay=self.__watchDelay,
+                batch=self.__watchBatch,
+                backend=self.__watchBackend,
+                interval=self.__watchInterval)
+        except ValueError as exception:
+            return({'code': 1, 'content': str(exception)})
+
+        res = watcher.run(until=until)
+        if res['code'] != 0:
+            self.__webdavClient.sendlog(msg=res['reason'], level='warn')
+        return({'code': res['code'], 'content': res})
+
     def remote_duplicate(self, src, dst):
         '''
          Duplicate a resource on Webdav where root is the
@@ -450,6 +889,110 @@ class core():
             result = {'code': 0, 'content': ''}
         return(result)
 
+    def __bulk(self, action, resources, dst=None):
+        '''
+         Expand share relative paths and globs then run a bulk operation,
+         sources go into the dst directory for move and duplicate
+        '''
+
+        patterns = ["{0}/{1}".format(self.__webdavShare, r) for r in resources]
+        paths = self.__webdavClient.expand(patterns)
+        if isinstance(paths, dict):
+            self.__webdavClient.reset()
+            return({'code': 1, 'content': paths['reason']})
+
+        if dst is None:
+            items = paths
+        else:
+            dest = "{0}/{1}".format(self.__webdavShare, dst)
+            items = [(p, "{0}/{1}".format(dest, fpath.basename(p)))
+                     for p in paths]
+
+        res = self.__webdavClient.bulk(action, items)
+        if 'results' not in res:
+            self.__webdavClient.reset()
+            return({'code': 1, 'content': res['reason']})
+        return({'code': res['code'], 'content': res['results']})
+
+    def remote_remove_many(self, resources):
+        '''
+         Delete many resources on Webdav where root is the
+         configuration file defined Webdav share path.
+
+         :param resources: Webdav target paths or glob patterns
+         :type  resources: list
+
+         :returns: It will returns result 'code' and 'content', a list of
+                   transfer.result (code 0 for each removed path)
+         :rtype: dict
+        '''
+
+        return(self.__bulk('delete', resources))
+
+    def remote_move_many(self, resources, dst):
+        '''
+         Move many resources into a Webdav directory where root is the
+         configuration file defined Webdav share path.
+
+         :param resources: Webdav source paths or glob patterns
+         :type  resources: list
+
+         :param dst: Webdav destination directory path
+         :type  dst: string
+
+         :returns: It will returns result 'code' and 'content', a list of
+                   transfer.result
+         :rtype: dict
+        '''
+
+        return(self.__bulk('move', resources, dst))
+
+    def remote_duplicate_many(self, resources, dst):
+        '''
+         Duplicate many resources into a Webdav directory where root is
+         the configuration file defined Webdav share path.
+
+         :param resources: Webdav source paths or glob patterns
+         :type  resources: list
+
+         :param dst: Webdav destination directory path
+         :type  dst: string
+
+         :returns: It will returns result 'code' and 'content', a list of
+                   transfer.result
+         :rtype: dict
+        '''
+
+        return(self.__bulk('duplicate', resources, dst))
+
+    def stats(self):
+        '''
+         Summary of the WebDAV requests sent so far, per operation and
+         HTTP method: count, errors, bytes and durations
+
+         :returns: It will returns result 'code' and 'content', a table
+         :rtype: dict
+        '''
+
+        return({'code': 0, 'content': metrics.shared().summary()})
+
+    def export_metrics(self, path):
+        '''
+         Write the WebDAV requests metrics to a file in the OpenMetrics
+         text format (e.g. for a node exporter textfile collector)
+
+         :param path: destination file path
+         :type  path: string
+
+         :returns: It will returns result 'code' and 'content'
+         :rtype: dict
+        '''
+
+        res = metrics.shared().export(path)
+        if res['code'] == 1:
+            self.__webdavClient.sendlog(msg=res['reason'], level='warn')
+        return({'code': res['code'], 'content': res['reason']})
+
     def get_localPath(self):
         '''
          Method that will give read access to localPath var
@@ -514,6 +1057,39 @@ class core():
         None,
         "Allow to interact with webdav remote path value")
 
+    def get_jobs(self):
+        '''
+         Method that will give read access to jobs var
+
+         :returns: It will returns the number of concurrent transfers
+         :rtype: int
+        '''
+
+        return(self.__jobs)
+
+    def set_jobs(self, jobs):
+        '''
+         Method that will give write access to jobs var,
+         a value set before connect() overrides the config file one,
+         a value set after applies to the next transfers
+
+         :param jobs: Number of files transferred concurrently
+         :type  jobs: int
+
+         :returns: None
+         :rtype: None
+        '''
+
+        self.__jobs = jobs
+        if self.__webdavClient is not None:
+            self.__webdavClient.jobs = jobs
+
+    jobs = property(
+        get_jobs,
+        set_jobs,
+        None,
+        "Allow to interact with concurrent transfers value")
+
 
 if __name__ == "__main__":
     pass
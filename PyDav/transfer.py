@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import threading
+from os import path as fpath
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from PyDav import progress
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav transfer scheduler which dispatches file transfers to workers
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# action is 'upload', 'download', 'put' or 'get', source and destination
+# are the paths given to the client.core method of the same name
+task = namedtuple('task', ['action', 'source', 'destination'])
+result = namedtuple(
+    'result', ['action', 'source', 'destination', 'code', 'reason'])
+
+# Worker state, one per thread (or per process for the process pool)
+_local = threading.local()
+
+
+def _init(factory, options, connect=True):
+    '''
+     Executor initializer, remembers how to build this worker client
+    '''
+
+    _local.factory = factory
+    _local.options = options
+    _local.connect = connect
+    _local.worker = None
+
+
+def _run(job):
+    '''
+     Run one transfer on the worker own webdav client
+    '''
+
+    if _local.worker is None:
+        worker = _local.factory(**_local.options)
+        if _local.connect:
+            connected = worker.connect()
+            if connected['code'] == 1:
+                return(result(
+                    job.action, job.source, job.destination,
+                    1, str(connected['reason'])))
+        _local.worker = worker
+
+    return(execute(_local.worker, job))
+
+
+def _size(res):
+    '''
+     Bytes moved by a finished transfer, read from its local file
+    '''
+
+    local = res.source if res.action in ['put', 'upload'] else res.destination
+    try:
+        return(fpath.getsize(local) if res.code == 0 else 0)
+    except OSError:
+        return(0)
+
+
+def execute(worker, job):
+    '''
+     Run one transfer on a connected client.core and reset its error
+     state so the next job can run
+    '''
+
+    worker.reset()
+    if job.action == 'download':
+        res = worker.download(job.source, job.destination)
+    elif job.action == 'get':
+        res = worker.get(job.source, job.destination)
+    elif job.action == 'put':
+        res = worker.put(job.source, job.destination)
+    else:
+        res = worker.upload(
+            local=job.source, remote=job.destination, recurse=True)
+    worker.reset()
+
+    return(result(
+        job.action, job.source, job.destination,
+        res['code'], str(res.get('reason', ''))))
+
+
+class scheduler():
+    '''
+     Run many file transfers concurrently. Each worker holds its own
+     client: process workers build and connect it with factory(**options),
+     thread workers get it from shared() when given, sharing connections
+     and metadata already known in this process.
+
+     :param factory: class (or picklable callable) building a client.core
+     :type  factory: class
+
+     :param options: keyword arguments given to factory
+     :type  options: dict
+
+     :param   jobs: number of workers
+     :type    jobs: int
+     :default jobs: 4
+
+     :param   pool: worker pool type (thread|process)
+     :type    pool: string
+     :default pool: 'thread'
+
+     :param   shared: callable returning a connected client for a thread
+                      worker (see client.core.worker)
+     :type    shared: function
+     :default shared: None
+
+     :returns: scheduler object
+     :rtype: obj
+    '''
+
+    def __init__(self, factory, options, jobs=4, pool='thread', shared=None):
+        self.__factory = factory
+        self.__options = dict(options)
+        self.__shared = shared
+        self.__jobs = max(1, int(jobs))
+        self.__process = pool == 'process'
+        if self.__process:
+            self.__executor = ProcessPoolExecutor
+        else:
+            self.__executor = ThreadPoolExecutor
+
+    def run(self, tasks):
+        '''
+         Transfer every task and wait for completion
+
+         :param tasks: list of transfer.task
+         :type  tasks: list
+
+         :returns: 'code', 'reason' and per file 'results' (transfer.result)
+         :rtype: dict
+        '''
+
+        tasks = list(tasks)
+        if not tasks:
+            return({'code': 0, 'reason': 'Nothing to transfer.', 'results': []})
+
+        jobs = min(self.__jobs, len(tasks))
+        initargs = (self.__factory, self.__options)
+        if not self.__process and self.__shared is not None:
+            initargs = (self.__shared, {}, False)
+        with self.__executor(
+                max_workers=jobs,
+                initializer=_init,
+                initargs=initargs) as executor:
+            if self.__process:
+                # worker processes cannot update this process progress line
+                meter = progress.shared()
+                results = []
+                for r in executor.map(_run, tasks):
+                    meter.complete(_size(r), r.code == 0)
+                    results.append(r)
+            else:
+                results = list(executor.map(_run, tasks))
+
+        failed = [r for r in results if r.code == 1]
+        if failed:
+            reason = '{0} of {1} transfers failed.'.format(
+                len(failed), len(results))
+            return({'code': 1, 'reason': reason, 'results': results})
+
+        reason = '{0} transfers done.'.format(len(results))
+        return({'code': 0, 'reason': reason, 'results': results})
+
+
+if __name__ == "__main__":
+    pass
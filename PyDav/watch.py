@@ -0,0 +1,775 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import hashlib
+from os import path as fpath
+try:
+    from PyDav import cache
+    from PyDav import metrics
+    from PyDav import sync
+    from PyDav import transfer
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Released"
+
+'''
+    PyDav watch mode: local changes sent to a Webdav path as they happen,
+    through inotify or by polling the local tree
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+BACKENDS = ['auto', 'inotify', 'poll']
+
+# seconds without event before a file is sent
+DELAY = 0.5
+
+# pending changes sent at once, whatever the delay
+BATCH = 500
+
+# seconds between two scans of the polling backend
+INTERVAL = 2.0
+
+# seconds a change may wait under a continuous flow of events
+MAXWAIT = 10.0
+
+# seconds the file system clock may lag behind time.time()
+SLACK = 0.1
+
+# bytes read from the inotify descriptor at once
+READSIZE = 1048576
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCHED = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+           IN_CREATE | IN_DELETE | IN_ONLYDIR | IN_DONT_FOLLOW |
+           IN_EXCL_UNLINK)
+
+# struct inotify_event header: wd, mask, cookie, name length
+_EVENT = struct.Struct('iIII')
+
+_libc = [None]
+
+
+def _inotify_calls():
+    '''
+     libc inotify functions through ctypes, None where they are missing
+    '''
+
+    if _libc[0] is None:
+        _libc[0] = False
+        if sys.platform.startswith('linux'):
+            try:
+                import ctypes
+                libc = ctypes.CDLL(None, use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [
+                    ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            except (OSError, AttributeError):
+                pass
+            else:
+                _libc[0] = (libc, ctypes)
+    return(_libc[0] or None)
+
+
+def available():
+    '''
+     Tell if inotify can be used on this system
+
+     :rtype: boolean
+    '''
+
+    return(_inotify_calls() is not None)
+
+
+def default_mark(localdir, remotedir):
+    '''
+     Default file keeping the time up to which the changes of a local
+     directory were sent to a remote path, in the user cache directory
+
+     :param localdir: watched local directory
+     :type  localdir: string
+
+     :param remotedir: Webdav path changes are sent to
+     :type  remotedir: string
+
+     :returns: mark file path
+     :rtype: string
+    '''
+
+    signature = '{0}|{1}'.format(
+        fpath.abspath(localdir), cache.normalize(remotedir))
+    key = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+    cachedir = os.environ.get('XDG_CACHE_HOME') or fpath.expanduser('~/.cache')
+    return(fpath.join(cachedir, 'pydav', 'watch-{0}.mark'.format(key)))
+
+
+def tree(top, since=None):
+    '''
+     Walk a local directory without building its listing, files first
+     changed after since only when it is given
+
+     :param top: local directory
+     :type  top: string
+
+     :param   since: epoch time in ns
+     :type    since: int
+     :default since: None
+
+     :returns: (relative path, is_dir) tuples
+     :rtype: generator
+    '''
+
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        try:
+            it = os.scandir(fpath.join(top, rel))
+        except OSError:
+            # removed since it was seen
+            continue
+        with it:
+            for e in it:
+                if sync.ignored(e.name):
+                    continue
+                child = fpath.join(rel, e.name)
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(child)
+                        if since is None:
+                            yield((child, True))
+                    elif e.is_file():
+                        if since is not None:
+                            st = e.stat()
+                            if max(st.st_mtime_ns, st.st_ctime_ns) <= since:
+                                continue
+                        yield((child, False))
+                except OSError:
+                    continue
+
+
+class inotify():
+    '''
+     Linux inotify descriptor read without blocking, raises OSError
+     when inotify is missing or out of instances
+
+     :returns: inotify object
+     :rtype: obj
+    '''
+
+    def __init__(self):
+        calls = _inotify_calls()
+        if calls is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+        self.__libc, ctypes = calls
+        self.__errno = ctypes.get_errno
+        self.__fd = self.__libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd < 0:
+            self.__raise('inotify_init1')
+        self.__poll = select.poll()
+        self.__poll.register(self.__fd, select.POLLIN)
+
+    def __raise(self, call, path=None):
+        code = self.__errno()
+        if path is None:
+            raise OSError(code, '{0}: {1}'.format(call, os.strerror(code)))
+        raise OSError(code, os.strerror(code), path)
+
+    def add(self, path):
+        '''
+         Watch a directory
+
+         :returns: watch descriptor
+         :rtype: int
+        '''
+
+        wd = self.__libc.inotify_add_watch(
+            self.__fd, os.fsencode(path), WATCHED)
+        if wd < 0:
+            self.__raise('inotify_add_watch', path)
+        return(wd)
+
+    def remove(self, wd):
+        # fails when the directory is gone already
+        self.__libc.inotify_rm_watch(self.__fd, wd)
+
+    def read(self, timeout):
+        '''
+         Wait up to timeout seconds for events
+
+         :returns: (wd, mask, cookie, name) tuples
+         :rtype: list
+        '''
+
+        if not self.__poll.poll(max(0, int(timeout * 1000))):
+            return([])
+        events = []
+        while True:
+            try:
+                data = os.read(self.__fd, READSIZE)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, size = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + size].rstrip(b'\0')
+                offset += size
+                events.append((wd, mask, cookie, os.fsdecode(name)))
+        return(events)
+
+    def close(self):
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
+
+
+class changes():
+    '''
+     Local changes waiting to be sent, coalesced: a path changed many
+     times is sent once, renames rewrite the pending paths and become a
+     remote MOVE unless the source was created since the last send.
+     Times are epoch seconds.
+    '''
+
+    def __init__(self):
+        self.__files = {}
+        self.__dirs = set()
+        self.__fresh = set()
+        self.__moves = []
+        self.__last = 0.0
+
+    def __len__(self):
+        return(len(self.__files) + len(self.__dirs) + len(self.__moves))
+
+    def last(self):
+        '''
+         Time of the latest change
+        '''
+
+        return(self.__last)
+
+    def first(self):
+        '''
+         Time of the oldest change waiting, None when nothing waits
+        '''
+
+        if not len(self):
+            return(None)
+        if self.__files:
+            return(min(self.__files.values()))
+        return(self.__last)
+
+    def changed(self, rel, now, created=False):
+        self.__files[rel] = now
+        if created:
+            self.__fresh.add(rel)
+        self.__last = now
+
+    def created(self, rel, now):
+        self.__dirs.add(rel)
+        self.__fresh.add(rel)
+        self.__last = now
+
+    def moved(self, source, destination, now):
+        prefix = '{0}/'.format(source)
+
+        def rebase(p):
+            if p == source:
+                return(destination)
+            if p.startswith(prefix):
+                return('{0}/{1}'.format(destination, p[len(prefix):]))
+            return(p)
+
+        fresh = source in self.__fresh
+        self.__files = dict(
+            (rebase(p), t) for p, t in self.__files.items())
+        self.__dirs = set(rebase(p) for p in self.__dirs)
+        self.__fresh = set(rebase(p) for p in self.__fresh)
+        if not fresh:
+            self.__moves.append((source, destination))
+        self.__last = now
+
+    def gone(self, rel, now):
+        '''
+         Forget a removed path and what is below it, the remote keeps it
+        '''
+
+        prefix = '{0}/'.format(rel)
+        for table in [self.__dirs, self.__fresh]:
+            for p in [p for p in table if p == rel or p.startswith(prefix)]:
+                table.discard(p)
+        for p in [p for p in self.__files if p == rel or p.startswith(prefix)]:
+            del(self.__files[p])
+        self.__last = now
+
+    def take(self, now, settle=0.0):
+        '''
+         Changes to send now, files changed less than settle seconds ago
+         keep waiting
+
+         :returns: moves (source, destination), new directories and files
+         :rtype: tuple
+        '''
+
+        moves, self.__moves = self.__moves, []
+        dirs = sorted(self.__dirs)
+        self.__dirs = set()
+        files = sorted(
+            p for p, t in self.__files.items() if now - t >= settle)
+        for p in files:
+            del(self.__files[p])
+        self.__fresh = set(p for p in self.__fresh if p in self.__files)
+        return(moves, dirs, files)
+
+
+class watcher():
+    '''
+     Send the changes of a local directory to a Webdav path as they
+     happen: new and modified files are uploaded by batches through the
+     transfer pool, renames become MOVE requests. Removals are not sent,
+     the remote keeps every file. Files changed while no watcher ran are
+     sent when the next one starts.
+
+     :param client: connected client.core
+     :type  client: obj
+
+     :param localdir: local directory to watch
+     :type  localdir: string
+
+     :param remotedir: Webdav path changes are sent to
+     :type  remotedir: string
+
+     :param   delay: seconds without event before a file is sent
+     :type    delay: float
+     :default delay: 0.5
+
+     :param   batch: pending changes sent at once, whatever the delay
+     :type    batch: int
+     :default batch: 500
+
+     :param   backend: auto (inotify when available), inotify or poll
+     :type    backend: string
+     :default backend: 'auto'
+
+     :param   interval: seconds between two scans when polling
+     :type    interval: float
+     :default interval: 2.0
+
+     :param   markpath: file keeping the time changes were sent up to
+     :type    markpath: string
+     :default markpath: default_mark()
+
+     :returns: watcher object
+     :rtype: obj
+    '''
+
+    def __init__(self, client, localdir, remotedir, delay=DELAY, batch=BATCH,
+                 backend='auto', interval=INTERVAL, markpath=None):
+        if backend not in BACKENDS:
+            raise ValueError('Unknown watch backend {0}'.format(backend))
+        self.__client = client
+        self.__local = fpath.abspath(localdir)
+        self.__remote = cache.normalize(remotedir)
+        self.__delay = max(0.0, float(delay))
+        self.__batch = max(1, int(batch))
+        self.__backend = backend
+        self.__interval = max(0.1, float(interval))
+        self.__markpath = markpath or default_mark(localdir, remotedir)
+        self.__pending = changes()
+        self.__notifier = None
+        self.__paths = {}
+        self.__moving = {}
+        self.__mark = None
+        self.__frozen = False
+        self.__known = None
+        self.__start = 0
+        self.__counts = {}
+
+    def __lpath(self, rel):
+        return(fpath.join(self.__local, rel))
+
+    def __rpath(self, rel):
+        return(fpath.normpath('{0}/{1}'.format(self.__remote, rel)))
+
+    def __log(self, msg, level='INFO'):
+        self.__client.reset()
+        self.__client.sendlog(msg=msg, level=level)
+
+    def __count(self, op, number=1):
+        self.__counts[op] = self.__counts.get(op, 0) + number
+
+    def __load(self):
+        try:
+            with open(self.__markpath) as markfile:
+                return(int(markfile.read().strip()))
+        except (OSError, ValueError):
+            return(None)
+
+    def __save(self, mark):
+        '''
+         Remember changes were sent up to mark (epoch ns), never going back
+        '''
+
+        if self.__frozen or (self.__mark is not None and mark <= self.__mark):
+            return
+        directory = fpath.dirname(self.__markpath)
+        try:
+            if directory and not fpath.isdir(directory):
+                os.makedirs(directory, 0o700, exist_ok=True)
+            temporary = '{0}.tmp'.format(self.__markpath)
+            with open(temporary, 'w') as markfile:
+                markfile.write(str(mark))
+            os.replace(temporary, self.__markpath)
+        except OSError as exception:
+            self.__log('Unable to save watch mark {0}: {1}'.format(
+                self.__markpath, exception), level='warn')
+        else:
+            self.__mark = mark
+
+    def __add(self, rel, strict=False):
+        '''
+         Watch one directory, False when it vanished. Running out of
+         watches raises OSError when strict, is logged otherwise.
+        '''
+
+        try:
+            wd = self.__notifier.add(self.__lpath(rel))
+        except OSError as exception:
+            if exception.errno in [errno.ENOENT, errno.ENOTDIR]:
+                return(False)
+            if strict:
+                raise
+            self.__log('Unable to watch {0}: {1}'.format(
+                self.__lpath(rel), exception), level='warn')
+            return(False)
+        self.__paths[wd] = rel
+        return(True)
+
+    def __unwatch(self, rel):
+        prefix = '{0}/'.format(rel)
+        for wd, p in list(self.__paths.items()):
+            if p == rel or p.startswith(prefix):
+                self.__notifier.remove(wd)
+                del(self.__paths[wd])
+
+    def __rewatch(self, source, destination):
+        prefix = '{0}/'.format(source)
+        for wd, p in list(self.__paths.items()):
+            if p == source:
+                self.__paths[wd] = destination
+            elif p.startswith(prefix):
+                self.__paths[wd] = '{0}/{1}'.format(
+                    destination, p[len(prefix):])
+
+    def __arrived(self, rel, now):
+        '''
+         A directory created or moved in: watched, created on the remote
+         with its content, which may predate the watch
+        '''
+
+        if not self.__add(rel):
+            return
+        self.__pending.created(rel, now)
+        for child, is_dir in tree(self.__lpath(rel)):
+            child = fpath.join(rel, child)
+            if is_dir:
+                # watched before its own content is listed
+                if self.__add(child):
+                    self.__pending.created(child, now)
+            else:
+                self.__pending.changed(child, now, created=True)
+            self.__due(now)
+
+    def __handle(self, events, now):
+        for wd, mask, cookie, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # events were lost, look for changes since the mark
+                self.__log('Watch of {0}: events lost, scanning.'.format(
+                    self.__local), level='warn')
+                self.__catchup(self.__mark or self.__start, now)
+                continue
+            base = self.__paths.get(wd)
+            if mask & IN_IGNORED:
+                self.__paths.pop(wd, None)
+                continue
+            if base is None or not name or sync.ignored(name):
+                continue
+            rel = fpath.join(base, name) if base else name
+            is_dir = bool(mask & IN_ISDIR)
+
+            if mask & IN_MOVED_FROM:
+                self.__moving[cookie] = (rel, is_dir, now)
+            elif mask & IN_MOVED_TO:
+                source = self.__moving.pop(cookie, None)
+                if source is None:
+                    if is_dir:
+                        self.__arrived(rel, now)
+                    else:
+                        self.__pending.changed(rel, now)
+                else:
+                    self.__pending.moved(source[0], rel, now)
+                    if is_dir:
+                        self.__rewatch(source[0], rel)
+            elif mask & IN_CREATE:
+                if is_dir:
+                    self.__arrived(rel, now)
+                else:
+                    self.__pending.changed(rel, now, created=True)
+            elif mask & (IN_MODIFY | IN_CLOSE_WRITE):
+                self.__pending.changed(rel, now)
+            elif mask & IN_DELETE:
+                self.__pending.gone(rel, now)
+            self.__due(now)
+
+        # moved out of the tree
+        for cookie, (rel, is_dir, when) in list(self.__moving.items()):
+            if now - when >= self.__delay:
+                del(self.__moving[cookie])
+                self.__pending.gone(rel, now)
+                if is_dir:
+                    self.__unwatch(rel)
+
+    def __catchup(self, since, known):
+        '''
+         Queue the files changed after since (epoch ns), changes are then
+         known up to known (epoch seconds), no mark is saved meanwhile
+        '''
+
+        self.__known = None
+        now = time.time()
+        for rel, is_dir in tree(self.__local, since=since):
+            if not is_dir:
+                self.__pending.changed(rel, now)
+                self.__due(now)
+        self.__known = known
+
+    def __due(self, now, final=False):
+        '''
+         Send the pending changes when they settled, waited long enough
+         or are too many to be kept
+        '''
+
+        waiting = len(self.__pending)
+        if not waiting:
+            return
+        if final or waiting >= self.__batch:
+            self.flush(now, force=True)
+        elif now - self.__pending.last() >= self.__delay:
+            self.flush(now)
+        elif now - self.__pending.first() >= max(MAXWAIT, self.__delay):
+            self.flush(now)
+
+    @metrics.operation('watch')
+    def flush(self, now=None, force=False):
+        '''
+         Send the pending changes: moves, new directories then files
+
+         :param   now: epoch time, changes are known up to it
+         :type    now: float
+         :default now: current time
+
+         :param   force: also send files which did not settle
+         :type    force: boolean
+         :default force: False
+
+         :returns: number of failed operations
+         :rtype: int
+        '''
+
+        now = time.time() if now is None else now
+        moves, dirs, files = self.__pending.take(
+            now, 0.0 if force else self.__delay)
+        failed = 0
+        puts = set(files)
+        uploads = []
+
+        for source, destination in moves:
+            self.__client.reset()
+            res = self.__client.move(
+                self.__rpath(source), self.__rpath(destination))
+            if res['code'] == 0:
+                self.__count('move')
+                continue
+            # not on the remote after all, sent instead
+            if fpath.isdir(self.__lpath(destination)):
+                uploads.append(transfer.task(
+                    'upload', self.__lpath(destination),
+                    self.__rpath(fpath.dirname(destination))))
+            else:
+                puts.add(destination)
+
+        for rel in sorted(set(dirs)):
+            if not fpath.isdir(self.__lpath(rel)):
+                continue
+            self.__client.reset()
+            if self.__client.createdir(self.__rpath(rel))['code'] == 0:
+                self.__count('mkcol')
+                continue
+            self.__client.reset()
+            found = self.__client.propfind(self.__rpath(rel), 0)
+            if isinstance(found, dict) or not any(e.is_dir for e in found):
+                failed += 1
+
+        tasks = uploads + [
+            transfer.task('put', self.__lpath(rel), self.__rpath(rel))
+            for rel in sorted(puts) if fpath.isfile(self.__lpath(rel))]
+        if tasks:
+            self.__client.reset()
+            res = self.__client.transfer(tasks)
+            results = res.get('results', [])
+            sent = len([r for r in results if r.code == 0])
+            self.__count('put', sent)
+            failed += len(tasks) - sent
+
+        self.__client.reset()
+        if failed:
+            self.__count('failed', failed)
+            self.__log('Watch of {0}: {1} changes not sent.'.format(
+                self.__local, failed), level='warn')
+            # the next watcher sends them again
+            self.__frozen = True
+
+        # sent up to the oldest change still waiting
+        if self.__known is not None:
+            oldest = self.__pending.first()
+            mark = self.__known if oldest is None else min(self.__known, oldest)
+            self.__save(int((mark - self.__delay - SLACK) * 1e9))
+        return(failed)
+
+    def stats(self):
+        '''
+         Operations done so far: move, mkcol, put and failed counts
+
+         :rtype: dict
+        '''
+
+        return(dict(self.__counts))
+
+    def run(self, until=None):
+        '''
+         Watch until interrupted, or until until() returns True
+
+         :param   until: called between events, stops watching when True
+         :type    until: callable
+         :default until: None
+
+         :returns: 'code', 'reason' and operation 'counts'
+         :rtype: dict
+        '''
+
+        if not fpath.isdir(self.__local):
+            return({'code': 1, 'reason': 'Local directory {0} not found.'.format(
+                self.__local), 'counts': {}})
+
+        self.__mark = self.__load()
+        started = time.time()
+        self.__start = int((started - SLACK) * 1e9)
+        self.__known = None
+        backend = 'poll'
+        if self.__backend != 'poll':
+            try:
+                self.__notifier = inotify()
+                self.__add('', strict=True)
+                for rel, is_dir in tree(self.__local):
+                    if is_dir:
+                        self.__add(rel, strict=True)
+            except OSError as exception:
+                self.__close()
+                if self.__backend == 'inotify':
+                    return({'code': 1, 'reason': 'Unable to watch {0}: {1}'.format(
+                        self.__local, exception), 'counts': {}})
+                self.__log('inotify unavailable ({0}), polling {1}.'.format(
+                    exception, self.__local), level='warn')
+            else:
+                backend = 'inotify'
+
+        self.__log('Watching {0} for {1} ({2}).'.format(
+            self.__local, self.__remote, backend))
+        try:
+            if self.__mark is not None:
+                # what changed while nobody watched
+                self.__catchup(self.__mark, started)
+            else:
+                self.__known = started
+            since = self.__start
+            while until is None or not until():
+                now = time.time()
+                if self.__notifier is not None:
+                    events = self.__notifier.read(self.__wait())
+                    read = time.time()
+                    self.__handle(events, read)
+                    self.__known = read
+                elif now - self.__known >= self.__interval:
+                    self.__catchup(since, now)
+                    since = int((now - SLACK) * 1e9)
+                else:
+                    time.sleep(self.__wait())
+                self.__due(time.time())
+            self.__due(time.time(), final=True)
+        finally:
+            self.__close()
+
+        counts = self.stats()
+        reason = 'Watch of {0} done: {1}.'.format(
+            self.__local,
+            ', '.join('{0} {1}'.format(v, k)
+                      for k, v in sorted(counts.items())) or 'no change')
+        return({'code': 1 if counts.get('failed') else 0, 'reason': reason,
+                'counts': counts})
+
+    def __wait(self):
+        '''
+         Seconds to wait for events before looking at the pending changes
+        '''
+
+        wait = self.__delay if len(self.__pending) else self.__interval
+        return(max(0.05, min(wait, self.__interval)))
+
+    def __close(self):
+        if self.__notifier is not None:
+            self.__notifier.close()
+            self.__notifier = None
+        self.__paths = {}
+
+
+if __name__ == "__main__":
+    pass
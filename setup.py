@@ -63,6 +63,8 @@ config = {
     'packages': ['PyDav'],
     'scripts': ['scripts/pydav-client'],
     'license': 'GNU GPLv3',
+    # socket.send_fds, namedtuple defaults, ThreadingHTTPServer
+    'python_requires': '>=3.9',
     'install_requires': [
         'argcomplete',
         'lxml',
@@ -82,7 +84,12 @@ config = {
         'License :: OSI Approved :: BSD License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
         'Topic :: Internet',
         'Topic :: Software Development :: Libraries :: Python Modules',
         'Topic :: Utilities']}
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import resource
+import tempfile
+import configparser
+import multiprocessing
+from os import path as fpath
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav transfer benchmarks against the local WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+curScriptDir = fpath.dirname(fpath.abspath(__file__))
+
+# run from a checkout without installing PyDav
+sys.path.insert(0, fpath.dirname(curScriptDir))
+sys.path.insert(0, curScriptDir)
+
+try:
+    import davserver
+    from PyDav import client
+    from PyDav import tools
+except BaseException:
+    print('Please Install PyDav library.')
+    exit(1)
+
+MIB = 1048576
+
+# workload sizes at scale 1
+SMALLFILES = 500
+SMALLSIZE = 4096
+HUGEFILES = 3
+HUGESIZE = 64 * MIB
+DEEPDEPTH = 6
+DEEPFANOUT = 2
+DEEPFILES = 3
+SEARCHFILES = 2000
+RESYNCFILES = 1000
+
+# seconds ratio above which a workload is reported as a regression
+TOLERANCE = 0.2
+
+
+def makefiles(directory, count, size, perdir=100):
+    '''
+     Write count files of size random bytes, perdir files per sub directory
+
+     :returns: list of file paths
+     :rtype: list
+    '''
+
+    paths = []
+    for i in range(count):
+        subdir = fpath.join(directory, 'd{0:03d}'.format(i // perdir))
+        os.makedirs(subdir, exist_ok=True)
+        local = fpath.join(subdir, 'f{0:05d}.bin'.format(i))
+        with open(local, 'wb') as f:
+            left = size
+            while left > 0:
+                f.write(os.urandom(min(left, MIB)))
+                left -= MIB
+        paths.append(local)
+    return(paths)
+
+
+def maketree(directory, depth, fanout, files, size):
+    '''
+     Write a tree of depth levels of fanout sub directories, each holding
+     files files
+
+     :returns: number of files written
+     :rtype: int
+    '''
+
+    count = 0
+    for i in range(files):
+        with open(fpath.join(directory, 'leaf{0}.txt'.format(i)), 'wb') as f:
+            f.write(os.urandom(size))
+        count += 1
+    if depth > 0:
+        for i in range(fanout):
+            subdir = fpath.join(directory, 'level{0}-{1}'.format(depth, i))
+            os.makedirs(subdir)
+            count += maketree(subdir, depth - 1, fanout, files, size)
+    return(count)
+
+
+def newclient(url, options):
+    webdav = client.core(
+        url, 'bench', 'bench', '/',
+        logtype='file',
+        logfile=fpath.join(options['workdir'], 'bench.log'),
+        jobs=options['jobs'],
+        maxconn=options['maxconn'],
+        segments=options['segments'])
+    connected = webdav.connect()
+    if connected['code'] == 1:
+        raise RuntimeError(connected['reason'])
+    return(webdav)
+
+
+def newtools(url, options, localpath, share):
+    config = configparser.ConfigParser()
+    config.read(fpath.join(curScriptDir, 'config.ini.example'))
+    config['DEFAULT']['localpath'] = localpath
+    config['webdav']['rhost'] = url
+    config['webdav']['rlogin'] = 'bench'
+    config['webdav']['rpass'] = 'bench'
+    config['webdav']['share'] = share
+    config['logging']['logdst'] = 'file'
+    config['logging']['logfilepath'] = fpath.join(options['workdir'], 'bench.log')
+    config['transfer']['jobs'] = str(options['jobs'])
+    config['transfer']['maxconn'] = str(options['maxconn'])
+    config['transfer']['segments'] = str(options['segments'])
+    configpath = fpath.join(options['workdir'], 'config.ini')
+    with open(configpath, 'w') as f:
+        config.write(f)
+
+    webdav = tools.core(configpath)
+    connected = webdav.connect()
+    if connected['code'] == 1:
+        raise RuntimeError(connected['content'])
+    return(webdav)
+
+
+def check(res):
+    if isinstance(res, dict) and res.get('code') == 1:
+        raise RuntimeError(res.get('reason', res.get('content')))
+    return(res)
+
+
+'''
+ Workloads: setup(root, options) prepares local and server files and
+ returns a state, run(url, options, state) is measured and returns the
+ bytes and files it transferred. Server files are written directly in
+ the served directory so setups do not count as requests.
+'''
+
+
+def setup_small_upload(root, options):
+    local = fpath.join(options['workdir'], 'small')
+    count = int(SMALLFILES * options['scale'])
+    makefiles(local, count, SMALLSIZE)
+    return({'local': local, 'files': count, 'bytes': count * SMALLSIZE})
+
+
+def run_small_upload(url, options, state):
+    check(newclient(url, options).upload(state['local'], '/'))
+    return(state['files'], state['bytes'])
+
+
+def setup_small_download(root, options):
+    count = int(SMALLFILES * options['scale'])
+    makefiles(fpath.join(root, 'smalldl'), count, SMALLSIZE)
+    return({'files': count, 'bytes': count * SMALLSIZE})
+
+
+def run_small_download(url, options, state):
+    local = fpath.join(options['workdir'], 'smalldl')
+    check(newclient(url, options).download('/smalldl', local))
+    return(state['files'], state['bytes'])
+
+
+def setup_huge_upload(root, options):
+    local = fpath.join(options['workdir'], 'huge')
+    size = int(HUGESIZE * options['scale'])
+    makefiles(local, HUGEFILES, size)
+    return({'local': local, 'files': HUGEFILES, 'bytes': HUGEFILES * size})
+
+
+def run_huge_upload(url, options, state):
+    check(newclient(url, options).upload(state['local'], '/'))
+    return(state['files'], state['bytes'])
+
+
+def setup_huge_download(root, options):
+    size = int(HUGESIZE * options['scale'])
+    makefiles(fpath.join(root, 'hugedl'), HUGEFILES, size)
+    return({'files': HUGEFILES, 'bytes': HUGEFILES * size})
+
+
+def run_huge_download(url, options, state):
+    local = fpath.join(options['workdir'], 'hugedl')
+    check(newclient(url, options).download('/hugedl', local))
+    return(state['files'], state['bytes'])
+
+
+def setup_deep_tree(root, options):
+    os.makedirs(fpath.join(root, 'deep'))
+    count = maketree(
+        fpath.join(root, 'deep'), DEEPDEPTH, DEEPFANOUT, DEEPFILES, SMALLSIZE)
+    return({'files': count, 'bytes': count * SMALLSIZE})
+
+
+def run_deep_tree(url, options, state):
+    webdav = newclient(url, options)
+    check(webdav.walk('/deep'))
+    check(webdav.download('/deep', fpath.join(options['workdir'], 'deep')))
+    return(state['files'], state['bytes'])
+
+
+def setup_search(root, options):
+    count = int(SEARCHFILES * options['scale'])
+    paths = makefiles(fpath.join(root, 'searched'), count, 16, perdir=50)
+    os.rename(paths[-1], fpath.join(fpath.dirname(paths[-1]), 'needle.txt'))
+    return({'files': count})
+
+
+def run_search(url, options, state):
+    webdav = newtools(url, options, options['workdir'], '/searched')
+    found = webdav.remote_search('needle')
+    if found['code'] == 1 or not found['content']:
+        raise RuntimeError('needle not found: {0}'.format(found['content']))
+    return(state['files'], 0)
+
+
+def setup_resync(root, options):
+    local = fpath.join(options['workdir'], 'resync')
+    count = int(RESYNCFILES * options['scale'])
+    makefiles(local, count, SMALLSIZE)
+    os.makedirs(fpath.join(root, 'resync'))
+    return({'local': local, 'files': count, 'primed': False})
+
+
+def run_resync(url, options, state):
+    webdav = newtools(url, options, state['local'], '/resync')
+    res = webdav.sync('both')
+    if res['code'] == 1:
+        raise RuntimeError(res['content'])
+    return(state['files'], 0)
+
+
+def prime_resync(url, options, state):
+    # first sync sends everything, only the second one is measured
+    run_resync(url, options, state)
+
+
+WORKLOADS = {
+    'small_upload': (setup_small_upload, None, run_small_upload),
+    'small_download': (setup_small_download, None, run_small_download),
+    'huge_upload': (setup_huge_upload, None, run_huge_upload),
+    'huge_download': (setup_huge_download, None, run_huge_download),
+    'deep_tree': (setup_deep_tree, None, run_deep_tree),
+    'search': (setup_search, None, run_search),
+    'resync': (setup_resync, prime_resync, run_resync)
+}
+
+
+def worker(name, url, options, state, channel):
+    '''
+     Run one workload in its own process so its peak RSS is its own
+    '''
+
+    os.environ['XDG_CACHE_HOME'] = options['workdir']
+    prime, run = WORKLOADS[name][1:]
+    try:
+        if prime is not None:
+            prime(url, options, state)
+        channel.send('ready')
+        channel.recv()
+        started = time.monotonic()
+        files, nbytes = run(url, options, state)
+        seconds = time.monotonic() - started
+    except Exception as exception:
+        channel.send({'error': str(exception)})
+        return
+    channel.send({
+        'seconds': seconds,
+        'files': files,
+        'bytes': nbytes,
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss})
+
+
+def percentile(values, ratio):
+    if not values:
+        return(0.0)
+    values = sorted(values)
+    return(values[min(len(values) - 1, int(round(ratio * (len(values) - 1))))])
+
+
+def measure(name, davsrv, options):
+    '''
+     Set a workload up, run it and gather client and server side metrics
+
+     :returns: workload metrics
+     :rtype: dict
+    '''
+
+    options = dict(options)
+    options['workdir'] = tempfile.mkdtemp(prefix='pydav-bench-', dir=options['tmpdir'])
+    state = WORKLOADS[name][0](davsrv.rootdir, options)
+
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe()
+    process = context.Process(
+        target=worker, args=(name, davsrv.url, options, state, child))
+    process.start()
+    try:
+        ready = parent.recv()
+        if ready != 'ready':
+            return(ready)
+        davsrv.reset()
+        parent.send('go')
+        metrics = parent.recv()
+    finally:
+        process.join()
+        shutil.rmtree(options['workdir'], ignore_errors=True)
+    if 'error' in metrics:
+        return(metrics)
+
+    timings = [t for values in davsrv.timings.values() for t in values]
+    seconds = max(metrics['seconds'], 1e-9)
+    metrics.update({
+        'throughput_bps': metrics['bytes'] / seconds,
+        'files_per_s': metrics['files'] / seconds,
+        'requests': dict(davsrv.requests),
+        'requests_total': sum(davsrv.requests.values()),
+        'latency_p50_ms': percentile(timings, 0.50) * 1000,
+        'latency_p99_ms': percentile(timings, 0.99) * 1000
+    })
+    return(metrics)
+
+
+def compare(results, baseline, tolerance):
+    '''
+     Print each workload time and request count against a baseline run
+
+     :returns: names of the workloads whose time or request count grew
+               more than tolerance allows
+     :rtype: list
+    '''
+
+    slower = []
+    print('{0:<16} {1:>10} {2:>10} {3:>8} {4:>10} {5:>10}'.format(
+        'workload', 'seconds', 'baseline', 'ratio', 'requests', 'baseline'),
+        file=sys.stderr)
+    for name, metrics in results['workloads'].items():
+        before = baseline.get('workloads', {}).get(name)
+        if 'error' in metrics or not before or 'error' in before:
+            continue
+        ratio = metrics['seconds'] / max(before['seconds'], 1e-9)
+        print('{0:<16} {1:>10.3f} {2:>10.3f} {3:>8.2f} {4:>10} {5:>10}'.format(
+            name, metrics['seconds'], before['seconds'], ratio,
+            metrics['requests_total'], before['requests_total']), file=sys.stderr)
+        if ratio > 1 + tolerance or metrics['requests_total'] > \
+                before['requests_total'] * (1 + tolerance):
+            slower.append(name)
+    return(slower)
+
+
+def argCommandline():
+    """
+    Manage cli script args
+    """
+    parser = argparse.ArgumentParser(
+        description='PyDav benchmarks against a local WebDAV stand-in server')
+    parser.add_argument(
+        "-w",
+        "--workloads",
+        action="store",
+        dest="workloads",
+        nargs='+',
+        choices=sorted(WORKLOADS),
+        default=list(WORKLOADS),
+        help=u"Workloads to run, all by default",
+        metavar='name')
+    parser.add_argument(
+        "--latency",
+        action="store",
+        dest="latency",
+        type=float,
+        default=0,
+        help=u"Milliseconds added by the server to each request",
+        metavar='20')
+    parser.add_argument(
+        "--bandwidth",
+        action="store",
+        dest="bandwidth",
+        type=int,
+        default=0,
+        help=u"Server bandwidth in bytes per second, 0 for no limit",
+        metavar='10485760')
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        dest="jobs",
+        type=int,
+        default=4,
+        help=u"Files transferred concurrently",
+        metavar='4')
+    parser.add_argument(
+        "--maxconn",
+        action="store",
+        dest="maxconn",
+        type=int,
+        default=8,
+        help=u"Keep-alive connections per host",
+        metavar='8')
+    parser.add_argument(
+        "--segments",
+        action="store",
+        dest="segments",
+        type=int,
+        default=1,
+        help=u"Byte ranges downloaded concurrently for huge files",
+        metavar='1')
+    parser.add_argument(
+        "--scale",
+        action="store",
+        dest="scale",
+        type=float,
+        default=1.0,
+        help=u"Multiply workload file counts (and huge file sizes)",
+        metavar='1.0')
+    parser.add_argument(
+        "-o",
+        "--output",
+        action="store",
+        dest="output",
+        type=str,
+        default=False,
+        help=u"Write results to this JSON file instead of stdout",
+        metavar='results.json')
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        action="store",
+        dest="baseline",
+        type=str,
+        default=False,
+        help=u"Compare with a previous JSON result, exit 1 on regressions",
+        metavar='baseline.json')
+    parser.add_argument(
+        "--tolerance",
+        action="store",
+        dest="tolerance",
+        type=float,
+        default=TOLERANCE,
+        help=u"Accepted slowdown ratio against the baseline",
+        metavar='0.2')
+    result = vars(parser.parse_args())
+    return(result)
+
+
+if __name__ == "__main__":
+    args = argCommandline()
+
+    tmpdir = tempfile.mkdtemp(prefix='pydav-bench-')
+    root = fpath.join(tmpdir, 'served')
+    os.makedirs(root)
+    davsrv = davserver.server(
+        root, latency=args['latency'] / 1000.0,
+        bandwidth=args['bandwidth']).start()
+
+    options = {
+        'jobs': args['jobs'],
+        'maxconn': args['maxconn'],
+        'segments': args['segments'],
+        'scale': args['scale'],
+        'tmpdir': tmpdir
+    }
+    results = {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'settings': {
+            'latency_ms': args['latency'],
+            'bandwidth_bps': args['bandwidth'],
+            'jobs': args['jobs'],
+            'maxconn': args['maxconn'],
+            'segments': args['segments'],
+            'scale': args['scale']
+        },
+        'workloads': {}
+    }
+    try:
+        for name in args['workloads']:
+            print('Running {0}...'.format(name), file=sys.stderr)
+            results['workloads'][name] = measure(name, davsrv, options)
+            if 'error' in results['workloads'][name]:
+                print('ERR: {0} failed: {1}'.format(
+                    name, results['workloads'][name]['error']), file=sys.stderr)
+    finally:
+        davsrv.stop()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    data = json.dumps(results, indent=2, sort_keys=True)
+    if args['output']:
+        with open(args['output'], 'w') as f:
+            f.write(data)
+    else:
+        print(data)
+
+    failed = [n for n, m in results['workloads'].items() if 'error' in m]
+    if args['baseline']:
+        with open(args['baseline']) as f:
+            slower = compare(results, json.load(f), args['tolerance'])
+        if slower:
+            print('WARN: regressions in {0}'.format(', '.join(slower)),
+                  file=sys.stderr)
+            exit(1)
+    exit(1 if failed else 0)
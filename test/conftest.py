@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import pytest
+import configparser
+from os import path as fpath
+
+from . import davserver
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav pytest fixtures: a local WebDAV stand-in server per test
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+@pytest.fixture(autouse=True)
+def cachehome(tmp_path, monkeypatch):
+    '''
+     Digest index and other caches kept out of the user home
+    '''
+
+    home = tmp_path / 'cache'
+    monkeypatch.setenv('XDG_CACHE_HOME', str(home))
+    return(home)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    '''
+     Directory served as Webdav root
+    '''
+
+    root = tmp_path / 'remote'
+    root.mkdir()
+    return(root)
+
+
+@pytest.fixture
+def local(tmp_path):
+    '''
+     Local directory for downloads and uploads
+    '''
+
+    work = tmp_path / 'local'
+    work.mkdir()
+    return(work)
+
+
+@pytest.fixture
+def dav(remote):
+    '''
+     Started stand-in server, its settings (dropafter, bandwidth...) may
+     be changed while it runs
+    '''
+
+    srv = davserver.server(str(remote)).start()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def config(dav, tmp_path):
+    '''
+     Factory writing a config.ini from config.ini.example for the stand-in
+     server, sections given as dicts override its settings
+    '''
+
+    def write(**sections):
+        settings = configparser.ConfigParser()
+        settings.read(fpath.join(fpath.dirname(__file__), 'config.ini.example'))
+        settings.set('DEFAULT', 'localpath', str(tmp_path / 'datas'))
+        settings.set('webdav', 'rhost', dav.url)
+        settings.set('logging', 'logdst', 'console')
+        for section, values in sections.items():
+            for key, value in values.items():
+                settings.set(section, key, str(value))
+        path = tmp_path / 'config.ini'
+        with open(str(path), 'w') as f:
+            settings.write(f)
+        return(str(path))
+
+    return(write)
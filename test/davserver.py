@@ -0,0 +1,828 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import gzip
+import hashlib
+import time
+import random
+import shutil
+import threading
+import argparse
+import re
+from os import path as fpath
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+from xml.etree import ElementTree
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import quote, unquote, urlsplit
+except ImportError:
+    print('Please use python3 to run the WebDAV stand-in server.')
+    exit(1)
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav local WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+curScriptDir = fpath.dirname(fpath.abspath(__file__))
+
+# Nextcloud chunking v2 upload collections
+UPLOADS = '/remote.php/dav/uploads/'
+
+# bytes sent at once when bandwidth is shaped
+SLICE = 65536
+
+# sync-collection tokens, followed by the change counter
+TOKEN = 'urn:pydav:sync:'
+
+
+class handler(BaseHTTPRequestHandler):
+    '''
+     Minimal WebDAV request handler serving server.rootdir
+    '''
+
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, without TCP_NODELAY each
+    # response would wait for the client delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def handle(self):
+        try:
+            BaseHTTPRequestHandler.handle(self)
+        except ConnectionError:
+            # the client gave up in the middle of a request (aborted upload)
+            self.close_connection = True
+
+    def parse_request(self):
+        self.started = time.monotonic()
+        parsed = BaseHTTPRequestHandler.parse_request(self)
+        if parsed and self.server.latency:
+            time.sleep(self.server.latency)
+        if parsed and self.server.unlucky():
+            # refused before reading the body, the connection cannot be reused
+            self.close_connection = True
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            return(False)
+        return(parsed)
+
+    def send(self, data):
+        '''
+         Write a response body at the server bandwidth
+        '''
+
+        if not self.server.bandwidth:
+            return(self.wfile.write(data))
+        for start in range(0, len(data), SLICE):
+            self.server.shape(min(SLICE, len(data) - start))
+            self.wfile.write(data[start:start + SLICE])
+
+    def local(self, href=None):
+        '''
+         Map request path (or a Destination href) to a local path
+        '''
+
+        urlpath = unquote(urlsplit(href or self.path).path)
+        relpath = fpath.normpath('/{0}'.format(urlpath)).lstrip('/')
+        return(fpath.join(self.server.rootdir, relpath))
+
+    def href(self, localpath):
+        relpath = fpath.relpath(localpath, self.server.rootdir)
+        relpath = '' if relpath == '.' else relpath
+        href = quote('/{0}'.format(relpath))
+        if fpath.isdir(localpath) and not href.endswith('/'):
+            href = '{0}/'.format(href)
+        return(href)
+
+    def etag(self, localpath):
+        st = os.stat(localpath)
+        return('"{0:x}-{1:x}"'.format(st.st_mtime_ns, st.st_size))
+
+    def touch_parents(self, localpath):
+        '''
+         Propagate modifications to parent collections etags
+        '''
+
+        parent = fpath.dirname(localpath)
+        while parent.startswith(self.server.rootdir):
+            try:
+                os.utime(parent)
+            except OSError:
+                break
+            self.server.changed(parent)
+            if parent == self.server.rootdir:
+                break
+            parent = fpath.dirname(parent)
+
+    def body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            data = b''
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    raise ConnectionAbortedError('request body cut short')
+                size = int(line.split(b';')[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                data += self.rfile.read(size)
+                self.rfile.readline()
+        else:
+            data = self.rfile.read(length) if length else b''
+        self.server.shape(len(data))
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            data = gzip.decompress(data)
+        return(data)
+
+    def reply(self, code, data=b'', headers=None):
+        self.send_response(code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if data and self.command != 'HEAD':
+            self.send(data)
+        self.server.count(self.command, time.monotonic() - self.started)
+
+    def propentry(self, localpath):
+        st = os.stat(localpath)
+        props = ['<d:getlastmodified>{0}</d:getlastmodified>'.format(
+            formatdate(st.st_mtime, usegmt=True))]
+        props.append('<d:getetag>{0}</d:getetag>'.format(
+            escape(self.etag(localpath))))
+        props.append('<d:creationdate>{0}</d:creationdate>'.format(
+            time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(st.st_ctime))))
+        if fpath.isdir(localpath):
+            props.append('<d:resourcetype><d:collection/></d:resourcetype>')
+        else:
+            props.append('<d:resourcetype/>')
+            props.append('<d:getcontentlength>{0}</d:getcontentlength>'.format(
+                st.st_size))
+            if self.server.checksums:
+                with open(localpath, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+                props.append(
+                    '<oc:checksums><oc:checksum>SHA1:{0}</oc:checksum>'
+                    '</oc:checksums>'.format(digest))
+        return(
+            '<d:response><d:href>{0}</d:href><d:propstat><d:prop>{1}'
+            '</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat>'
+            '</d:response>'.format(escape(self.href(localpath)), ''.join(props)))
+
+    def do_OPTIONS(self):
+        self.body()
+        headers = {
+            'DAV': '1, 2',
+            'Allow': 'OPTIONS, GET, HEAD, PUT, DELETE, MKCOL, COPY, MOVE, PROPFIND',
+            'Accept-Ranges': 'bytes' if self.server.ranges else 'none'}
+        if self.server.dasl:
+            headers['DASL'] = '<DAV:basicsearch>'
+        if self.server.synccollection:
+            headers['Allow'] = '{0}, REPORT'.format(headers['Allow'])
+        self.reply(200, headers=headers)
+
+    def do_SEARCH(self):
+        '''
+         RFC 5323 basicsearch limited to one scope and a displayname
+         like condition, matched without case like Nextcloud does
+        '''
+
+        body = self.body()
+        if not self.server.dasl:
+            return(self.reply(501))
+        try:
+            query = ElementTree.fromstring(body)
+            scope = query.find('.//{DAV:}scope/{DAV:}href').text
+            literal = query.find('.//{DAV:}like/{DAV:}literal').text
+        except (ElementTree.ParseError, AttributeError):
+            return(self.reply(400))
+        target = self.local(scope)
+        if not fpath.isdir(target):
+            return(self.reply(404))
+
+        pattern = ''.join(
+            '.*' if c == '%' else '.' if c == '_' else re.escape(c)
+            for c in literal)
+        like = re.compile('^{0}$'.format(pattern), re.IGNORECASE | re.DOTALL)
+        found = []
+        for dirpath, dirnames, filenames in os.walk(target):
+            dirnames.sort()
+            for f in dirnames + sorted(filenames):
+                if like.match(f):
+                    found.append(fpath.join(dirpath, f))
+
+        data = '<?xml version="1.0" encoding="utf-8"?>'
+        data += '<d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+        data += ''.join(self.propentry(f) for f in found)
+        data += '</d:multistatus>'
+        self.reply(207, data.encode('utf-8'), {
+            'Content-Type': 'application/xml; charset="utf-8"'})
+
+    def do_PROPFIND(self):
+        body = self.body()
+        target = self.local()
+        if not fpath.exists(target):
+            return(self.reply(404))
+
+        if b'supported-report-set' in body:
+            reports = ''
+            if self.server.synccollection:
+                reports = ('<d:supported-report><d:report><d:sync-collection/>'
+                           '</d:report></d:supported-report>')
+            data = (
+                '<?xml version="1.0" encoding="utf-8"?>'
+                '<d:multistatus xmlns:d="DAV:"><d:response>'
+                '<d:href>{0}</d:href><d:propstat><d:prop>'
+                '<d:supported-report-set>{1}</d:supported-report-set>'
+                '</d:prop><d:status>HTTP/1.1 200 OK</d:status></d:propstat>'
+                '</d:response></d:multistatus>'.format(
+                    escape(self.href(target)), reports))
+            return(self.reply(207, data.encode('utf-8'), {
+                'Content-Type': 'application/xml; charset="utf-8"'}))
+
+        depth = self.headers.get('Depth', 'infinity').lower()
+        if depth == 'infinity' and not self.server.infinity:
+            return(self.reply(403))
+
+        found = [target]
+        if fpath.isdir(target) and depth == '1':
+            found += [fpath.join(target, f) for f in sorted(os.listdir(target))]
+        elif fpath.isdir(target) and depth == 'infinity':
+            for dirpath, dirnames, filenames in os.walk(target):
+                dirnames.sort()
+                for f in dirnames + sorted(filenames):
+                    found.append(fpath.join(dirpath, f))
+
+        data = '<?xml version="1.0" encoding="utf-8"?>'
+        data += '<d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+        data += ''.join(self.propentry(f) for f in found)
+        data += '</d:multistatus>'
+        self.reply(207, data.encode('utf-8'), {
+            'Content-Type': 'application/xml; charset="utf-8"'})
+
+    def do_REPORT(self):
+        '''
+         RFC 6578 sync-collection of every resource below a collection,
+         changes since a token being those made through this server
+        '''
+
+        body = self.body()
+        if not self.server.synccollection:
+            return(self.reply(501))
+        try:
+            query = ElementTree.fromstring(body)
+        except ElementTree.ParseError:
+            return(self.reply(400))
+        if query.tag != '{DAV:}sync-collection':
+            return(self.reply(403))
+        target = self.local()
+        if not fpath.isdir(target):
+            return(self.reply(404 if not fpath.exists(target) else 403))
+
+        token = (query.findtext('{DAV:}sync-token') or '').strip()
+        found, removed, truncated, current = [], [], False, None
+        if token:
+            since = None
+            if token.startswith(TOKEN) and token[len(TOKEN):].isdigit():
+                since = int(token[len(TOKEN):])
+            changes, latest = self.server.changes(since)
+            if changes is None:
+                data = ('<?xml version="1.0" encoding="utf-8"?>'
+                        '<d:error xmlns:d="DAV:"><d:valid-sync-token/>'
+                        '</d:error>')
+                return(self.reply(403, data.encode('utf-8'), {
+                    'Content-Type': 'application/xml; charset="utf-8"'}))
+            below = '{0}/'.format(target.rstrip('/'))
+            paths = []
+            current = since
+            for seq, localpath in changes:
+                if not localpath.startswith(below):
+                    current = seq
+                    continue
+                if localpath not in paths:
+                    if self.server.synclimit and \
+                            len(paths) >= self.server.synclimit:
+                        truncated = True
+                        break
+                    paths.append(localpath)
+                current = seq
+            if not truncated:
+                current = latest
+            for localpath in sorted(paths):
+                if fpath.exists(localpath):
+                    found.append(localpath)
+                else:
+                    removed.append(localpath)
+        else:
+            current = self.server.changes(0)[1]
+            for dirpath, dirnames, filenames in os.walk(target):
+                dirnames.sort()
+                for f in dirnames + sorted(filenames):
+                    found.append(fpath.join(dirpath, f))
+
+        data = '<?xml version="1.0" encoding="utf-8"?>'
+        data += '<d:multistatus xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+        data += ''.join(self.propentry(f) for f in found)
+        data += ''.join(
+            '<d:response><d:href>{0}</d:href>'
+            '<d:status>HTTP/1.1 404 Not Found</d:status></d:response>'.format(
+                escape(quote('/{0}'.format(
+                    fpath.relpath(f, self.server.rootdir)))))
+            for f in removed)
+        if truncated:
+            data += (
+                '<d:response><d:href>{0}</d:href>'
+                '<d:status>HTTP/1.1 507 Insufficient Storage</d:status>'
+                '</d:response>'.format(escape(self.href(target))))
+        data += '<d:sync-token>{0}{1}</d:sync-token>'.format(TOKEN, current)
+        data += '</d:multistatus>'
+        self.reply(207, data.encode('utf-8'), {
+            'Content-Type': 'application/xml; charset="utf-8"'})
+
+    def do_HEAD(self):
+        target = self.local()
+        if not fpath.exists(target):
+            return(self.reply(404))
+        self.reply(200, headers={'ETag': self.etag(target)})
+
+    def do_GET(self):
+        target = self.local()
+        if not fpath.isfile(target):
+            return(self.reply(404))
+        with open(target, 'rb') as f:
+            data = f.read()
+
+        code = 200
+        etag = self.etag(target)
+        headers = {'ETag': etag}
+        ranged = self.headers.get('Range', '') if self.server.ranges else ''
+        ifrange = self.headers.get('If-Range')
+        lastmod = formatdate(os.stat(target).st_mtime, usegmt=True)
+        if self.server.ranges:
+            headers['Accept-Ranges'] = 'bytes'
+        if ranged.startswith('bytes=') and ifrange in [None, etag, lastmod]:
+            first, sep, last = ranged[6:].split(',')[0].partition('-')
+            start = int(first or 0)
+            if start >= len(data):
+                headers['Content-Range'] = 'bytes */{0}'.format(len(data))
+                return(self.reply(416, headers=headers))
+            end = min(int(last), len(data) - 1) if last else len(data) - 1
+            code = 206
+            headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(
+                start, end, len(data))
+            data = data[start:end + 1]
+        elif 'gzip' in self.headers.get('Accept-Encoding', ''):
+            data = gzip.compress(data)
+            headers['Content-Encoding'] = 'gzip'
+
+        if self.server.dropafter and len(data) > self.server.dropafter:
+            # flaky link: announce the whole body but hang up midway
+            self.send_response(code)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.send(data[:self.server.dropafter])
+            self.server.count(self.command, time.monotonic() - self.started)
+            self.close_connection = True
+            return(None)
+
+        self.reply(code, data, headers)
+
+    def do_PUT(self):
+        target = self.local()
+        data = self.body()
+        if self.server.exhausted():
+            # interrupted upload: the next PUT requests are refused
+            return(self.reply(503))
+        if not fpath.isdir(fpath.dirname(target)):
+            return(self.reply(409))
+        created = not fpath.exists(target)
+
+        # partial PUT: write the chunk at its offset
+        ranged = self.headers.get('Content-Range', '')
+        if ranged.startswith('bytes '):
+            if not self.server.partialput:
+                return(self.reply(400))
+            start = int(ranged[6:].split('-')[0])
+            with open(target, 'r+b' if not created else 'wb') as f:
+                f.seek(start)
+                f.write(data)
+            self.touch_parents(target)
+            self.server.changed(target)
+            return(self.reply(
+                201 if created else 204, headers={'ETag': self.etag(target)}))
+
+        with open(target, 'wb') as f:
+            f.write(data)
+        self.touch_parents(target)
+        self.server.changed(target)
+        self.reply(201 if created else 204, headers={'ETag': self.etag(target)})
+
+    def do_DELETE(self):
+        self.body()
+        target = self.local()
+        if not fpath.exists(target):
+            return(self.reply(404))
+        if fpath.isdir(target):
+            shutil.rmtree(target)
+        else:
+            os.remove(target)
+        self.touch_parents(target)
+        self.server.changed(target)
+        self.reply(204)
+
+    def do_MKCOL(self):
+        self.body()
+        target = self.local()
+        if fpath.exists(target):
+            return(self.reply(405))
+        if self.server.chunking and self.path.startswith(UPLOADS):
+            # Nextcloud creates user upload folders on demand
+            os.makedirs(fpath.dirname(target.rstrip('/')), exist_ok=True)
+        if not fpath.isdir(fpath.dirname(target.rstrip('/'))):
+            return(self.reply(409))
+        os.mkdir(target)
+        self.touch_parents(target.rstrip('/'))
+        self.server.changed(target.rstrip('/'))
+        self.reply(201)
+
+    def assemble(self, source, dest):
+        '''
+         Nextcloud chunking v2: MOVE of <upload>/.file concatenates the
+         upload chunks onto the destination
+        '''
+
+        upload = fpath.dirname(source)
+        if not fpath.isdir(upload):
+            return(self.reply(404))
+        if not fpath.isdir(fpath.dirname(dest)):
+            return(self.reply(409))
+        existed = fpath.exists(dest)
+        with open(dest, 'wb') as f:
+            for chunk in sorted(os.listdir(upload)):
+                with open(fpath.join(upload, chunk), 'rb') as c:
+                    shutil.copyfileobj(c, f)
+        total = self.headers.get('OC-Total-Length')
+        if total is not None and os.stat(dest).st_size != int(total):
+            os.remove(dest)
+            return(self.reply(400))
+        shutil.rmtree(upload)
+        self.touch_parents(dest)
+        self.server.changed(dest)
+        self.reply(204 if existed else 201, headers={'ETag': self.etag(dest)})
+
+    def copy_or_move(self, move):
+        self.body()
+        source = self.local()
+        dest = self.local(self.headers.get('Destination'))
+        if move and self.server.chunking and self.path.startswith(UPLOADS) \
+                and fpath.basename(source) == '.file':
+            return(self.assemble(source, dest))
+        if not fpath.exists(source):
+            return(self.reply(404))
+        if not fpath.isdir(fpath.dirname(dest.rstrip('/'))):
+            return(self.reply(409))
+        existed = fpath.exists(dest)
+        if existed:
+            if self.headers.get('Overwrite', 'T').upper() == 'F':
+                return(self.reply(412))
+            if fpath.isdir(dest):
+                shutil.rmtree(dest)
+            else:
+                os.remove(dest)
+        if move:
+            shutil.move(source, dest)
+            self.touch_parents(source)
+        elif fpath.isdir(source):
+            shutil.copytree(source, dest)
+        else:
+            shutil.copy2(source, dest)
+        self.touch_parents(dest)
+        dest = dest.rstrip('/')
+        if move:
+            self.server.changed(source.rstrip('/'))
+        self.server.changed(dest)
+        for dirpath, dirnames, filenames in os.walk(dest):
+            self.server.changed(
+                *[fpath.join(dirpath, f) for f in dirnames + filenames])
+        self.reply(204 if existed else 201)
+
+    def do_COPY(self):
+        self.copy_or_move(move=False)
+
+    def do_MOVE(self):
+        self.copy_or_move(move=True)
+
+    def do_PROPPATCH(self):
+        self.body()
+        if not fpath.exists(self.local()):
+            return(self.reply(404))
+        # properties are not stored, they are only echoed back as accepted
+        data = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<d:multistatus xmlns:d="DAV:"><d:response>'
+            '<d:href>{0}</d:href><d:propstat><d:prop><public_url/></d:prop>'
+            '<d:status>HTTP/1.1 200 OK</d:status></d:propstat>'
+            '</d:response></d:multistatus>'.format(escape(self.path)))
+        self.reply(207, data.encode('utf-8'))
+
+
+class server(ThreadingHTTPServer):
+    '''
+     Local WebDAV stand-in server
+
+     :param rootdir: local directory served as Webdav root
+     :type  rootdir: string
+
+     :param   port: listening port, 0 picks a free one
+     :type    port: int
+     :default port: 0
+
+     :param   infinity: accept Depth: infinity PROPFIND
+     :type    infinity: boolean
+     :default infinity: True
+
+     :param   dropafter: close GET connections after this many body bytes
+     :type    dropafter: int
+     :default dropafter: 0 (never)
+
+     :param   ranges: answer GET Range requests with 206 partial contents
+     :type    ranges: boolean
+     :default ranges: True
+
+     :param   partialput: accept PUT with Content-Range
+     :type    partialput: boolean
+     :default partialput: True
+
+     :param   chunking: serve Nextcloud chunking v2 under /remote.php/dav/uploads/
+     :type    chunking: boolean
+     :default chunking: True
+
+     :param   checksums: return SHA1 oc:checksums of files in PROPFIND
+     :type    checksums: boolean
+     :default checksums: False
+
+     :param   latency: seconds waited before handling each request
+     :type    latency: float
+     :default latency: 0
+
+     :param   bandwidth: bytes per second shared by every request and
+                         response body, 0 for no limit
+     :type    bandwidth: int
+     :default bandwidth: 0
+
+     :param   failrate: share of requests refused with a 503 status
+     :type    failrate: float
+     :default failrate: 0
+
+     :param   dasl: answer SEARCH requests and announce it in OPTIONS
+     :type    dasl: boolean
+     :default dasl: False
+
+     :param   synccollection: answer sync-collection REPORT requests
+     :type    synccollection: boolean
+     :default synccollection: False
+
+     :param   synclimit: most changes sent in a sync-collection answer,
+                         the following ones being truncated, 0 for all
+     :type    synclimit: int
+     :default synclimit: 0
+
+     :param   maxputs: PUT requests stored before the next ones are
+                       refused with a 503 status, 0 for no limit
+     :type    maxputs: int
+     :default maxputs: 0
+    '''
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+            self, rootdir, port=0, infinity=True, verbose=False, dropafter=0,
+            ranges=True, partialput=True, chunking=True, checksums=False, latency=0,
+            bandwidth=0, failrate=0, dasl=False, synccollection=False,
+            synclimit=0, maxputs=0):
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', port), handler)
+        self.rootdir = fpath.abspath(rootdir)
+        self.infinity = infinity
+        self.verbose = verbose
+        self.dropafter = dropafter
+        self.ranges = ranges
+        self.partialput = partialput
+        self.chunking = chunking
+        self.checksums = checksums
+        self.latency = float(latency)
+        self.bandwidth = int(bandwidth)
+        self.failrate = float(failrate)
+        self.dasl = dasl
+        self.synccollection = synccollection
+        self.synclimit = int(synclimit)
+        self.maxputs = int(maxputs)
+        self.puts = 0
+        # (counter, local path) of every change made through the server
+        self.changelog = []
+        self.synctoken = 0
+        # same failures from one run to the other
+        self.__random = random.Random(0)
+        self.requests = {}
+        self.timings = {}
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__free = 0.0
+
+    @property
+    def url(self):
+        return('http://127.0.0.1:{0}'.format(self.server_address[1]))
+
+    def count(self, method, elapsed=None):
+        with self.__lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+            if elapsed is not None:
+                self.timings.setdefault(method, []).append(elapsed)
+
+    def changed(self, *localpaths):
+        '''
+         Log changes of local paths for sync-collection answers
+        '''
+
+        with self.__lock:
+            for localpath in localpaths:
+                self.synctoken += 1
+                self.changelog.append((self.synctoken, localpath))
+
+    def changes(self, since):
+        '''
+         Changes logged after the since counter and the last counter,
+         changes being None if since is not a known counter
+        '''
+
+        with self.__lock:
+            if since is None or since > self.synctoken:
+                return(None, self.synctoken)
+            return([c for c in self.changelog if c[0] > since], self.synctoken)
+
+    def reset(self):
+        '''
+         Forget request counts and timings
+        '''
+
+        with self.__lock:
+            self.requests = {}
+            self.timings = {}
+
+    def unlucky(self):
+        '''
+         Tell if the request being handled has to fail
+        '''
+
+        if not self.failrate:
+            return(False)
+        with self.__lock:
+            return(self.__random.random() < self.failrate)
+
+    def exhausted(self):
+        '''
+         Count a PUT request, tell if it is over maxputs
+        '''
+
+        if not self.maxputs:
+            return(False)
+        with self.__lock:
+            self.puts += 1
+            return(self.puts > self.maxputs)
+
+    def shape(self, nbytes):
+        '''
+         Wait for nbytes to go through the shaped link
+        '''
+
+        if not self.bandwidth or not nbytes:
+            return
+        with self.__lock:
+            now = time.monotonic()
+            start = max(now, self.__free)
+            self.__free = start + float(nbytes) / self.bandwidth
+            wait = self.__free - now
+        time.sleep(wait)
+
+    def start(self):
+        self.__thread = threading.Thread(target=self.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+        return(self)
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def argCommandline():
+    """
+    Manage cli script args
+    """
+    parser = argparse.ArgumentParser(description='WebDAV stand-in server')
+    parser.add_argument(
+        "-r",
+        "--root",
+        action="store",
+        dest="root",
+        type=str,
+        default=curScriptDir,
+        help=u"Directory served as Webdav root",
+        metavar='path/to/dir')
+    parser.add_argument(
+        "-p",
+        "--port",
+        action="store",
+        dest="port",
+        type=int,
+        default=8080,
+        help=u"Listening port",
+        metavar='8080')
+    parser.add_argument(
+        "--checksums",
+        action="store_true",
+        dest="checksums",
+        default=False,
+        help=u"Return SHA1 oc:checksums of files")
+    parser.add_argument(
+        "--latency",
+        action="store",
+        dest="latency",
+        type=float,
+        default=0,
+        help=u"Milliseconds waited before handling each request",
+        metavar='20')
+    parser.add_argument(
+        "--bandwidth",
+        action="store",
+        dest="bandwidth",
+        type=int,
+        default=0,
+        help=u"Bytes per second shared by all transfers, 0 for no limit",
+        metavar='1048576')
+    parser.add_argument(
+        "--failrate",
+        action="store",
+        dest="failrate",
+        type=float,
+        default=0,
+        help=u"Share of requests refused with a 503 status",
+        metavar='0.1')
+    parser.add_argument(
+        "--dasl",
+        action="store_true",
+        dest="dasl",
+        default=False,
+        help=u"Answer SEARCH requests (RFC 5323 basicsearch)")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        dest="synccollection",
+        default=False,
+        help=u"Answer sync-collection REPORT requests (RFC 6578)")
+    result = vars(parser.parse_args())
+    return(result)
+
+
+if __name__ == "__main__":
+    args = argCommandline()
+    davserver = server(
+        args['root'], args['port'], verbose=True, checksums=args['checksums'],
+        latency=args['latency'] / 1000.0, bandwidth=args['bandwidth'],
+        failrate=args['failrate'], dasl=args['dasl'],
+        synccollection=args['synccollection'])
+    print('Serving {0} on {1}'.format(davserver.rootdir, davserver.url))
+    try:
+        davserver.serve_forever()
+    except KeyboardInterrupt:
+        davserver.server_close()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import argparse
+import compileall
+import subprocess
+from os import path as fpath
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav start up budget: import time of the client script and
+    of the library, measured with python -X importtime
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+curScriptDir = fpath.dirname(fpath.abspath(__file__))
+checkout = fpath.dirname(curScriptDir)
+script = fpath.join(checkout, 'scripts', 'pydav-client')
+
+# modules only a command reaching the server may import
+NETWORK = ['PyDav.client', 'pycurl', 'webdav', 'lxml', 'ssl', 'sqlite3',
+           'asyncio']
+
+# name, arguments, extra environment, milliseconds, forbidden modules
+CASES = [
+    ('help', [script, '-h'], {}, 30, NETWORK + ['PyDav.daemon']),
+    ('completion', [script], {
+        '_ARGCOMPLETE': '1', 'COMP_LINE': 'pydav-client --up',
+        'COMP_POINT': '17', '_ARGCOMPLETE_IFS': ' ',
+        '_ARGCOMPLETE_STDOUT_FILENAME': os.devnull},
+     40, NETWORK + ['PyDav.daemon']),
+    ('tools', ['-c', 'import PyDav.tools'], {}, 30, NETWORK),
+    ('client', ['-c', 'import PyDav.client'], {}, 250, ['asyncio']),
+]
+
+
+def importtime(arguments, environ):
+    '''
+     Modules imported by a python run and their own import time
+
+     :returns: microseconds by module name
+     :rtype: dict
+    '''
+
+    env = dict(os.environ)
+    env.update(environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [checkout] + [p for p in [env.get('PYTHONPATH')] if p])
+    run = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + arguments, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+
+    modules = {}
+    for line in run.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = int(own)
+    return(modules)
+
+
+def argCommandline(argv):
+    parser = argparse.ArgumentParser(
+        description='PyDav start up budget check')
+    parser.add_argument(
+        '--runs', type=int, default=5,
+        help='runs per case, the fastest one is kept')
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='budget factor, for slow machines')
+    return(parser.parse_args(argv[1:]))
+
+
+if __name__ == "__main__":
+    args = argCommandline(sys.argv)
+
+    # installed packages come with their bytecode, compiling is not counted
+    compileall.compile_dir(fpath.join(checkout, 'PyDav'), quiet=1)
+
+    # modules every interpreter imports at start up are not counted
+    baseline = set(importtime(['-c', 'pass'], {}))
+
+    failures = 0
+    print('{0:<12} {1:>10} {2:>10}  {3}'.format(
+        'case', 'ms', 'budget', 'heaviest imports'))
+    for name, arguments, environ, budget, forbidden in CASES:
+        best = None
+        for run in range(max(1, args.runs)):
+            modules = importtime(arguments, environ)
+            spent = sum(
+                us for m, us in modules.items() if m not in baseline) / 1000.0
+            if best is None or spent < best[0]:
+                best = (spent, modules)
+
+        spent, modules = best
+        budget = budget * args.scale
+        heaviest = sorted(
+            [(us, m) for m, us in modules.items() if m not in baseline],
+            reverse=True)[:3]
+        print('{0:<12} {1:>10.1f} {2:>10.1f}  {3}'.format(
+            name, spent, budget,
+            ', '.join('{0} {1:.1f}'.format(m, us / 1000.0)
+                      for us, m in heaviest)))
+
+        if spent > budget:
+            print('  FAIL: over budget')
+            failures += 1
+        leaked = sorted(
+            m for m in modules
+            if any(m == f or m.startswith('{0}.'.format(f)) for f in forbidden))
+        if leaked:
+            print('  FAIL: imported {0}'.format(', '.join(leaked)))
+            failures += 1
+
+    exit(1 if failures else 0)
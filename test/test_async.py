@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import asyncio
+import pytest
+
+from PyDav import client
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav AsyncCore tests against the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+SIZE = 4 * 1024 * 1024
+
+
+async def started(path, timeout=10.0):
+    # wait for the first bytes of a download to reach the disk
+    waited = 0.0
+    while not (path.exists() and path.stat().st_size):
+        assert waited < timeout, '{0} never started'.format(path)
+        await asyncio.sleep(0.05)
+        waited += 0.05
+
+
+def test_download(dav, remote, local):
+    data = os.urandom(SIZE)
+    (remote / 'big.bin').write_bytes(data)
+
+    async def scenario():
+        async with client.AsyncCore(dav.url, 'u', 'p', '/') as dc:
+            return(await dc.download('/big.bin', str(local / 'big.bin')))
+
+    result = asyncio.run(scenario())
+    assert result['code'] == 0
+    assert (local / 'big.bin').read_bytes() == data
+    assert sorted(os.listdir(str(local))) == ['big.bin']
+
+
+def test_cancelled_download_cleanup(dav, remote, local):
+    data = os.urandom(SIZE)
+    (remote / 'big.bin').write_bytes(data)
+    # slow enough to be cancelled in the middle of the body
+    dav.bandwidth = SIZE // 4
+    target = local / 'big.bin'
+
+    async def scenario():
+        # a single connection: the next download needs the cancelled one back
+        async with client.AsyncCore(dav.url, 'u', 'p', '/', maxconn=1) as dc:
+            task = asyncio.ensure_future(dc.download('/big.bin', str(target)))
+            await started(local / 'big.bin.part')
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            leftovers = sorted(os.listdir(str(local)))
+
+            dav.bandwidth = 0
+            result = await asyncio.wait_for(
+                dc.download('/big.bin', str(target)), 30)
+            return(leftovers, result)
+
+    leftovers, result = asyncio.run(scenario())
+    assert leftovers == []
+    assert result['code'] == 0
+    assert target.read_bytes() == data
+
+
+def test_cancelled_directory_download_cleanup(dav, remote, local):
+    (remote / 'dir').mkdir()
+    for i in range(4):
+        (remote / 'dir' / 'f{0}.bin'.format(i)).write_bytes(os.urandom(SIZE))
+    dav.bandwidth = SIZE
+
+    async def scenario():
+        async with client.AsyncCore(dav.url, 'u', 'p', '/') as dc:
+            task = asyncio.ensure_future(
+                dc.download('/dir', str(local / 'dir')))
+            await started(local / 'dir' / 'f0.bin.part')
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(scenario())
+    assert os.listdir(str(local / 'dir')) == []
+
+
+def test_walk_root(dav, remote):
+    (remote / 'synced' / 'docs').mkdir(parents=True)
+    for name in ['synced/a.txt', 'synced/docs/report.txt', 'top.txt']:
+        (remote / name).write_bytes(b'x')
+
+    async def scenario():
+        async with client.AsyncCore(dav.url, 'u', 'p', '/') as dc:
+            return(await dc.walk('/'), await dc.walk('synced'),
+                   await dc.search('.txt'))
+
+    root, below, found = asyncio.run(scenario())
+    # same paths as the synchronous client
+    assert sorted(e.path for e in root) == [
+        '/synced', '/synced/a.txt', '/synced/docs', '/synced/docs/report.txt',
+        '/top.txt']
+    assert sorted(e.path for e in below) == [
+        'synced/a.txt', 'synced/docs', 'synced/docs/report.txt']
+    assert sorted(found) == [
+        '/synced/a.txt', '/synced/docs/report.txt', '/top.txt']
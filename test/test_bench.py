@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import sys
+import json
+import subprocess
+from os import path as fpath
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav benchmark harness smoke tests: every workload run at a
+    small scale and compared with a baseline
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+BENCH = fpath.join(fpath.dirname(fpath.abspath(__file__)), 'bench.py')
+
+WORKLOADS = ['deep_tree', 'huge_download', 'huge_upload', 'resync', 'search',
+             'small_download', 'small_upload']
+
+
+def bench(*args):
+    return(subprocess.run(
+        [sys.executable, BENCH, '--scale', '0.01'] + list(args),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, timeout=300))
+
+
+def test_workloads(tmp_path):
+    output = tmp_path / 'bench.json'
+    proc = bench('-o', str(output))
+    assert proc.returncode == 0, proc.stderr
+    results = json.loads(output.read_text())
+    assert results['settings']['scale'] == 0.01
+    assert sorted(results['workloads']) == WORKLOADS
+    for name, metrics in results['workloads'].items():
+        assert 'error' not in metrics, name
+        assert metrics['requests_total'] == sum(metrics['requests'].values())
+        assert metrics['seconds'] > 0
+    assert results['workloads']['small_upload']['requests'].get('PUT')
+    assert results['workloads']['huge_download']['bytes'] > 0
+
+
+def test_baseline(tmp_path):
+    output = tmp_path / 'bench.json'
+    proc = bench('-w', 'small_upload', '-o', str(output))
+    assert proc.returncode == 0, proc.stderr
+    results = json.loads(output.read_text())
+
+    # the same requests and ample time: no regression
+    same = results['workloads']['small_upload']
+    baseline = tmp_path / 'baseline.json'
+    same['seconds'] = 3600
+    baseline.write_text(json.dumps(results))
+    proc = bench('-w', 'small_upload', '-o', str(output), '-b', str(baseline))
+    assert proc.returncode == 0, proc.stderr
+    assert 'small_upload' in proc.stderr
+
+    # twice fewer requests before
+    same['requests_total'] //= 2
+    baseline.write_text(json.dumps(results))
+    proc = bench('-w', 'small_upload', '-o', str(output), '-b', str(baseline))
+    assert proc.returncode == 1
+    assert 'WARN: regressions in small_upload' in proc.stderr
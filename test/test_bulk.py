@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import subprocess
+import pytest
+from os import path as fpath
+
+from PyDav import client, listing, tools
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav bulk operations tests: glob expansion and concurrent
+    DELETE/MOVE/COPY requests against the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+CHECKOUT = fpath.dirname(fpath.dirname(fpath.abspath(__file__)))
+CLIENT = fpath.join(CHECKOUT, 'scripts', 'pydav-client')
+
+
+@pytest.fixture
+def tree(remote):
+    '''
+     /synced/build/{a.o, a.c, lib/b.o, lib/deep/c.o}, logs/{1.log, 2.log, x.txt}
+    '''
+
+    base = remote / 'synced'
+    for directory in ['build/lib/deep', 'logs']:
+        (base / directory).mkdir(parents=True)
+    for name in ['build/a.o', 'build/a.c', 'build/lib/b.o',
+                 'build/lib/deep/c.o', 'logs/1.log', 'logs/2.log',
+                 'logs/x.txt']:
+        (base / name).write_bytes(name.encode('utf-8'))
+    return(base)
+
+
+@pytest.fixture
+def dc(dav, tree):
+    core = client.core(dav.url, 'u', 'p', '/')
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+def outcome(res):
+    return(sorted((r.source, r.destination, r.code, r.reason)
+                  for r in res['results']))
+
+
+def test_glob_match():
+    assert listing.has_magic('a/*.o')
+    assert listing.has_magic('a/[ab]')
+    assert not listing.has_magic('a/b.o')
+    assert listing.glob_match(['a.o'], ['*.o'])
+    assert not listing.glob_match(['lib', 'b.o'], ['*.o'])
+    assert listing.glob_match(['lib', 'b.o'], ['**', '*.o'])
+    assert listing.glob_match(['b.o'], ['**', '*.o'])
+    assert listing.glob_match(['x', 'lib', 'y', 'b.o'], ['**', 'lib', '**', 'b.o'])
+    assert not listing.glob_match(['b.O'], ['*.o'])
+    assert listing.glob_match(['1.log'], ['[0-9].log'])
+    assert listing.glob_match(['1.log'], ['?.log'])
+
+
+def test_expand(dc):
+    assert dc.expand(['/synced/build/*.o']) == ['/synced/build/a.o']
+    assert sorted(dc.expand(['/synced/build/**/*.o'])) == [
+        '/synced/build/a.o', '/synced/build/lib/b.o',
+        '/synced/build/lib/deep/c.o']
+    assert dc.expand(['/synced/logs/?.log', '/synced/logs/[2].log']) == [
+        '/synced/logs/1.log', '/synced/logs/2.log']
+    # without wildcards, not checked
+    assert dc.expand(['/synced/missing', 'synced//logs/']) == [
+        '/synced/missing', '/synced/logs']
+    assert dc.expand(['/synced/nothing*']) == []
+
+
+def test_expand_matched_directory(dc):
+    # members of a matched directory go with it
+    assert dc.expand(['/synced/**/lib*', '/synced/build/**']) == [
+        '/synced/build/lib', '/synced/build/a.c', '/synced/build/a.o']
+    assert dc.expand(['/synced/build/lib', '/synced/build/lib/*.o']) == [
+        '/synced/build/lib']
+
+
+def test_delete(dc, tree):
+    paths = dc.expand(['/synced/build/**/*.o'])
+    res = dc.bulk('delete', paths + ['/synced/missing'])
+    assert res['code'] == 1
+    assert res['reason'] == '1 of 4 operations failed.'
+    assert outcome(res) == [
+        ('/synced/build/a.o', None, 0, 'Done'),
+        ('/synced/build/lib/b.o', None, 0, 'Done'),
+        ('/synced/build/lib/deep/c.o', None, 0, 'Done'),
+        ('/synced/missing', None, 1, 'Not found')]
+    assert sorted(os.listdir(str(tree / 'build'))) == ['a.c', 'lib']
+    assert os.listdir(str(tree / 'build' / 'lib' / 'deep')) == []
+
+    # the metadata cache forgets them
+    assert sorted(dc.list('/synced/build')) == ['a.c', 'lib/']
+
+
+def test_move(dc, tree):
+    dc.list('/synced/logs')
+    items = [(p, '/synced/archives/2017/{0}'.format(fpath.basename(p)))
+             for p in dc.expand(['/synced/logs/*.log'])]
+    res = dc.bulk('move', items, concurrency=2)
+    assert res['code'] == 0
+    assert res['reason'] == '2 operations done.'
+    # missing parents created
+    assert sorted(os.listdir(str(tree / 'archives' / '2017'))) == [
+        '1.log', '2.log']
+    assert os.listdir(str(tree / 'logs')) == ['x.txt']
+    assert dc.list('/synced/logs') == ['x.txt']
+
+
+def test_duplicate(dc, tree):
+    res = dc.bulk('duplicate', [
+        ('/synced/logs/x.txt', '/synced/build/x.txt'),
+        ('/synced/build/lib', '/synced/copy/lib')])
+    assert res['code'] == 0
+    assert (tree / 'build' / 'x.txt').read_bytes() == b'logs/x.txt'
+    assert (tree / 'copy' / 'lib' / 'deep' / 'c.o').exists()
+    # sources kept
+    assert (tree / 'logs' / 'x.txt').exists()
+    assert (tree / 'build' / 'lib' / 'b.o').exists()
+
+
+def test_bulk_nothing(dc):
+    assert dc.bulk('delete', []) == {
+        'code': 0, 'reason': 'Nothing to do.', 'results': []}
+    res = dc.bulk('erase', ['/synced/logs'])
+    assert res['code'] == 1
+    assert 'results' not in res
+
+
+def test_tools(config, tree):
+    pydav = tools.core(config())
+    assert pydav.connect()['code'] == 0
+    res = pydav.remote_duplicate_many(['logs/*.log', 'build/a.c'], 'kept')
+    assert res['code'] == 0
+    assert [r.destination for r in res['content']] == [
+        '/synced/kept/1.log', '/synced/kept/2.log', '/synced/kept/a.c']
+    res = pydav.remote_remove_many(['**/*.log'])
+    assert res['code'] == 0
+    assert len(res['content']) == 4
+    assert sorted(os.listdir(str(tree / 'kept'))) == ['a.c']
+
+
+def test_cli(config, tree, tmp_path):
+    configpath = config()
+    environ = dict(
+        os.environ, PYTHONPATH=CHECKOUT, XDG_RUNTIME_DIR=str(tmp_path))
+
+    def cli(*args, **kwargs):
+        done = subprocess.run(
+            [sys.executable, CLIENT, '-c', configpath] + list(args),
+            input=kwargs.get('stdin', b''), capture_output=True, env=environ)
+        return(done.returncode, done.stdout.decode('utf-8').splitlines())
+
+    code, lines = cli('-m', 'logs/*.log', 'logs/x.txt', 'old')
+    assert code == 0
+    assert sorted(lines) == [
+        'OK;/synced/logs/1.log;/synced/old/1.log;Done',
+        'OK;/synced/logs/2.log;/synced/old/2.log;Done',
+        'OK;/synced/logs/x.txt;/synced/old/x.txt;Done']
+
+    # paths from stdin
+    code, lines = cli('-r', '-', stdin=b'old/1.log\n\nold/missing\n')
+    assert code == 1
+    assert sorted(lines) == [
+        'FAIL;/synced/old/missing;Not found',
+        'OK;/synced/old/1.log;Done']
+    assert sorted(os.listdir(str(tree / 'old'))) == ['2.log', 'x.txt']
+
+    # a single path keeps the former output
+    code, lines = cli('-r', 'old/x.txt')
+    assert code == 0
+    assert not [l for l in lines if l.startswith('OK;')]
+    assert os.listdir(str(tree / 'old')) == ['2.log']
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import pytest
+
+from PyDav import cache, client, listing
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav remote metadata cache tests: expiry, etag revalidation
+    and invalidation by the client own changes
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class clock():
+    '''
+     time.time() stand-in moved forward by the tests
+    '''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return(self.now)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    fake = clock()
+    monkeypatch.setattr(cache.time, 'time', fake)
+    return(fake)
+
+
+def directory(path, etag='"d1"'):
+    return(listing.entry(path, True, None, None, etag, None))
+
+
+def item(path, etag='"f1"'):
+    return(listing.entry(path, False, 10, 1, etag, None))
+
+
+def test_normalize():
+    assert cache.normalize('a//b/') == '/a/b'
+    assert cache.normalize('/') == '/'
+    assert cache.normalize('') == '/'
+
+
+def test_ttl(now):
+    metadata = cache.metadata(ttl=30)
+    assert metadata.get('/f') == (False, None)
+    metadata.put(item('/f'))
+    assert metadata.get('f/') == (True, item('/f'))
+
+    now.now += 31
+    assert metadata.get('/f') == (False, None)
+    # kept for revalidation
+    assert metadata.etag('/f') == '"f1"'
+    assert (metadata.hits, metadata.misses) == (1, 2)
+
+
+def test_listing_proves_missing(now):
+    metadata = cache.metadata(ttl=30)
+    metadata.fill('/d', [directory('/d'), item('/d/f')], 1)
+    assert metadata.get('/d/missing') == (True, None)
+    assert [e.path for e in metadata.members('/d')] == ['/d/f']
+    # below a member not listed
+    assert metadata.get('/d/f/g') == (False, None)
+
+    now.now += 31
+    assert metadata.get('/d/missing') == (False, None)
+    assert metadata.members('/d') is None
+
+
+def test_depth_infinity(now):
+    metadata = cache.metadata()
+    metadata.fill('/', [
+        directory('/'), directory('/a'), item('/a/f'), directory('/a/b')], 'infinity')
+    assert sorted(e.path for e in metadata.members('/a')) == ['/a/b', '/a/f']
+    assert metadata.members('/a/b') == []
+    # a Depth 1 listing only proves its own members
+    metadata.fill('/c', [directory('/c'), directory('/c/d')], 1)
+    assert metadata.members('/c/d') is None
+
+
+def test_etag_revalidation(now):
+    metadata = cache.metadata(ttl=30)
+    metadata.fill('/d', [directory('/d'), item('/d/f')], 1)
+
+    now.now += 31
+    assert metadata.members('/d') is None
+    # same collection etag, members asked again one by one
+    metadata.put(directory('/d'))
+    metadata.put(item('/d/f'))
+    assert [e.path for e in metadata.members('/d')] == ['/d/f']
+
+    now.now += 31
+    metadata.put(directory('/d', etag='"d2"'))
+    metadata.put(item('/d/f'))
+    # changed collection: its listing is dropped
+    assert metadata.members('/d') is None
+
+
+def test_invalidate(now):
+    metadata = cache.metadata()
+    metadata.fill('/', [
+        directory('/'), directory('/d'), item('/d/f'), item('/d/g'),
+        directory('/d/sub'), item('/d/sub/h')], 'infinity')
+
+    # written: asked again, the parent listing keeps it
+    metadata.invalidate('/d/f', exists=True)
+    assert metadata.get('/d/f') == (False, None)
+    assert metadata.get('/d') == (False, None)
+    assert metadata.members('/d') is None
+    assert metadata.get('/d/missing') == (True, None)
+
+    # removed: known missing
+    metadata.invalidate('/d/g', exists=False)
+    assert metadata.get('/d/g') == (True, None)
+
+    # unknown: the parent listing goes
+    metadata.invalidate('/d/sub')
+    assert metadata.get('/d/sub/h') == (False, None)
+    assert metadata.get('/d/missing') == (False, None)
+    assert metadata.get('/') == (True, directory('/'))
+
+
+def test_bound(now):
+    metadata = cache.metadata(maxsize=2)
+    for name in ['/a', '/b', '/c']:
+        metadata.put(item(name))
+    # least recently used first
+    assert metadata.get('/a') == (False, None)
+    assert metadata.get('/c')[0]
+
+    metadata.get('/b')
+    metadata.put(item('/d'))
+    assert metadata.get('/b')[0]
+    assert not metadata.get('/c')[0]
+
+
+@pytest.fixture
+def dc(dav, remote):
+    (remote / 'd').mkdir()
+    (remote / 'd' / 'f').write_bytes(b'one')
+    core = client.core(dav.url, 'u', 'p', '/', cachettl=300)
+    assert core.connect()['code'] == 0
+    assert sorted(core.list('/d')) == ['f']
+    return(core)
+
+
+def test_client_trusts_cache(dc, remote):
+    (remote / 'd' / 'other').write_bytes(b'two')
+    assert sorted(dc.list('/d')) == ['f']
+
+
+def test_client_invalidates_put(dc, local):
+    (local / 'g').write_bytes(b'two')
+    assert dc.upload(str(local / 'g'), '/d')['code'] == 0
+    assert sorted(dc.list('/d')) == ['f', 'g']
+    assert dc.getinfo('/d/g')['size'] == 3
+
+
+def test_client_invalidates_overwrite(dc, local):
+    assert dc.getinfo('/d/f')['size'] == 3
+    (local / 'f').write_bytes(b'longer')
+    assert dc.upload(str(local / 'f'), '/d')['code'] == 0
+    assert dc.getinfo('/d/f')['size'] == 6
+
+
+def test_client_invalidates_delete(dc):
+    assert dc.delete('/d/f')['code'] == 0
+    dc.reset()
+    assert dc.list('/d') == []
+    assert dc.getinfo('/d/f')['code'] == 1
+
+
+def test_client_invalidates_move(dc, remote):
+    dc.createdir('/e')
+    assert dc.move('/d/f', '/e/f')['code'] == 0
+    assert dc.list('/d') == []
+    assert dc.list('/e') == ['f']
+    dc.reset()
+    assert dc.duplicate('/e/f', '/d/f')['code'] == 0
+    assert dc.list('/d') == ['f']
+    assert (remote / 'd' / 'f').read_bytes() == b'one'
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import shutil
+import subprocess
+import pytest
+from os import path as fpath
+
+from PyDav import catalog, client, tools
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav local index tests: listings and searches answered from
+    the SQLite catalog, refreshed from changed collections or
+    sync-collection reports, rebuilt with --fresh
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+CHECKOUT = fpath.dirname(fpath.dirname(fpath.abspath(__file__)))
+CLIENT = fpath.join(CHECKOUT, 'scripts', 'pydav-client')
+
+
+@pytest.fixture
+def tree(remote):
+    '''
+     /synced/a.txt, docs/report.pdf, docs/old/archive.zip, pics/cat.png
+    '''
+
+    base = remote / 'synced'
+    for directory in ['docs/old', 'pics']:
+        (base / directory).mkdir(parents=True)
+    for name in ['a.txt', 'docs/report.pdf', 'docs/old/archive.zip',
+                 'pics/cat.png']:
+        (base / name).write_bytes(name.encode('utf-8'))
+    return(base)
+
+
+def connected(dav):
+    # no metadata cache: every refresh asks the server
+    core = client.core(dav.url, 'u', 'p', '/', cachettl=0)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+@pytest.fixture
+def writer(dav):
+    '''
+     Another client: its changes reach the parent collections etags
+    '''
+
+    return(connected(dav))
+
+
+@pytest.fixture
+def index(dav, tree, tmp_path):
+    found = catalog.catalog(
+        connected(dav), '/synced', dbpath=str(tmp_path / 'tree.db'))
+    yield found
+    found.close()
+
+
+def test_default_catalog(cachehome):
+    path = catalog.default_catalog('h:80', '/', '/synced/')
+    assert path == catalog.default_catalog('h:80', '/', 'synced')
+    assert path != catalog.default_catalog('h:80', '/', '/other')
+    assert fpath.dirname(path) == str(cachehome / 'pydav')
+
+
+def test_build(index):
+    assert not index.ready()
+    assert index.members() is None
+    res = index.refresh()
+    assert res['code'] == 0, res['reason']
+    assert index.ready()
+
+    assert index.members() == ['a.txt', 'docs/', 'pics/']
+    assert index.members('/synced/docs') == ['old/', 'report.pdf']
+    assert index.members('/synced/a.txt') is None
+    assert [e.path for e in index.entries('/synced/docs')] == [
+        '/synced/docs/old', '/synced/docs/old/archive.zip',
+        '/synced/docs/report.pdf']
+    assert index.covers('/synced/docs/')
+    assert not index.covers('/synced2')
+
+
+def test_search(index):
+    assert index.refresh()['code'] == 0
+    assert index.search('report') == ['/synced/docs/report.pdf']
+    # exact case
+    assert index.search('REPORT') == []
+    # shorter than a trigram
+    assert index.search('.p') == [
+        '/synced/docs/report.pdf', '/synced/pics/cat.png']
+    assert index.search('a', '/synced/docs/old') == [
+        '/synced/docs/old/archive.zip']
+    assert index.search('missing') == []
+
+
+def test_changed_collections(index, writer, local):
+    assert index.refresh()['code'] == 0
+    (local / 'new.txt').write_bytes(b'new')
+    assert writer.upload(str(local / 'new.txt'), '/synced/docs/old')['code'] == 0
+    assert writer.delete('/synced/a.txt')['code'] == 0
+
+    res = index.refresh()
+    # pics is not listed again
+    assert res['reason'] == '3 collections of /synced listed again.'
+    assert index.members() == ['docs/', 'pics/']
+    assert index.members('/synced/docs/old') == ['archive.zip', 'new.txt']
+
+    assert index.refresh()['reason'] == \
+        '0 collections of /synced listed again.'
+
+
+def test_ttl(dav, tree, writer, tmp_path):
+    index = catalog.catalog(
+        connected(dav), '/synced', dbpath=str(tmp_path / 'tree.db'), ttl=300)
+    assert index.refresh()['code'] == 0
+    assert writer.delete('/synced/a.txt')['code'] == 0
+
+    assert index.refresh()['reason'] == 'Index of /synced is recent.'
+    assert 'a.txt' in index.members()
+    assert index.refresh(ttl=0)['code'] == 0
+    assert 'a.txt' not in index.members()
+    index.close()
+
+
+def test_fresh(index, tree):
+    assert index.refresh()['code'] == 0
+    # behind the server back: no collection etag changes
+    (tree / 'pics' / 'cat.png').unlink()
+    (tree / 'pics' / 'dog.png').write_bytes(b'dog')
+
+    index.refresh()
+    assert index.members('/synced/pics') == ['cat.png']
+    res = index.refresh(fresh=True)
+    assert res['code'] == 0
+    assert index.members('/synced/pics') == ['dog.png']
+    assert index.search('cat') == []
+
+
+def test_sync_collection(dav, index, writer, local):
+    dav.synccollection = True
+    res = index.refresh()
+    assert res['code'] == 0
+    assert index.members() == ['a.txt', 'docs/', 'pics/']
+
+    (local / 'new.txt').write_bytes(b'new')
+    assert writer.upload(str(local / 'new.txt'), '/synced/pics')['code'] == 0
+    assert writer.delete('/synced/docs')['code'] == 0
+    res = index.refresh()
+    assert res['reason'].endswith('changes of /synced received.')
+    assert index.members() == ['a.txt', 'pics/']
+    assert index.members('/synced/pics') == ['cat.png', 'new.txt']
+    assert index.search('archive') == []
+
+
+def test_kept(dav, index, tree, tmp_path):
+    assert index.refresh()['code'] == 0
+    index.close()
+
+    # another run, the share cannot be listed
+    shutil.rmtree(str(tree))
+    again = catalog.catalog(
+        connected(dav), '/synced', dbpath=str(tmp_path / 'tree.db'))
+    assert again.ready()
+    res = again.refresh()
+    assert res['code'] == 1
+    assert 'not found' in res['reason']
+    assert again.search('report') == ['/synced/docs/report.pdf']
+    again.close()
+
+
+@pytest.fixture
+def indexed(config, tree, tmp_path):
+    # listings not kept by the metadata cache either
+    return(config(
+        index={'enabled': True, 'path': tmp_path / 'tree.db'},
+        cache={'ttl': 0}))
+
+
+def test_tools_fresh(indexed, tree):
+    pydav = tools.core(indexed)
+    assert pydav.connect()['code'] == 0
+    assert pydav.remote_list()['content'] == ['a.txt', 'docs/', 'pics/']
+
+    before = tree.stat()
+    (tree / 'b.txt').write_bytes(b'b')
+    os.utime(str(tree), ns=(before.st_atime_ns, before.st_mtime_ns))
+    # the index answers, its top collection did not change
+    assert pydav.remote_list()['content'] == ['a.txt', 'docs/', 'pics/']
+    assert sorted(pydav.remote_list(fresh=True)['content']) == [
+        'a.txt', 'b.txt', 'docs/', 'pics/']
+    assert pydav.remote_search('b.t', fresh=True)['content'] == [
+        '/synced/b.txt']
+
+
+def test_cli_fresh(indexed, tree, tmp_path):
+    environ = dict(
+        os.environ, PYTHONPATH=CHECKOUT, XDG_RUNTIME_DIR=str(tmp_path))
+
+    def cli(*args):
+        done = subprocess.run(
+            [sys.executable, CLIENT, '-c', indexed] + list(args),
+            stdin=subprocess.DEVNULL, capture_output=True, env=environ)
+        assert done.returncode == 0, done.stderr
+        return(done.stdout.decode('utf-8').split())
+
+    assert cli('-l') == ['a.txt', 'docs/', 'pics/']
+    (tree / 'pics' / 'dog.png').write_bytes(b'dog')
+    assert cli('-s', 'dog') == []
+    assert cli('--fresh', '-s', 'dog')[0].startswith('/synced/pics/dog.png;')
+    # the index is not rebuilt by --fresh
+    assert cli('-s', 'dog') == []
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import pytest
+
+from PyDav import catalog, client, sync
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav sync-collection tests: remote changes followed with
+    sync-tokens against the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+def connected(dav):
+    core = client.core(dav.url, 'u', 'p', '/', retries=0)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+@pytest.fixture
+def tree(remote):
+    base = remote / 'synced'
+    (base / 'docs').mkdir(parents=True)
+    (base / 'a.txt').write_bytes(b'a')
+    (base / 'docs' / 'report.pdf').write_bytes(b'report')
+    return(base)
+
+
+@pytest.fixture
+def dc(dav, tree):
+    dav.synccollection = True
+    return(connected(dav))
+
+
+@pytest.fixture
+def writer(dav):
+    '''
+     Another client: the server logs the changes made through it
+    '''
+
+    return(connected(dav))
+
+
+def paths(res):
+    return(sorted(e.path for e in res['changed']))
+
+
+def test_initial(dc):
+    res = dc.changes('/synced')
+    assert res['code'] == 0
+    assert res['initial']
+    assert res['token']
+    assert paths(res) == [
+        '/synced/a.txt', '/synced/docs', '/synced/docs/report.pdf']
+    assert dict((e.path, e.is_dir) for e in res['changed'])['/synced/docs']
+    assert res['removed'] == []
+    assert dc.changes('synced/')['initial']
+
+
+def test_since_token(dc, writer, local):
+    token = dc.changes('/synced')['token']
+    res = dc.changes('/synced', token)
+    assert (res['code'], res['initial']) == (0, False)
+    assert res['changed'] == res['removed'] == []
+
+    (local / 'new.txt').write_bytes(b'new')
+    assert writer.upload(str(local / 'new.txt'), '/synced/docs')['code'] == 0
+    assert writer.delete('/synced/a.txt')['code'] == 0
+    res = dc.changes('/synced', token)
+    assert res['code'] == 0
+    assert not res['initial']
+    assert '/synced/docs/new.txt' in paths(res)
+    assert res['removed'] == ['/synced/a.txt']
+    assert res['token'] != token
+
+    # nothing after the new token
+    again = dc.changes('/synced', res['token'])
+    assert again['changed'] == again['removed'] == []
+
+
+def test_other_collection(dc, writer, remote, local):
+    (remote / 'other').mkdir()
+    token = dc.changes('/synced')['token']
+    (local / 'f').write_bytes(b'f')
+    assert writer.upload(str(local / 'f'), '/other')['code'] == 0
+    res = dc.changes('/synced', token)
+    assert res['changed'] == res['removed'] == []
+
+
+def test_forgotten_token(dc):
+    # unknown to the server: listed again from scratch
+    res = dc.changes('/synced', 'urn:pydav:sync:999')
+    assert res['code'] == 0
+    assert res['initial']
+    assert paths(res) == [
+        '/synced/a.txt', '/synced/docs', '/synced/docs/report.pdf']
+
+
+def test_truncated(dav, dc, writer, local):
+    token = dc.changes('/synced')['token']
+    for i in range(5):
+        name = 'f{0}'.format(i)
+        (local / name).write_bytes(b'x')
+        assert writer.upload(str(local / name), '/synced')['code'] == 0
+    dav.synclimit = 2
+    # 507 answers are followed until complete
+    res = dc.changes('/synced', token)
+    assert res['code'] == 0
+    assert paths(res) == ['/synced/f{0}'.format(i) for i in range(5)]
+    assert dc.changes('/synced', res['token'])['changed'] == []
+
+
+def test_unsupported(dav, tree):
+    dc = connected(dav)
+    res = dc.changes('/synced')
+    assert res['code'] == 1
+    assert res['supported'] is False
+    # not an error, the client goes on
+    assert sorted(dc.list('/synced')) == ['a.txt', 'docs/']
+
+
+def test_sync_engine(dav, dc, writer, tree, local, tmp_path):
+    index = catalog.catalog(dc, '/synced', dbpath=str(tmp_path / 'tree.db'))
+    try:
+        res = sync.engine(dc, str(local), '/synced', mode='pull',
+                          catalog=index).run()
+        assert res['code'] == 0, res['reason']
+        assert (local / 'docs' / 'report.pdf').read_bytes() == b'report'
+
+        (tmp_path / 'new.txt').write_bytes(b'new')
+        assert writer.upload(str(tmp_path / 'new.txt'), '/synced')['code'] == 0
+        dc.reset()
+        res = sync.engine(dc, str(local), '/synced', mode='pull',
+                          catalog=index).run()
+        assert res['code'] == 0, res['reason']
+        assert res['counts'] == {'get': 1}
+        assert (local / 'new.txt').read_bytes() == b'new'
+    finally:
+        index.close()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import pytest
+
+from PyDav import client
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav chunked upload tests against the WebDAV stand-in server
+    refusing uploads midway
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+MB = 1024 * 1024
+# Nextcloud files collection of user u
+FILES = '/remote.php/dav/files/u'
+
+
+@pytest.fixture
+def share(remote):
+    path = remote / FILES.lstrip('/') / 'd'
+    path.mkdir(parents=True)
+    return(path)
+
+
+@pytest.fixture
+def source(local):
+    path = local / 'big.bin'
+    path.write_bytes(os.urandom(5 * MB + 17))
+    return(path)
+
+
+def connected(dav, mode):
+    dc = client.core(
+        dav.url, 'u', 'p', FILES, retries=0, chunking=mode, chunksize=MB)
+    assert dc.connect()['code'] == 0
+    return(dc)
+
+
+@pytest.mark.parametrize('mode', ['range', 'nextcloud'])
+def test_resumed_upload(dav, share, source, mode):
+    dc = connected(dav, mode)
+    dav.maxputs = 2
+    assert dc.upload(str(source), '/d')['code'] == 1
+    assert not (share / 'big.bin').exists()
+
+    # 4 chunks are missing: sending the 2 stored ones again would fail
+    dav.puts = 0
+    dav.maxputs = 4
+    dc.reset()
+    assert dc.upload(str(source), '/d')['code'] == 0
+    assert (share / 'big.bin').read_bytes() == source.read_bytes()
+    assert sorted(os.listdir(str(share))) == ['big.bin']
+
+
+@pytest.mark.parametrize('mode', ['range', 'nextcloud'])
+def test_single_put_fallback(dav, share, source, mode):
+    dav.partialput = False
+    dav.chunking = False
+    dc = connected(dav, mode)
+    assert dc.upload(str(source), '/d')['code'] == 0
+    assert (share / 'big.bin').read_bytes() == source.read_bytes()
+    assert sorted(os.listdir(str(share))) == ['big.bin']
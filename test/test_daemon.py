@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import time
+import subprocess
+import pytest
+from os import path as fpath
+
+from PyDav import daemon
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav session daemon tests: commands forwarded over the Unix
+    socket, restart on config change and stop
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+CHECKOUT = fpath.dirname(fpath.dirname(fpath.abspath(__file__)))
+CLIENT = fpath.join(CHECKOUT, 'scripts', 'pydav-client')
+
+# daemon whose commands print their arguments and working directory, fail
+# with "boom" and exit with "exit N"
+SERVER = '''
+import os
+import sys
+from PyDav import daemon
+
+
+def execute(arguments):
+    if arguments[:1] == ['boom']:
+        raise RuntimeError('boom')
+    if arguments[:1] == ['exit']:
+        sys.exit(int(arguments[1]))
+    print(' '.join(arguments), os.getcwd())
+    return(0)
+
+
+res = daemon.serve(sys.argv[1], execute, notify=print)
+sys.exit(res['code'])
+'''
+
+
+@pytest.fixture
+def environ(tmp_path, monkeypatch):
+    rundir = tmp_path / 'run'
+    rundir.mkdir()
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(rundir))
+    monkeypatch.setenv('PYTHONPATH', CHECKOUT)
+    # forward() hands its standard streams over, pytest stdin has none
+    stdin = open(os.devnull)
+    monkeypatch.setattr(sys, 'stdin', stdin)
+    yield dict(os.environ)
+    stdin.close()
+
+
+def started(configpath, process, log, timeout=10.0):
+    waited = 0.0
+    while not fpath.exists(daemon.socket_path(configpath)):
+        assert process.poll() is None, log.read_text()
+        assert waited < timeout, 'daemon never listened'
+        time.sleep(0.05)
+        waited += 0.05
+    return(process)
+
+
+@pytest.fixture
+def served(environ, tmp_path):
+    configpath = tmp_path / 'config.ini'
+    configpath.write_text('[DEFAULT]\n')
+    log = tmp_path / 'daemon.log'
+    with open(str(log), 'w') as output:
+        process = subprocess.Popen(
+            [sys.executable, '-u', '-c', SERVER, str(configpath)],
+            stdout=output, stderr=subprocess.STDOUT, env=environ)
+    started(str(configpath), process, log)
+    yield str(configpath), process, log
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+def test_forward(served, tmp_path, capfd, monkeypatch):
+    configpath, process, log = served
+    monkeypatch.chdir(str(tmp_path))
+
+    assert daemon.forward(configpath, ['-l', '/a']) == 0
+    assert daemon.forward(configpath, ['exit', '3']) == 3
+    out, err = capfd.readouterr()
+    # printed on the caller streams, from the caller directory
+    assert out == '-l /a {0}\n'.format(tmp_path)
+
+
+def test_failing_command_keeps_serving(served, capfd):
+    configpath, process, log = served
+
+    assert daemon.forward(configpath, ['boom']) == 1
+    out, err = capfd.readouterr()
+    assert 'RuntimeError: boom' in err
+
+    assert daemon.forward(configpath, ['after']) == 0
+    assert process.poll() is None
+    assert 'Command [\'boom\'] failed' in log.read_text()
+
+
+def test_stale_config(served):
+    configpath, process, log = served
+    stat = os.stat(configpath)
+    os.utime(configpath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    # the caller runs the command itself with the new file
+    assert daemon.forward(configpath, ['-l']) is None
+    assert process.wait(10) == 0
+    assert 'changed' in log.read_text()
+    assert not fpath.exists(daemon.socket_path(configpath))
+
+
+def test_stop(served):
+    configpath, process, log = served
+
+    assert daemon.stop(configpath)['code'] == 0
+    assert process.wait(10) == 0
+    assert not fpath.exists(daemon.socket_path(configpath))
+    assert daemon.stop(configpath)['code'] == 1
+    assert daemon.forward(configpath, ['-l']) is None
+
+
+def test_socket_left_by_killed_daemon(served, environ, tmp_path):
+    configpath, process, log = served
+    process.kill()
+    process.wait()
+    assert fpath.exists(daemon.socket_path(configpath))
+
+    with open(str(log), 'w') as output:
+        process = subprocess.Popen(
+            [sys.executable, '-u', '-c', SERVER, configpath],
+            stdout=output, stderr=subprocess.STDOUT, env=environ)
+    try:
+        # the dead socket does not look like a running daemon
+        started(configpath, process, log)
+        time.sleep(0.2)
+        assert process.poll() is None
+        assert daemon.forward(configpath, ['again']) == 0
+    finally:
+        daemon.stop(configpath)
+        process.wait(10)
+
+
+def test_client_without_arguments(dav, remote, config, environ, tmp_path):
+    (remote / 'synced').mkdir()
+    configpath = config()
+    log = tmp_path / 'client.log'
+    with open(str(log), 'w') as output:
+        process = subprocess.Popen(
+            [sys.executable, '-u', CLIENT, '-c', configpath, '--daemon'],
+            stdout=output, stderr=subprocess.STDOUT, env=environ)
+    started(configpath, process, log)
+    try:
+        for action in ['-m', '-i', '-r']:
+            client = subprocess.run(
+                [sys.executable, CLIENT, '-c', configpath, action],
+                stdin=subprocess.DEVNULL, capture_output=True, env=environ)
+            assert client.returncode == 1, client.stderr
+            assert b'Traceback' not in client.stderr
+        assert process.poll() is None
+        client = subprocess.run(
+            [sys.executable, CLIENT, '-c', configpath, '-l'],
+            stdin=subprocess.DEVNULL, capture_output=True, env=environ)
+        assert client.returncode == 0, client.stderr
+    finally:
+        daemon.stop(configpath)
+        process.wait(10)
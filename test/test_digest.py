@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import hashlib
+import pytest
+
+from PyDav import client, digest, sync
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav content digests tests: transfers of identical files
+    skipped and renames sent as MOVE/COPY, against the WebDAV stand-in
+    server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+@pytest.fixture
+def dc(dav):
+    core = client.core(dav.url, 'u', 'p', '/', retries=0)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+@pytest.fixture
+def puts(dav):
+    # PUT requests are counted before answering, unlike dav.requests
+    dav.puts = 0
+    dav.maxputs = 10 ** 6
+    return(dav)
+
+
+def aged(path, seconds=3600):
+    # another modification time, the content is the same
+    st = path.stat()
+    os.utime(str(path), ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10 ** 9))
+
+
+def run(dc, local, remotedir='/synced'):
+    dc.reset()
+    return(sync.engine(dc, str(local), remotedir).run())
+
+
+def test_parse():
+    assert digest.parse_checksums('SHA1:AbC MD5:dd bogus') == {
+        'sha1': 'abc', 'md5': 'dd'}
+    assert digest.parse_checksums(None) == {}
+    md5 = hashlib.md5(b'x').hexdigest()
+    assert digest.etag_md5('"{0}"'.format(md5.upper())) == md5
+    assert digest.etag_md5('W/"{0}"'.format(md5)) is None
+    assert digest.etag_md5('"5f1-3a"') is None
+
+    sums = {'b c': '01', 'a': '02'}
+    assert digest.format_sidecar(sums) == b'02  a\n01  b c\n'
+    assert digest.parse_sidecar(digest.format_sidecar(sums)) == sums
+
+
+def test_index(tmp_path):
+    path = tmp_path / 'f'
+    path.write_bytes(b'one')
+    index = digest.index(str(tmp_path / 'hashes.db'))
+    assert index.digest(str(path)) == hashlib.sha1(b'one').hexdigest()
+    assert index.digest(str(path), 'md5') == hashlib.md5(b'one').hexdigest()
+
+    # same inode, size and time: not read again
+    st = path.stat()
+    path.write_bytes(b'two')
+    os.utime(str(path), ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert index.digest(str(path)) == hashlib.sha1(b'one').hexdigest()
+    aged(path)
+    assert index.digest(str(path)) == hashlib.sha1(b'two').hexdigest()
+
+    found = index.digests([str(path), str(tmp_path / 'missing')])
+    assert found == {
+        str(path): hashlib.sha1(b'two').hexdigest(),
+        str(tmp_path / 'missing'): None}
+    index.close()
+
+
+def test_upload_skips_same_content(dav, puts, remote, local):
+    dav.checksums = True
+    (remote / 'synced').mkdir()
+    for name in ['same', 'other']:
+        (remote / 'synced' / name).write_bytes(b'remote content')
+    (local / 'same').write_bytes(b'remote content')
+    (local / 'other').write_bytes(b'local  content')
+    dc = client.core(dav.url, 'u', 'p', '/', retries=0)
+    assert dc.connect()['code'] == 0
+
+    assert dc.upload(str(local / 'same'), '/synced')['code'] == 0
+    assert puts.puts == 0
+    # same size, another content
+    dc.reset()
+    assert dc.upload(str(local / 'other'), '/synced')['code'] == 0
+    assert puts.puts == 1
+    assert (remote / 'synced' / 'other').read_bytes() == b'local  content'
+
+
+def test_sidecar(dav, dc, remote, local, tmp_path):
+    # no server checksum: a sync keeps the digests of what it sent
+    (remote / 'synced').mkdir()
+    for name in ['same', 'other']:
+        (local / name).write_bytes(b'first content')
+    assert run(dc, local)['code'] == 0
+    sidecar = digest.parse_sidecar(
+        (remote / 'synced' / digest.SIDECAR).read_bytes())
+    assert sidecar == dict((name, hashlib.sha1(b'first content').hexdigest())
+                           for name in ['same', 'other'])
+
+    # another copy, without manifest
+    elsewhere = tmp_path / 'elsewhere'
+    elsewhere.mkdir()
+    (elsewhere / 'same').write_bytes(b'first content')
+    (elsewhere / 'other').write_bytes(b'other content')
+    res = run(dc, elsewhere)
+    assert res['code'] == 2
+    # sizes are equal, contents are compared
+    assert res['conflicts'] == ['other']
+    assert res['counts'] == {'record': 1, 'conflict': 1}
+
+
+def test_download_skips_same_content(dav, dc, remote, local):
+    dav.checksums = True
+    (remote / 'f').write_bytes(b'content')
+    (local / 'f').write_bytes(b'content')
+    aged(local / 'f')
+    before = (local / 'f').stat()
+
+    assert dc.download('/f', str(local / 'f'))['code'] == 0
+    # not written again
+    assert (local / 'f').stat().st_mtime_ns == before.st_mtime_ns
+
+
+def test_local_rename_is_moved(dc, puts, remote, local):
+    (remote / 'synced').mkdir()
+    (local / 'a').mkdir()
+    (local / 'a' / 'big').write_bytes(os.urandom(100000))
+    assert run(dc, local)['code'] == 0
+
+    os.rename(str(local / 'a' / 'big'), str(local / 'moved'))
+    sent = puts.puts
+    res = run(dc, local)
+    assert res['code'] == 0, res['reason']
+    assert res['counts'] == {'move': 1}
+    assert not (remote / 'synced' / 'a' / 'big').exists()
+    assert (remote / 'synced' / 'moved').read_bytes() == \
+        (local / 'moved').read_bytes()
+    # only the .pydav-hashes files were written
+    assert all(name == digest.SIDECAR for name in os.listdir(
+        str(remote / 'synced' / 'a')))
+    assert puts.puts - sent <= 2
+
+    # the new place is recorded: nothing more to do
+    assert run(dc, local)['counts'] == {}
+
+
+def test_local_copy_is_copied(dc, puts, remote, local):
+    (remote / 'synced').mkdir()
+    (local / 'big').write_bytes(os.urandom(100000))
+    assert run(dc, local)['code'] == 0
+
+    (local / 'twin').write_bytes((local / 'big').read_bytes())
+    res = run(dc, local)
+    assert res['counts'] == {'copy': 1}
+    assert (remote / 'synced' / 'twin').read_bytes() == \
+        (local / 'big').read_bytes()
+
+
+def test_remote_rename_is_renamed(dc, remote, local):
+    (remote / 'synced').mkdir()
+    (remote / 'synced' / 'big').write_bytes(os.urandom(100000))
+    assert run(dc, local)['code'] == 0
+    inode = (local / 'big').stat().st_ino
+
+    # same etag at its new place
+    os.rename(str(remote / 'synced' / 'big'), str(remote / 'synced' / 'moved'))
+    res = run(dc, local)
+    assert res['code'] == 0, res['reason']
+    assert res['counts'] == {'rename': 1}
+    assert not (local / 'big').exists()
+    assert (local / 'moved').stat().st_ino == inode
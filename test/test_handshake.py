@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import pytest
+
+from PyDav import client
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav connection handshake tests against the WebDAV stand-in
+    server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+HANDSHAKES = ['propfind', 'options', 'list']
+
+
+@pytest.mark.parametrize('handshake', HANDSHAKES)
+def test_share(dav, remote, handshake):
+    (remote / 'synced').mkdir()
+    dc = client.core(dav.url, 'u', 'p', '/', handshake=handshake)
+    assert dc.connect('/synced')['code'] == 0
+
+
+@pytest.mark.parametrize('handshake', HANDSHAKES)
+def test_missing_share(dav, handshake):
+    dc = client.core(dav.url, 'u', 'p', '/', handshake=handshake)
+    res = dc.connect('/synced')
+    assert res['code'] == 1
+    assert 'Unable to find /synced' in str(res['reason'])
+
+
+@pytest.mark.parametrize('handshake', HANDSHAKES)
+def test_server_down(dav, handshake):
+    url = dav.url
+    dav.stop()
+    dc = client.core(url, 'u', 'p', '/', handshake=handshake, retries=0)
+    res = dc.connect()
+    assert res['code'] == 1
+    assert 'Unable to connect to server' in str(res['reason'])
+
+
+def test_options_capabilities(dav, remote):
+    (remote / 'synced').mkdir()
+    dav.dasl = True
+    dc = client.core(dav.url, 'u', 'p', '/', handshake='options')
+    assert dc.connect('/synced')['code'] == 0
+    capabilities = dc.capabilities()
+    assert capabilities['ranges']
+    assert capabilities['search']
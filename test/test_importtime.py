@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import compileall
+import pytest
+from os import path as fpath
+
+from . import importtime
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav start up budget, run by pytest: each case of
+    importtime.py must stay under its budget and must not import the
+    network modules
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+# budget factor for slow machines, like importtime.py --scale
+SCALE = float(os.environ.get('PYDAV_IMPORT_SCALE', '1.0'))
+# runs per case, the fastest one is kept
+RUNS = 5
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    # installed packages come with their bytecode, compiling is not counted
+    compileall.compile_dir(
+        fpath.join(importtime.checkout, 'PyDav'), quiet=1)
+    # modules every interpreter imports at start up are not counted
+    return(set(importtime.importtime(['-c', 'pass'], {})))
+
+
+@pytest.mark.parametrize(
+    'name, arguments, environ, budget, forbidden', importtime.CASES,
+    ids=[case[0] for case in importtime.CASES])
+def test_importtime(baseline, name, arguments, environ, budget, forbidden):
+    best = None
+    for run in range(RUNS):
+        modules = importtime.importtime(arguments, environ)
+        spent = sum(
+            us for m, us in modules.items() if m not in baseline) / 1000.0
+        if best is None or spent < best[0]:
+            best = (spent, modules)
+
+    spent, modules = best
+    assert modules, '{0} imported nothing, the run failed'.format(name)
+    leaked = sorted(
+        m for m in modules
+        if any(m == f or m.startswith('{0}.'.format(f)) for f in forbidden))
+    assert not leaked, '{0} imported {1}'.format(name, ', '.join(leaked))
+    assert spent <= budget * SCALE, '{0} took {1:.1f} ms, budget {2:.1f} ms'.format(
+        name, spent, budget * SCALE)
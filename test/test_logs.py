@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import time
+import logging
+import logging.handlers
+
+from PyDav import client, logs
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav log pipelines tests: loggers built once per destination
+    and file records written by the queue listener
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+def written(path, expected, timeout=5.0):
+    '''
+     Content of the log file once it holds expected, the listener
+     thread writes the queued records on its own
+    '''
+
+    limit = time.monotonic() + timeout
+    while time.monotonic() < limit:
+        if path.exists() and expected in path.read_text():
+            break
+        time.sleep(0.01)
+    return(path.read_text() if path.exists() else '')
+
+
+def test_levelno():
+    assert logs.levelno('debug') == logging.DEBUG
+    assert logs.levelno('INFO') == logging.INFO
+    assert logs.levelno('warn') == logs.levelno('warning') == logging.WARNING
+    assert logs.levelno('critical') == logging.CRITICAL
+    assert logs.levelno('unknown') == logging.CRITICAL
+
+
+def test_built_once(tmp_path):
+    console = logs.getlogger('console', name='tests')
+    assert logs.getlogger('console', name='tests') is console
+    # only files have a path
+    assert logs.getlogger('console', str(tmp_path / 'x.log'), 'tests') is console
+    assert logs.getlogger('console', name='other') is not console
+    assert isinstance(console.handlers[0], logging.StreamHandler)
+
+    first = logs.getlogger('file', str(tmp_path / 'a.log'), 'tests')
+    assert logs.getlogger('file', str(tmp_path / 'a.log'), 'tests') is first
+    assert logs.getlogger('file', str(tmp_path / 'b.log'), 'tests') is not first
+    # file records go through the queue
+    assert [type(h) for h in first.handlers] == [
+        logging.handlers.QueueHandler]
+
+
+def test_file(tmp_path):
+    path = tmp_path / 'pydav.log'
+    logs.emit('hidden', 'debug', 'file', str(path), 'tests')
+    logs.emit('first', 'warn', 'file', str(path), 'tests')
+    logs.emit('second', 'error', 'file', str(path), 'tests')
+    content = written(path, 'second')
+    assert '[tests MainProcess] DEBUG: hidden' in content
+    assert '[tests MainProcess] WARNING: first' in content
+    assert content.index('first') < content.index('second')
+
+
+def test_shutdown(tmp_path):
+    path = tmp_path / 'pydav.log'
+    logger = logs.getlogger('file', str(path), 'tests')
+    for i in range(100):
+        logger.info('line {0}'.format(i))
+    # every queued record is written before the listener stops
+    logs.shutdown()
+    assert path.read_text().count(' INFO: line ') == 100
+
+
+def test_client_levels(dav, tmp_path):
+    path = tmp_path / 'client.log'
+    dc = client.core(dav.url, 'u', 'p', '/', logtype='file', logfile=str(path))
+    dc.sendlog('not verbose', level='debug')
+    dc.sendlog('kept', level='info')
+    content = written(path, 'kept')
+    assert '[client MainProcess] INFO: kept' in content
+    assert 'not verbose' not in content
+
+    verbose = client.core(dav.url, 'u', 'p', '/', logtype='file',
+                          logfile=str(path), verbosity=True)
+    verbose.sendlog('verbose', level='debug')
+    assert 'DEBUG: verbose' in written(path, 'verbose')
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import warnings
+import pytest
+
+from PyDav import client, metrics
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav request metrics tests: registry counters, OpenMetrics
+    export and requests recorded against the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+@pytest.fixture
+def reg():
+    return(metrics.registry())
+
+
+def samples(text):
+    '''
+     Metric lines of an OpenMetrics text keyed on name and labels
+    '''
+
+    found = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            found[name] = float(value)
+    return(found)
+
+
+def test_method_of():
+    assert metrics.method_of({'CUSTOMREQUEST': 'propfind'}) == 'PROPFIND'
+    assert metrics.method_of({'UPLOAD': 1}) == 'PUT'
+    assert metrics.method_of({}) == 'HEAD'
+    assert metrics.method_of({'NOBODY': 0}) == 'GET'
+    assert metrics.method_of({'NOBODY': 0, 'POSTFIELDS': ''}) == 'POST'
+
+
+def test_record(reg):
+    with reg.operation('upload'):
+        # inner operations are counted for the outer one
+        with reg.operation('createdir'):
+            assert reg.current() == 'upload'
+            reg.record('MKCOL', '/d', 201, 0, 0, 0.002)
+        reg.record('PUT', '/d/f', 201, 100, 0, 0.2, retries=2)
+        reg.record('PUT', '/d/g', 503, 50, 10, 3.0)
+        reg.record('PUT', '/d/h', 0, 0, 0, 60.0)
+    assert reg.current() == ''
+    reg.record('GET', '/d/f', 200, 0, 100, 0.02)
+
+    stats = reg.snapshot()
+    assert sorted(stats) == [('', 'GET'), ('upload', 'MKCOL'), ('upload', 'PUT')]
+    put = stats[('upload', 'PUT')]
+    assert put['count'] == 3
+    # no answer and 5xx
+    assert put['errors'] == 2
+    assert put['statuses'] == {0: 1, 201: 1, 503: 1}
+    assert (put['sent'], put['received'], put['retries']) == (150, 10, 2)
+    assert put['max'] == 60.0
+    # 60 seconds is past the last bound
+    assert sum(put['buckets']) == 2
+    assert put['buckets'][metrics.BUCKETS.index(0.25)] == 1
+
+    # a copy
+    put['count'] = 0
+    assert reg.snapshot()[('upload', 'PUT')]['count'] == 3
+    reg.reset()
+    assert reg.snapshot() == {}
+
+
+def test_hooks(reg):
+    seen = []
+
+    def broken(item):
+        raise RuntimeError('monitoring failed')
+
+    reg.add_hook(broken)
+    reg.add_hook(seen.append)
+    with reg.operation('get'):
+        reg.record('GET', '/f', 200, 0, 10, 0.1)
+    reg.remove_hook(seen.append)
+    reg.record('GET', '/f', 200, 0, 10, 0.1)
+
+    assert seen == [metrics.sample('get', 'GET', '/f', 200, 0, 10, 0.1, 0)]
+    assert reg.snapshot()[('get', 'GET')]['count'] == 1
+
+
+def test_summary(reg):
+    assert reg.summary() == 'No request sent.'
+    with reg.operation('upload'):
+        reg.record('MKCOL', '/d', 201, 0, 0, 0.002)
+        reg.record('PUT', '/d/f', 201, 2048, 0, 0.2)
+    lines = reg.summary().splitlines()
+    assert lines[0].split() == [
+        'operation', 'method', 'requests', 'errors', 'sent', 'received',
+        'seconds', 'mean', 'ms', 'max', 'ms']
+    assert [l.split()[:3] for l in lines[1:]] == [
+        ['upload', 'MKCOL', '1'], ['upload', 'PUT', '1'],
+        ['upload', 'all', '2']]
+
+
+def test_openmetrics(reg):
+    with reg.operation('upload'):
+        reg.record('PUT', '/f', 201, 100, 0, 0.003)
+        reg.record('PUT', '/g', 503, 10, 0, 0.3, retries=1)
+        reg.record('PUT', '/h', 201, 5, 0, 100.0)
+    reg.record('GET', '/f', 200, 0, 100, 0.02)
+
+    text = reg.openmetrics()
+    assert text.endswith('\n# EOF\n')
+    assert text.count('# EOF') == 1
+    found = samples(text)
+    put = 'operation="upload",method="PUT"'
+    assert found['pydav_requests_total{{{0},status="201"}}'.format(put)] == 2
+    assert found['pydav_requests_total{{{0},status="503"}}'.format(put)] == 1
+    assert found['pydav_requests_total{operation="none",method="GET",status="200"}'] == 1
+    assert found['pydav_request_errors_total{{{0}}}'.format(put)] == 1
+    assert found['pydav_request_retries_total{{{0}}}'.format(put)] == 1
+    assert found['pydav_request_bytes_total{{{0},direction="sent"}}'.format(put)] == 115
+
+    # cumulative buckets, +Inf equal to the count
+    buckets = [found['pydav_request_duration_seconds_bucket{{{0},le="{1}"}}'.format(
+        put, bound)] for bound in metrics.BUCKETS + ['+Inf']]
+    assert buckets == sorted(buckets)
+    assert buckets[0] == 1
+    assert buckets[-2] == 2
+    assert buckets[-1] == found[
+        'pydav_request_duration_seconds_count{{{0}}}'.format(put)] == 3
+    assert found['pydav_request_duration_seconds_sum{{{0}}}'.format(
+        put)] == pytest.approx(100.303)
+
+    # each metric family is declared once, before its samples
+    families = [l.split()[2] for l in text.splitlines()
+                if l.startswith('# TYPE')]
+    assert len(families) == len(set(families))
+
+
+def test_openmetrics_escaping(reg):
+    with reg.operation('a"b\\c\nd'):
+        reg.record('GET', '/f', 200, 0, 0, 0.1)
+    assert 'operation="a\\"b\\\\c\\nd"' in reg.openmetrics()
+
+
+def test_export(reg, tmp_path):
+    reg.record('GET', '/f', 200, 0, 0, 0.1)
+    target = tmp_path / 'pydav.prom'
+    assert reg.export(str(target))['code'] == 0
+    assert target.read_text() == reg.openmetrics()
+    assert os.listdir(str(tmp_path)) == ['pydav.prom']
+
+    assert reg.export(str(tmp_path / 'missing' / 'pydav.prom'))['code'] == 1
+
+
+def test_client_requests(dav, remote, local):
+    (remote / 'f.bin').write_bytes(b'x' * 5000)
+    registry = metrics.shared()
+    (remote / 'up').mkdir()
+    dc = client.core(dav.url, 'u', 'p', '/')
+    assert dc.connect()['code'] == 0
+    registry.reset()
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        assert dc.download('/f.bin', str(local / 'f.bin'))['code'] == 0
+        dc.reset()
+        assert dc.upload(str(local / 'f.bin'), '/up')['code'] == 0
+    # byte counters are read without deprecated curl options
+    assert not [w for w in caught if w.filename == metrics.__file__]
+
+    stats = registry.snapshot()
+    assert stats[('download', 'GET')]['received'] == 5000
+    assert stats[('upload', 'PUT')]['sent'] == 5000
+    assert stats[('upload', 'PUT')]['statuses'] == {201: 1}
+    assert all(k[0] in ['download', 'upload'] for k in stats)
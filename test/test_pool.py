@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import threading
+import pytest
+
+from PyDav import client, pool
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav keep-alive connections pool tests
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class clock():
+    '''
+     time.time() stand-in moved forward by the tests
+    '''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return(self.now)
+
+
+def test_reuse():
+    handles = pool.connections(maxconn=2)
+    first = handles.acquire('h')
+    curl = first.curl
+    first.close()
+    # closed once only
+    first.close()
+    assert handles.stats()['idle'] == 1
+
+    again = handles.acquire('h')
+    assert again.curl is curl
+    other = handles.acquire('other')
+    assert other.curl is not curl
+    stats = handles.stats()
+    assert (stats['created'], stats['reused'], stats['busy']) == (2, 1, 2)
+    again.close()
+    other.close()
+    assert handles.stats()['requests'] == 3
+
+
+def test_dropped_handle():
+    handles = pool.connections(maxconn=1)
+    handles.acquire('h')
+    # given back when collected
+    assert handles.stats()['busy'] == 0
+    handles.acquire('h').close()
+
+
+def test_bounded():
+    handles = pool.connections(maxconn=2)
+    held = [handles.acquire('h'), handles.acquire('h')]
+    got = []
+    waiting = threading.Thread(target=lambda: got.append(handles.acquire('h')))
+    waiting.start()
+    waiting.join(0.2)
+    # a third handle waits for one to be released
+    assert waiting.is_alive()
+    held[0].close()
+    waiting.join(5)
+    assert not waiting.is_alive()
+    assert got[0].curl is held[0].curl
+    assert handles.stats()['created'] == 2
+
+
+def test_evicted(monkeypatch):
+    now = clock()
+    monkeypatch.setattr(pool.time, 'time', now)
+    handles = pool.connections(idletime=60)
+    handles.acquire('h').close()
+    now.now += 30
+    handles.acquire('h').close()
+    assert handles.stats()['evicted'] == 0
+
+    now.now += 61
+    handles.acquire('h').close()
+    stats = handles.stats()
+    assert (stats['evicted'], stats['created']) == (1, 2)
+
+    handles.close()
+    assert handles.stats()['idle'] == 0
+
+
+def test_client_keepalive(dav, remote, local):
+    for i in range(5):
+        (remote / 'f{0}'.format(i)).write_bytes(b'x' * 1000)
+    dc = client.core(dav.url, 'u', 'p', '/', maxconn=2)
+    assert dc.pool_stats() == {}
+    assert dc.connect()['code'] == 0
+
+    for i in range(5):
+        name = 'f{0}'.format(i)
+        assert dc.download('/' + name, str(local / name))['code'] == 0
+    stats = dc.pool_stats()
+    assert stats['busy'] == 0
+    assert stats['created'] <= 2
+    # requests share their connections
+    assert stats['requests'] >= 6
+    assert stats['connects'] < stats['requests']
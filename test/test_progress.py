@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import io
+import pytest
+
+from PyDav import client, progress
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav aggregated progress tests
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+@pytest.fixture
+def output():
+    return(io.StringIO())
+
+
+def test_human():
+    assert progress.human(512) == '512 B'
+    assert progress.human(5000) == '4.9 KiB'
+    assert progress.duration(3725) == '1:02:05'
+
+
+def test_draw(output):
+    meter = progress.meter(output=output, rate=1000, enabled=True)
+    meter.begin()
+    meter.expect(2, 200)
+    first = meter.track()
+    first.advance(50, 100)
+    line = output.getvalue().split('\r')[-1]
+    assert '25.0%' in line
+    assert '0/2 files' in line
+
+    first.done()
+    second = meter.track()
+    second(0, 0, 100, 100)
+    second.done()
+    summary = meter.end()
+    assert summary.startswith('2 files, 150 B transferred')
+    assert 'failed' not in summary
+    # the drawn line is left on its own line
+    assert output.getvalue().endswith('\n')
+
+
+def test_not_drawn_without_terminal(output):
+    meter = progress.meter(output=output)
+    assert not meter.enabled
+    meter.track().done()
+    assert output.getvalue() == ''
+
+
+def test_failures(output):
+    meter = progress.meter(output=output)
+    meter.begin()
+    meter.track().done()
+    meter.track().done(False)
+    assert meter.end().endswith(', 1 failed')
+
+
+def test_sent_again(output):
+    meter = progress.meter(output=output)
+    meter.begin()
+    # given up for another attempt, counted for nothing
+    meter.track().done(None)
+    meter.track().done()
+    assert meter.end() is None
+
+
+def test_nested(output):
+    meter = progress.meter(output=output)
+    meter.begin()
+    meter.begin()
+    meter.track().done()
+    meter.track().done()
+    assert meter.end() is None
+    assert meter.end().startswith('2 files')
+
+
+def test_upload_creating_parent(dav, remote, local, caplog):
+    (local / 'f.bin').write_bytes(b'x' * 5000)
+    dc = client.core(dav.url, 'u', 'p', '/')
+    assert dc.connect()['code'] == 0
+
+    # the first PUT finds no parent, the file is sent again once created
+    assert dc.upload(str(local / 'f.bin'), '/missing')['code'] == 0
+    assert (remote / 'missing' / 'f.bin').exists()
+    assert 'failed' not in caplog.text
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import json
+import asyncio
+import pytest
+
+from PyDav import client
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav resumable download tests against the WebDAV stand-in
+    server dropping connections midway
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+MB = 1024 * 1024
+
+
+def interrupted(local, dropafter):
+    '''
+     Check the checkpoint of a download cut after dropafter bytes and
+     mark the data kept on disk, so the test can tell it is not fetched
+     again
+    '''
+
+    part = local / 'big.bin.part'
+    with open(str(local / 'big.bin.part.json')) as f:
+        state = json.load(f)
+    assert not (local / 'big.bin').exists()
+    assert state['offset'] == dropafter == part.stat().st_size
+    part.write_bytes(b'\0' * dropafter)
+    return(state)
+
+
+@pytest.fixture
+def dc(dav):
+    core = client.core(dav.url, 'u', 'p', '/', retries=0)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+def test_resumed_download(dav, dc, remote, local):
+    data = os.urandom(5 * MB)
+    (remote / 'big.bin').write_bytes(data)
+    dav.dropafter = 2 * MB
+
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 1
+    interrupted(local, 2 * MB)
+
+    dav.dropafter = 0
+    dc.reset()
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 0
+    # only the missing bytes were asked for
+    assert (local / 'big.bin').read_bytes() == b'\0' * 2 * MB + data[2 * MB:]
+    assert sorted(os.listdir(str(local))) == ['big.bin']
+
+
+def test_changed_remote_restarts(dav, dc, remote, local):
+    data = os.urandom(5 * MB)
+    (remote / 'big.bin').write_bytes(data)
+    dav.dropafter = 2 * MB
+
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 1
+    interrupted(local, 2 * MB)
+
+    # a new version of the same size: the validator no longer matches
+    data = data[::-1]
+    (remote / 'big.bin').write_bytes(data)
+    os.utime(str(remote / 'big.bin'), ns=(1, 1))
+    dav.dropafter = 0
+    dc.reset()
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 0
+    assert (local / 'big.bin').read_bytes() == data
+    assert sorted(os.listdir(str(local))) == ['big.bin']
+
+
+def test_resumed_segmented_download(dav, remote, local):
+    data = os.urandom(8 * MB + 3)
+    (remote / 'big.bin').write_bytes(data)
+    dav.dropafter = MB
+    dc = client.core(
+        dav.url, 'u', 'p', '/', retries=0, segments=4, segthreshold=MB)
+    assert dc.connect()['code'] == 0
+
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 1
+    with open(str(local / 'big.bin.part.json')) as f:
+        segments = json.load(f)['segments']
+    # every segment kept what it received
+    assert len(segments) == 4
+    assert all(start > 0 for start, end in segments)
+
+    dav.dropafter = 0
+    dc.reset()
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 0
+    assert (local / 'big.bin').read_bytes() == data
+    assert sorted(os.listdir(str(local))) == ['big.bin']
+
+
+def test_async_resumed_download(dav, remote, local):
+    data = os.urandom(5 * MB)
+    (remote / 'big.bin').write_bytes(data)
+    dav.dropafter = 3 * MB
+
+    async def scenario():
+        async with client.AsyncCore(dav.url, 'u', 'p', '/') as dc:
+            first = await dc.download('/big.bin', str(local / 'big.bin'))
+            interrupted(local, 3 * MB)
+            dav.dropafter = 0
+            second = await dc.download('/big.bin', str(local / 'big.bin'))
+            return(first, second)
+
+    first, second = asyncio.run(scenario())
+    assert first['code'] == 1
+    assert second['code'] == 0
+    assert (local / 'big.bin').read_bytes() == b'\0' * 3 * MB + data[3 * MB:]
+    assert sorted(os.listdir(str(local))) == ['big.bin']
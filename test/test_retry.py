@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import pytest
+import pycurl
+
+from PyDav import client, retry
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav request retries tests: backoff, replayed methods and
+    statuses, file budgets and host circuit breakers
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class clock():
+    '''
+     time.monotonic() stand-in moved forward by the tests
+    '''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return(self.now)
+
+
+class server():
+    '''
+     perform() stand-in answering the given statuses or curl errors in
+     turn, the last one for good
+    '''
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def __call__(self):
+        answer = self.answers[min(self.calls, len(self.answers) - 1)]
+        self.calls += 1
+        if isinstance(answer, BaseException):
+            raise answer
+        return(answer)
+
+
+@pytest.fixture(autouse=True)
+def breakers(monkeypatch):
+    # circuits are shared by the whole process
+    monkeypatch.setattr(retry, '__breakers', {})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(retry.time, 'sleep', waited.append)
+    return(waited)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    fake = clock()
+    monkeypatch.setattr(retry.time, 'monotonic', fake)
+    return(fake)
+
+
+def dropped(code=pycurl.E_RECV_ERROR):
+    return(pycurl.error(code, 'dropped'))
+
+
+def test_retry_after():
+    assert retry.retry_after('120') == 120.0
+    assert retry.retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert retry.retry_after('soon') is None
+
+
+def test_delay_bounds(monkeypatch):
+    # the largest wait full jitter can pick
+    monkeypatch.setattr(retry.random, 'uniform', lambda low, high: high)
+    rule = retry.policy(wait=0.5, maxwait=3.0)
+    assert [rule.delay(n) for n in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    # Retry-After honored up to maxwait
+    assert rule.delay(0, 2.5) == 2.5
+    assert rule.delay(0, 60.0) is None
+
+    monkeypatch.undo()
+    assert all(0 <= rule.delay(3) <= 3.0 for i in range(100))
+
+
+def test_retries_limit(sleeps):
+    perform = server(503)
+    assert retry.policy(retries=3).run('GET', 'h', perform) == 503
+    assert perform.calls == 4
+    assert len(sleeps) == 3
+
+    perform = server(dropped())
+    with pytest.raises(pycurl.error):
+        retry.policy(retries=2).run('GET', 'h', perform)
+    assert perform.calls == 3
+
+    perform = server(503, 503, 207)
+    assert retry.policy(retries=0).run('PROPFIND', 'h', perform) == 503
+    assert perform.calls == 1
+
+
+def test_recovers(sleeps):
+    seen = []
+    perform = server(dropped(), 502, 201)
+    assert retry.policy().run('PUT', 'h', perform, seen.append) == 201
+    assert perform.calls == 3
+    assert seen[0].startswith('PUT failed (dropped), attempt 2/4')
+    assert seen[1].startswith('PUT failed (HTTP error 502), attempt 3/4')
+
+
+@pytest.mark.parametrize('status', [200, 207, 400, 403, 404, 409, 412, 501])
+def test_not_retryable_status(sleeps, status):
+    perform = server(status, 200)
+    assert retry.policy().run('GET', 'h', perform) == status
+    assert perform.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.parametrize('method,answer,calls', [
+    # may have been processed
+    ('MOVE', 500, 1),
+    ('COPY', 502, 1),
+    ('MOVE', dropped(), 1),
+    # refused before being processed
+    ('MOVE', 503, 2),
+    ('COPY', 429, 2),
+    ('MOVE', dropped(pycurl.E_COULDNT_CONNECT), 2),
+    ('DELETE', 500, 2),
+    ('GET', dropped(), 2),
+])
+def test_replayed_methods(sleeps, method, answer, calls):
+    perform = server(answer, 201)
+    try:
+        retry.policy().run(method, 'h', perform)
+    except pycurl.error:
+        pass
+    assert perform.calls == calls
+
+
+def test_not_transient_error(sleeps):
+    perform = server(dropped(pycurl.E_SSL_CACERT), 200)
+    with pytest.raises(pycurl.error):
+        retry.policy().run('GET', 'h', perform)
+    assert perform.calls == 1
+
+
+def test_retry_after_too_long(sleeps):
+    def perform():
+        retry.tap()(b'Retry-After: 3600\r\n')
+        return(503)
+    assert retry.policy().run('GET', 'h', perform) == 503
+    assert sleeps == []
+
+
+def test_file_budget(sleeps):
+    rule = retry.policy(retries=3, budget=4)
+    with rule.file():
+        first = server(429)
+        assert rule.run('GET', 'h', first) == 429
+        assert first.calls == 4
+        # nested, same budget
+        with rule.file():
+            second = server(429)
+            assert rule.run('GET', 'h', second) == 429
+        assert second.calls == 2
+        third = server(429)
+        assert rule.run('GET', 'h', third) == 429
+        assert third.calls == 1
+    # next file
+    fourth = server(429)
+    assert rule.run('GET', 'h', fourth) == 429
+    assert fourth.calls == 4
+
+
+def test_breaker(now):
+    gate = retry.breaker('h', threshold=3, cooldown=30)
+    for i in range(2):
+        gate.failure()
+    assert gate.admit() is False
+    gate.success()
+    for i in range(2):
+        gate.failure()
+    assert gate.state() == 'closed'
+    gate.failure()
+    assert gate.state() == 'open'
+    with pytest.raises(retry.unavailable):
+        gate.admit()
+
+    now.now += 30
+    assert gate.state() == 'half-open'
+    assert gate.admit() is True
+    # a single probe
+    with pytest.raises(retry.unavailable):
+        gate.admit()
+    # its failure opens the circuit again, at once
+    gate.failure()
+    assert gate.state() == 'open'
+
+    now.now += 30
+    assert gate.admit() is True
+    gate.success()
+    assert gate.state() == 'closed'
+    assert gate.admit() is False
+
+
+def opened(now, host='h'):
+    gate = retry.circuit(host)
+    for i in range(retry.THRESHOLD):
+        gate.failure()
+    now.now += retry.COOLDOWN
+    assert gate.state() == 'half-open'
+    return(gate)
+
+
+def test_probe_success(sleeps, now):
+    gate = opened(now)
+    assert retry.policy().run('GET', 'h', server(200)) == 200
+    assert gate.state() == 'closed'
+    assert gate.admit() is False
+
+
+def test_probe_failure(sleeps, now):
+    gate = opened(now)
+    perform = server(503)
+    with pytest.raises(retry.unavailable):
+        retry.policy().run('GET', 'h', perform)
+    # the probe only
+    assert perform.calls == 1
+    assert gate.state() == 'open'
+
+    # released: the next probe goes through
+    now.now += retry.COOLDOWN
+    assert retry.policy().run('GET', 'h', server(200)) == 200
+    assert gate.state() == 'closed'
+
+
+@pytest.mark.parametrize('answer', [429, ValueError('callback')])
+def test_probe_without_verdict(sleeps, now, answer):
+    gate = opened(now)
+    try:
+        retry.policy(retries=0).run('GET', 'h', server(answer))
+    except ValueError:
+        pass
+    assert gate.state() == 'half-open'
+    # not left probing for good
+    assert gate.admit() is True
+
+
+def test_breakers_per_host():
+    assert retry.circuit('a') is retry.circuit('a')
+    assert retry.circuit('a') is not retry.circuit('b')
+
+
+def test_client_failrate(dav, remote, local):
+    (local / 'f.bin').write_bytes(b'x' * 5000)
+    for name in ['a', 'b', 'c']:
+        (remote / name).mkdir()
+    dav.failrate = 0.3
+    dc = client.core(dav.url, 'u', 'p', '/', retries=10, retrywait=0.01)
+    assert dc.connect()['code'] == 0
+    for name in ['a', 'b', 'c']:
+        target = '/{0}/f.bin'.format(name)
+        assert dc.upload(str(local / 'f.bin'), '/' + name)['code'] == 0
+        assert dc.list('/' + name) == ['f.bin']
+        assert dc.download(target, str(local / name))['code'] == 0
+        assert dc.delete(target)['code'] == 0
+        assert (local / name).read_bytes() == b'x' * 5000
+        assert not (remote / name / 'f.bin').exists()
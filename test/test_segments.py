@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import pytest
+
+from PyDav import client
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav segmented downloads tests: large files fetched as
+    concurrent byte ranges from the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def data(remote):
+    found = os.urandom(4 * MB + 5)
+    (remote / 'big.bin').write_bytes(found)
+    return(found)
+
+
+def segmented(dav, segments=4):
+    core = client.core(
+        dav.url, 'u', 'p', '/', retries=0, segments=segments, segthreshold=MB)
+    assert core.connect()['code'] == 0
+    # the handshake answer may still be counted
+    time.sleep(0.1)
+    dav.reset()
+    return(core)
+
+
+def gets(dav):
+    # requests are counted once answered
+    time.sleep(0.2)
+    return(dav.requests.get('GET', 0))
+
+
+def test_segmented(dav, data, local):
+    dc = segmented(dav)
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 0
+    assert (local / 'big.bin').read_bytes() == data
+    assert sorted(os.listdir(str(local))) == ['big.bin']
+    assert gets(dav) == 4
+
+
+def test_below_threshold(dav, remote, local):
+    (remote / 'small.bin').write_bytes(b'x' * (MB - 1))
+    dc = segmented(dav)
+    assert dc.download('/small.bin', str(local / 'small.bin'))['code'] == 0
+    assert (local / 'small.bin').stat().st_size == MB - 1
+    assert gets(dav) == 1
+
+
+def test_disabled(dav, data, local):
+    dc = segmented(dav, segments=1)
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 0
+    assert gets(dav) == 1
+
+
+def test_ranges_refused(dav, data, local):
+    dav.ranges = False
+    dc = segmented(dav)
+    # a single stream instead
+    assert dc.download('/big.bin', str(local / 'big.bin'))['code'] == 0
+    assert (local / 'big.bin').read_bytes() == data
+    assert sorted(os.listdir(str(local))) == ['big.bin']
+
+
+def test_directory(dav, remote, local):
+    (remote / 'd').mkdir()
+    files = dict((name, os.urandom(2 * MB + i))
+                 for i, name in enumerate(['a.bin', 'b.bin']))
+    for name, content in files.items():
+        (remote / 'd' / name).write_bytes(content)
+    dc = segmented(dav, segments=2)
+    assert dc.download('/d', str(local / 'd'))['code'] == 0
+    for name, content in files.items():
+        assert (local / 'd' / name).read_bytes() == content
+    assert gets(dav) == 4
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import io
+import pytest
+
+from PyDav import client, tools
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav streaming tests (open_read/open_write) against the
+    WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+SIZE = 4 * 1024 * 1024
+CHUNK = 65536
+
+
+@pytest.fixture
+def dc(dav):
+    # a single pooled handle: a stream keeping it would block the next one
+    core = client.core(dav.url, 'u', 'p', '/', maxconn=1)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+class failing(io.RawIOBase):
+    '''
+     Source raising after a few reads, like a broken pipe
+    '''
+
+    def __init__(self, reads):
+        io.RawIOBase.__init__(self)
+        self.reads = reads
+
+    def readable(self):
+        return(True)
+
+    def read(self, size=-1):
+        self.reads -= 1
+        if self.reads < 0:
+            raise OSError('source failed')
+        return(b'q' * CHUNK)
+
+
+def test_read(dc, remote):
+    data = os.urandom(SIZE)
+    (remote / 'big.bin').write_bytes(data)
+
+    rstream = dc.open_read('/big.bin', chunksize=CHUNK)
+    assert b''.join(rstream) == data
+    rstream.close()
+    assert dc.pool_stats()['busy'] == 0
+
+
+def test_reader_early_close(dc, remote):
+    data = os.urandom(SIZE)
+    (remote / 'big.bin').write_bytes(data)
+
+    rstream = dc.open_read('/big.bin', chunksize=CHUNK)
+    assert rstream.read(10) == data[:10]
+    rstream.close()
+    assert rstream.closed
+    # the cancelled transfer gave its handle back
+    assert dc.pool_stats()['busy'] == 0
+
+    rstream = dc.open_read('/big.bin', chunksize=CHUNK)
+    assert b''.join(rstream) == data
+    rstream.close()
+
+
+def test_write(dc, remote):
+    data = os.urandom(SIZE)
+    with dc.open_write('/up.bin', chunksize=CHUNK) as wstream:
+        for start in range(0, SIZE, CHUNK):
+            wstream.write(data[start:start + CHUNK])
+    assert (remote / 'up.bin').read_bytes() == data
+    assert dc.pool_stats()['busy'] == 0
+
+
+def test_writer_abort(dc, remote):
+    wstream = dc.open_write('/up.bin', chunksize=CHUNK)
+    wstream.write(b'x' * SIZE)
+    wstream.abort()
+    wstream.abort()
+    assert wstream.closed
+    assert not (remote / 'up.bin').exists()
+    assert dc.pool_stats()['busy'] == 0
+
+
+def test_writer_aborted_by_exception(dc, remote):
+    with pytest.raises(RuntimeError):
+        with dc.open_write('/up.bin', chunksize=CHUNK) as wstream:
+            wstream.write(b'x' * SIZE)
+            raise RuntimeError('producer failed')
+    assert not (remote / 'up.bin').exists()
+    assert dc.pool_stats()['busy'] == 0
+
+    # the next upload gets the handle
+    with dc.open_write('/up.bin', chunksize=CHUNK) as wstream:
+        wstream.write(b'y' * CHUNK)
+    assert (remote / 'up.bin').read_bytes() == b'y' * CHUNK
+
+
+def test_remote_write_aborts_on_failed_source(config, remote):
+    (remote / 'synced').mkdir()
+    pydav = tools.core(config())
+    assert pydav.connect()['code'] == 0
+
+    result = pydav.remote_write(failing(3), '/synced/up.bin')
+    assert result['code'] == 1
+    assert not (remote / 'synced' / 'up.bin').exists()
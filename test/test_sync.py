@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import sys
+import subprocess
+import pytest
+from os import path as fpath
+
+from PyDav import client, sync
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav three way synchronization tests against the WebDAV
+    stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+CHECKOUT = fpath.dirname(fpath.dirname(fpath.abspath(__file__)))
+CLIENT = fpath.join(CHECKOUT, 'scripts', 'pydav-client')
+
+
+@pytest.fixture
+def dc(dav):
+    core = client.core(dav.url, 'u', 'p', '/', retries=0)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+@pytest.fixture
+def puts(dav):
+    # PUT requests are counted before answering, unlike dav.requests
+    dav.puts = 0
+    dav.maxputs = 10 ** 6
+    return(dav)
+
+
+def tree(root):
+    found = {}
+    for directory, dirs, files in os.walk(str(root)):
+        for name in files:
+            if name.startswith('.pydav'):
+                continue
+            path = fpath.join(directory, name)
+            with open(path, 'rb') as f:
+                found[fpath.relpath(path, str(root))] = f.read()
+    return(found)
+
+
+def changed(path, data):
+    # a new mtime as well: sizes may not change
+    path.write_bytes(data)
+    st = path.stat()
+    os.utime(str(path), ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10 ** 9))
+
+
+def run(dc, local, remotedir, mode='both', dryrun=False):
+    dc.reset()
+    return(sync.engine(dc, str(local), remotedir, mode=mode).run(dryrun=dryrun))
+
+
+def test_push_creates_remote_root(dc, local, remote):
+    (local / 'a').mkdir()
+    (local / 'a' / 'f1').write_bytes(b'one')
+    (local / 'f2').write_bytes(b'two')
+
+    res = run(dc, local, '/synced/deep', mode='push')
+    assert res['code'] == 0, res['reason']
+    assert tree(remote / 'synced' / 'deep') == {'a/f1': b'one', 'f2': b'two'}
+
+
+def test_both_creates_remote_root(dc, local, remote):
+    (local / 'f1').write_bytes(b'one')
+
+    # a dry run only tells
+    res = run(dc, local, '/synced', dryrun=True)
+    assert res['code'] == 0
+    assert res['counts'] == {'put': 1}
+    assert not (remote / 'synced').exists()
+
+    res = run(dc, local, '/synced')
+    assert res['code'] == 0, res['reason']
+    assert tree(remote / 'synced') == {'f1': b'one'}
+
+
+def test_pull_needs_remote_root(dc, local, remote):
+    with pytest.raises(IOError):
+        run(dc, local, '/synced', mode='pull')
+    assert not (remote / 'synced').exists()
+
+
+def test_manifest(dc, puts, local, remote):
+    (remote / 'synced').mkdir()
+    (local / 'f1').write_bytes(b'one')
+    (remote / 'synced' / 'f2').write_bytes(b'two')
+
+    res = run(dc, local, '/synced')
+    assert res['code'] == 0, res['reason']
+    assert res['counts'] == {'put': 1, 'get': 1}
+    assert fpath.exists(str(local / sync.MANIFEST))
+    sent = puts.puts
+
+    # nothing changed since the recorded state
+    res = run(dc, local, '/synced')
+    assert res['code'] == 0
+    assert res['counts'] == {}
+    assert puts.puts == sent
+    assert tree(local) == tree(remote / 'synced') == {
+        'f1': b'one', 'f2': b'two'}
+
+
+def test_diff(dc, local, remote):
+    (remote / 'synced').mkdir()
+    for name in ['keep', 'lchange', 'rchange', 'ldelete', 'rdelete']:
+        (local / name).write_bytes(name.encode('utf-8'))
+    assert run(dc, local, '/synced')['code'] == 0
+
+    changed(local / 'lchange', b'local version')
+    changed(remote / 'synced' / 'rchange', b'remote version')
+    (local / 'ldelete').unlink()
+    (remote / 'synced' / 'rdelete').unlink()
+    (local / 'lnew').write_bytes(b'local new')
+    (remote / 'synced' / 'rnew').write_bytes(b'remote new')
+
+    res = run(dc, local, '/synced')
+    assert res['code'] == 0, res['reason']
+    assert res['counts'] == {
+        'put': 2, 'get': 2, 'delete': 1, 'remove': 1}
+    expected = {
+        'keep': b'keep', 'lchange': b'local version',
+        'rchange': b'remote version', 'lnew': b'local new',
+        'rnew': b'remote new'}
+    assert tree(local) == tree(remote / 'synced') == expected
+
+
+def test_conflict(dc, local, remote):
+    (remote / 'synced').mkdir()
+    (local / 'f1').write_bytes(b'one')
+    (local / 'f2').write_bytes(b'two')
+    assert run(dc, local, '/synced')['code'] == 0
+
+    changed(local / 'f1', b'local one')
+    changed(remote / 'synced' / 'f1', b'remote one')
+    changed(local / 'f2', b'local two')
+
+    res = run(dc, local, '/synced')
+    assert res['code'] == 2
+    assert res['conflicts'] == ['f1']
+    assert res['failed'] == []
+    # left untouched, the other change went through
+    assert (local / 'f1').read_bytes() == b'local one'
+    assert (remote / 'synced' / 'f1').read_bytes() == b'remote one'
+    assert (remote / 'synced' / 'f2').read_bytes() == b'local two'
+
+    # still a conflict until solved
+    assert run(dc, local, '/synced')['conflicts'] == ['f1']
+    res = run(dc, local, '/synced', mode='push')
+    assert res['code'] == 0
+    assert (remote / 'synced' / 'f1').read_bytes() == b'local one'
+
+
+def test_conflict_exit_code(dav, config, local, remote, tmp_path):
+    (remote / 'synced').mkdir()
+    configpath = config()
+    environ = dict(
+        os.environ, PYTHONPATH=CHECKOUT, XDG_RUNTIME_DIR=str(tmp_path))
+
+    def cli():
+        return(subprocess.run(
+            [sys.executable, CLIENT, '-c', configpath, '-y', 'both',
+             str(local)],
+            stdin=subprocess.DEVNULL, capture_output=True, env=environ))
+
+    (local / 'f1').write_bytes(b'one')
+    assert cli().returncode == 0
+    changed(local / 'f1', b'local one')
+    changed(remote / 'synced' / 'f1', b'remote one')
+
+    done = cli()
+    assert done.returncode == 2, done.stderr
+    assert b'CONFLICT;f1' in done.stdout
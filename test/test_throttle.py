@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import pytest
+
+from PyDav import client, throttle
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav bandwidth limits tests: rates, schedules, token buckets
+    and transfers shaped against the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class clock():
+    '''
+     time.monotonic() stand-in moved forward by the tests
+    '''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return(self.now)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    fake = clock()
+    monkeypatch.setattr(throttle.time, 'monotonic', fake)
+    return(fake)
+
+
+@pytest.fixture
+def unlimited():
+    # limits are process wide
+    yield throttle.shared()
+    throttle.shared().configure()
+
+
+def at(hour, minute):
+    '''
+     Epoch time of today at a local time of day
+    '''
+
+    local = time.localtime()
+    return(time.mktime((local.tm_year, local.tm_mon, local.tm_mday,
+                        hour, minute, 0, 0, 0, -1)))
+
+
+def test_rate():
+    assert throttle.rate('') == 0
+    assert throttle.rate(None) == 0
+    assert throttle.rate(1000) == 1000
+    assert throttle.rate('512K') == 512 * 1024
+    assert throttle.rate('1.5m') == 1536 * 1024
+    assert throttle.rate('2MiB/s') == 2 * 1024 ** 2
+    with pytest.raises(ValueError):
+        throttle.rate('fast')
+
+
+def test_timetable():
+    assert throttle.timetable('') == []
+    assert throttle.timetable('08:00-19:30 1M 256K, 22:00-06:00 0 0') == [
+        (480, 1170, 1024 ** 2, 256 * 1024), (1320, 360, 0, 0)]
+    for wrong in ['08:00 1M 1M', '08:00-25:00 1M 1M', '08:00-09:00 1M']:
+        with pytest.raises(ValueError):
+            throttle.timetable(wrong)
+
+
+def test_bucket(now):
+    tank = throttle.bucket(1000)
+    # empty at first
+    assert tank.delay(500) == 0.5
+    assert tank.delay(500) == 1.0
+    now.now += 1.0
+    assert tank.delay(0) == 0.0
+    # holds one second of tokens at most
+    now.now += 10.0
+    assert tank.delay(1000) == 0.0
+    assert tank.delay(1000) == 1.0
+
+    assert throttle.bucket(0).delay(10 ** 9) == 0.0
+
+
+def test_limits():
+    shaper = throttle.shaper()
+    assert not shaper.limited()
+    assert shaper.limits() == (0, 0)
+
+    shaper.configure(maxrecv='1M', maxsend='100K', shares=4,
+                     schedule='08:00-19:00 400K 0, 22:00-06:00 0 800K')
+    assert shaper.limited()
+    assert shaper.limits(at(7, 59)) == (256 * 1024, 25 * 1024)
+    assert shaper.limits(at(8, 0)) == (100 * 1024, 0)
+    assert shaper.limits(at(23, 0)) == (0, 200 * 1024)
+    # over midnight
+    assert shaper.limits(at(5, 0)) == (0, 200 * 1024)
+
+    with pytest.raises(ValueError):
+        shaper.configure(maxrecv='fast')
+
+
+def test_shape():
+    shaper = throttle.shaper()
+    options = {'WRITEFUNCTION': len}
+    assert shaper.shape(options) is options
+
+    shaper.configure(filerecv='1K', filesend='2K')
+    written = []
+    shaped = shaper.shape({
+        'WRITEFUNCTION': written.append,
+        'READFUNCTION': lambda size: b'x' * size,
+        'MAX_SEND_SPEED_LARGE': 10})
+    assert shaped['MAX_RECV_SPEED_LARGE'] == 1024
+    # set by the caller
+    assert shaped['MAX_SEND_SPEED_LARGE'] == 10
+    shaped['WRITEFUNCTION'](b'abc')
+    assert written == [b'abc']
+    assert shaped['READFUNCTION'](3) == b'xxx'
+
+
+def test_download_rate(dav, remote, local, unlimited):
+    size = 192 * 1024
+    (remote / 'f.bin').write_bytes(os.urandom(size))
+    dc = client.core(dav.url, 'u', 'p', '/', maxrecv='128K')
+    assert dc.connect()['code'] == 0
+    assert unlimited.limits() == (128 * 1024, 0)
+
+    started = time.monotonic()
+    assert dc.download('/f.bin', str(local / 'f.bin'))['code'] == 0
+    # one second of tokens at most, refilled at 128K per second
+    assert time.monotonic() - started >= 1.2
+    assert (local / 'f.bin').stat().st_size == size
+
+
+def test_upload_rate(dav, remote, local, unlimited):
+    size = 192 * 1024
+    (local / 'f.bin').write_bytes(os.urandom(size))
+    dc = client.core(dav.url, 'u', 'p', '/', maxsend='128K')
+    assert dc.connect()['code'] == 0
+
+    started = time.monotonic()
+    assert dc.upload(str(local / 'f.bin'), '/')['code'] == 0
+    assert time.monotonic() - started >= 1.2
+    assert (remote / 'f.bin').stat().st_size == size
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import threading
+import pytest
+
+from PyDav import client, transfer
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav transfer scheduler tests, with stand-in clients and
+    against the WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+
+class fake():
+    '''
+     Client counting the transfers running at once, failing the sources
+     named "bad"
+    '''
+
+    lock = threading.Lock()
+    running = 0
+    highest = 0
+    built = 0
+
+    def __init__(self, refused=False):
+        self.refused = refused
+        with fake.lock:
+            fake.built += 1
+
+    def connect(self):
+        if self.refused:
+            return({'code': 1, 'reason': 'refused'})
+        return({'code': 0})
+
+    def reset(self):
+        return({'code': 0, 'reason': ''})
+
+    def upload(self, local, remote, recurse=False):
+        with fake.lock:
+            fake.running += 1
+            fake.highest = max(fake.highest, fake.running)
+        time.sleep(0.05)
+        with fake.lock:
+            fake.running -= 1
+        if local == 'bad':
+            return({'code': 1, 'reason': 'failed'})
+        return({'code': 0, 'reason': ''})
+
+
+@pytest.fixture(autouse=True)
+def counters():
+    fake.running = fake.highest = fake.built = 0
+
+
+def tasks(*sources):
+    return([transfer.task('upload', s, '/{0}'.format(s)) for s in sources])
+
+
+def test_nothing():
+    res = transfer.scheduler(fake, {}).run([])
+    assert res == {'code': 0, 'reason': 'Nothing to transfer.', 'results': []}
+
+
+def test_jobs():
+    res = transfer.scheduler(fake, {}, jobs=3).run(
+        tasks(*['f{0}'.format(i) for i in range(9)]))
+    assert res['code'] == 0
+    assert res['reason'] == '9 transfers done.'
+    assert fake.highest == 3
+    # one client per worker, not per transfer
+    assert fake.built == 3
+
+
+def test_failures_keep_order():
+    res = transfer.scheduler(fake, {}, jobs=2).run(
+        tasks('f1', 'bad', 'f2', 'bad'))
+    assert res['code'] == 1
+    assert res['reason'] == '2 of 4 transfers failed.'
+    assert [(r.source, r.code) for r in res['results']] == [
+        ('f1', 0), ('bad', 1), ('f2', 0), ('bad', 1)]
+
+
+def test_worker_not_connected():
+    res = transfer.scheduler(fake, {'refused': True}, jobs=2).run(
+        tasks('f1', 'f2'))
+    assert res['code'] == 1
+    assert all(r.reason == 'refused' for r in res['results'])
+
+
+def test_shared_workers():
+    made = []
+
+    def shared():
+        made.append(fake())
+        return(made[-1])
+
+    res = transfer.scheduler(
+        fake, {'refused': True}, jobs=2, shared=shared).run(
+            tasks('f1', 'f2', 'f3'))
+    # given connected, the factory is not used
+    assert res['code'] == 0
+    assert 1 <= len(made) <= 2
+
+
+@pytest.fixture
+def tree(local):
+    top = local / 'dir'
+    (top / 'sub').mkdir(parents=True)
+    for i in range(3):
+        (top / 'f{0}'.format(i)).write_bytes(os.urandom(1000 + i))
+        (top / 'sub' / 'g{0}'.format(i)).write_bytes(os.urandom(2000 + i))
+    return(top)
+
+
+@pytest.mark.parametrize('pool', ['thread', 'process'])
+def test_directory_upload(dav, remote, tree, pool):
+    dc = client.core(dav.url, 'u', 'p', '/', jobs=3, pool=pool)
+    assert dc.connect()['code'] == 0
+
+    res = dc.upload(str(tree), '/')
+    assert res['code'] == 0, res['reason']
+    for path in tree.rglob('*'):
+        if path.is_file():
+            rel = path.relative_to(tree)
+            assert (remote / 'dir' / rel).read_bytes() == path.read_bytes()
+
+
+def test_directory_upload_failures(dav, remote, tree):
+    dav.maxputs = 2
+    dc = client.core(dav.url, 'u', 'p', '/', jobs=3, retries=0)
+    assert dc.connect()['code'] == 0
+
+    res = dc.upload(str(tree), '/')
+    assert res == {'code': 1, 'reason': '4 of 6 transfers failed.'}
+
+    # into the existing directory
+    dav.puts = 0
+    dc.reset()
+    for path in tree.rglob('*'):
+        if path.is_file():
+            path.write_bytes(b'changed')
+    res = dc.upload(str(tree), '/')
+    assert res == {'code': 1, 'reason': '4 of 6 transfers failed.'}
+
+
+def test_worker_error_state(dav):
+    dc = client.core(dav.url, 'u', 'p', '/')
+    assert dc.connect()['code'] == 0
+    twin = dc.worker()
+    # same shape as the state reset() leaves
+    assert twin._core__error == {'code': 0, 'reason': ''}
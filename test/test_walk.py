@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import time
+import pytest
+
+from PyDav import client, listing
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav recursive listing and search tests against the WebDAV
+    stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+TREE = ['/synced', '/synced/a.txt', '/synced/docs', '/synced/docs/report.txt',
+        '/top.txt']
+
+
+@pytest.fixture
+def tree(remote):
+    (remote / 'synced' / 'docs').mkdir(parents=True)
+    for name in ['synced/a.txt', 'synced/docs/report.txt', 'top.txt']:
+        (remote / name).write_bytes(b'x')
+    return(remote)
+
+
+@pytest.fixture
+def dc(dav, tree):
+    core = client.core(dav.url, 'u', 'p', '/')
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+def test_rebase():
+    assert listing.rebase('/', '/', '/a/b') == '/a/b'
+    assert listing.rebase('//', '/', '/a') == '/a'
+    assert listing.rebase('/d/', '/d', '/d/a') == '/d/a'
+    # as the caller gave it
+    assert listing.rebase('d', '/d', '/d/a') == 'd/a'
+
+
+@pytest.mark.parametrize('path', ['/', '', '//'])
+def test_walk_root(dc, path):
+    found = dc.walk(path or '/')
+    assert sorted(e.path for e in found) == TREE
+    assert dict((e.path, e.is_dir) for e in found)['/synced/docs']
+    assert sorted(dc.list_recurse(path or '/')) == TREE
+
+
+def test_walk_below(dc):
+    assert sorted(e.path for e in dc.walk('/synced/')) == [
+        '/synced/a.txt', '/synced/docs', '/synced/docs/report.txt']
+    assert sorted(e.path for e in dc.walk('synced')) == [
+        'synced/a.txt', 'synced/docs', 'synced/docs/report.txt']
+
+
+def test_search_root(dc):
+    seen = []
+    assert sorted(dc.search('.txt', callback=seen.append)) == [
+        '/synced/a.txt', '/synced/docs/report.txt', '/top.txt']
+    assert sorted(seen) == sorted(dc.search('.txt', '/'))
+    assert dc.search('docs', '/synced') == ['/synced/docs']
+
+
+def counted(dav, method, expected, timeout=5.0):
+    # requests are counted once answered
+    limit = time.monotonic() + timeout
+    while dav.requests.get(method, 0) < expected and \
+            time.monotonic() < limit:
+        time.sleep(0.01)
+    # and no more
+    time.sleep(0.1)
+    return(dav.requests.get(method, 0))
+
+
+@pytest.mark.parametrize('path', [False, '/'])
+def test_server_search_root(dav, tree, path):
+    dav.dasl = True
+    dc = client.core(dav.url, 'u', 'p', '/')
+    assert dc.connect()['code'] == 0
+    time.sleep(0.1)
+    dav.reset()
+    seen = []
+    found = dc.search('.txt', path, callback=seen.append)
+    assert sorted(found) == [
+        '/synced/a.txt', '/synced/docs/report.txt', '/top.txt']
+    assert sorted(seen) == sorted(found)
+    # one request, no listing
+    assert counted(dav, 'SEARCH', 1) == 1
+    assert not dav.requests.get('PROPFIND')
+
+
+def test_server_search_below(dav, tree):
+    dav.dasl = True
+    dc = client.core(dav.url, 'u', 'p', '/')
+    assert dc.connect()['code'] == 0
+    assert sorted(dc.search('.txt', '/synced/')) == [
+        '/synced/a.txt', '/synced/docs/report.txt']
+    assert sorted(dc.search('.txt', 'synced')) == [
+        'synced/a.txt', 'synced/docs/report.txt']
+    assert counted(dav, 'SEARCH', 2) == 2
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+
+import os
+import time
+import threading
+import pytest
+from os import path as fpath
+
+from PyDav import client, tools, watch
+
+__author__ = "Alain Maibach"
+__status__ = "Tests purpose only"
+
+'''
+    Python3 PyDav watch tests: coalesced local changes, and changes sent
+    as they happen with the inotify and polling backends against the
+    WebDAV stand-in server
+    Copyright (C) 2017 MAIBACH ALAIN
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+    Contact: alain.maibach@gmail.com / 34 rue appienne, 13480 Calas - FRANCE.
+'''
+
+BACKENDS = [
+    pytest.param('inotify', marks=pytest.mark.skipif(
+        not watch.available(), reason='inotify unavailable')),
+    'poll'
+]
+
+
+def settled(check, timeout=10.0):
+    '''
+     Wait for check() to be true, False on timeout
+    '''
+
+    limit = time.monotonic() + timeout
+    while time.monotonic() < limit:
+        if check():
+            return(True)
+        time.sleep(0.05)
+    return(check())
+
+
+class running():
+    '''
+     Watcher run on its own thread until stopped, its result kept
+    '''
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+        self.result = None
+        self.__stop = threading.Event()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.start()
+
+    def __run(self):
+        self.result = self.watcher.run(until=self.__stop.is_set)
+
+    def stop(self):
+        self.__stop.set()
+        self.__thread.join(30)
+        return(self.result)
+
+
+@pytest.fixture
+def dc(dav, remote):
+    (remote / 'synced').mkdir()
+    # no metadata cache, the test server is changed behind the client back
+    core = client.core(dav.url, 'u', 'p', '/', cachettl=0)
+    assert core.connect()['code'] == 0
+    return(core)
+
+
+@pytest.fixture
+def watching(dc, local, tmp_path):
+    started = []
+
+    def start(backend):
+        found = running(watch.watcher(
+            dc, str(local), '/synced', delay=0.1, backend=backend,
+            interval=0.2, markpath=str(tmp_path / 'watch.mark')))
+        started.append(found)
+        # the watch begins once the first scan or inotify watches are done
+        time.sleep(0.5)
+        return(found)
+
+    yield start
+    for found in started:
+        found.stop()
+
+
+def test_changes():
+    pending = watch.changes()
+    assert pending.first() is None
+    pending.changed('a', 1.0)
+    pending.changed('a', 2.0)
+    pending.created('d', 2.0)
+    pending.changed('d/f', 3.0, created=True)
+    assert len(pending) == 3
+    assert (pending.first(), pending.last()) == (2.0, 3.0)
+
+    # created since the last send: no remote MOVE
+    pending.moved('d', 'e', 4.0)
+    # known on the remote
+    pending.moved('old', 'new', 4.0)
+    pending.changed('gone/f', 4.0)
+    pending.gone('gone', 4.0)
+    moves, dirs, files = pending.take(3.5, settle=1.0)
+    assert moves == [('old', 'new')]
+    assert dirs == ['e']
+    assert files == ['a']
+    assert pending.take(5.0, settle=1.0) == ([], [], ['e/f'])
+    assert len(pending) == 0
+
+
+def test_tree(tmp_path):
+    (tmp_path / 'd').mkdir()
+    (tmp_path / 'd' / 'f').write_bytes(b'f')
+    (tmp_path / 'g').write_bytes(b'g')
+    (tmp_path / 'h.part').write_bytes(b'h')
+    assert sorted(watch.tree(str(tmp_path))) == [
+        ('d', True), ('d/f', False), ('g', False)]
+
+    since = time.time_ns()
+    time.sleep(0.05)
+    (tmp_path / 'd' / 'f').write_bytes(b'changed')
+    assert list(watch.tree(str(tmp_path), since=since)) == [('d/f', False)]
+
+
+def test_default_mark(cachehome, tmp_path):
+    path = watch.default_mark(str(tmp_path), '/synced/')
+    assert path == watch.default_mark(str(tmp_path) + '/', 'synced')
+    assert fpath.dirname(path) == str(cachehome / 'pydav')
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_sent(watching, backend, local, remote):
+    base = remote / 'synced'
+    (local / 'kept').write_bytes(b'kept')
+    # changed before the watch, file system clock slack included
+    time.sleep(0.3)
+    watcher = watching(backend)
+
+    (local / 'a').write_bytes(b'one')
+    assert settled(lambda: (base / 'a').exists())
+    (local / 'a').write_bytes(b'changed')
+    assert settled(lambda: (base / 'a').read_bytes() == b'changed')
+
+    os.makedirs(str(local / 'd' / 'e'))
+    (local / 'd' / 'e' / 'f').write_bytes(b'deep')
+    assert settled(lambda: (base / 'd' / 'e' / 'f').exists())
+
+    # removals are not sent
+    os.unlink(str(local / 'a'))
+    (local / 'b').write_bytes(b'two')
+    assert settled(lambda: (base / 'b').exists())
+    assert (base / 'a').exists()
+
+    res = watcher.stop()
+    assert res['code'] == 0
+    assert res['counts']['put'] >= 3
+    # present before the watch and never changed
+    assert not (base / 'kept').exists()
+
+
+def test_renamed(watching, local, remote):
+    if not watch.available():
+        pytest.skip('inotify unavailable')
+    base = remote / 'synced'
+    watcher = watching('inotify')
+    (local / 'big').write_bytes(os.urandom(100000))
+    assert settled(lambda: (base / 'big').exists())
+
+    os.rename(str(local / 'big'), str(local / 'moved'))
+    assert settled(lambda: (base / 'moved').exists())
+    assert not (base / 'big').exists()
+    res = watcher.stop()
+    assert res['counts'] == {'put': 1, 'move': 1}
+
+
+def test_unwatched_changes(watching, local, remote):
+    base = remote / 'synced'
+    watching('poll').stop()
+
+    # changed while no watcher ran
+    (local / 'offline').write_bytes(b'offline')
+    watcher = watching('poll')
+    assert settled(lambda: (base / 'offline').exists())
+    assert watcher.stop()['counts'] == {'put': 1}
+
+
+def test_tools(config, remote, local, tmp_path):
+    (remote / 'synced').mkdir()
+    pydav = tools.core(config(watch={'backend': 'poll', 'interval': 0.2}))
+    assert pydav.connect()['code'] == 0
+    res = pydav.watch(local=str(tmp_path / 'missing'), until=lambda: True)
+    assert res['code'] == 1
+    assert 'not found' in res['content']['reason']
+
+    res = pydav.watch(local=str(local), until=lambda: True)
+    assert res['code'] == 0
+    assert res['content']['reason'].endswith('no change.')
+
+    pydav = tools.core(config(watch={'backend': 'fsevents'}))
+    assert pydav.connect()['code'] == 0
+    res = pydav.watch(until=lambda: True)
+    assert res == {'code': 1, 'content': 'Unknown watch backend fsevents'}